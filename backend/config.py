@@ -71,6 +71,10 @@ class Config:
     except json.JSONDecodeError:
         SUPPRESSION_RULES = []
 
+    # キーワード辞書（kpi, kpi_downgrade, exit, risk, escalation, opposition）の上書き用JSONファイル。
+    # {"カテゴリ": ["キーワード", ...]} の形式で、含まれないカテゴリは既定値を使う。空の場合は既定値のみ
+    KEYWORD_SETS_PATH: str = os.getenv("KEYWORD_SETS_PATH", "")
+
     # API Key 認証（JSON配列: [{"key":"xxx","role":"operator"}, ...]。空なら認証無効）
     _api_keys_json = os.getenv("API_KEYS", "[]")
     API_KEYS: List[Dict[str, str]] = []
@@ -101,10 +105,128 @@ class Config:
     LLM_TIMEOUT: int = int(os.getenv("LLM_TIMEOUT", "60"))  # タイムアウト時間（秒）
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.2"))  # 温度パラメータ
     LLM_TOP_P: float = float(os.getenv("LLM_TOP_P", "0.95"))  # Top-pサンプリング
+    # LLMの呼び出し先（genai: Gen AI SDK / vertex: Vertex AI SDK / fake: APIを呼ばないローカル実装。負荷試験・CI用）
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "genai")
+    # fake バックエンドの挙動（同じ LLM_FAKE_SEED・同じプロンプトなら同じ結果を再現する）
+    LLM_FAKE_LATENCY_DISTRIBUTION: str = os.getenv("LLM_FAKE_LATENCY_DISTRIBUTION", "lognormal")  # fixed | uniform | lognormal
+    LLM_FAKE_LATENCY_MS: float = float(os.getenv("LLM_FAKE_LATENCY_MS", "800"))  # 遅延の基準値（固定値・一様分布の中心・対数正規分布の中央値）
+    LLM_FAKE_LATENCY_SPREAD: float = float(os.getenv("LLM_FAKE_LATENCY_SPREAD", "0.5"))  # 一様分布の幅（割合）・対数正規分布のシグマ
+    LLM_FAKE_ERROR_RATE: float = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))  # 503 を返す確率
+    LLM_FAKE_THROTTLE_RATE: float = float(os.getenv("LLM_FAKE_THROTTLE_RATE", "0"))  # 429 を返す確率
+    LLM_FAKE_OUTPUT_TOKENS: int = int(os.getenv("LLM_FAKE_OUTPUT_TOKENS", "0"))  # 出力トークン数（0は応答テキストから推定）
+    LLM_FAKE_SEED: int = int(os.getenv("LLM_FAKE_SEED", "0"))
+    LLM_FAKE_RESPONSES_DIR: str = os.getenv("LLM_FAKE_RESPONSES_DIR", "")  # canned JSON のディレクトリ（空文字は config/fake_llm）
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs")  # 出力ファイルの保存ディレクトリ
     # 日次トークン上限（0は無制限）。超えた場合はLLM呼び出しをスキップしモックにフォールバック
     LLM_DAILY_TOKEN_LIMIT: int = int(os.getenv("LLM_DAILY_TOKEN_LIMIT", "0"))
-    
+    # 上限に近づいたときの段階的な縮退（残りの割合がしきい値を下回ったら）: 重みの低いロールを除外 → 軽いモデルに切り替え → モック
+    LLM_BUDGET_DROP_ROLES_RATIO: float = float(os.getenv("LLM_BUDGET_DROP_ROLES_RATIO", "0.3"))
+    LLM_BUDGET_MIN_ROLE_WEIGHT: float = float(os.getenv("LLM_BUDGET_MIN_ROLE_WEIGHT", "0.15"))  # これ未満の重みのロール（governance 等）を除外
+    LLM_BUDGET_CHEAP_MODEL_RATIO: float = float(os.getenv("LLM_BUDGET_CHEAP_MODEL_RATIO", "0.1"))
+    LLM_BUDGET_CHEAP_MODEL: str = os.getenv("LLM_BUDGET_CHEAP_MODEL", "")  # 切り替え先（空文字は LLM_MODEL_CHAIN の最後のモデル）
+    # プロンプト予算: 1プロンプトの推定入力トークン数の上限（0は無制限）。超える入力は長時間会議モードの分割・切り詰めを強制し、
+    # それでも超えるプロンプトは LLM_BUDGET_CHEAP_MODEL（未設定ならチェーンの最後のモデル）で呼ぶ。
+    # 日次上限がある場合は、推定入力 + LLM_ADMISSION_OUTPUT_TOKENS が残りを超える呼び出しを送る前に拒否する（モックにフォールバック）
+    LLM_PROMPT_TOKEN_BUDGET: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "32000"))
+    # トークン推定の補正（LLM呼び出しの usage_metadata の実測値から文字種ごとの係数を補正する）
+    TOKEN_ESTIMATOR_CALIBRATION_ENABLED: bool = os.getenv("TOKEN_ESTIMATOR_CALIBRATION_ENABLED", "true").lower() == "true"
+    TOKEN_ESTIMATOR_MIN_SAMPLES: int = int(os.getenv("TOKEN_ESTIMATOR_MIN_SAMPLES", "20"))  # 補正した係数を使い始めるまでの実測数
+    # LLM使用量台帳（呼び出しごとのトークン数・所要時間を分析ID・ロール・エンドポイント付きで記録）
+    LLM_USAGE_LEDGER_ENABLED: bool = os.getenv("LLM_USAGE_LEDGER_ENABLED", "true").lower() == "true"
+    LLM_USAGE_LEDGER_DB_PATH: str = os.getenv("LLM_USAGE_LEDGER_DB_PATH", "data/usage/llm_usage.sqlite3")  # 空文字はメモリ上のみ
+    LLM_USAGE_LEDGER_RETENTION_DAYS: int = int(os.getenv("LLM_USAGE_LEDGER_RETENTION_DAYS", "30"))  # 呼び出し明細の保持日数（時間別の集計は残す）
+    LLM_USAGE_LEDGER_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("LLM_USAGE_LEDGER_FLUSH_INTERVAL_SECONDS", "1.0"))  # 記録をまとめて書き込む間隔
+    LLM_USAGE_LEDGER_PURGE_INTERVAL_SECONDS: float = float(os.getenv("LLM_USAGE_LEDGER_PURGE_INTERVAL_SECONDS", "3600"))  # 保持期間を過ぎた明細を削除する間隔
+    # 非同期パスでSDKに async API が無い場合に同期呼び出しを流すスレッドプールの上限
+    LLM_EXECUTOR_WORKERS: int = int(os.getenv("LLM_EXECUTOR_WORKERS", "8"))
+    # LLMレスポンスキャッシュ（プロンプト・モデル・生成パラメータのハッシュをキーに再利用）
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))  # 有効期間（24時間）
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))  # メモリ層の最大エントリ数
+    LLM_CACHE_DB_PATH: str = os.getenv("LLM_CACHE_DB_PATH", "data/cache/llm_response_cache.sqlite3")  # 空文字でディスク層を無効化
+    # モデルのフォールバックチェーン（カンマ区切り。LLM_MODEL の次に試すモデルを軽い順に）。例: "gemini-2.5-flash-lite"
+    # 呼び出し失敗・パースできない応答の場合は次のモデルで再試行し、最初にパースできた応答を使う
+    LLM_MODEL_CHAIN: str = os.getenv("LLM_MODEL_CHAIN", "")
+    # 構造化出力: JSON応答の生成設定に response_schema（get_response_schema のスキーマ）を渡し、スキーマに沿った出力をモデル側で強制する
+    LLM_RESPONSE_SCHEMA_ENABLED: bool = os.getenv("LLM_RESPONSE_SCHEMA_ENABLED", "true").lower() == "true"
+    # 出力修正: パースできない応答は元のプロンプトを再送せず、不正な出力と問題点だけを送って同じモデルに修正させる
+    # （複数ロール一括評価では、バリデーションに失敗したロールだけを修正依頼する）
+    LLM_REPAIR_ENABLED: bool = os.getenv("LLM_REPAIR_ENABLED", "true").lower() == "true"
+    # ヘッジ要求: 応答がモデルのレイテンシのパーセンタイルを超えたら、チェーンの次のモデル（無ければ同じモデル）に2本目を送る
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # 2本目を送るまでの待ち時間に使うパーセンタイル
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # これ未満の計測数では LLM_HEDGE_DEFAULT_DELAY を使う
+    LLM_HEDGE_DEFAULT_DELAY: float = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "15"))  # 計測が少ない間の待ち時間（秒）
+    LLM_HEDGE_MIN_DELAY: float = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1"))  # 待ち時間の下限（秒。ヘッジの出し過ぎを防ぐ）
+    # アドミッション制御: プロセス全体のLLM呼び出しを分あたりの上限（RPM / TPM）と同時実行ウィンドウ（AIMD）で待たせる
+    LLM_ADMISSION_ENABLED: bool = os.getenv("LLM_ADMISSION_ENABLED", "true").lower() == "true"
+    LLM_RPM_LIMIT: int = int(os.getenv("LLM_RPM_LIMIT", "0"))  # 1分あたりのリクエスト数（0は無制限。プロジェクトのクォータに合わせて設定）
+    LLM_TPM_LIMIT: int = int(os.getenv("LLM_TPM_LIMIT", "0"))  # 1分あたりのトークン数（入力 + 出力、0は無制限）
+    LLM_CONCURRENCY_INITIAL: int = int(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))  # 同時実行数の初期値（成功で広げ、429・タイムアウトで半分に狭める）
+    LLM_CONCURRENCY_MIN: int = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+    LLM_CONCURRENCY_MAX: int = int(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+    LLM_ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("LLM_ADMISSION_QUEUE_TIMEOUT", "30"))  # 待ち行列で待つ最大秒数（超えたらモックにフォールバック）
+    LLM_ADMISSION_OUTPUT_TOKENS: int = int(os.getenv("LLM_ADMISSION_OUTPUT_TOKENS", "1024"))  # TPMの予約に加える想定出力トークン数（完了後に実績で精算）
+    # サーキットブレーカー: 直近のエラー率・遅延率が閾値を超えたら一定時間LLMを呼ばず、リトライを待たずにルールベース / モックの結果を返す
+    LLM_CIRCUIT_BREAKER_ENABLED: bool = os.getenv("LLM_CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    LLM_CIRCUIT_WINDOW_SECONDS: float = float(os.getenv("LLM_CIRCUIT_WINDOW_SECONDS", "60"))  # エラー率・遅延率を集計する直近の期間
+    LLM_CIRCUIT_MIN_CALLS: int = int(os.getenv("LLM_CIRCUIT_MIN_CALLS", "10"))  # 判定に必要な最小呼び出し数
+    LLM_CIRCUIT_FAILURE_RATE: float = float(os.getenv("LLM_CIRCUIT_FAILURE_RATE", "0.5"))  # これ以上のエラー率で開く
+    LLM_CIRCUIT_SLOW_CALL_SECONDS: float = float(os.getenv("LLM_CIRCUIT_SLOW_CALL_SECONDS", "30"))  # これ以上かかった呼び出しを遅延とみなす
+    LLM_CIRCUIT_SLOW_RATE: float = float(os.getenv("LLM_CIRCUIT_SLOW_RATE", "0.8"))  # これ以上の遅延率で開く
+    LLM_CIRCUIT_OPEN_SECONDS: float = float(os.getenv("LLM_CIRCUIT_OPEN_SECONDS", "30"))  # 開いてから試験呼び出し（half_open）までの秒数
+    # コンテキストキャッシュ: ロール別プロンプトの共通の先頭部分（評価指示 + 会議・チャット・資料）をプロバイダ側にキャッシュして再利用
+    LLM_CONTEXT_CACHE_ENABLED: bool = os.getenv("LLM_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CONTEXT_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CONTEXT_CACHE_TTL_SECONDS", "600"))  # 有効期間（保存料金がかかるため短め）
+    LLM_CONTEXT_CACHE_MIN_TOKENS: int = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "2048"))  # これ未満の先頭部分はキャッシュしない
+    LLM_CONTEXT_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CONTEXT_CACHE_MAX_ENTRIES", "32"))  # 同時に保持する最大キャッシュ数
+
+    # プロンプトテンプレート（config/prompts/）の更新を確認する間隔（秒）。変更されたファイルだけ再読み込みする
+    PROMPT_RELOAD_CHECK_SECONDS: float = float(os.getenv("PROMPT_RELOAD_CHECK_SECONDS", "5"))
+
+    # マルチ視点LLM分析の並列実行設定
+    # true の場合は全ロールを同時に評価し、分析レイテンシを「最も遅い1ロール分」に抑える
+    MULTI_VIEW_CONCURRENT: bool = os.getenv("MULTI_VIEW_CONCURRENT", "true").lower() == "true"
+    MULTI_VIEW_ROLE_TIMEOUT: float = float(os.getenv("MULTI_VIEW_ROLE_TIMEOUT", "45"))  # ロール単位のタイムアウト（秒。ロールの実行開始から数える）
+    MULTI_VIEW_DEADLINE: float = float(os.getenv("MULTI_VIEW_DEADLINE", "60"))  # 1分析あたりの締め切り（秒）。超過ロールは除外してアンサンブル
+    MULTI_VIEW_MAX_WORKERS: int = int(os.getenv("MULTI_VIEW_MAX_WORKERS", "16"))  # ロール評価用スレッドプールの上限
+    MULTI_VIEW_MAX_IN_FLIGHT: int = int(os.getenv("MULTI_VIEW_MAX_IN_FLIGHT", "4"))  # 1分析あたり同時に実行するロール評価の上限
+    # per_role: ロールごとにLLMを呼ぶ / single_call: 1回の呼び出しで全ロールを評価（入力トークンを1回分に削減）
+    MULTI_VIEW_MODE: str = os.getenv("MULTI_VIEW_MODE", "per_role").lower()
+    # ルールベースの結果だけでエスカレーション判断が確定する場合はLLMロールを呼ばない（0 / 1 / 全ロールに絞る）
+    LLM_GATING_ENABLED: bool = os.getenv("LLM_GATING_ENABLED", "true").lower() == "true"
+    # severity の引き上げでしか判断が変わらない場合に評価する代表ロール（空文字の場合はLLMを呼ばない）
+    LLM_GATING_PROBE_ROLE: str = os.getenv("LLM_GATING_PROBE_ROLE", "executive")
+    # 長時間会議モード: 推定トークン数が閾値を超える議事録は、チャンク単位の抽出結果を集約したダイジェストに置き換える
+    LONG_INPUT_ENABLED: bool = os.getenv("LONG_INPUT_ENABLED", "true").lower() == "true"
+    LONG_INPUT_THRESHOLD_TOKENS: int = int(os.getenv("LONG_INPUT_THRESHOLD_TOKENS", "12000"))  # ダイジェストに切り替える議事録の推定トークン数
+    LONG_INPUT_CHUNK_TOKENS: int = int(os.getenv("LONG_INPUT_CHUNK_TOKENS", "4000"))  # 1チャンクのトークン予算
+    LONG_INPUT_DIGEST_TOKENS: int = int(os.getenv("LONG_INPUT_DIGEST_TOKENS", "3000"))  # ダイジェスト全体のトークン予算
+    LONG_INPUT_MAX_WORKERS: int = int(os.getenv("LONG_INPUT_MAX_WORKERS", "4"))  # 差し替えたチャンク抽出（LLM等）の並行数。既定のキーワード抽出は逐次
+    LONG_INPUT_CHAT_TOKENS: int = int(os.getenv("LONG_INPUT_CHAT_TOKENS", "4000"))  # チャットログのトークン予算（超過分は中間を省略）
+    LONG_INPUT_MATERIALS_TOKENS: int = int(os.getenv("LONG_INPUT_MATERIALS_TOKENS", "4000"))  # 会議資料のトークン予算（超過分は中間を省略）
+    # プロンプト入力の圧縮（描画前に NFKC・空白を正規化し、フィラー発言の除去・同じ発言者の連続発言の結合・チャットの引用の重複除去を行う）
+    PROMPT_COMPACTION_ENABLED: bool = os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() == "true"
+    PROMPT_COMPACTION_FILLER_MAX_CHARS: int = int(os.getenv("PROMPT_COMPACTION_FILLER_MAX_CHARS", "8"))  # フィラーとして除く発言の最大文字数（句読点を除く）
+
+    # 同じ入力（会議・チャット・資料の内容）の分析が実行中なら、新たに実行せず完了を待って結果を共有する
+    ANALYZE_COALESCING_ENABLED: bool = os.getenv("ANALYZE_COALESCING_ENABLED", "true").lower() == "true"
+
+    # バッチ分析（POST /api/analyze/batch）
+    ANALYZE_BATCH_MAX_ITEMS: int = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "100"))  # 1リクエストあたりの最大件数
+    ANALYZE_BATCH_CONCURRENCY: int = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", "4"))  # LLM分析の同時実行数（全バッチ共通の上限）
+
+    # 議事録の再取り込みで追記によりルール判定の入力が変わった場合、分析済みの会議をジョブで再分析する
+    INCREMENTAL_REANALYZE_ENABLED: bool = os.getenv("INCREMENTAL_REANALYZE_ENABLED", "true").lower() == "true"
+
+    # ジョブキュー（Prefer: respond-async 指定時の /api/analyze・/api/execute）
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()  # memory または sqlite
+    JOB_QUEUE_DB_PATH: str = os.getenv("JOB_QUEUE_DB_PATH", "data/jobs/jobs.sqlite3")  # sqlite 利用時の保存先
+    JOB_QUEUE_WORKERS: int = int(os.getenv("JOB_QUEUE_WORKERS", "4"))  # 同時に実行するジョブ数
+    JOB_IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("JOB_IDEMPOTENCY_TTL_SECONDS", "600"))  # 成功したジョブを同一リソースの再投入に返す期間
+    JOB_STORE_MAX_JOBS: int = int(os.getenv("JOB_STORE_MAX_JOBS", "1000"))  # 保持するジョブ数の上限（完了ジョブから削除）
+    JOB_RETENTION_SECONDS: int = int(os.getenv("JOB_RETENTION_SECONDS", "86400"))  # 完了したジョブを保持する期間
+
     @classmethod
     def get_timeout(cls, timeout_type: str = "default") -> int:
         """
@@ -15,12 +15,12 @@ except (UnicodeDecodeError, Exception):
 
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 from pydantic import BaseModel, ValidationError as PydanticValidationError
-from typing import List, Optional, Dict, Any, Set
+from typing import Callable, List, Optional, Dict, Any, Set, Tuple
 import uuid
 import copy
 from datetime import datetime
@@ -30,6 +30,12 @@ import asyncio
 import json
 from utils.logger import logger, set_log_context, clear_log_context
 from utils.simple_cache import analysis_cache, execution_results_cache
+from utils.llm_response_cache import get_response_cache
+from utils.llm_context_cache import get_context_cache
+from utils.llm_admission import get_admission_controller, llm_priority
+from utils.llm_usage_tracker import get_usage_tracker
+from utils.llm_usage_ledger import GROUP_BY_COLUMNS, get_usage_ledger, llm_usage_tags
+from utils.single_flight import SingleFlight, content_fingerprint
 from utils.error_notifier import error_notification_manager
 from utils.exceptions import (
     HelmException,
@@ -42,6 +48,7 @@ from utils.exceptions import (
 from config import config
 from services import (
     GoogleMeetService,
+    TranscriptParseState,
     GoogleChatService,
     StructureAnalyzer,
     GoogleWorkspaceService,
@@ -51,6 +58,7 @@ from services import (
     LLMService,
     MultiRoleLLMAnalyzer,
     EnsembleScoringService,
+    LLMGate,
 )
 from services.agents.research_agent import execute_research_task
 from services.agents.analysis_agent import execute_analysis_task
@@ -75,6 +83,15 @@ except ImportError as e:
     DATA_MASKING_AVAILABLE = False
     DataMaskingService = None
 
+# 根拠引用サービス（エラーハンドリング付きでインポート）
+try:
+    from services.evidence_citation import EvidenceCitationService
+    EVIDENCE_CITATION_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"EvidenceCitationService not available: {e}")
+    EVIDENCE_CITATION_AVAILABLE = False
+    EvidenceCitationService = None
+
 # 監査ログサービス（エラーハンドリング付きでインポート）
 try:
     from services.audit_log import AuditLogService, AuditAction
@@ -88,9 +105,12 @@ from services.output_service import OutputService
 from services.evaluation_metrics import EvaluationMetrics
 from services.analysis_metrics import AnalysisMetrics
 from services.retention_cleanup import run_retention_cleanup
+from services.prompts.registry import get_prompt_registry
+from services.input_compaction import get_input_compactor
 from services.definition_loader import DefinitionLoader
 from services.responsibility_resolver import ResponsibilityResolver
 from services.approval_flow_engine import ApprovalFlowEngine
+from services.job_queue import Job, JobQueue, create_job_store
 
 app = FastAPI(
     title=config.API_TITLE,
@@ -465,6 +485,9 @@ class AnalyzeRequest(BaseModel):
     chat_id: Optional[str] = None
     material_id: Optional[str] = None
 
+class AnalyzeBatchRequest(BaseModel):
+    items: List[AnalyzeRequest]
+
 class EscalateRequest(BaseModel):
     analysis_id: str
 
@@ -537,6 +560,15 @@ if DATA_MASKING_AVAILABLE and DataMaskingService:
         logger.warning(f"Failed to initialize DataMaskingService: {e}")
         data_masking_service = None
 
+# 根拠引用サービス（状態を持たないため全リクエストで共有）
+evidence_citation_service = None
+if EVIDENCE_CITATION_AVAILABLE and EvidenceCitationService:
+    try:
+        evidence_citation_service = EvidenceCitationService()
+    except Exception as e:
+        logger.warning(f"Failed to initialize EvidenceCitationService: {e}")
+        evidence_citation_service = None
+
 # 監査ログサービス（エラーハンドリング付きで初期化）
 audit_log_service = None
 if AUDIT_LOG_AVAILABLE and AuditLogService:
@@ -557,10 +589,23 @@ drive_service = GoogleDriveService(
 )  # 環境変数から認証情報を取得（サービスアカウントまたはOAuth）
 llm_service = LLMService()  # LLM統合サービス
 multi_view_analyzer = MultiRoleLLMAnalyzer(llm_service=llm_service)  # マルチ視点LLM分析
+# 長時間処理（分析・タスク生成）用のジョブキュー。ハンドラは各処理の定義後に登録する
+job_queue = JobQueue(
+    store=create_job_store(
+        config.JOB_QUEUE_BACKEND,
+        config.JOB_QUEUE_DB_PATH,
+        max_jobs=config.JOB_STORE_MAX_JOBS,
+        retention_seconds=config.JOB_RETENTION_SECONDS,
+    ),
+    workers=config.JOB_QUEUE_WORKERS,
+    idempotency_ttl_seconds=config.JOB_IDEMPOTENCY_TTL_SECONDS,
+)
 ensemble_scoring_service = EnsembleScoringService()  # アンサンブルスコアリング
+llm_gate = LLMGate(escalation_engine=escalation_engine, roles=multi_view_analyzer.roles)  # ルール確信度によるLLMロールの絞り込み
 output_service = OutputService(output_dir=os.getenv("OUTPUT_DIR", "outputs"))  # 出力サービス
 evaluation_metrics = EvaluationMetrics(data_dir=os.getenv("EVALUATION_DATA_DIR", "data/evaluation"))
 analysis_metrics = AnalysisMetrics()
+analysis_single_flight = SingleFlight()  # 同一入力の並行分析の合流
 
 # ==================== インメモリストレージ（開発用） ====================
 
@@ -571,6 +616,8 @@ analyses_db: Dict[str, Dict] = {}
 escalations_db: Dict[str, Dict] = {}
 approvals_db: Dict[str, Dict] = {}
 executions_db: Dict[str, Dict] = {}
+# 会議ごとの議事録増分パース状態（再取り込み時は追記分だけをパースする）
+meeting_parse_states: Dict[str, TranscriptParseState] = {}
 
 # グローバル共有コンテキスト（実行IDごとに管理）
 shared_contexts: Dict[str, SharedContext] = {}
@@ -960,6 +1007,44 @@ async def root():
         headers={"Cache-Control": "public, max-age=5"}
     )
 
+def _meeting_rule_signature(parse_state: TranscriptParseState) -> Dict[str, Any]:
+    """
+    会議データのうちルールベース判定に効く値（LLM再評価の要否判定用）
+    
+    増分パースの集計（追記された発言だけで更新済み）から求めるため、発言数に比例する処理はしない。
+    判断集中率は発言が増えるたびに変わるため値そのものは含めず、検出パターンの変化として反映する。
+    """
+    summary = parse_state.rule_summary()
+    return {
+        "kpi_downgrade_count": summary["kpi_downgrade_count"],
+        "kpi_mention_count": summary["kpi_mention_count"],
+        "exit_discussed": summary["exit_discussed"],
+        "pattern_ids": analyzer.detect_pattern_ids(summary),
+    }
+
+
+async def _schedule_reanalysis(meeting_id: str, revision: int) -> Optional[str]:
+    """直近の分析と同じ入力（チャット・資料）で会議の再分析ジョブを投入し、job_id を返す"""
+    latest = next(
+        (a for a in reversed(list(analyses_db.values())) if a.get("meeting_id") == meeting_id),
+        None,
+    )
+    if latest is None:
+        return None
+    payload = {
+        "meeting_id": meeting_id,
+        "chat_id": latest.get("chat_id"),
+        "material_id": latest.get("material_id"),
+    }
+    try:
+        job, _ = await job_queue.enqueue("analyze", "meeting_revision", f"{meeting_id}:{revision}", payload)
+    except Exception as e:
+        logger.warning(f"Failed to schedule reanalysis for meeting {meeting_id}: {e}")
+        return None
+    logger.info(f"Reanalysis scheduled for meeting {meeting_id} (revision {revision}): job {job.job_id}")
+    return job.job_id
+
+
 @app.post("/api/meetings/ingest")
 async def ingest_meeting(request: MeetingIngestRequest):
     """Google Meet議事録の取り込み"""
@@ -991,9 +1076,16 @@ async def ingest_meeting(request: MeetingIngestRequest):
                 details={"meeting_id": request.meeting_id}
             )
         
-        # 議事録をパース
+        # 議事録をパース（同じ会議の再取り込みで前回の続きが追記されていれば追記分のみ）
         try:
-            parsed_data = meet_service.parse_transcript(transcript)
+            parse_state = meeting_parse_states.get(request.meeting_id)
+            if parse_state is None:
+                parse_state = TranscriptParseState()
+            parse_mode = parse_state.feed(transcript)
+            # 変更が無ければ前回のスナップショットをそのまま使う（発言リストを複製しない）
+            previous_parsed = (meetings_db.get(request.meeting_id) or {}).get("parsed_data")
+            parsed_data = previous_parsed if parse_mode == "unchanged" and previous_parsed else parse_state.snapshot()
+            meeting_parse_states[request.meeting_id] = parse_state
         except Exception as e:
             logger.error(f"Failed to parse transcript for meeting {request.meeting_id}: {e}", exc_info=True)
             raise ServiceError(
@@ -1020,8 +1112,28 @@ async def ingest_meeting(request: MeetingIngestRequest):
                 logger.warning(f"Failed to mask meeting data: {e}, using unmasked data")
                 # エラー時はマスキングなしで続行
         
+        previous_meeting = meetings_db.get(request.meeting_id) or {}
+        rule_signature = _meeting_rule_signature(parse_state)
+        rule_inputs_changed = rule_signature != previous_meeting.get("rule_signature")
+        masked_meeting_data["rule_signature"] = rule_signature
+        masked_meeting_data["revision"] = parse_state.revision
         meetings_db[request.meeting_id] = masked_meeting_data
         
+        # 既に分析済みの会議で追記によりルールの入力が変わった場合のみ、LLM再評価をジョブとして投入
+        reanalysis_job_id = None
+        if previous_meeting and rule_inputs_changed and config.INCREMENTAL_REANALYZE_ENABLED:
+            reanalysis_job_id = await _schedule_reanalysis(request.meeting_id, parse_state.revision)
+        
+        incremental = {
+            "parse_mode": parse_mode,
+            "revision": parse_state.revision,
+            "new_statements": parsed_data["total_statements"] - (
+                (previous_meeting.get("parsed_data") or {}).get("total_statements", 0) if parse_mode != "full" else 0
+            ),
+            "rule_inputs_changed": rule_inputs_changed,
+            "reanalysis_job_id": reanalysis_job_id,
+        }
+        
         # 監査ログの記録（エラーハンドリング付き）
         if audit_log_service and AuditAction:
             try:
@@ -1048,7 +1160,8 @@ async def ingest_meeting(request: MeetingIngestRequest):
             "status": "success",
             "parsed": parsed_data,
             "transcript": transcript,  # 実際の議事録テキストを返す
-            "metadata": metadata  # メタデータも返す
+            "metadata": metadata,  # メタデータも返す
+            "incremental": incremental,
         }
     except HelmException:
         raise
@@ -1184,222 +1297,422 @@ async def ingest_material(request: MaterialIngestRequest):
         logger.error(f"Unexpected error in ingest_material: {e}", exc_info=True)
         raise
 
-@app.post("/api/analyze")
-async def analyze(request: AnalyzeRequest):
-    """構造的問題検知"""
+def _analysis_inputs_revision(
+    meeting_id: str,
+    chat_id: Optional[str] = None,
+    material_id: Optional[str] = None,
+) -> str:
+    """分析対象の会議・チャット・資料の版（会議の revision と各データの取り込み日時のハッシュ。内容全体はハッシュしない）"""
+    records = [meetings_db.get(meeting_id), chats_db.get(chat_id) if chat_id else None,
+               materials_db.get(material_id) if material_id else None]
+    return content_fingerprint(
+        [(record.get("revision"), record.get("ingested_at")) if record else None for record in records]
+    )[:16]
+
+
+def _load_analysis_inputs(
+    meeting_id: str,
+    chat_id: Optional[str] = None,
+    material_id: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    分析対象の会議・チャット・資料データを取得し、分析用の形式に整える
+    
+    Returns:
+        (meeting_parsed, chat_parsed, material_data)
+    
+    Raises:
+        NotFoundError: 会議データが存在しない場合
+    """
+    meeting = meetings_db.get(meeting_id)
+    if not meeting:
+        raise NotFoundError(
+            message=f"会議データが見つかりません: {meeting_id}",
+            resource_type="meeting",
+            resource_id=meeting_id
+        )
+    
+    chat = chats_db.get(chat_id) if chat_id else None
+    if chat_id and not chat:
+        logger.warning(f"Chat {chat_id} not found, proceeding without chat data")
+    
+    # 会議資料データを取得
+    material = materials_db.get(material_id) if material_id else None
+    if material_id and not material:
+        logger.warning(f"Material {material_id} not found, proceeding without material data")
+    
+    meeting_parsed = meeting.get("parsed_data", {}) or {}
+    # 生データも含める（LLMがテキストを直接分析できるように）
+    if not meeting_parsed.get("transcript") and meeting.get("transcript"):
+        meeting_parsed["transcript"] = meeting.get("transcript")
+    
+    chat_parsed = chat.get("parsed_data", {}) if chat else None
+    # 生データも含める
+    if chat and not (chat_parsed or {}).get("messages") and chat.get("messages"):
+        if not chat_parsed:
+            chat_parsed = {}
+        chat_parsed["messages"] = chat.get("messages")
+    
+    material_data = material if material else None
+    return meeting_parsed, chat_parsed, material_data
+
+
+def _analysis_source_data(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    分析元の会議・チャット・資料（タスク生成で分析時のコンテキストキャッシュを再利用するため）
+    
+    Returns:
+        generate_tasks の meeting_data / chat_data / materials_data。会議データが保存期間切れ等で無い場合は空
+    """
     try:
-        analysis_start_time = time.time()
-        logger.info(f"Analysis request: meeting_id={request.meeting_id}, chat_id={request.chat_id}")
-        analysis_id = str(uuid.uuid4())
-        
-        # 会議データとチャットデータを取得
-        meeting = meetings_db.get(request.meeting_id)
-        if not meeting:
-            raise NotFoundError(
-                message=f"会議データが見つかりません: {request.meeting_id}",
-                resource_type="meeting",
-                resource_id=request.meeting_id
-            )
-        
-        chat = chats_db.get(request.chat_id) if request.chat_id else None
-        if request.chat_id and not chat:
-            logger.warning(f"Chat {request.chat_id} not found, proceeding without chat data")
-        
-        # 会議資料データを取得
-        material = materials_db.get(request.material_id) if request.material_id else None
-        if request.material_id and not material:
-            logger.warning(f"Material {request.material_id} not found, proceeding without material data")
-        
-        # 構造的問題検知を実行（ルールベース + マルチ視点LLMのアンサンブル）
-        try:
-            meeting_parsed = meeting.get("parsed_data", {}) or {}
-            # 生データも含める（LLMがテキストを直接分析できるように）
-            if not meeting_parsed.get("transcript") and meeting.get("transcript"):
-                meeting_parsed["transcript"] = meeting.get("transcript")
-            
-            chat_parsed = chat.get("parsed_data", {}) if chat else None
-            # 生データも含める
-            if chat and not (chat_parsed or {}).get("messages") and chat.get("messages"):
-                if not chat_parsed:
-                    chat_parsed = {}
-                chat_parsed["messages"] = chat.get("messages")
-            
-            material_data = material if material else None
-            
-            # ルールベース分析（常に実行し、安全側のベースラインとする）
-            # use_vertex_ai=False なので、analyze() は _analyze_with_rules を呼ぶ
-            rule_result = analyzer.analyze(meeting_parsed, chat_parsed)
-            
-            # マルチ視点LLM分析（LLM利用可否は内部で判定）
-            multi_view_results = multi_view_analyzer.analyze_with_roles(
+        meeting_parsed, chat_parsed, material_data = _load_analysis_inputs(
+            analysis.get("meeting_id"), analysis.get("chat_id"), analysis.get("material_id")
+        )
+    except NotFoundError:
+        return {}
+    return {"meeting_data": meeting_parsed, "chat_data": chat_parsed, "materials_data": material_data}
+
+
+def _analysis_service_error(e: Exception, meeting_id: str, chat_id: Optional[str], material_id: Optional[str]) -> ServiceError:
+    """分析処理中の想定外エラーをログに記録し、ServiceError に変換"""
+    error_type = type(e).__name__
+    logger.error(
+        f"Failed to analyze: {e}",
+        extra={
+            "error_type": error_type,
+            "meeting_id": meeting_id,
+            "chat_id": chat_id,
+            "material_id": material_id
+        },
+        exc_info=True
+    )
+    return ServiceError(
+        message=f"構造的問題検知に失敗しました: {str(e)}",
+        service_name="AnalysisEnsemble",
+        details={
+            "meeting_id": meeting_id,
+            "chat_id": chat_id,
+            "material_id": material_id,
+            "error_type": error_type
+        }
+    )
+
+
+async def _run_analysis(
+    analysis_id: str,
+    request: AnalyzeRequest,
+    meeting_parsed: Dict[str, Any],
+    chat_parsed: Optional[Dict[str, Any]],
+    material_data: Optional[Dict[str, Any]],
+    rule_result: Dict[str, Any],
+    analysis_start_time: float,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    ルールベース分析済みの入力に対してマルチ視点LLM分析・アンサンブルを実行し、
+    分析結果を保存して返す（/api/analyze・/api/analyze/batch・/api/analyze/stream で共通）
+
+    on_event を指定した場合はゲーティング結果とロールの途中経過を逐次通知する（MultiRoleLLMAnalyzer.run_roles_async 参照）
+    """
+    # 再現性のため、この分析で使う分析プロンプトのバージョンを控えておく（フォールバック使用時は含まれない）
+    prompt_versions = get_prompt_registry().versions(prefix="analysis/")
+    # 構造的問題検知を実行（ルールベース + マルチ視点LLMのアンサンブル）
+    try:
+        # ルールベースの結果だけでエスカレーション判断が確定する場合はLLMロールを絞る（0 / 1 / 全ロール）
+        gate_decision = llm_gate.decide(rule_result)
+        if on_event is not None:
+            on_event({"type": "gating", **gate_decision.to_dict()})
+        # マルチ視点LLM分析（LLM利用可否は内部で判定。締め切り超過ロールは除外される）
+        # LLM呼び出しが混み合っている場合は、ルールベースの緊急度が高い分析を先に通す
+        # 使用量台帳にはこの分析のIDで記録する（ロールIDは LLMService が付ける）
+        with llm_priority(rule_result.get("urgency")), llm_usage_tags(analysis_id=analysis_id):
+            multi_view_outcome = await multi_view_analyzer.run_roles_async(
                 meeting_data=meeting_parsed,
                 chat_data=chat_parsed,
                 materials_data=material_data,
+                role_ids=gate_decision.role_ids,
+                on_event=on_event,
             )
-            
-            # アンサンブルスコアリング
-            ensemble_result = ensemble_scoring_service.combine(
-                rule_result=rule_result,
-                role_results=multi_view_results,
-            )
-        except ServiceError:
-            # ServiceErrorはそのまま再スロー
-            raise
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.error(
-                f"Failed to analyze: {e}",
-                extra={
-                    "error_type": error_type,
-                    "meeting_id": request.meeting_id,
-                    "chat_id": request.chat_id,
-                    "material_id": request.material_id
-                },
-                exc_info=True
-            )
-            raise ServiceError(
-                message=f"構造的問題検知に失敗しました: {str(e)}",
-                service_name="AnalysisEnsemble",
-                details={
-                    "meeting_id": request.meeting_id,
-                    "chat_id": request.chat_id,
-                    "material_id": request.material_id,
-                    "error_type": error_type
-                }
-            )
-        
-        # 説明文に根拠引用を追加（エラーハンドリング付き）
-        explanation = ensemble_result.get("explanation", "")
-        findings = ensemble_result.get("findings", [])
-        
-        # 根拠引用サービスを使用（エラーハンドリング付き）
-        try:
-            if EVIDENCE_CITATION_AVAILABLE:
-                from services.evidence_citation import EvidenceCitationService
-                evidence_service = EvidenceCitationService()
-                explanation = evidence_service.add_evidence_citations(
-                    explanation,
-                    findings,
-                    meeting_parsed,
-                    chat_parsed
-                )
-                logger.info(f"Evidence citations added to explanation for analysis {analysis_id}")
-        except Exception as e:
-            logger.warning(f"Failed to add evidence citations: {e}, using original explanation")
-            # エラー時は元の説明文を使用（フォールバック）
+        multi_view_results = multi_view_outcome.results
         
-        analysis_data = {
-            "analysis_id": analysis_id,
-            "meeting_id": request.meeting_id,
-            "chat_id": request.chat_id,
-            # アンサンブル結果をトップレベルに反映
-            "findings": findings,
-            "scores": rule_result.get("scores", {}),
-            "score": ensemble_result.get("overall_score", 0),
-            "overall_score": ensemble_result.get("overall_score", 0),  # 拡張エスカレーション用
+        # アンサンブルスコアリング
+        ensemble_result = ensemble_scoring_service.combine(
+            rule_result=rule_result,
+            role_results=multi_view_results,
+            dropped_roles=multi_view_outcome.dropped_roles,
+        )
+    except ServiceError:
+        # ServiceErrorはそのまま再スロー
+        raise
+    except Exception as e:
+        raise _analysis_service_error(e, request.meeting_id, request.chat_id, request.material_id)
+    
+    # 説明文に根拠引用を追加（エラーハンドリング付き）
+    explanation = ensemble_result.get("explanation", "")
+    findings = ensemble_result.get("findings", [])
+    
+    # 根拠引用サービスを使用（エラーハンドリング付き）
+    try:
+        if evidence_citation_service is not None:
+            explanation = evidence_citation_service.add_evidence_citations(
+                explanation,
+                findings,
+                meeting_parsed,
+                chat_parsed
+            )
+            logger.info(f"Evidence citations added to explanation for analysis {analysis_id}")
+    except Exception as e:
+        logger.warning(f"Failed to add evidence citations: {e}, using original explanation")
+        # エラー時は元の説明文を使用（フォールバック）
+    
+    analysis_data = {
+        "analysis_id": analysis_id,
+        "meeting_id": request.meeting_id,
+        "chat_id": request.chat_id,
+        "material_id": request.material_id,
+        # アンサンブル結果をトップレベルに反映
+        "findings": findings,
+        "scores": rule_result.get("scores", {}),
+        "score": ensemble_result.get("overall_score", 0),
+        "overall_score": ensemble_result.get("overall_score", 0),  # 拡張エスカレーション用
+        "severity": ensemble_result.get("severity", "MEDIUM"),
+        "urgency": ensemble_result.get("urgency", "MEDIUM"),
+        "explanation": explanation,  # 根拠引用付きの説明文
+        "created_at": rule_result.get("created_at", datetime.now().isoformat()),
+        "status": "completed",
+        # LLM生成かモックかを明示（マルチロール結果が1つでもあればLLM利用とみなす）
+        "is_llm_generated": len(multi_view_results) > 0,
+        "llm_status": (
+            "success" if len(multi_view_results) > 0
+            else "skipped" if gate_decision.mode == "skip"
+            else "circuit_open" if multi_view_outcome.circuit_open
+            else "disabled"
+        ),
+        # フォールバックチェーンで別のモデルが応答した場合はロールの結果（multi_view[].analysis._llm_model）で分かる
+        "llm_model": llm_service.model_name if len(multi_view_results) > 0 else None,
+        # 追加メタ情報
+        "multi_view": multi_view_results,
+        "ensemble": {
+            "overall_score": ensemble_result.get("overall_score", 0),
             "severity": ensemble_result.get("severity", "MEDIUM"),
             "urgency": ensemble_result.get("urgency", "MEDIUM"),
-            "explanation": explanation,  # 根拠引用付きの説明文
+            "reasons": ensemble_result.get("reasons", []),
+            "contributing_roles": ensemble_result.get("contributing_roles", []),
+            "dropped_roles": ensemble_result.get("dropped_roles", []),
+        },
+        # マルチ視点分析の実行情報（並列/逐次、締め切り超過で除外したロール、ゲーティングでスキップしたロール）
+        "multi_view_meta": {
+            "mode": multi_view_outcome.mode,
+            "elapsed_ms": multi_view_outcome.elapsed_ms,
+            "dropped_roles": multi_view_outcome.dropped_roles,
+            "llm_calls": multi_view_outcome.llm_calls,
+            "gating": gate_decision.to_dict(),
+        },
+        # 使用したプロンプトテンプレートのバージョン（config/prompts/ からの相対パス → 内容ハッシュ）
+        "prompt_versions": prompt_versions,
+        # ルールベースとLLMスコア（確信度計算用）
+        "rule_score": rule_result.get("overall_score", 0),
+        "llm_score": sum(r.get("overall_score", 0) * r.get("weight", 0) for r in multi_view_results) / max(sum(r.get("weight", 0) for r in multi_view_results), 1) if multi_view_results else 0,
+    }
+
+    # 分析メトリクス（レイテンシ・トークン数）を集計して記録
+    latency_ms = int((time.time() - analysis_start_time) * 1000)
+    # single_call モードでは1回の呼び出しに全ロールが含まれるため、集計は outcome 側の値を使う
+    llm_usage = multi_view_outcome.usage
+    input_tokens = llm_usage.get("input_tokens", 0)
+    output_tokens = llm_usage.get("output_tokens", 0)
+    cache_hits = llm_usage.get("cache_hits", 0)
+    cached_input_tokens = llm_usage.get("cached_input_tokens", 0)
+    analysis_metrics.record(
+        analysis_id=analysis_id,
+        latency_ms=latency_ms,
+        llm_calls=multi_view_outcome.llm_calls,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+    )
+    analysis_data["metrics"] = {
+        "latency_ms": latency_ms,
+        "llm_calls": multi_view_outcome.llm_calls,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "llm_cache_hits": cache_hits,
+        "cached_input_tokens": cached_input_tokens,
+        # プロンプト入力の圧縮前後の推定トークン数（ロール別プロンプトの描画に使った圧縮結果）
+        "input_compaction": multi_view_outcome.input_compaction,
+    }
+    
+    analyses_db[analysis_id] = analysis_data
+    
+    # 分析結果をJSONファイルに出力（ファイルI/Oでイベントループを止めないようスレッドで実行）
+    try:
+        # アンサンブル結果を保存用の形式に変換
+        output_data = {
+            "findings": ensemble_result.get("findings", []),
+            "overall_score": ensemble_result.get("overall_score", 0),
+            "severity": ensemble_result.get("severity", "MEDIUM"),
+            "urgency": ensemble_result.get("urgency", "MEDIUM"),
+            "explanation": ensemble_result.get("explanation", ""),
             "created_at": rule_result.get("created_at", datetime.now().isoformat()),
-            "status": "completed",
-            # LLM生成かモックかを明示（マルチロール結果が1つでもあればLLM利用とみなす）
-            "is_llm_generated": len(multi_view_results) > 0,
-            "llm_status": "success" if len(multi_view_results) > 0 else "disabled",
-            "llm_model": llm_service.model_name if len(multi_view_results) > 0 else None,
-            # 追加メタ情報
             "multi_view": multi_view_results,
-            "ensemble": {
-                "overall_score": ensemble_result.get("overall_score", 0),
-                "severity": ensemble_result.get("severity", "MEDIUM"),
-                "urgency": ensemble_result.get("urgency", "MEDIUM"),
-                "reasons": ensemble_result.get("reasons", []),
-                "contributing_roles": ensemble_result.get("contributing_roles", []),
-            },
-            # ルールベースとLLMスコア（確信度計算用）
-            "rule_score": rule_result.get("overall_score", 0),
-            "llm_score": sum(r.get("overall_score", 0) * r.get("weight", 0) for r in multi_view_results) / max(sum(r.get("weight", 0) for r in multi_view_results), 1) if multi_view_results else 0,
+            "ensemble": ensemble_result,
         }
-
-        # 分析メトリクス（レイテンシ・トークン数）を集計して記録
-        latency_ms = int((time.time() - analysis_start_time) * 1000)
-        input_tokens = 0
-        output_tokens = 0
-        for r in multi_view_results:
-            u = (r.get("analysis") or {}).get("_usage") or {}
-            input_tokens += u.get("input_tokens", 0)
-            output_tokens += u.get("output_tokens", 0)
-        analysis_metrics.record(
-            analysis_id=analysis_id,
-            latency_ms=latency_ms,
-            llm_calls=len(multi_view_results),
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-        )
-        analysis_data["metrics"] = {
-            "latency_ms": latency_ms,
-            "llm_calls": len(multi_view_results),
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-        }
-        
-        analyses_db[analysis_id] = analysis_data
-        
-        # 分析結果をJSONファイルに出力
-        try:
-            # アンサンブル結果を保存用の形式に変換
-            output_data = {
-                "findings": ensemble_result.get("findings", []),
-                "overall_score": ensemble_result.get("overall_score", 0),
-                "severity": ensemble_result.get("severity", "MEDIUM"),
-                "urgency": ensemble_result.get("urgency", "MEDIUM"),
-                "explanation": ensemble_result.get("explanation", ""),
-                "created_at": rule_result.get("created_at", datetime.now().isoformat()),
-                "multi_view": multi_view_results,
-                "ensemble": ensemble_result,
+        output_file_info = await asyncio.to_thread(output_service.save_analysis_result, analysis_id, output_data)
+        analysis_data["output_file"] = output_file_info
+        # LogRecordの予約キーである"filename"はextraで上書きできないため、別キー名を使用する
+        logger.info(
+            f"Analysis result saved to file: {output_file_info.get('filename')}",
+            extra={
+                "analysis_id": analysis_id,
+                "output_filename": output_file_info.get("filename")
             }
-            output_file_info = output_service.save_analysis_result(analysis_id, output_data)
-            analysis_data["output_file"] = output_file_info
-            # LogRecordの予約キーである"filename"はextraで上書きできないため、別キー名を使用する
-            logger.info(
-                f"Analysis result saved to file: {output_file_info.get('filename')}",
-                extra={
-                    "analysis_id": analysis_id,
-                    "output_filename": output_file_info.get("filename")
-                }
-            )
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.warning(
-                f"Failed to save analysis result to file: {e}",
-                extra={
-                    "error_type": error_type,
-                    "analysis_id": analysis_id
-                },
-                exc_info=True
-            )
-            # ファイル保存失敗は分析結果の返却には影響しない
-        
-        logger.info(f"Analysis {analysis_id} completed: score={ensemble_result.get('overall_score', 0)}, severity={ensemble_result.get('severity', 'MEDIUM')}")
+        )
+    except Exception as e:
+        error_type = type(e).__name__
+        logger.warning(
+            f"Failed to save analysis result to file: {e}",
+            extra={
+                "error_type": error_type,
+                "analysis_id": analysis_id
+            },
+            exc_info=True
+        )
+        # ファイル保存失敗は分析結果の返却には影響しない
+    
+    logger.info(f"Analysis {analysis_id} completed: score={ensemble_result.get('overall_score', 0)}, severity={ensemble_result.get('severity', 'MEDIUM')}")
+    return analysis_data
+
+
+def _prefers_async(http_request: Request) -> bool:
+    """Prefer: respond-async（RFC 7240）が指定されているか"""
+    prefer = http_request.headers.get("Prefer", "")
+    return any(p.strip().lower() == "respond-async" for p in prefer.split(","))
+
+
+async def _enqueue_job(job_type: str, resource_type: str, resource_id: str, payload: Dict[str, Any]) -> JSONResponse:
+    """ジョブを投入して 202 Accepted を返す（同一リソースの実行中ジョブがあればそれを返す）"""
+    job, created = await job_queue.enqueue(job_type, resource_type, resource_id, payload)
+    status_url = f"/api/jobs/{job.job_id}"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.job_id,
+            "job_type": job.job_type,
+            "status": job.status,
+            "status_url": status_url,
+            "websocket_url": f"{status_url}/ws",
+            "idempotent_replay": not created,
+        },
+        headers={"Location": status_url, "Preference-Applied": "respond-async"},
+    )
+
+
+async def _perform_analysis(request: AnalyzeRequest) -> Dict[str, Any]:
+    """
+    構造的問題検知を実行して分析結果を返す（同期API・ジョブキューで共通）
+    
+    同じ入力（会議・チャット・資料の内容ハッシュ）の分析が実行中の場合は新たに実行せず、
+    その完了を待って結果を共有する（analysis_id は別に発行し、coalesced_from に共有元を記録）
+    """
+    analysis_start_time = time.time()
+    
+    # 会議データ・チャットデータ・会議資料データを取得
+    meeting_parsed, chat_parsed, material_data = _load_analysis_inputs(
+        request.meeting_id, request.chat_id, request.material_id
+    )
+    
+    def compute() -> Any:
+        return _compute_analysis(request, meeting_parsed, chat_parsed, material_data, analysis_start_time)
+    
+    if not config.ANALYZE_COALESCING_ENABLED:
+        return await compute()
+    fingerprint = content_fingerprint(meeting_parsed, chat_parsed, material_data)
+    analysis_data, shared = await analysis_single_flight.do(fingerprint, compute)
+    if not shared:
+        return analysis_data
+    return _store_coalesced_analysis(request, analysis_data, analysis_start_time)
+
+
+async def _compute_analysis(
+    request: AnalyzeRequest,
+    meeting_parsed: Dict[str, Any],
+    chat_parsed: Optional[Dict[str, Any]],
+    material_data: Optional[Dict[str, Any]],
+    analysis_start_time: float,
+) -> Dict[str, Any]:
+    """ルールベース分析からアンサンブルまでを実行して分析結果を保存"""
+    analysis_id = str(uuid.uuid4())
+    
+    # ルールベース分析（常に実行し、安全側のベースラインとする）
+    # use_vertex_ai=False なので、analyze() は _analyze_with_rules を呼ぶ
+    try:
+        rule_result = analyzer.analyze(meeting_parsed, chat_parsed)
+    except ServiceError:
+        raise
+    except Exception as e:
+        raise _analysis_service_error(e, request.meeting_id, request.chat_id, request.material_id)
+    
+    return await _run_analysis(
+        analysis_id,
+        request,
+        meeting_parsed,
+        chat_parsed,
+        material_data,
+        rule_result,
+        analysis_start_time,
+    )
+
+
+def _store_coalesced_analysis(
+    request: AnalyzeRequest,
+    source: Dict[str, Any],
+    analysis_start_time: float,
+) -> Dict[str, Any]:
+    """
+    実行中の分析に合流したリクエストの分析結果を保存
+    
+    共有元の結果を複製し、analysis_id とリクエストのID・レイテンシを付け替える。
+    LLM呼び出しは共有元で計上済みのため、トークン数等の数値の指標は0にする（入力の圧縮結果は同じ入力のものを引き継ぐ）
+    """
+    analysis_id = str(uuid.uuid4())
+    analysis_data = copy.deepcopy(source)
+    analysis_data.update({
+        "analysis_id": analysis_id,
+        "meeting_id": request.meeting_id,
+        "chat_id": request.chat_id,
+        "material_id": request.material_id,
+        "coalesced_from": source["analysis_id"],
+    })
+    source_metrics = analysis_data.get("metrics", {})
+    analysis_data["metrics"] = {
+        **{key: 0 for key, value in source_metrics.items() if isinstance(value, (int, float))},
+        "input_compaction": source_metrics.get("input_compaction", {}),
+        "latency_ms": int((time.time() - analysis_start_time) * 1000),
+    }
+    analyses_db[analysis_id] = analysis_data
+    logger.info(f"Analysis {analysis_id} coalesced with in-flight analysis {source['analysis_id']}")
+    return analysis_data
+
+
+@app.post("/api/analyze")
+async def analyze(request: AnalyzeRequest, http_request: Request):
+    """構造的問題検知（Prefer: respond-async 指定時はジョブとして受け付けて 202 を返す）"""
+    try:
+        logger.info(f"Analysis request: meeting_id={request.meeting_id}, chat_id={request.chat_id}")
         
-        # 監査ログの記録（エラーハンドリング付き）
-        if audit_log_service and AuditAction:
-            try:
-                user_id, role = _audit_identity(request)
-                client_host = request.client.host if request.client else None
-                
-                audit_log_service.log(
-                    user_id=user_id,
-                    role=role,
-                    action=AuditAction.VIEW_ANALYSIS,
-                    resource_type="analysis",
-                    resource_id=analysis_id,
-                    ip_address=client_host,
-                    details={"meeting_id": request.meeting_id, "chat_id": request.chat_id}
+        if _prefers_async(http_request):
+            if request.meeting_id not in meetings_db:
+                raise NotFoundError(
+                    message=f"会議データが見つかりません: {request.meeting_id}",
+                    resource_type="meeting",
+                    resource_id=request.meeting_id
                 )
-            except Exception as e:
-                logger.warning(f"Failed to log audit: {e}")
-                # エラー時はログ記録をスキップして続行
+            # 取り込み直し（会議の追記・チャットや資料の再取り込み）の後は、成功済みの古い分析ジョブを返さない
+            inputs_revision = _analysis_inputs_revision(request.meeting_id, request.chat_id, request.material_id)
+            resource_id = f"{request.meeting_id}:{request.chat_id or ''}:{request.material_id or ''}:{inputs_revision}"
+            return await _enqueue_job("analyze", "analysis_request", resource_id, request.dict())
         
+        analysis_data = await _perform_analysis(request)
+        _audit_analysis_view(http_request, request, analysis_data["analysis_id"])
         return analysis_data
     except HelmException:
         raise
@@ -1407,6 +1720,234 @@ async def analyze(request: AnalyzeRequest):
         logger.error(f"Unexpected error in analyze: {e}", exc_info=True)
         raise
 
+
+def _audit_analysis_view(http_request: Request, request: AnalyzeRequest, analysis_id: str) -> None:
+    """分析実行の監査ログを記録（失敗しても分析結果の返却には影響させない）"""
+    if not (audit_log_service and AuditAction):
+        return
+    try:
+        user_id, role = _audit_identity(http_request)
+        client_host = http_request.client.host if http_request.client else None
+        
+        audit_log_service.log(
+            user_id=user_id,
+            role=role,
+            action=AuditAction.VIEW_ANALYSIS,
+            resource_type="analysis",
+            resource_id=analysis_id,
+            ip_address=client_host,
+            details={"meeting_id": request.meeting_id, "chat_id": request.chat_id}
+        )
+    except Exception as e:
+        logger.warning(f"Failed to log audit: {e}")
+        # エラー時はログ記録をスキップして続行
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events の1イベントを生成"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/api/analyze/stream")
+async def analyze_stream(request: AnalyzeRequest, http_request: Request):
+    """
+    構造的問題検知（Server-Sent Events）
+    
+    ルールベース分析の結果を最初に rule_result イベントで送り、マルチ視点LLMの各ロールのスコア・説明文を
+    生成途中（role_partial）と確定時（role_result）に順次送る。最後に /api/analyze と同じ分析結果を
+    analysis イベント（失敗時は error イベント）で送る。
+    """
+    analysis_start_time = time.time()
+    analysis_id = str(uuid.uuid4())
+    logger.info(f"Streaming analysis request: meeting_id={request.meeting_id}, chat_id={request.chat_id}")
+    
+    # 入力不備はストリーム開始前に通常のエラーレスポンスで返す
+    meeting_parsed, chat_parsed, material_data = _load_analysis_inputs(
+        request.meeting_id, request.chat_id, request.material_id
+    )
+    try:
+        rule_result = analyzer.analyze(meeting_parsed, chat_parsed)
+    except ServiceError:
+        raise
+    except Exception as e:
+        raise _analysis_service_error(e, request.meeting_id, request.chat_id, request.material_id)
+    
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def run() -> None:
+        try:
+            analysis_data = await _run_analysis(
+                analysis_id, request, meeting_parsed, chat_parsed, material_data,
+                rule_result, analysis_start_time, on_event=events.put_nowait,
+            )
+            _audit_analysis_view(http_request, request, analysis_id)
+            events.put_nowait({"type": "analysis", "analysis": analysis_data})
+        except HelmException as e:
+            events.put_nowait({"type": "error", "error": {"error_code": e.error_code, "message": e.message}})
+        except Exception as e:
+            error = _analysis_service_error(e, request.meeting_id, request.chat_id, request.material_id)
+            events.put_nowait({"type": "error", "error": {"error_code": error.error_code, "message": error.message}})
+    
+    async def stream():
+        yield _sse_event("rule_result", {
+            "analysis_id": analysis_id,
+            "overall_score": rule_result.get("overall_score", 0),
+            "severity": rule_result.get("severity", "LOW"),
+            "urgency": rule_result.get("urgency", "LOW"),
+            "explanation": rule_result.get("explanation", ""),
+            "findings": rule_result.get("findings", []),
+        })
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                event = await events.get()
+                event_type = event.pop("type")
+                yield _sse_event(event_type, event)
+                if event_type in ("analysis", "error"):
+                    break
+        finally:
+            # クライアント切断時は未完了の分析を取り消す
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _get_batch_llm_semaphore() -> asyncio.Semaphore:
+    """
+    バッチ分析のLLM処理の同時実行数を制限するセマフォ（全バッチリクエストで共有）
+    
+    asyncio.Semaphore はイベントループに紐づくため、作成したループと一緒に app.state に保持し、
+    ループが変わった場合（テストでの再起動など）は作り直す
+    """
+    loop = asyncio.get_running_loop()
+    entry = getattr(app.state, "batch_llm_semaphore", None)
+    if entry is None or entry[0] is not loop:
+        entry = app.state.batch_llm_semaphore = (loop, asyncio.Semaphore(max(1, config.ANALYZE_BATCH_CONCURRENCY)))
+    return entry[1]
+
+
+def _ndjson_line(data: Dict[str, Any]) -> str:
+    """NDJSONの1行を生成"""
+    return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(request: AnalyzeBatchRequest, http_request: Request):
+    """
+    複数会議の構造的問題検知（NDJSONストリーミング）
+    
+    ルールベース分析を全件まとめて（イベントループの外のスレッドで）実行した後、LLM分析を全体の同時実行上限付きで
+    並列に進め、完了した順に1行ずつ結果を返す。各行は type が "result" / "error"、最終行は "summary"。
+    成功した各件は /api/analyze と同じく監査ログに記録する。
+    """
+    if not request.items:
+        raise ValidationError(message="items が空です", details={"items": 0})
+    if len(request.items) > config.ANALYZE_BATCH_MAX_ITEMS:
+        raise ValidationError(
+            message=f"1回のバッチで分析できるのは最大 {config.ANALYZE_BATCH_MAX_ITEMS} 件です",
+            details={"items": len(request.items), "max_items": config.ANALYZE_BATCH_MAX_ITEMS}
+        )
+    
+    batch_start_time = time.time()
+    logger.info(f"Batch analysis request: items={len(request.items)}")
+    
+    # 1パス目: 入力データ取得とルールベース分析（LLMを使わないため全件まとめて先に実行）。
+    # 件数分の同期処理でイベントループを止めないよう、別スレッドで実行する
+    prepared, early_errors = await asyncio.to_thread(_prepare_batch_items, request.items)
+    
+    async def run_item(index: int, item: AnalyzeRequest, inputs: Tuple[Any, ...], rule_result: Dict[str, Any]) -> Dict[str, Any]:
+        async with _get_batch_llm_semaphore():
+            item_start_time = time.time()
+            try:
+                analysis_data = await _run_analysis(
+                    str(uuid.uuid4()), item, inputs[0], inputs[1], inputs[2], rule_result, item_start_time
+                )
+            except HelmException as e:
+                return _batch_error_line(index, item, e)
+            except Exception as e:
+                return _batch_error_line(
+                    index, item, _analysis_service_error(e, item.meeting_id, item.chat_id, item.material_id)
+                )
+            _audit_analysis_view(http_request, item, analysis_data["analysis_id"])
+            return {"type": "result", "index": index, "meeting_id": item.meeting_id, "analysis": analysis_data}
+    
+    async def stream():
+        completed = 0
+        failed = len(early_errors)
+        for line in early_errors:
+            yield _ndjson_line(line)
+        
+        tasks = [asyncio.ensure_future(run_item(*p)) for p in prepared]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                if line["type"] == "result":
+                    completed += 1
+                else:
+                    failed += 1
+                yield _ndjson_line(line)
+        finally:
+            # クライアント切断時は未完了の分析を取り消す
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        elapsed_ms = int((time.time() - batch_start_time) * 1000)
+        logger.info(f"Batch analysis completed: total={len(request.items)}, completed={completed}, failed={failed}, elapsed={elapsed_ms}ms")
+        yield _ndjson_line({
+            "type": "summary",
+            "total": len(request.items),
+            "completed": completed,
+            "failed": failed,
+            "elapsed_ms": elapsed_ms,
+        })
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _prepare_batch_items(
+    items: List[AnalyzeRequest],
+) -> Tuple[List[Tuple[int, AnalyzeRequest, Tuple[Any, ...], Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    バッチ分析の1パス目（入力データ取得とルールベース分析）
+    
+    Returns:
+        (prepared, early_errors)。prepared は (index, item, inputs, rule_result) のリスト、
+        early_errors はこの段階で失敗した件の失敗行
+    """
+    prepared: List[Tuple[int, AnalyzeRequest, Tuple[Any, ...], Dict[str, Any]]] = []
+    early_errors: List[Dict[str, Any]] = []
+    for index, item in enumerate(items):
+        try:
+            inputs = _load_analysis_inputs(item.meeting_id, item.chat_id, item.material_id)
+            rule_result = analyzer.analyze(inputs[0], inputs[1])
+            prepared.append((index, item, inputs, rule_result))
+        except HelmException as e:
+            early_errors.append(_batch_error_line(index, item, e))
+        except Exception as e:
+            early_errors.append(_batch_error_line(
+                index, item, _analysis_service_error(e, item.meeting_id, item.chat_id, item.material_id)
+            ))
+    return prepared, early_errors
+
+
+def _batch_error_line(index: int, item: AnalyzeRequest, error: HelmException) -> Dict[str, Any]:
+    """バッチ分析の失敗行を生成"""
+    return {
+        "type": "error",
+        "index": index,
+        "meeting_id": item.meeting_id,
+        "error": {
+            "error_code": error.error_code,
+            "message": error.message,
+        },
+    }
+
 @app.get("/api/analysis/{analysis_id}")
 async def get_analysis(analysis_id: str):
     """分析結果取得（キャッシュ: 同一 analysis_id は TTL 間キャッシュ）"""
@@ -1645,90 +2186,91 @@ async def approve(approve_req: ApproveRequest, request: Request):
         raise
 
 @app.post("/api/execute")
-async def execute(request: ExecuteRequest):
-    """AI自律実行開始（冪等: 同一 approval_id の再リクエストは既存実行を返す）"""
+async def execute(request: ExecuteRequest, http_request: Request):
+    """
+    AI自律実行開始（冪等: 同一 approval_id の再リクエストは既存実行を返す）
+    
+    Prefer: respond-async 指定時はタスク生成をジョブとして受け付けて 202 を返す
+    """
     try:
         logger.info(f"Execution request: approval_id={request.approval_id}")
-        approval = approvals_db.get(request.approval_id)
-        if not approval:
-            raise NotFoundError(
-                message=f"承認が見つかりません: {request.approval_id}",
-                resource_type="approval",
-                resource_id=request.approval_id
-            )
-        # 冪等性: 同一 approval_id で既に execution があればそれを返す
-        for eid, ex in executions_db.items():
-            if isinstance(ex, dict) and ex.get("approval_id") == request.approval_id:
-                out = copy.deepcopy(ex)
-                out["idempotent_replay"] = True
-                return out
-        execution_id = str(uuid.uuid4())
-        
-        # 分析結果と承認データを取得
-        escalation = escalations_db.get(approval.get("escalation_id"))
-        analysis = None
-        if escalation:
-            analysis = analyses_db.get(escalation.get("analysis_id"))
-        
-        # 承認された介入案を抽出
-        approved_interventions = None
-        if approval.get("modifications"):
-            modifications = approval.get("modifications")
-            if isinstance(modifications, dict):
-                # modificationsから介入案を抽出
-                approved_interventions = modifications.get("interventions") or modifications.get("approved_items")
-            elif isinstance(modifications, list):
-                approved_interventions = modifications
-        
-        # LLMサービスを使用してタスクを生成（フォールバックはLLMサービス内で処理）
-        try:
-            if analysis:
-                task_generation_result = llm_service.generate_tasks(
+        if _prefers_async(http_request):
+            if request.approval_id not in approvals_db:
+                raise NotFoundError(
+                    message=f"承認が見つかりません: {request.approval_id}",
+                    resource_type="approval",
+                    resource_id=request.approval_id
+                )
+            return await _enqueue_job("execute", "approval", request.approval_id, request.dict())
+        return await _start_execution(request)
+    except HelmException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in execute: {e}", exc_info=True)
+        raise
+
+
+async def _start_execution(request: ExecuteRequest) -> Dict[str, Any]:
+    """タスクを生成して実行を開始し、実行状態を返す（同期API・ジョブキューで共通）"""
+    approval = approvals_db.get(request.approval_id)
+    if not approval:
+        raise NotFoundError(
+            message=f"承認が見つかりません: {request.approval_id}",
+            resource_type="approval",
+            resource_id=request.approval_id
+        )
+    # 冪等性: 同一 approval_id で既に execution があればそれを返す
+    for eid, ex in executions_db.items():
+        if isinstance(ex, dict) and ex.get("approval_id") == request.approval_id:
+            out = copy.deepcopy(ex)
+            out["idempotent_replay"] = True
+            return out
+    execution_id = str(uuid.uuid4())
+    
+    # 分析結果と承認データを取得
+    escalation = escalations_db.get(approval.get("escalation_id"))
+    analysis = None
+    if escalation:
+        analysis = analyses_db.get(escalation.get("analysis_id"))
+    
+    # 承認された介入案を抽出
+    approved_interventions = None
+    if approval.get("modifications"):
+        modifications = approval.get("modifications")
+        if isinstance(modifications, dict):
+            # modificationsから介入案を抽出
+            approved_interventions = modifications.get("interventions") or modifications.get("approved_items")
+        elif isinstance(modifications, list):
+            approved_interventions = modifications
+    
+    # LLMサービスを使用してタスクを生成（フォールバックはLLMサービス内で処理）
+    try:
+        if analysis:
+            with llm_priority(analysis.get("urgency")), llm_usage_tags(analysis_id=analysis.get("analysis_id")):
+                task_generation_result = await llm_service.generate_tasks_async(
                     analysis_result=analysis,
                     approval_data=approval,
-                    approved_interventions=approved_interventions
+                    approved_interventions=approved_interventions,
+                    **_analysis_source_data(analysis),
                 )
-                
-                # 生成されたタスクを実行計画に反映
-                generated_tasks = task_generation_result.get("tasks", [])
-                tasks = []
-                for i, task_def in enumerate(generated_tasks, start=1):
-                    tasks.append({
-                        "id": task_def.get("id", f"task{i}"),
-                        "name": task_def.get("name", ""),
-                        "status": "pending",
-                        "type": task_def.get("type", "research"),
-                        "description": task_def.get("description", ""),
-                        "dependencies": task_def.get("dependencies", []),
-                        "estimated_duration": task_def.get("estimated_duration"),
-                        "expected_output": task_def.get("expected_output")
-                    })
-            else:
-                # 分析結果がない場合はモックタスクを使用
-                logger.warning("Analysis result not found, using mock tasks")
-                tasks = [
-                    {"id": "task1", "name": "市場データ分析", "status": "pending", "type": "research"},
-                    {"id": "task2", "name": "社内データ統合", "status": "pending", "type": "analysis"},
-                    {"id": "task3", "name": "3案比較資料の自動生成", "status": "pending", "type": "document"},
-                    {"id": "task4", "name": "関係部署への事前通知", "status": "pending", "type": "notification"},
-                    {"id": "task5", "name": "会議アジェンダの更新", "status": "pending", "type": "calendar"}
-                ]
-        except ServiceError:
-            # ServiceErrorはそのまま再スロー
-            raise
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.error(
-                f"Failed to generate tasks with LLM: {e}",
-                extra={
-                    "error_type": error_type,
-                    "approval_id": request.approval_id,
-                    "has_analysis": analysis is not None
-                },
-                exc_info=True
-            )
-            # エラー時はモックタスクにフォールバック
-            logger.warning("Falling back to mock tasks due to LLM error")
+            
+            # 生成されたタスクを実行計画に反映
+            generated_tasks = task_generation_result.get("tasks", [])
+            tasks = []
+            for i, task_def in enumerate(generated_tasks, start=1):
+                tasks.append({
+                    "id": task_def.get("id", f"task{i}"),
+                    "name": task_def.get("name", ""),
+                    "status": "pending",
+                    "type": task_def.get("type", "research"),
+                    "description": task_def.get("description", ""),
+                    "dependencies": task_def.get("dependencies", []),
+                    "estimated_duration": task_def.get("estimated_duration"),
+                    "expected_output": task_def.get("expected_output")
+                })
+        else:
+            # 分析結果がない場合はモックタスクを使用
+            logger.warning("Analysis result not found, using mock tasks")
             tasks = [
                 {"id": "task1", "name": "市場データ分析", "status": "pending", "type": "research"},
                 {"id": "task2", "name": "社内データ統合", "status": "pending", "type": "analysis"},
@@ -1736,90 +2278,186 @@ async def execute(request: ExecuteRequest):
                 {"id": "task4", "name": "関係部署への事前通知", "status": "pending", "type": "notification"},
                 {"id": "task5", "name": "会議アジェンダの更新", "status": "pending", "type": "calendar"}
             ]
-        
-        # タスク生成結果からLLM生成かモックかを取得
-        is_llm_generated = False
-        llm_status = "unknown"
-        llm_model = None
+    except ServiceError:
+        # ServiceErrorはそのまま再スロー
+        raise
+    except Exception as e:
+        error_type = type(e).__name__
+        logger.error(
+            f"Failed to generate tasks with LLM: {e}",
+            extra={
+                "error_type": error_type,
+                "approval_id": request.approval_id,
+                "has_analysis": analysis is not None
+            },
+            exc_info=True
+        )
+        # エラー時はモックタスクにフォールバック
+        logger.warning("Falling back to mock tasks due to LLM error")
+        tasks = [
+            {"id": "task1", "name": "市場データ分析", "status": "pending", "type": "research"},
+            {"id": "task2", "name": "社内データ統合", "status": "pending", "type": "analysis"},
+            {"id": "task3", "name": "3案比較資料の自動生成", "status": "pending", "type": "document"},
+            {"id": "task4", "name": "関係部署への事前通知", "status": "pending", "type": "notification"},
+            {"id": "task5", "name": "会議アジェンダの更新", "status": "pending", "type": "calendar"}
+        ]
+    
+    # タスク生成結果からLLM生成かモックかを取得
+    is_llm_generated = False
+    llm_status = "unknown"
+    llm_model = None
+    if analysis:
+        task_result = task_generation_result if 'task_generation_result' in locals() else None
+        if task_result:
+            is_llm_generated = not task_result.get("_is_mock", True)
+            llm_status = task_result.get("_llm_status", "unknown")
+            llm_model = task_result.get("_llm_model", None)
+    
+    execution_data = {
+        "execution_id": execution_id,
+        "approval_id": request.approval_id,
+        "status": "running",
+        "progress": 0,
+        "tasks": tasks,
+        "created_at": datetime.now().isoformat(),
+        "updated_at": datetime.now().isoformat(),
+        # LLM生成かモックかを明示
+        "is_llm_generated": is_llm_generated,
+        "llm_status": llm_status,
+        "llm_model": llm_model
+    }
+    
+    executions_db[execution_id] = execution_data
+    
+    # タスク生成結果をJSONファイルに出力
+    try:
         if analysis:
-            task_result = task_generation_result if 'task_generation_result' in locals() else None
-            if task_result:
-                is_llm_generated = not task_result.get("_is_mock", True)
-                llm_status = task_result.get("_llm_status", "unknown")
-                llm_model = task_result.get("_llm_model", None)
-        
-        execution_data = {
-            "execution_id": execution_id,
-            "approval_id": request.approval_id,
-            "status": "running",
-            "progress": 0,
-            "tasks": tasks,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
-            # LLM生成かモックかを明示
-            "is_llm_generated": is_llm_generated,
-            "llm_status": llm_status,
-            "llm_model": llm_model
-        }
-        
-        executions_db[execution_id] = execution_data
-        
-        # タスク生成結果をJSONファイルに出力
-        try:
-            if analysis:
-                # タスク生成結果を取得（LLM生成かモックかを含む）
-                task_result_data = task_generation_result if 'task_generation_result' in locals() else {
-                    "tasks": tasks,
-                    "execution_plan": {
-                        "total_tasks": len(tasks),
-                        "estimated_total_duration": "未計算",
-                        "critical_path": []
-                    },
-                    "_is_mock": True,
-                    "_llm_status": "unknown"
-                }
-                
-                task_result = {
-                    "tasks": tasks,
-                    "execution_plan": {
-                        "total_tasks": len(tasks),
-                        "estimated_total_duration": "未計算",
-                        "critical_path": []
-                    }
-                }
-                output_file_info = output_service.save_task_generation_result(execution_id, task_result_data)
-                execution_data["output_file"] = output_file_info
-                logger.info(
-                    f"Task generation result saved to file: {output_file_info.get('filename')}",
-                    extra={"execution_id": execution_id, "filename": output_file_info.get('filename')}
-                )
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.warning(
-                f"Failed to save task generation result to file: {e}",
-                extra={
-                    "error_type": error_type,
-                    "execution_id": execution_id
+            # タスク生成結果を取得（LLM生成かモックかを含む）
+            task_result_data = task_generation_result if 'task_generation_result' in locals() else {
+                "tasks": tasks,
+                "execution_plan": {
+                    "total_tasks": len(tasks),
+                    "estimated_total_duration": "未計算",
+                    "critical_path": []
                 },
-                exc_info=True
+                "_is_mock": True,
+                "_llm_status": "unknown"
+            }
+            
+            task_result = {
+                "tasks": tasks,
+                "execution_plan": {
+                    "total_tasks": len(tasks),
+                    "estimated_total_duration": "未計算",
+                    "critical_path": []
+                }
+            }
+            output_file_info = output_service.save_task_generation_result(execution_id, task_result_data)
+            execution_data["output_file"] = output_file_info
+            logger.info(
+                f"Task generation result saved to file: {output_file_info.get('filename')}",
+                extra={"execution_id": execution_id, "filename": output_file_info.get('filename')}
             )
-            # ファイル保存失敗は実行開始には影響しない
-        
-        logger.info(f"Execution {execution_id} started: {len(tasks)} tasks")
-        
-        # バックグラウンドタスクとして実行を開始
-        if execution_id not in running_execution_tasks:
-            task = asyncio.create_task(execute_tasks_background(execution_id))
-            running_execution_tasks[execution_id] = task
-        
-        return execution_data
+    except Exception as e:
+        error_type = type(e).__name__
+        logger.warning(
+            f"Failed to save task generation result to file: {e}",
+            extra={
+                "error_type": error_type,
+                "execution_id": execution_id
+            },
+            exc_info=True
+        )
+        # ファイル保存失敗は実行開始には影響しない
+    
+    logger.info(f"Execution {execution_id} started: {len(tasks)} tasks")
+    
+    # バックグラウンドタスクとして実行を開始
+    if execution_id not in running_execution_tasks:
+        task = asyncio.create_task(execute_tasks_background(execution_id))
+        running_execution_tasks[execution_id] = task
+    
+    return execution_data
+
+
+# ==================== ジョブキュー ====================
+
+async def _analyze_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """分析ジョブ"""
+    return await _perform_analysis(AnalyzeRequest(**payload))
+
+
+async def _execute_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """実行開始ジョブ（タスク生成まで。タスクの進捗は /api/execution/{execution_id}/ws で配信）"""
+    return await _start_execution(ExecuteRequest(**payload))
+
+
+async def _broadcast_job_update(job: Job) -> None:
+    """ジョブの状態変更を /api/jobs/{job_id}/ws の購読者に配信"""
+    await broadcast_to_websockets(job.job_id, {"type": "job", "data": job.to_dict()})
+
+
+job_queue.register_handler("analyze", _analyze_job)
+job_queue.register_handler("execute", _execute_job)
+job_queue.add_listener(_broadcast_job_update)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """ジョブの状態取得（完了時は result に分析結果または実行状態、失敗時は error を含む）"""
+    try:
+        job = await job_queue.get_async(job_id)
+        if not job:
+            raise NotFoundError(
+                message=f"ジョブが見つかりません: {job_id}",
+                resource_type="job",
+                resource_id=job_id
+            )
+        return job.to_dict()
     except HelmException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in execute: {e}", exc_info=True)
+        logger.error(f"Unexpected error in get_job: {e}", exc_info=True)
         raise
 
 
+@app.websocket("/api/jobs/{job_id}/ws")
+async def job_websocket_endpoint(websocket: WebSocket, job_id: str):
+    """WebSocketエンドポイント: ジョブの状態変更（queued → running → succeeded/failed）を配信"""
+    await websocket.accept()
+    try:
+        job = await job_queue.get_async(job_id)
+        if not job:
+            await websocket.send_json({
+                "type": "error",
+                "data": {
+                    "job_id": job_id,
+                    "message": f"ジョブが見つかりません: {job_id}",
+                    "error_code": "NOT_FOUND"
+                }
+            })
+            await websocket.close()
+            return
+        
+        await add_websocket_connection(job_id, websocket)
+        # 現在の状態を送信（接続前に完了していた場合もここで結果が届く）
+        await websocket.send_json({"type": "job", "data": job.to_dict()})
+        
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                if message.get("type") == "unsubscribe":
+                    break
+            except WebSocketDisconnect:
+                break
+            except json.JSONDecodeError:
+                logger.warning("Invalid JSON message from job WebSocket")
+    except Exception as e:
+        logger.error(f"Error in job WebSocket endpoint: {e}", exc_info=True)
+    finally:
+        await remove_websocket_connection(job_id, websocket)
+
+
 @app.post("/api/feedback/false-positive")
 async def feedback_false_positive(request: FalsePositiveFeedbackRequest):
     """誤検知フィードバックを登録（精度改善用）"""
@@ -1861,12 +2499,79 @@ async def get_metrics_usage(last_n: Optional[int] = None):
     """分析の利用状況を取得（直近の平均レイテンシ・トークン数・分析件数）。last_n で直近 N 件に絞る。"""
     try:
         stats = analysis_metrics.get_usage_stats(last_n=last_n)
+        stats["llm_cache"] = get_response_cache().get_stats()
+        stats["llm_context_cache"] = get_context_cache().get_stats()
+        stats["analyze_coalescing"] = analysis_single_flight.get_stats()
         return stats
     except Exception as e:
         logger.error(f"Unexpected error in get_metrics_usage: {e}", exc_info=True)
         raise
 
 
+@app.get("/api/metrics/llm")
+async def get_metrics_llm():
+    """LLM呼び出しのアドミッション制御の状態（同時実行ウィンドウ・待ち行列・RPM/TPMバケット残量）、サーキットブレーカーの状態、
+    モデルチェーン・ヘッジ要求の回数とモデル別レイテンシ、呼び出し先のバックエンド、予算による縮退の段階。
+    本日の使用トークン数は GET /api/metrics/llm/usage（使用量台帳を読むため）。"""
+    try:
+        return {
+            "backend": llm_service.backend.get_stats(),
+            "admission": get_admission_controller().get_stats(),
+            "circuit_breaker": llm_service.circuit_breaker.get_stats(),
+            "routing": llm_service.get_routing_stats(),
+            "budget": llm_service.get_budget_state(),
+            "ledger": get_usage_ledger().get_stats(),
+            "input_compaction": get_input_compactor().get_stats(),
+        }
+    except Exception as e:
+        logger.error(f"Unexpected error in get_metrics_llm: {e}", exc_info=True)
+        raise
+
+
+@app.get("/api/metrics/llm/usage")
+async def get_metrics_llm_usage(hours: int = 24, group_by: str = "role_id", analysis_id: Optional[str] = None):
+    """LLM使用量台帳の集計（ロール・エンドポイント・モデル別のトークン数・呼び出し数・キャッシュヒット・平均所要時間）。
+    hours は現在の時間帯を含む集計時間数、group_by は model / endpoint / role_id のカンマ区切り。
+    analysis_id を指定した場合はその分析の呼び出しだけをロール・モデル別に集計する。
+    daily_tokens は本日の累積トークン数と日次上限（LLM_DAILY_TOKEN_LIMIT）。"""
+    columns = [c.strip() for c in group_by.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in GROUP_BY_COLUMNS]
+    if unknown:
+        raise ValidationError(
+            message=f"group_by に指定できない列です: {', '.join(unknown)}",
+            field="group_by",
+            details={"valid_values": list(GROUP_BY_COLUMNS)}
+        )
+    if hours < 1:
+        raise ValidationError(message="hours は1以上で指定してください。", field="hours")
+    ledger = get_usage_ledger()
+    if analysis_id:
+        rows = await asyncio.to_thread(ledger.analysis_usage, analysis_id)
+        return {"analysis_id": analysis_id, "usage": rows}
+    tracker = get_usage_tracker(config.LLM_DAILY_TOKEN_LIMIT)
+    rows = await asyncio.to_thread(ledger.summary, hours, columns)
+    daily_total = await asyncio.to_thread(tracker.get_daily_total)
+    return {
+        "hours": hours,
+        "group_by": columns,
+        "usage": rows,
+        "daily_tokens": {"total": daily_total, "limit": tracker.daily_limit or None},
+    }
+
+
+@app.get("/api/admin/prompts")
+async def admin_list_prompts():
+    """読み込み済みプロンプトテンプレートのバージョン一覧。"""
+    return {"versions": get_prompt_registry().versions()}
+
+
+@app.post("/api/admin/prompts/reload")
+async def admin_reload_prompts():
+    """config/prompts/ のテンプレートを強制的に再読み込みする（mtime 確認の間隔を待たずに反映）。"""
+    summary = await asyncio.to_thread(get_prompt_registry().reload)
+    return {"status": "ok", **summary}
+
+
 @app.post("/api/admin/retention/cleanup")
 async def admin_retention_cleanup():
     """保存期間を超えたデータを削除（日次バッチ用）。"""
@@ -1890,6 +2595,10 @@ async def admin_retention_cleanup():
             executions_db,
             retention_days,
         )
+        for meeting_id in [m for m in meeting_parse_states if m not in meetings_db]:
+            del meeting_parse_states[meeting_id]
+        # LLM使用量台帳の呼び出し明細（書き込みスレッドでも purge_interval ごとに削除している）
+        deleted["llm_usage_calls"] = await asyncio.to_thread(get_usage_ledger().purge)
         return {"status": "ok", "deleted": deleted}
     except Exception as e:
         logger.error(f"Retention cleanup failed: {e}", exc_info=True)
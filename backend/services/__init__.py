@@ -3,11 +3,12 @@ Helm Services
 Googleサービス統合と構造的問題検知
 """
 
-from .google_meet import GoogleMeetService
+from .google_meet import GoogleMeetService, TranscriptParseState
 from .google_chat import GoogleChatService
 from .analyzer import StructureAnalyzer
-from .multi_view_analyzer import MultiRoleLLMAnalyzer, RoleConfig
+from .multi_view_analyzer import MultiRoleLLMAnalyzer, MultiRoleOutcome, RoleConfig
 from .ensemble_scoring import EnsembleScoringService
+from .llm_gating import GateDecision, LLMGate
 from .google_workspace import GoogleWorkspaceService
 from .google_drive import GoogleDriveService
 from .vertex_ai import VertexAIService
@@ -16,11 +17,15 @@ from .llm_service import LLMService
 
 __all__ = [
     "GoogleMeetService",
+    "TranscriptParseState",
     "GoogleChatService",
     "StructureAnalyzer",
     "MultiRoleLLMAnalyzer",
     "RoleConfig",
+    "MultiRoleOutcome",
     "EnsembleScoringService",
+    "LLMGate",
+    "GateDecision",
     "GoogleWorkspaceService",
     "GoogleDriveService",
     "VertexAIService",
@@ -34,7 +34,9 @@ def get_model():
     """
     if not ADK_AVAILABLE:
         return None  # モックモード
-    
+    if os.getenv("LLM_BACKEND", "genai").lower() == "fake":
+        return None  # fake バックエンド（負荷試験・CI）ではエージェントもAPIを呼ばないモックモード
+
     # ADK_MODEL > LLM_MODEL > gemini-2.0-flash（フォールバック）
     model_name = os.getenv("ADK_MODEL") or os.getenv("LLM_MODEL") or "gemini-2.0-flash"
     if model_name.startswith("models/"):
@@ -6,7 +6,7 @@ ADK統合、モック実装、フォールバック対応
 
 from services.adk_setup import get_model, get_or_create_runner, ADK_AVAILABLE
 from services.google_workspace import GoogleWorkspaceService
-from services.prompts.loader import load_agent_instruction, load_agent_prompt_template
+from services.prompts.loader import load_agent_instruction, render_agent_prompt
 from typing import Dict, Any, Optional, List
 import logging
 import json
@@ -118,8 +118,7 @@ async def execute_analysis_task(task: Dict[str, Any], context: Dict[str, Any]) -
             await session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
             
             description = task.get('description', '')
-            template = load_agent_prompt_template("analysis")
-            prompt = template.format(description=description) if template else f"社内データを統合し、財務シミュレーションを実行してください。{description}"
+            prompt = render_agent_prompt("analysis", description=description) or f"社内データを統合し、財務シミュレーションを実行してください。{description}"
             
             # async関数内ではrun_async()を使用
             from google.genai import types
@@ -7,7 +7,7 @@ Phase1では送信せず、ドラフト生成のみ
 
 from services.adk_setup import get_model, get_or_create_runner, ADK_AVAILABLE
 from services.google_chat import GoogleChatService
-from services.prompts.loader import load_agent_instruction, load_agent_prompt_template
+from services.prompts.loader import load_agent_instruction, render_agent_prompt
 from typing import Dict, Any, Optional, List
 import logging
 import json
@@ -106,10 +106,8 @@ async def execute_notification_task(task: Dict[str, Any], context: Dict[str, Any
             recipients_str = ", ".join(recipients)
             description = task.get('description', '')
             
-            template = load_agent_prompt_template("notification")
-            if template:
-                prompt = template.format(recipients=recipients_str, document_url=document_url, description=description)
-            else:
+            prompt = render_agent_prompt("notification", recipients=recipients_str, document_url=document_url, description=description)
+            if not prompt:
                 prompt = f"""
             以下の情報を基に通知ドラフトを生成してください:
             - 対象者: {recipients_str}
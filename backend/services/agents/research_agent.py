@@ -6,7 +6,7 @@ ADK統合、モック実装、フォールバック対応
 
 from services.adk_setup import get_model, get_or_create_runner, ADK_AVAILABLE
 from services.google_workspace import GoogleWorkspaceService
-from services.prompts.loader import load_agent_instruction, load_agent_prompt_template
+from services.prompts.loader import load_agent_instruction, render_agent_prompt
 from typing import Dict, Any, Optional
 import logging
 import json
@@ -95,8 +95,7 @@ async def execute_research_task(task: Dict[str, Any], context: Dict[str, Any]) -
             
             description = task.get("description", "")
             topic = description.split("：")[-1] if "：" in description else task.get("name", "")
-            template = load_agent_prompt_template("research")
-            prompt = template.format(topic=topic) if template else f"以下のトピックについて市場データを収集・分析してください: {topic}"
+            prompt = render_agent_prompt("research", topic=topic) or f"以下のトピックについて市場データを収集・分析してください: {topic}"
             
             # async関数内ではrun_async()を使用
             from google.genai import types
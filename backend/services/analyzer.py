@@ -7,21 +7,30 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import re
 from .scoring import ScoringService
+from .pattern_rules import PatternRuleEngine, extract_features, get_pattern_rule_engine
 
 
 class StructureAnalyzer:
     """構造的問題検知アナライザー"""
     
-    def __init__(self, use_vertex_ai: bool = False, vertex_ai_service=None, scoring_service=None):
+    def __init__(
+        self,
+        use_vertex_ai: bool = False,
+        vertex_ai_service=None,
+        scoring_service=None,
+        rule_engine: Optional[PatternRuleEngine] = None,
+    ):
         """
         Args:
             use_vertex_ai: Vertex AIを使用するか（Falseの場合はルールベース）
             vertex_ai_service: Vertex AIサービスインスタンス（オプション）
             scoring_service: スコアリングサービスインスタンス（オプション）
+            rule_engine: パターンルールエンジン（オプション、Noneの場合は定義ファイルから構築した共有インスタンス）
         """
         self.use_vertex_ai = use_vertex_ai
         self.vertex_ai_service = vertex_ai_service
-        self.scoring_service = scoring_service or ScoringService()
+        self.rule_engine = rule_engine or get_pattern_rule_engine()
+        self.scoring_service = scoring_service or ScoringService(rule_engine=self.rule_engine)
     
     def analyze(self, meeting_data: Dict[str, Any], chat_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -40,94 +49,34 @@ class StructureAnalyzer:
         else:
             return self._analyze_with_rules(meeting_data, chat_data)
     
-    def _analyze_with_rules(self, meeting_data: Dict[str, Any], chat_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """ルールベース分析"""
-        findings = []
-        scores = {}
-        
-        # KPI下方修正の検出
-        kpi_mentions = meeting_data.get("kpi_mentions", [])
-        kpi_downgrade_count = sum(
-            1 for mention in kpi_mentions
-            if any(keyword in mention["text"] for keyword in ["下方修正", "下回", "未達", "▲"])
-        )
-        
-        # 撤退/ピボット議論の不在
-        exit_discussed = meeting_data.get("exit_discussed", False)
-        
-        # 判断集中の検出（発言者の多様性）
-        statements = meeting_data.get("statements", [])
-        speakers = [stmt["speaker"] for stmt in statements]
-        if len(statements) == 0:
-            decision_concentration_rate = 0.0
-        else:
-            # 最も多く発言した人の発言数 / 総発言数
-            from collections import Counter
-            speaker_counts = Counter(speakers)
-            max_speaker_count = max(speaker_counts.values())
-            decision_concentration_rate = max_speaker_count / len(statements)  # len(speakers)ではなくlen(statements)
-        
-        # 反対意見の無視
-        ignored_opposition_count = 0
-        if chat_data:
-            opposition_messages = chat_data.get("opposition_messages", [])
-            # チャットで反対意見が出ているが、会議で反映されていない
-            if opposition_messages and not exit_discussed:
-                ignored_opposition_count = len(opposition_messages)
+    def rule_inputs(self, meeting_data: Dict[str, Any], chat_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        ルールベース分析の入力となる特徴量を算出（全パターンで共有）
         
-        # 正当化フェーズパターンの検出（判断集中率の条件を緩和）
-        # KPI下方修正が2回以上あり、撤退議論がなく、判断が集中している場合
-        if (kpi_downgrade_count >= 2 and 
-            not exit_discussed and 
-            decision_concentration_rate >= 0.4):  # 0.5から0.4にさらに緩和（デモ用）
-            
-            score = 75  # 閾値70を超過
-            severity = "HIGH"
-            
-            findings.append({
-                "pattern_id": "B1_正当化フェーズ",
-                "severity": severity,
-                "score": score,
-                "description": "KPI悪化認識があるが戦略変更議論がない",
-                "evidence": [
-                    f"KPI下方修正が{kpi_downgrade_count}回検出",
-                    "撤退/ピボット議論が一度も行われていない",
-                    f"判断集中率: {decision_concentration_rate:.2%}",
-                    f"反対意見無視: {ignored_opposition_count}件"
-                ],
-                "quantitative_scores": {
-                    "kpi_downgrade_count": kpi_downgrade_count,
-                    "exit_discussed": exit_discussed,
-                    "decision_concentration_rate": decision_concentration_rate,
-                    "ignored_opposition_count": ignored_opposition_count
-                }
-            })
-            
-            scores["B1_正当化フェーズ"] = score
+        Returns:
+            特徴量（kpi_downgrade_count, exit_discussed, decision_concentration_rate 等。一覧は pattern_rules.FEATURE_NAMES）
+        """
+        return extract_features(meeting_data, chat_data)
+    
+    def detect_pattern_ids(self, meeting_data: Dict[str, Any], chat_data: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        ルールベースで検出されるパターンIDの一覧（重要性・緊急性の評価はしない）
         
-        # エスカレーション遅延の検出
-        if chat_data:
-            risk_messages = chat_data.get("risk_messages", [])
-            escalation_mentioned = chat_data.get("escalation_mentioned", False)
-            
-            if risk_messages and not escalation_mentioned and decision_concentration_rate < 0.5:
-                score = 65
-                severity = "MEDIUM"
-                
-                findings.append({
-                    "pattern_id": "ES1_報告遅延",
-                    "severity": severity,
-                    "score": score,
-                    "description": "リスク認識があるが報告が遅延している",
-                    "evidence": [
-                        f"リスク提起メッセージ: {len(risk_messages)}件",
-                        "エスカレーション未完了"
-                    ]
-                })
+        meeting_data には TranscriptParseState.rule_summary の集計も渡せる。
+        """
+        return sorted(f.get("pattern_id", "") for f in self.rule_engine.evaluate(self.rule_inputs(meeting_data, chat_data)))
+    
+    def _analyze_with_rules(self, meeting_data: Dict[str, Any], chat_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """ルールベース分析（config/definitions/pattern_rules.json のパターン定義を評価）"""
+        features = self.rule_inputs(meeting_data, chat_data)
+        findings = self.rule_engine.evaluate(features)
+        scores = {}
         
         # 重要性・緊急性評価を実行
         evaluated_findings = []
         for finding in findings:
+            if self.rule_engine.records_score(finding["pattern_id"]):
+                scores[finding["pattern_id"]] = finding["score"]  # 検出時のスコア
             evaluation = self.scoring_service.evaluate(finding, {
                 "meeting_data": meeting_data,
                 "chat_data": chat_data
@@ -0,0 +1,200 @@
+"""
+バッチスコアリング（閾値・スコア表のバックテスト用）
+過去の finding の定量スコアを列（カラム）形式の配列で受け取り、pattern_rules.json のスコア表で
+重要性・緊急性・総合スコア・重要度を全行まとめて NumPy で計算する。
+結果は ScoringService.evaluate を1件ずつ呼んだ場合と一致する。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.exceptions import ServiceError, ValidationError
+
+# NumPy（オプション）
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .pattern_rules import (
+    DEFAULT_SEVERITY_LEVELS,
+    DEFAULT_URGENCY_LEVELS,
+    PatternRuleEngine,
+    get_pattern_rule_engine,
+)
+
+
+class BatchScoringService:
+    """スコア表を列指向で一括評価するサービス"""
+
+    def __init__(self, rule_engine: Optional[PatternRuleEngine] = None):
+        """
+        Args:
+            rule_engine: パターンルールエンジン（オプション、Noneの場合は定義ファイルから構築した共有インスタンス）
+        """
+        self.rule_engine = rule_engine or get_pattern_rule_engine()
+
+    def score(
+        self,
+        columns: Dict[str, Sequence[Any]],
+        pattern_id: str = "B1_正当化フェーズ",
+        scoring: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        全行のスコアを計算
+
+        Args:
+            columns: 特徴量名 → 値の配列（kpi_downgrade_count, decision_concentration_rate 等。fixed 評価は score 列）。
+                スコア表が参照する列が無い場合は 0 として扱う（ScoringService と同じ）
+            pattern_id: スコア表を使うパターン
+            scoring: スコア表の上書き（キー単位でパターン定義のスコア表を置き換える）
+
+        Returns:
+            importance_score, urgency_score, overall_score（int64配列）と severity, urgency（文字列配列）
+
+        Raises:
+            ServiceError: NumPy が利用できない場合、またはスコア表が定義されていない場合
+            ValidationError: 列の長さが揃っていない場合
+        """
+        _require_numpy()
+        spec = self._resolve_scoring(pattern_id, scoring)
+        arrays, rows = self._to_arrays(columns)
+        return self._score_arrays(spec, arrays, rows, self.rule_engine.default_score(pattern_id))
+
+    def sweep(
+        self,
+        columns: Dict[str, Sequence[Any]],
+        escalation_thresholds: Sequence[float],
+        pattern_id: str = "B1_正当化フェーズ",
+        scoring_candidates: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        スコア表の候補 × エスカレーション閾値のグリッドを1回の呼び出しで評価
+
+        Args:
+            columns: score と同じ列データ
+            escalation_thresholds: 評価するエスカレーション閾値（overall_score >= 閾値でエスカレーション）
+            pattern_id: スコア表を使うパターン
+            scoring_candidates: スコア表の上書き候補のリスト（Noneの場合は定義どおりのスコア表のみ）
+
+        Returns:
+            thresholds と、候補ごとの overall_score / severity / escalated（閾値数 × 行数の真偽行列）/
+            escalation_counts / escalation_rates / severity_counts
+        """
+        _require_numpy()
+        arrays, rows = self._to_arrays(columns)
+        thresholds = np.asarray(escalation_thresholds, dtype=float)
+        default_score = self.rule_engine.default_score(pattern_id)
+
+        results = []
+        for index, candidate in enumerate(scoring_candidates or [None]):
+            spec = self._resolve_scoring(pattern_id, candidate)
+            scored = self._score_arrays(spec, arrays, rows, default_score)
+            escalated = scored["overall_score"][np.newaxis, :] >= thresholds[:, np.newaxis]
+            counts = escalated.sum(axis=1)
+            levels, level_counts = np.unique(scored["severity"], return_counts=True)
+            results.append({
+                "index": index,
+                "scoring": candidate,
+                "overall_score": scored["overall_score"],
+                "severity": scored["severity"],
+                "escalated": escalated,
+                "escalation_counts": counts.tolist(),
+                "escalation_rates": (counts / rows).tolist() if rows else [0.0] * len(thresholds),
+                "severity_counts": {str(level): int(count) for level, count in zip(levels, level_counts)},
+            })
+        return {"thresholds": thresholds.tolist(), "rows": rows, "candidates": results}
+
+    def _resolve_scoring(self, pattern_id: str, override: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """パターン定義のスコア表に上書きを適用"""
+        base = self.rule_engine.get_scoring(pattern_id)
+        if base is None and not override:
+            raise ServiceError(
+                message=f"パターンのスコア表が定義されていません: {pattern_id}",
+                service_name="BatchScoringService",
+                details={"pattern_id": pattern_id}
+            )
+        spec = dict(base or {})
+        spec.update(override or {})
+        return spec
+
+    @staticmethod
+    def _to_arrays(columns: Dict[str, Sequence[Any]]) -> tuple:
+        """列データを NumPy 配列に変換し、行数を返す"""
+        arrays = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {name: len(values) for name, values in arrays.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValidationError(
+                message="列の長さが揃っていません。",
+                field="columns",
+                details={"lengths": lengths}
+            )
+        rows = next(iter(lengths.values()), 0)
+        return arrays, rows
+
+    @staticmethod
+    def _score_arrays(spec: Dict[str, Any], arrays: Dict[str, Any], rows: int, default_score: int) -> Dict[str, Any]:
+        """スコア表を列データに適用（ScoringService の評価式と同じ演算順序）"""
+        def column(name: str) -> Any:
+            values = arrays.get(name)
+            return values if values is not None else np.zeros(rows)
+
+        if spec.get("type") == "fixed":
+            overall = column("score") if "score" in arrays else np.full(rows, default_score)
+            overall = overall.astype(np.int64)
+            levels = spec.get("levels", [])
+            conditions = [overall >= level["min"] for level in levels]
+            return {
+                "importance_score": overall,
+                "urgency_score": overall,
+                "overall_score": overall,
+                "severity": np.select(conditions, [level["severity"] for level in levels], default="LOW"),
+                "urgency": np.select(conditions, [level["urgency"] for level in levels], default="LOW"),
+            }
+
+        def table_points(tables: List[Dict[str, Any]]) -> Any:
+            total = np.zeros(rows, dtype=np.int64)
+            for table in tables:
+                values = column(table["feature"])
+                bands = table["bands"]
+                total += np.select(
+                    [values >= band["min"] for band in bands],
+                    [band["points"] for band in bands],
+                    default=0,
+                ).astype(np.int64)
+            return total
+
+        importance = table_points(spec.get("importance", []))
+        urgency = table_points(spec.get("urgency", []))
+        weights = spec.get("weights", {"importance": 0.6, "urgency": 0.4})
+        # int() と同じく0方向への切り捨て（スコアは非負）
+        overall = (importance * weights.get("importance", 0) + urgency * weights.get("urgency", 0)).astype(np.int64)
+
+        return {
+            "importance_score": importance,
+            "urgency_score": urgency,
+            "overall_score": overall,
+            "severity": _levels(overall, spec.get("severity_levels")),
+            "urgency": _levels(urgency, spec.get("urgency_levels"), urgency=True),
+        }
+
+
+def _require_numpy() -> None:
+    """NumPy が利用できない場合は ServiceError"""
+    if not NUMPY_AVAILABLE:
+        raise ServiceError(
+            message="バッチスコアリングには NumPy が必要です。",
+            service_name="BatchScoringService",
+            details={"dependency": "numpy"}
+        )
+
+
+def _levels(scores: Any, levels: Optional[List[Dict[str, Any]]], urgency: bool = False) -> Any:
+    """閾値の高い順に並んだレベル表を配列に適用"""
+    levels = levels or (DEFAULT_URGENCY_LEVELS if urgency else DEFAULT_SEVERITY_LEVELS)
+    return np.select(
+        [scores >= level["min"] for level in levels],
+        [level["level"] for level in levels],
+        default=levels[-1]["level"],
+    )
@@ -37,3 +37,6 @@ class DefinitionLoader:
 
     def get_approval_flows(self) -> Optional[Dict[str, Any]]:
         return self._load_json("approval_flows")
+
+    def get_pattern_rules(self) -> Optional[Dict[str, Any]]:
+        return self._load_json("pattern_rules")
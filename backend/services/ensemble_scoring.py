@@ -3,7 +3,7 @@
 ルールベース分析結果とマルチロールLLM分析結果を統合して最終スコアを決定
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 
 class EnsembleScoringService:
@@ -19,10 +19,15 @@ class EnsembleScoringService:
     _severity_order = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
     _urgency_order = ["LOW", "MEDIUM", "HIGH", "URGENT", "IMMEDIATE"]
 
+    # ルールベースとLLMの配分（LLMGate がLLM結果の影響範囲を見積もる際にも参照）
+    RULE_WEIGHT = 0.6
+    LLM_WEIGHT = 0.4
+
     def combine(
         self,
         rule_result: Dict[str, Any],
         role_results: List[Dict[str, Any]],
+        dropped_roles: Optional[List[Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
         """
         アンサンブル結果を計算
@@ -30,7 +35,9 @@ class EnsembleScoringService:
         Args:
             rule_result: StructureAnalyzer._analyze_with_rules の結果
             role_results: MultiRoleLLMAnalyzer.analyze_with_roles の結果
+            dropped_roles: 締め切り超過・失敗で除外されたロール（MultiRoleOutcome.dropped_roles）
         """
+        dropped_roles = dropped_roles or []
         base_score = rule_result.get("overall_score", 0)
         base_severity = rule_result.get("severity", "LOW")
         base_urgency = rule_result.get("urgency", "LOW")
@@ -43,6 +50,7 @@ class EnsembleScoringService:
                 "urgency": base_urgency,
                 "reasons": [rule_result.get("explanation", "")],
                 "contributing_roles": [],
+                "dropped_roles": dropped_roles,
                 "findings": rule_result.get("findings", []),
                 "explanation": rule_result.get("explanation", ""),
             }
@@ -54,7 +62,7 @@ class EnsembleScoringService:
         ) / total_weight
 
         # ルール: ルールベース6割 + LLM4割（プラン記述通り）
-        overall_score = int(0.6 * base_score + 0.4 * llm_score)
+        overall_score = int(self.RULE_WEIGHT * base_score + self.LLM_WEIGHT * llm_score)
 
         # severity / urgency を安全側で決定
         role_severities = [r.get("severity", "LOW") for r in role_results]
@@ -96,6 +104,8 @@ class EnsembleScoringService:
             "urgency": urgency,
             "reasons": reasons,
             "contributing_roles": contributing_roles,
+            # 除外ロールは重み付き平均から外れている（残りのロールの重みで正規化済み）
+            "dropped_roles": dropped_roles,
             # ルールベースのfindingをそのまま採用（将来的にロール別マージも検討）
             "findings": rule_result.get("findings", []),
             "explanation": explanation,
@@ -6,15 +6,21 @@ LLMレスポンスの評価構造を定義し、パースしやすくする
 from .schema import (
     AnalysisFinding,
     AnalysisResult,
+    RoleEvaluation,
+    MultiPerspectiveResult,
     TaskDefinition,
     TaskGenerationResult
 )
 from .parser import EvaluationParser
+from .incremental_parser import IncrementalJSONParser
 
 __all__ = [
     "AnalysisFinding",
     "AnalysisResult",
+    "RoleEvaluation",
+    "MultiPerspectiveResult",
     "TaskDefinition",
     "TaskGenerationResult",
     "EvaluationParser",
+    "IncrementalJSONParser",
 ]
@@ -0,0 +1,163 @@
+"""
+LLMストリーミングレスポンスの増分JSONパース
+受信途中のテキストから、値が確定したキー・配列要素を順に取り出す
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+Path = Tuple[Any, ...]
+
+
+@dataclass
+class _Frame:
+    """パース中のオブジェクト/配列"""
+    kind: str  # object / array
+    path: Path
+    start: int
+    index: int = 0
+    key: Optional[str] = None
+    expect_key: bool = True
+
+
+class IncrementalJSONParser:
+    """
+    ストリーミングされるJSONの増分パーサー
+
+    feed() にチャンクを渡すたびに、新たに値が確定した (path, value) を返す。
+    path はルートからのキー/配列インデックスのタプル（例: ("overall_score",)、("evaluations", 0)）。
+    文字列・数値は閉じた時点、オブジェクト/配列は対応する括弧が閉じた時点で確定する。
+    最初の "{" より前（マークダウンのコードブロック開始など）は読み飛ばす。
+
+    完全なレスポンスの検証は従来どおり EvaluationParser で行い、ここでは途中経過の表示用に値を取り出すだけ。
+    """
+
+    def __init__(self, max_depth: int = 2) -> None:
+        """
+        Args:
+            max_depth: 値を取り出す最大の深さ（ルート直下が1）。深い入れ子の値は親が閉じた時点でまとめて得られる
+        """
+        self.max_depth = max_depth
+        self.values: dict = {}  # ルート直下で確定した値
+        self.result: Optional[Any] = None  # ルートが閉じた場合のJSON全体
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._token_start: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """ルートのオブジェクトが閉じたか"""
+        return self.result is not None
+
+    @property
+    def text(self) -> str:
+        """これまでに受信したテキスト"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """
+        チャンクを追加し、新たに確定した値を返す
+
+        Returns:
+            (path, value) のリスト（確定した順）
+        """
+        self._text += chunk
+        events: List[Tuple[Path, Any]] = []
+        text = self._text
+        i = self._pos
+        while i < len(text) and not self.complete:
+            ch = text[i]
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append(_Frame(kind="object", path=(), start=i))
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._close_string(i, events)
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._token_start = i
+            elif ch in "{[":
+                self._stack.append(_Frame(
+                    kind="object" if ch == "{" else "array",
+                    path=self._value_path(),
+                    start=i,
+                ))
+            elif ch in "}]":
+                self._close_literal(i, events)
+                frame = self._stack.pop()
+                self._emit(frame.path, text[frame.start:i + 1], events)
+            elif ch == ":":
+                self._stack[-1].expect_key = False
+            elif ch == ",":
+                self._close_literal(i, events)
+                frame = self._stack[-1]
+                if frame.kind == "object":
+                    frame.expect_key = True
+                    frame.key = None
+                else:
+                    frame.index += 1
+            elif ch in " \t\r\n":
+                self._close_literal(i, events)
+            elif self._token_start is None:
+                # 数値・true/false/null の開始
+                self._token_start = i
+            i += 1
+        self._pos = i
+        return events
+
+    def _value_path(self) -> Path:
+        """現在位置の値のパス"""
+        frame = self._stack[-1]
+        if frame.kind == "object":
+            return frame.path + (frame.key,)
+        return frame.path + (frame.index,)
+
+    def _close_string(self, end: int, events: List[Tuple[Path, Any]]) -> None:
+        """文字列の終端（キーまたは値）"""
+        start, self._token_start = self._token_start, None
+        frame = self._stack[-1]
+        if frame.kind == "object" and frame.expect_key:
+            try:
+                frame.key = json.loads(self._text[start:end + 1])
+            except ValueError:
+                frame.key = None
+            return
+        self._emit(self._value_path(), self._text[start:end + 1], events)
+
+    def _close_literal(self, end: int, events: List[Tuple[Path, Any]]) -> None:
+        """数値・true/false/null の終端"""
+        if self._token_start is None:
+            return
+        start, self._token_start = self._token_start, None
+        self._emit(self._value_path(), self._text[start:end], events)
+
+    def _emit(self, path: Path, raw: str, events: List[Tuple[Path, Any]]) -> None:
+        """確定した値を記録（不正な値・深すぎる値は捨てる）"""
+        if len(path) > self.max_depth:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        if not path:
+            self.result = value
+        elif len(path) == 1:
+            self.values[path[0]] = value
+        events.append((path, value))
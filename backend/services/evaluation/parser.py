@@ -1,13 +1,44 @@
 """
 LLMレスポンスのパース
 JSONレスポンスをパースしてバリデーション
+
+JSONモード（response_mime_type=application/json）の応答は全体がJSONのため、抽出を行わずに直接デコードする（高速パス）。
+直接デコードできない場合のみ、マークダウンのコードブロック・前後の説明文からJSONオブジェクトを括弧の対応で取り出す（線形時間）。
+デコードには orjson があれば使い、バリデーションは事前に構築した Pydantic の TypeAdapter で行う。
 """
 
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
 from utils.logger import logger
-from .schema import AnalysisResult, TaskGenerationResult
+from .schema import AnalysisResult, MultiPerspectiveResult, RoleEvaluation, TaskGenerationResult
+
+# 高速なJSONデコーダ（オプション）。orjson.JSONDecodeError は json.JSONDecodeError のサブクラス
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+# バリデーション用の TypeAdapter（スキーマの構築はインポート時の1回だけ）
+_ANALYSIS_ADAPTER = TypeAdapter(AnalysisResult)
+_ROLE_EVALUATION_ADAPTER = TypeAdapter(RoleEvaluation)
+_TASK_GENERATION_ADAPTER = TypeAdapter(TaskGenerationResult)
+_ADAPTERS: Dict[Any, TypeAdapter] = {
+    AnalysisResult: _ANALYSIS_ADAPTER,
+    RoleEvaluation: _ROLE_EVALUATION_ADAPTER,
+    TaskGenerationResult: _TASK_GENERATION_ADAPTER,
+    MultiPerspectiveResult: TypeAdapter(MultiPerspectiveResult),
+}
+
+# 括弧の対応を取るためのトークン（文字列リテラル全体・波括弧）。文字列内の括弧を数えないよう文字列ごと読み飛ばす
+_JSON_TOKEN_PATTERN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]')
+_CODE_FENCE = "```"
 
 
 class EvaluationParser:
@@ -25,21 +56,15 @@ class EvaluationParser:
             パースされた分析結果（Dict形式）、パース失敗時はNone
         """
         try:
-            # JSONを抽出（マークダウンコードブロック内のJSONも対応）
-            json_text = EvaluationParser._extract_json(response_text)
+            # JSONをパース（JSONモードの応答は直接、それ以外はコードブロック等から抽出）
+            parsed_data = EvaluationParser._load_json(response_text)
             
-            if not json_text:
+            if parsed_data is None:
                 logger.warning("JSON not found in response text")
                 return None
             
-            # JSONをパース
-            parsed_data = json.loads(json_text)
-            
-            # Pydanticモデルでバリデーション
-            analysis_result = AnalysisResult(**parsed_data)
-            
-            # Dict形式に変換
-            return analysis_result.dict()
+            # Pydanticモデルでバリデーションし、Dict形式に変換
+            return _ANALYSIS_ADAPTER.validate_python(parsed_data).model_dump()
             
         except json.JSONDecodeError as e:
             logger.error(
@@ -73,6 +98,187 @@ class EvaluationParser:
             )
             return None
     
+    @staticmethod
+    def parse_multi_perspective_response(
+        response_text: str,
+        role_ids: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        複数ロール一括評価のレスポンスをパース
+        
+        ロール単位でバリデーションし、不正なロールだけを除外する（1ロールの不備で全体を捨てない）。
+        
+        Args:
+            response_text: LLMからのレスポンステキスト
+            role_ids: 期待するロールIDのリスト（指定時はそれ以外のロールを無視）
+            
+        Returns:
+            role_id → 分析結果（Dict形式、role_idは含まない）。有効なロールが1件も無い場合はNone
+        """
+        try:
+            parsed_data = EvaluationParser._load_json(response_text)
+            
+            if parsed_data is None:
+                logger.warning("JSON not found in response text")
+                return None
+            
+            evaluations = parsed_data.get("evaluations") if isinstance(parsed_data, dict) else None
+            if not isinstance(evaluations, list):
+                logger.warning("evaluations array not found in multi-perspective response")
+                return None
+            
+            results: Dict[str, Dict[str, Any]] = {}
+            for item in evaluations:
+                parsed_item = EvaluationParser.parse_role_evaluation(item, role_ids)
+                if parsed_item is None:
+                    continue
+                role_id, evaluation = parsed_item
+                # 同一ロールが重複した場合は最初の評価を採用
+                results.setdefault(role_id, evaluation)
+            
+            return results or None
+            
+        except json.JSONDecodeError as e:
+            logger.error(
+                f"JSON parse error in multi-perspective response: {e}",
+                extra={
+                    "error_type": "JSONDecodeError",
+                    "response_preview": response_text[:200] if response_text else None
+                },
+                exc_info=True
+            )
+            return None
+        except Exception as e:
+            logger.error(
+                f"Unexpected error parsing multi-perspective response: {e}",
+                extra={
+                    "error_type": type(e).__name__,
+                    "response_preview": response_text[:200] if response_text else None
+                },
+                exc_info=True
+            )
+            return None
+    
+    @staticmethod
+    def parse_role_evaluation(
+        item: Any,
+        role_ids: Optional[List[str]] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        複数ロール一括評価の evaluations 配列の1要素をバリデーション
+
+        一括レスポンスのパースと、ストリーミング中に要素が確定した時点の逐次通知で共通に使う。
+
+        Args:
+            item: evaluations 配列の要素
+            role_ids: 期待するロールIDのリスト（指定時はそれ以外のロールを無視）
+
+        Returns:
+            (role_id, 分析結果（role_idは含まない）)。不正な要素・対象外のロールはNone
+        """
+        try:
+            evaluation = _ROLE_EVALUATION_ADAPTER.validate_python(item).model_dump()
+        except (TypeError, ValueError) as e:
+            logger.warning(
+                f"Validation error in multi-perspective evaluation: {e}",
+                extra={"role_id": item.get("role_id") if isinstance(item, dict) else None}
+            )
+            return None
+        role_id = evaluation.pop("role_id")
+        if role_ids is not None and role_id not in role_ids:
+            return None
+        return role_id, evaluation
+
+    @staticmethod
+    def parse_role_evaluation_response(
+        response_text: str,
+        role_ids: Optional[List[str]] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        ロール評価1件（evaluations 配列の1要素と同じ形式）のレスポンスをパース（ロール単位の修正依頼の応答用）
+
+        Returns:
+            (role_id, 分析結果（role_idは含まない）)。パースできない・対象外のロールはNone
+        """
+        try:
+            item = EvaluationParser._load_json(response_text)
+        except ValueError as e:
+            logger.warning(f"JSON parse error in role evaluation response: {e}")
+            return None
+        if not isinstance(item, dict):
+            return None
+        return EvaluationParser.parse_role_evaluation(item, role_ids)
+
+    @staticmethod
+    def find_role_items(response_text: str) -> Dict[str, Any]:
+        """
+        複数ロール一括評価のレスポンスから、role_id → evaluations 配列の要素（バリデーション前）を取り出す
+
+        バリデーションに失敗したロールを修正依頼する際に、そのロールの出力だけを渡すために使う。
+        """
+        try:
+            parsed_data = EvaluationParser._load_json(response_text)
+        except ValueError:
+            return {}
+        evaluations = parsed_data.get("evaluations") if isinstance(parsed_data, dict) else None
+        items: Dict[str, Any] = {}
+        for item in evaluations if isinstance(evaluations, list) else []:
+            if isinstance(item, dict) and isinstance(item.get("role_id"), str):
+                items.setdefault(item["role_id"], item)
+        return items
+
+    @staticmethod
+    def describe_error(response_text: str, schema: Any) -> Optional[str]:
+        """
+        レスポンスがパースできない理由（修正依頼のプロンプトに含める）
+
+        Args:
+            response_text: LLMからのレスポンステキスト
+            schema: 期待するPydanticモデル（AnalysisResult / RoleEvaluation / MultiPerspectiveResult / TaskGenerationResult）
+
+        Returns:
+            理由の説明（JSONの構文エラー・スキーマ違反の項目）。パースできる場合はNone
+        """
+        try:
+            data = EvaluationParser._load_json(response_text)
+        except ValueError as e:
+            return f"JSONとして解釈できません: {e}"
+        if data is None:
+            return "JSONオブジェクトが含まれていません"
+        adapter = _ADAPTERS.get(schema) or TypeAdapter(schema)
+        try:
+            adapter.validate_python(data)
+        except ValidationError as e:
+            return "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or '(root)'}: {error['msg']}"
+                for error in e.errors()[:10]
+            )
+        return None
+
+    @staticmethod
+    def parse_partial_analysis(values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        ストリーミング途中で確定した分析結果のフィールドのうち、スキーマを満たすものだけを返す
+
+        Args:
+            values: IncrementalJSONParser.values（ルート直下で確定した値）
+
+        Returns:
+            overall_score / severity / urgency / explanation / findings_count のうち確定済みのもの
+        """
+        partial: Dict[str, Any] = {}
+        score = values.get("overall_score")
+        if isinstance(score, int) and not isinstance(score, bool) and 0 <= score <= 100:
+            partial["overall_score"] = score
+        for key in ("severity", "urgency"):
+            if values.get(key) in ("HIGH", "MEDIUM", "LOW"):
+                partial[key] = values[key]
+        if isinstance(values.get("explanation"), str):
+            partial["explanation"] = values["explanation"]
+        if isinstance(values.get("findings"), list):
+            partial["findings_count"] = len(values["findings"])
+        return partial
+
     @staticmethod
     def parse_task_generation_response(response_text: str) -> Optional[Dict[str, Any]]:
         """
@@ -85,21 +291,15 @@ class EvaluationParser:
             パースされたタスク生成結果（Dict形式）、パース失敗時はNone
         """
         try:
-            # JSONを抽出（マークダウンコードブロック内のJSONも対応）
-            json_text = EvaluationParser._extract_json(response_text)
+            # JSONをパース（JSONモードの応答は直接、それ以外はコードブロック等から抽出）
+            parsed_data = EvaluationParser._load_json(response_text)
             
-            if not json_text:
+            if parsed_data is None:
                 logger.warning("JSON not found in response text")
                 return None
             
-            # JSONをパース
-            parsed_data = json.loads(json_text)
-            
-            # Pydanticモデルでバリデーション
-            task_result = TaskGenerationResult(**parsed_data)
-            
-            # Dict形式に変換
-            return task_result.dict()
+            # Pydanticモデルでバリデーションし、Dict形式に変換
+            return _TASK_GENERATION_ADAPTER.validate_python(parsed_data).model_dump()
             
         except json.JSONDecodeError as e:
             logger.error(
@@ -133,35 +333,94 @@ class EvaluationParser:
             )
             return None
     
+    @staticmethod
+    def _load_json(text: str) -> Any:
+        """
+        レスポンスのJSONをデコード
+        
+        1. 全体が "{" で始まるJSONなら抽出せずにそのままデコード（JSONモードの応答）
+        2. 前後に説明文・コードブロックがある場合は、最初の "{" から最後の "}" まで（コードブロック内に限る）をデコード
+        3. それでもデコードできない場合（後ろに別の括弧がある等）は _extract_json の括弧の対応で取り出してデコード
+        
+        Args:
+            text: LLMからのレスポンステキスト
+            
+        Returns:
+            デコードしたJSON。JSONが見つからない場合はNone
+            
+        Raises:
+            json.JSONDecodeError: 取り出したJSONが不正な場合
+        """
+        if not text:
+            return None
+        stripped = text.strip()
+        if stripped.startswith("{"):
+            try:
+                return _json_loads(stripped)
+            except ValueError:
+                pass
+        
+        start, end = EvaluationParser._json_bounds(text)
+        if start < 0:
+            return None
+        if end > start:
+            try:
+                return _json_loads(text[start:end + 1])
+            except ValueError:
+                pass
+        json_text = EvaluationParser._extract_json(text)
+        if not json_text:
+            return None
+        return _json_loads(json_text)
+    
+    @staticmethod
+    def _json_bounds(text: str) -> Tuple[int, int]:
+        """
+        JSONオブジェクトの候補範囲（最初の "{" と最後の "}" の位置。見つからない場合は -1）
+        
+        マークダウンのコードブロックがあれば、その中に限る。
+        """
+        fence = text.find(_CODE_FENCE)
+        if fence >= 0:
+            start = text.find("{", fence + len(_CODE_FENCE))
+            if start >= 0:
+                closing = text.find(_CODE_FENCE, start)
+                return start, text.rfind("}", start, closing if closing >= 0 else len(text))
+        start = text.find("{")
+        return start, text.rfind("}", start) if start >= 0 else -1
+    
     @staticmethod
     def _extract_json(text: str) -> Optional[str]:
         """
         テキストからJSONを抽出
         
+        マークダウンのコードブロックがあればその中の、無ければ最初の "{" から対応する "}" までを返す。
+        文字列リテラルは丸ごと読み飛ばすため、文字列内の括弧は数えない（正規表現のバックトラックが無く線形時間）。
+        括弧が閉じていない場合（出力の打ち切り等）は最初の "{" から最後の "}" まで。
+        
         Args:
             text: 抽出元のテキスト
             
         Returns:
             抽出されたJSON文字列、見つからない場合はNone
         """
-        # マークダウンコードブロック内のJSONを検索
-        code_block_pattern = r"```(?:json)?\s*(\{.*?\})\s*```"
-        match = re.search(code_block_pattern, text, re.DOTALL)
-        if match:
-            return match.group(1)
-        
-        # JSONオブジェクトを直接検索
-        json_pattern = r"\{.*\}"
-        match = re.search(json_pattern, text, re.DOTALL)
-        if match:
-            return match.group(0)
+        if not text:
+            return None
+        start, end = EvaluationParser._json_bounds(text)
+        if start < 0:
+            return None
         
-        # 全体がJSONの可能性
-        text_stripped = text.strip()
-        if text_stripped.startswith("{") and text_stripped.endswith("}"):
-            return text_stripped
+        depth = 0
+        for match in _JSON_TOKEN_PATTERN.finditer(text, start):
+            token = match.group()
+            if token == "{":
+                depth += 1
+            elif token == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:match.end()]
         
-        return None
+        return text[start:end + 1] if end > start else None
     
     @staticmethod
     def validate_analysis_result(data: Dict[str, Any]) -> bool:
@@ -175,7 +434,7 @@ class EvaluationParser:
             バリデーション成功時True
         """
         try:
-            AnalysisResult(**data)
+            _ANALYSIS_ADAPTER.validate_python(data)
             return True
         except Exception as e:
             logger.warning(f"Analysis result validation failed: {e}")
@@ -193,7 +452,7 @@ class EvaluationParser:
             バリデーション成功時True
         """
         try:
-            TaskGenerationResult(**data)
+            _TASK_GENERATION_ADAPTER.validate_python(data)
             return True
         except Exception as e:
             logger.warning(f"Task generation result validation failed: {e}")
@@ -49,6 +49,16 @@ class AnalysisResult(BaseModel):
         return v
 
 
+class RoleEvaluation(AnalysisResult):
+    """ロール別の分析結果（複数ロール一括評価の1要素）"""
+    role_id: str = Field(..., description="評価ロールID（executive|corp_planning|staff|governance 等）")
+
+
+class MultiPerspectiveResult(BaseModel):
+    """複数ロール一括評価の結果"""
+    evaluations: List[RoleEvaluation] = Field(..., description="ロール別の分析結果")
+
+
 class TaskDefinition(BaseModel):
     """タスク定義"""
     id: str = Field(..., description="タスクID")
@@ -9,6 +9,7 @@ import os
 import re
 from utils.logger import logger
 from utils.exceptions import ServiceError
+from utils.keyword_matcher import get_keyword_matcher
 
 
 class GoogleChatService:
@@ -239,44 +240,31 @@ class GoogleChatService:
         Returns:
             構造化されたチャットデータ
         """
-        # リスク提起メッセージの検出
-        risk_keywords = ["やばい", "危険", "リスク", "問題", "止める", "上げた方がいい", "報告"]
+        # リスク提起・エスカレーション完了・反対意見を1メッセージ1回の走査で検出
+        matcher = get_keyword_matcher()
         risk_messages = []
-        
-        for msg in messages:
-            text = msg.get("text", "")
-            for keyword in risk_keywords:
-                if keyword in text:
-                    risk_messages.append({
-                        "user": msg.get("user"),
-                        "text": text,
-                        "keyword": keyword,
-                        "timestamp": msg.get("timestamp")
-                    })
-                    break
-        
-        # エスカレーション完了の検出
-        escalation_keywords = ["エスカレーション", "報告", "相談", "上げました", "報告しました"]
-        escalation_mentioned = any(
-            any(keyword in msg.get("text", "") for keyword in escalation_keywords)
-            for msg in messages
-        )
-        
-        # 反対意見の検出
-        opposition_keywords = ["やめた方が", "止める", "撤退", "反対", "問題"]
         opposition_messages = []
+        escalation_mentioned = False
         
         for msg in messages:
             text = msg.get("text", "")
-            for keyword in opposition_keywords:
-                if keyword in text:
-                    opposition_messages.append({
-                        "user": msg.get("user"),
-                        "text": text,
-                        "keyword": keyword,
-                        "timestamp": msg.get("timestamp")
-                    })
-                    break
+            hits = matcher.scan(text)
+            if "risk" in hits:
+                risk_messages.append({
+                    "user": msg.get("user"),
+                    "text": text,
+                    "keyword": hits["risk"][0],
+                    "timestamp": msg.get("timestamp")
+                })
+            if "escalation" in hits:
+                escalation_mentioned = True
+            if "opposition" in hits:
+                opposition_messages.append({
+                    "user": msg.get("user"),
+                    "text": text,
+                    "keyword": hits["opposition"][0],
+                    "timestamp": msg.get("timestamp")
+                })
         
         return {
             "total_messages": len(messages),
@@ -3,12 +3,14 @@ Google Meet API統合
 議事録の取得とパース
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import os
 import re
+from collections import Counter
 from utils.logger import logger
 from utils.exceptions import ServiceError
+from utils.keyword_matcher import KeywordMatcher, get_keyword_matcher
 
 
 class GoogleMeetService:
@@ -350,67 +352,193 @@ class GoogleMeetService:
         Returns:
             構造化された議事録データ
         """
-        # 発言者と発言内容を抽出
-        speaker_pattern = r'^([^:]+):\s*(.+)$'
-        lines = transcript.strip().split('\n')
+        state = TranscriptParseState()
+        state.feed(transcript)
+        return state.snapshot()
+
+
+class TranscriptParseState:
+    """
+    議事録の増分パース状態（会議ごとに保持）
+    
+    議事録が追記されて再取り込みされたとき、前回までのテキストの続きだけを行単位でパースし、
+    発言リスト・発言者ごとの発言数・KPI/撤退キーワードの検出状態を差分で更新する。
+    最後の発言は次の行が続きになり得るため確定させず、改行で終わっていない最終行も
+    スナップショット作成時にだけ仮に反映する（全文パースと同じ結果になる）。
+    """
+    
+    def __init__(self, matcher: Optional[KeywordMatcher] = None):
+        """
+        Args:
+            matcher: キーワード検出エンジン（Noneの場合は設定から構築した共有インスタンス）
+        """
+        self.matcher = matcher or get_keyword_matcher()
+        self.revision = 0  # 内容が変わるたびに増える番号（作り直しても戻さない）
+        self.reset()
+    
+    def reset(self) -> None:
+        """状態を初期化"""
+        self.text = ""  # これまでに受け取った議事録全文
+        self._pending_line = ""  # 改行で終わっていない最終行
+        self._statements: List[Dict[str, str]] = []  # 確定済みの発言
+        self._speaker_counts: Counter = Counter()
+        self._kpi_mentions: List[Dict[str, str]] = []
+        self._kpi_downgrade_count = 0
+        self._exit_discussed = False
+        self._open_speaker: Optional[str] = None  # 続きの行を受け付けている発言
+        self._open_lines: List[str] = []
+    
+    def feed(self, transcript: str) -> str:
+        """
+        議事録全文を受け取り、前回からの差分だけをパース
         
-        statements = []
-        current_speaker = None
-        current_text = []
+        Args:
+            transcript: 議事録全文（前回の全文の末尾に追記されたものを想定）
+            
+        Returns:
+            "unchanged"（変更なし）/ "append"（追記分のみパース）/ "full"（先頭から再パース）
+        """
+        if transcript == self.text:
+            return "unchanged"
+        if self.text and transcript.startswith(self.text):
+            mode = "append"
+            delta = transcript[len(self.text):]
+        else:
+            # 途中が書き換えられた場合は増分にできないため作り直す
+            mode = "full" if self.text else "append"
+            self.reset()
+            delta = transcript
+        self.text = transcript
+        self.revision += 1
         
+        lines = (self._pending_line + delta).split("\n")
+        self._pending_line = lines.pop()
         for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            match = re.match(speaker_pattern, line)
+            self._consume_line(line)
+        return mode
+    
+    def _consume_line(self, line: str) -> None:
+        """改行まで揃った1行を反映"""
+        line = line.strip()
+        if not line:
+            return
+        match = _SPEAKER_PATTERN.match(line)
+        if match:
+            self._close_open_statement()
+            self._open_speaker = match.group(1).strip()
+            self._open_lines = [match.group(2).strip()]
+        elif self._open_lines:
+            self._open_lines.append(line)
+    
+    def _close_open_statement(self) -> None:
+        """続きの行を受け付けていた発言を確定"""
+        if self._open_speaker and self._open_lines:
+            stmt = {"speaker": self._open_speaker, "text": " ".join(self._open_lines)}
+            self._statements.append(stmt)
+            self._speaker_counts[stmt["speaker"]] += 1
+            mention, is_downgrade, mentions_exit = _classify_statement(stmt, self.matcher)
+            if mention:
+                self._kpi_mentions.append(mention)
+            if is_downgrade:
+                self._kpi_downgrade_count += 1
+            if mentions_exit:
+                self._exit_discussed = True
+        self._open_speaker = None
+        self._open_lines = []
+    
+    def _provisional_statement(self) -> Optional[Dict[str, str]]:
+        """未確定の発言（改行で終わっていない最終行を含む）"""
+        speaker = self._open_speaker
+        lines = list(self._open_lines)
+        pending = self._pending_line.strip()
+        if pending:
+            match = _SPEAKER_PATTERN.match(pending)
             if match:
-                # 前の発言を保存
-                if current_speaker and current_text:
-                    statements.append({
-                        "speaker": current_speaker,
-                        "text": " ".join(current_text)
-                    })
-                
-                # 新しい発言者
-                current_speaker = match.group(1).strip()
-                current_text = [match.group(2).strip()]
-            else:
-                # 発言の続き
-                if current_text:
-                    current_text.append(line)
+                # 最終行が新しい発言の場合、それまでの発言は確定扱い
+                closed = {"speaker": speaker, "text": " ".join(lines)} if speaker and lines else None
+                return {"closed": closed, "speaker": match.group(1).strip(), "text": match.group(2).strip()}
+            if lines:
+                lines.append(pending)
+        if speaker and lines:
+            return {"closed": None, "speaker": speaker, "text": " ".join(lines)}
+        return None
+    
+    def _provisional_tail(self) -> List[Tuple[Dict[str, str], Optional[Dict[str, str]], bool, bool]]:
+        """未確定の発言と、そのキーワード分類（_classify_statement の結果）"""
+        provisional = self._provisional_statement()
+        if not provisional:
+            return []
+        tail = [provisional["closed"]] if provisional["closed"] else []
+        tail.append({"speaker": provisional["speaker"], "text": provisional["text"]})
+        return [(stmt, *_classify_statement(stmt, self.matcher)) for stmt in tail]
+    
+    def rule_summary(self) -> Dict[str, Any]:
+        """
+        ルールベース判定に使う集計（snapshot から発言リスト・KPI言及リストを除き、件数にしたもの）
         
-        # 最後の発言を保存
-        if current_speaker and current_text:
-            statements.append({
-                "speaker": current_speaker,
-                "text": " ".join(current_text)
-            })
+        確定済みの発言は追記のたびに差分で集計済みのため、未確定の発言だけを分類する（全発言を走査・複製しない）。
+        extract_features にそのまま渡せる。
+        """
+        speaker_counts = Counter(self._speaker_counts)
+        summary = {
+            "total_statements": len(self._statements),
+            "kpi_mention_count": len(self._kpi_mentions),
+            "kpi_downgrade_count": self._kpi_downgrade_count,
+            "exit_discussed": self._exit_discussed,
+        }
+        for stmt, mention, is_downgrade, mentions_exit in self._provisional_tail():
+            summary["total_statements"] += 1
+            speaker_counts[stmt["speaker"]] += 1
+            summary["kpi_mention_count"] += 1 if mention else 0
+            summary["kpi_downgrade_count"] += 1 if is_downgrade else 0
+            summary["exit_discussed"] = summary["exit_discussed"] or mentions_exit
+        summary["speaker_counts"] = dict(speaker_counts)
+        return summary
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の状態を parse_transcript と同じ形式で返す
         
-        # KPI関連キーワードの検出
-        kpi_keywords = ["KPI", "目標", "達成", "未達", "下方修正", "成長率", "ARPU", "利益率"]
-        kpi_mentions = []
-        for stmt in statements:
-            for keyword in kpi_keywords:
-                if keyword in stmt["text"]:
-                    kpi_mentions.append({
-                        "speaker": stmt["speaker"],
-                        "text": stmt["text"],
-                        "keyword": keyword
-                    })
-                    break
+        speaker_counts / kpi_downgrade_count はルールベース分析が全発言を数え直さずに済むよう付加する。
+        発言リストは取り込み済みの会議データとして保存されるため、以後の追記で変わらないよう複製する。
+        """
+        statements = list(self._statements)
+        speaker_counts = Counter(self._speaker_counts)
+        kpi_mentions = list(self._kpi_mentions)
+        kpi_downgrade_count = self._kpi_downgrade_count
+        exit_discussed = self._exit_discussed
         
-        # 撤退/ピボット議論の検出
-        exit_keywords = ["撤退", "中止", "ピボット", "方向転換", "やめる"]
-        exit_mentioned = any(
-            any(keyword in stmt["text"] for keyword in exit_keywords)
-            for stmt in statements
-        )
+        for stmt, mention, is_downgrade, mentions_exit in self._provisional_tail():
+            statements.append(stmt)
+            speaker_counts[stmt["speaker"]] += 1
+            if mention:
+                kpi_mentions.append(mention)
+            if is_downgrade:
+                kpi_downgrade_count += 1
+            exit_discussed = exit_discussed or mentions_exit
         
         return {
             "statements": statements,
             "kpi_mentions": kpi_mentions,
-            "exit_discussed": exit_mentioned,
-            "total_statements": len(statements)
+            "exit_discussed": exit_discussed,
+            "total_statements": len(statements),
+            "speaker_counts": dict(speaker_counts),
+            "kpi_downgrade_count": kpi_downgrade_count,
         }
 
+
+# 発言者と発言内容の抽出パターン
+_SPEAKER_PATTERN = re.compile(r'^([^:]+):\s*(.+)$')
+
+def _classify_statement(stmt: Dict[str, str], matcher: KeywordMatcher) -> Tuple[Optional[Dict[str, str]], bool, bool]:
+    """
+    発言を1回の走査でキーワード分類
+    
+    Returns:
+        (KPI言及（最も優先順位の高いキーワード付き）またはNone, KPI下方修正を示すか, 撤退/ピボットに言及しているか)
+    """
+    hits = matcher.scan(stmt["text"])
+    mention = None
+    if "kpi" in hits:
+        mention = {"speaker": stmt["speaker"], "text": stmt["text"], "keyword": hits["kpi"][0]}
+    return mention, mention is not None and "kpi_downgrade" in hits, "exit" in hits
@@ -0,0 +1,295 @@
+"""
+プロンプト入力の圧縮
+議事録・チャットログ・会議資料をプロンプトに埋め込む前に、内容を変えずに冗長な部分を除く。
+- 全角・半角（NFKC）と空白の正規化
+- 相づち・言いよどみだけの短い発言（フィラー）の除去
+- 同じ発言者の連続した発言の結合（発言者ラベルの繰り返しを減らす）
+- チャットの引用（> で始まる行）のうち、既出のメッセージと同じものの除去と、同じメッセージの重複の除去
+分析ごとの圧縮結果は collect_compaction_stats で、プロンプトの描画に実際に使ったものを受け取る。
+"""
+
+import contextvars
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import config
+from utils.logger import logger
+from utils.token_estimator import TokenEstimator, get_token_estimator
+
+_SPEAKER_LINE = re.compile(r'^([^:]+):\s*(.+)$')
+# 空白の連続（NFKC で全角スペースは半角になる）
+_WHITESPACE = re.compile(r'\s+')
+# フィラー判定の前に除く句読点・記号
+_FILLER_PUNCTUATION = re.compile(r'[\s、。,.!?…・~〜]+')
+# 相づち・言いよどみだけで構成された発言（「はい」「了解」などの同意は意思決定の判断材料になるため含めない）
+_FILLER = re.compile(r'^(?:え[ーっと]*|あ[ーの]*|う[ーん]*|ん[ー]*|まあ|その|なんか|uh+|um+|hmm+|er+|ah+)+$', re.IGNORECASE)
+
+# collect_compaction_stats のブロック内で compact が返した圧縮結果の stats（asyncio のタスクには自動で引き継がれる。
+# スレッドプールへは contextvars.copy_context で渡す）
+_used_stats_var: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "input_compaction_used_stats", default=None
+)
+
+
+@dataclass
+class CompactedInputs:
+    """圧縮後の入力テキストと圧縮の集計"""
+    meeting_transcript: str
+    chat_messages: str
+    materials_content: str
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def texts(self) -> Tuple[str, str, str]:
+        """(議事録, チャットログ, 会議資料)"""
+        return self.meeting_transcript, self.chat_messages, self.materials_content
+
+
+def normalize_text(text: str) -> str:
+    """NFKC で全角英数字・記号を半角に揃え、空白の連続（改行を含む）を1つにまとめる"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def is_filler(text: str, max_chars: int) -> bool:
+    """句読点を除いて max_chars 文字以下で、相づち・言いよどみ・句読点だけの発言か"""
+    stripped = _FILLER_PUNCTUATION.sub("", text)
+    return len(stripped) <= max_chars and (not stripped or _FILLER.match(stripped) is not None)
+
+
+@contextmanager
+def collect_compaction_stats() -> Iterator[List[Dict[str, Any]]]:
+    """このブロック内でプロンプトの描画に使った圧縮結果の stats を、使った順に集める（再利用した結果も含む）"""
+    used: List[Dict[str, Any]] = []
+    token = _used_stats_var.set(used)
+    try:
+        yield used
+    finally:
+        _used_stats_var.reset(token)
+
+
+def render_inputs(
+    meeting_data: Dict[str, Any],
+    chat_data: Optional[Dict[str, Any]] = None,
+    materials_data: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, str, str]:
+    """会議・チャット・資料をそのままプロンプト用のテキストにする（圧縮なし）"""
+    meeting_transcript = meeting_data.get("transcript", "")
+    if not meeting_transcript and meeting_data.get("statements"):
+        meeting_transcript = "\n".join(
+            f"{stmt.get('speaker', 'Unknown')}: {stmt.get('text', '')}"
+            for stmt in meeting_data.get("statements", [])
+        )
+    chat_messages = ""
+    if chat_data and chat_data.get("messages"):
+        chat_messages = "\n".join(
+            f"{_author(msg)}: {msg.get('text', '')}"
+            for msg in chat_data.get("messages", [])
+        )
+    materials_content = materials_data.get("content", "") if materials_data else ""
+    return meeting_transcript, chat_messages, materials_content
+
+
+class InputCompactor:
+    """
+    プロンプト入力の圧縮
+
+    ロール別プロンプトは同じ入力を何度も描画するため、同じ入力の圧縮結果はキャッシュして再利用する。
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        filler_max_chars: Optional[int] = None,
+        estimator: Optional[TokenEstimator] = None,
+        cache_size: int = 32,
+    ):
+        """
+        Args:
+            enabled: 圧縮するか（Noneの場合は PROMPT_COMPACTION_ENABLED）
+            filler_max_chars: フィラーとして除く発言の最大文字数（句読点を除く）
+            estimator: 圧縮前後のトークン数の推定器（Noneの場合は共有インスタンス）
+            cache_size: 再利用する圧縮結果の件数
+        """
+        self.enabled = config.PROMPT_COMPACTION_ENABLED if enabled is None else enabled
+        self.filler_max_chars = config.PROMPT_COMPACTION_FILLER_MAX_CHARS if filler_max_chars is None else filler_max_chars
+        self.estimator = estimator or get_token_estimator()
+        self._cache: "OrderedDict[str, CompactedInputs]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._totals = {"compactions": 0, "before_tokens": 0, "after_tokens": 0}
+
+    def compact(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+    ) -> CompactedInputs:
+        """会議・チャット・資料をプロンプト用のテキストにして圧縮する（無効の場合はそのまま。stats は {"enabled": False}）"""
+        compacted = self._compact(meeting_data, chat_data, materials_data)
+        used = _used_stats_var.get()
+        if used is not None:
+            used.append(compacted.stats)
+        return compacted
+
+    def _compact(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> CompactedInputs:
+        """compact の本体（同じ入力の圧縮結果はキャッシュから返す）"""
+        if not self.enabled:
+            return CompactedInputs(*render_inputs(meeting_data, chat_data, materials_data), stats={"enabled": False})
+
+        cache_key = self._cache_key(meeting_data, chat_data, materials_data)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        counts = {"dropped_fillers": 0, "merged_turns": 0, "deduped_quotes": 0, "deduped_messages": 0}
+        before = render_inputs(meeting_data, chat_data, materials_data)
+        after = (
+            self._compact_transcript(meeting_data, before[0], counts),
+            self._compact_chat(chat_data, counts),
+            self._compact_materials(before[2]),
+        )
+        before_tokens = self.estimator.estimate_many(before)
+        after_tokens = self.estimator.estimate_many(after)
+        compacted = CompactedInputs(*after, stats={
+            "enabled": True,
+            "before_tokens": before_tokens,
+            "after_tokens": after_tokens,
+            "saved_ratio": round(1 - after_tokens / before_tokens, 4) if before_tokens else 0.0,
+            **counts,
+        })
+        logger.info(
+            f"Prompt inputs compacted: tokens={before_tokens}->{after_tokens}, "
+            f"fillers={counts['dropped_fillers']}, merged={counts['merged_turns']}, "
+            f"quotes={counts['deduped_quotes']}, duplicates={counts['deduped_messages']}"
+        )
+
+        with self._lock:
+            self._totals["compactions"] += 1
+            self._totals["before_tokens"] += before_tokens
+            self._totals["after_tokens"] += after_tokens
+            self._cache[cache_key] = compacted
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return compacted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """圧縮の累計（同じ入力の再利用は数えない。監視用）"""
+        with self._lock:
+            totals = dict(self._totals)
+        before = totals["before_tokens"]
+        return {
+            "enabled": self.enabled,
+            **totals,
+            "saved_ratio": round(1 - totals["after_tokens"] / before, 4) if before else 0.0,
+        }
+
+    def _compact_transcript(self, meeting_data: Dict[str, Any], transcript: str, counts: Dict[str, int]) -> str:
+        """議事録の各発言を正規化し、フィラーを除いて同じ発言者の連続した発言を1行にまとめる"""
+        if meeting_data.get("transcript") or not meeting_data.get("statements"):
+            turns = []
+            for line in transcript.splitlines():
+                match = _SPEAKER_LINE.match(unicodedata.normalize("NFKC", line))
+                turns.append((match.group(1), match.group(2)) if match else (None, line))
+        else:
+            turns = [(str(stmt.get("speaker", "Unknown")), str(stmt.get("text") or "")) for stmt in meeting_data["statements"]]
+
+        merged: List[List[Optional[str]]] = []  # [発言者 or None, テキスト]
+        for speaker, text in turns:
+            speaker = normalize_text(speaker) if speaker is not None else None
+            text = normalize_text(text)
+            if not text:
+                continue
+            if is_filler(text, self.filler_max_chars):
+                counts["dropped_fillers"] += 1
+                continue
+            if speaker is not None and merged and merged[-1][0] == speaker:
+                merged[-1][1] = f"{merged[-1][1]} {text}"
+                counts["merged_turns"] += 1
+                continue
+            merged.append([speaker, text])
+        return "\n".join(text if speaker is None else f"{speaker}: {text}" for speaker, text in merged)
+
+    def _compact_chat(self, chat_data: Optional[Dict[str, Any]], counts: Dict[str, int]) -> str:
+        """チャットの各メッセージを正規化し、既出のメッセージの引用と重複メッセージを除く"""
+        if not chat_data or not chat_data.get("messages"):
+            return ""
+        seen_texts = set()  # 既出のメッセージ本文と、その各行
+        seen_messages = set()  # (投稿者, 本文)
+        lines: List[str] = []
+        for msg in chat_data["messages"]:
+            author = normalize_text(str(_author(msg)))
+            body: List[str] = []
+            for raw_line in str(msg.get("text") or "").splitlines():
+                line = normalize_text(raw_line)
+                if line.startswith(">"):
+                    quoted = line.lstrip("> ").strip()
+                    if not quoted or quoted in seen_texts:
+                        counts["deduped_quotes"] += 1
+                        continue
+                if line:
+                    body.append(line)
+            text = " ".join(body)
+            if not text:
+                continue
+            if (author, text) in seen_messages:
+                counts["deduped_messages"] += 1
+                continue
+            seen_messages.add((author, text))
+            seen_texts.add(text)
+            seen_texts.update(line for line in body if not line.startswith(">"))
+            lines.append(f"{author}: {text}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _compact_materials(content: str) -> str:
+        """会議資料は行ごとに正規化し、空行の連続を1行にまとめる（表・箇条書きの行構造は残す）"""
+        lines: List[str] = []
+        for raw_line in content.splitlines():
+            line = normalize_text(raw_line)
+            if line or (lines and lines[-1]):
+                lines.append(line)
+        return "\n".join(lines).strip()
+
+    @staticmethod
+    def _cache_key(
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> str:
+        """入力のハッシュ（プロンプトに使う項目だけ）"""
+        payload = [
+            meeting_data.get("transcript", ""),
+            [(stmt.get("speaker"), stmt.get("text")) for stmt in meeting_data.get("statements") or []],
+            [(_author(msg), msg.get("text")) for msg in (chat_data or {}).get("messages") or []],
+            (materials_data or {}).get("content", ""),
+        ]
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def _author(msg: Dict[str, Any]) -> str:
+    """チャットメッセージの投稿者（AnalysisPromptBuilder と同じ優先順）"""
+    return msg.get("author", msg.get("user", "Unknown"))
+
+
+# モジュール単一インスタンス（ロール間・タスク生成で圧縮結果を共有する）
+_input_compactor: Optional[InputCompactor] = None
+
+
+def get_input_compactor() -> InputCompactor:
+    global _input_compactor
+    if _input_compactor is None:
+        _input_compactor = InputCompactor()
+    return _input_compactor
@@ -0,0 +1,502 @@
+"""
+プロセス内ジョブキュー
+分析・タスク生成などの長時間処理をジョブとして受け付け、ワーカープールで非同期に実行する。
+API は 202 Accepted と job_id を即座に返し、完了は GET /api/jobs/{job_id} または WebSocket で確認する。
+ジョブの保存先（JobStore）は差し替え可能で、メモリ版と SQLite 版を用意している（Cloud Tasks 等の代替）。
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.exceptions import HelmException
+from utils.logger import logger
+
+
+class JobStatus:
+    """ジョブの状態"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    ACTIVE = (QUEUED, RUNNING)
+
+
+@dataclass
+class Job:
+    """ジョブ"""
+    job_id: str
+    job_type: str
+    resource_type: str
+    resource_id: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    status: str = JobStatus.QUEUED
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    attempts: int = 0
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobStore(ABC):
+    """ジョブの保存先（バックエンド）インターフェース"""
+
+    # ディスク等への同期I/Oを伴うか（True の場合、JobQueue はイベントループの外のスレッドで呼ぶ）
+    blocking: bool = False
+
+    # 保持期間切れの確認間隔（秒）。件数が max_jobs を超えた場合は間隔に関係なく削除する
+    _PRUNE_INTERVAL_SECONDS = 60.0
+
+    @abstractmethod
+    def find_reusable(self, resource_type: str, resource_id: str, succeeded_after: datetime) -> Optional[Job]:
+        """
+        同一リソースの再利用可能なジョブを取得
+
+        実行待ち・実行中のジョブ、または succeeded_after 以降に成功したジョブを返す（冪等な再投入用）
+        """
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        """ジョブを作成または更新"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得"""
+
+    @abstractmethod
+    def list_incomplete(self) -> List[Job]:
+        """未完了（実行待ち・実行中）のジョブを作成順に取得（再起動時の再投入用）"""
+
+
+class InMemoryJobStore(JobStore):
+    """
+    メモリ上のジョブ保存先（プロセス再起動で消える）
+
+    完了（成功・失敗）から retention_seconds を過ぎたジョブと、max_jobs を超えた分の古い完了ジョブは
+    新しいジョブの保存時に削除する（実行待ち・実行中のジョブは削除しない）
+    """
+
+    def __init__(self, max_jobs: int = 1000, retention_seconds: int = 86400):
+        """
+        Args:
+            max_jobs: 保持するジョブ数の上限
+            retention_seconds: 完了したジョブを保持する期間（秒）
+        """
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+        # (resource_type, resource_id) → job_id（作成順）。冪等な再投入の検索用
+        self._by_resource: Dict[Tuple[str, str], List[str]] = {}
+        self._lock = threading.Lock()
+        self._last_pruned = time.monotonic()
+
+    def find_reusable(self, resource_type: str, resource_id: str, succeeded_after: datetime) -> Optional[Job]:
+        with self._lock:
+            for job_id in reversed(self._by_resource.get((resource_type, resource_id), [])):
+                job = self._jobs[job_id]
+                if _is_reusable(job, succeeded_after):
+                    return job
+        return None
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            created = job.job_id not in self._jobs
+            self._jobs[job.job_id] = job
+            if not created:
+                return
+            self._by_resource.setdefault((job.resource_type, job.resource_id), []).append(job.job_id)
+            now = time.monotonic()
+            if len(self._jobs) > self.max_jobs or now - self._last_pruned >= self._PRUNE_INTERVAL_SECONDS:
+                self._last_pruned = now
+                self._prune()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_incomplete(self) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.status in JobStatus.ACTIVE]
+
+    def _prune(self) -> None:
+        """保持期間切れの完了ジョブと、上限を超えた分の古い完了ジョブを削除（ロック取得済み前提）"""
+        cutoff = (datetime.now() - timedelta(seconds=self.retention_seconds)).isoformat()
+        finished = [job for job in self._jobs.values() if job.status not in JobStatus.ACTIVE]
+        excess = len(self._jobs) - self.max_jobs
+        removed = 0
+        for job in finished:  # 作成順
+            if removed < excess or (job.finished_at or job.created_at) < cutoff:
+                self._remove(job)
+                removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} finished job(s) from in-memory job store")
+
+    def _remove(self, job: Job) -> None:
+        """ジョブと索引を削除（ロック取得済み前提）"""
+        del self._jobs[job.job_id]
+        key = (job.resource_type, job.resource_id)
+        job_ids = self._by_resource.get(key, [])
+        job_ids.remove(job.job_id)
+        if not job_ids:
+            del self._by_resource[key]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite によるジョブ保存先（プロセス再起動後も未完了ジョブを再投入できる）
+
+    メモリ版と同じく、保持期間切れの完了ジョブと max_jobs を超えた分の古い完了ジョブを保存時に削除する
+    """
+
+    blocking = True
+
+    _COLUMNS = (
+        "job_id", "job_type", "resource_type", "resource_id", "payload", "status",
+        "result", "error", "attempts", "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, db_path: str, max_jobs: int = 1000, retention_seconds: int = 86400):
+        """
+        Args:
+            db_path: SQLite ファイルのパス
+            max_jobs: 保持するジョブ数の上限
+            retention_seconds: 完了したジョブを保持する期間（秒）
+        """
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+        self._last_pruned = time.monotonic()
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " job_type TEXT NOT NULL,"
+                " resource_type TEXT NOT NULL,"
+                " resource_id TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " created_at TEXT NOT NULL,"
+                " started_at TEXT,"
+                " finished_at TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_resource ON jobs (resource_type, resource_id)")
+            self._conn.commit()
+
+    def find_reusable(self, resource_type: str, resource_id: str, succeeded_after: datetime) -> Optional[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs"
+                " WHERE resource_type = ? AND resource_id = ? ORDER BY created_at DESC",
+                (resource_type, resource_id),
+            ).fetchall()
+        for row in rows:
+            job = self._to_job(row)
+            if _is_reusable(job, succeeded_after):
+                return job
+        return None
+
+    def save(self, job: Job) -> None:
+        data = job.to_dict()
+        for key in ("payload", "result", "error"):
+            data[key] = json.dumps(data[key], ensure_ascii=False, default=str) if data[key] is not None else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self._COLUMNS)})"
+                f" VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                tuple(data[c] for c in self._COLUMNS),
+            )
+            now = time.monotonic()
+            if now - self._last_pruned >= self._PRUNE_INTERVAL_SECONDS or (
+                self._is_new(job) and self._count() > self.max_jobs
+            ):
+                self._last_pruned = now
+                self._prune()
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def list_incomplete(self) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                JobStatus.ACTIVE,
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    @staticmethod
+    def _is_new(job: Job) -> bool:
+        """投入直後（未実行）のジョブか"""
+        return job.status == JobStatus.QUEUED and job.attempts == 0
+
+    def _count(self) -> int:
+        """保存されているジョブ数（ロック取得済み前提）"""
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def _prune(self) -> None:
+        """保持期間切れの完了ジョブと、上限を超えた分の古い完了ジョブを削除（ロック取得済み前提）"""
+        cutoff = (datetime.now() - timedelta(seconds=self.retention_seconds)).isoformat()
+        removed = self._conn.execute(
+            "DELETE FROM jobs WHERE status NOT IN (?, ?) AND COALESCE(finished_at, created_at) < ?",
+            (*JobStatus.ACTIVE, cutoff),
+        ).rowcount
+        excess = self._count() - self.max_jobs
+        if excess > 0:
+            removed += self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN ("
+                " SELECT job_id FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at LIMIT ?)",
+                (*JobStatus.ACTIVE, excess),
+            ).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} finished job(s) from SQLite job store")
+
+    def _to_job(self, row: Tuple[Any, ...]) -> Job:
+        data = dict(zip(self._COLUMNS, row))
+        data["payload"] = json.loads(data["payload"]) if data["payload"] else {}
+        for key in ("result", "error"):
+            data[key] = json.loads(data[key]) if data[key] else None
+        return Job(**data)
+
+
+def _is_reusable(job: Job, succeeded_after: datetime) -> bool:
+    """冪等な再投入で既存ジョブを返してよいか（失敗したジョブは再投入を許可）"""
+    if job.status in JobStatus.ACTIVE:
+        return True
+    if job.status == JobStatus.SUCCEEDED and job.finished_at:
+        return datetime.fromisoformat(job.finished_at) >= succeeded_after
+    return False
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+JobListener = Callable[[Job], Awaitable[None]]
+
+
+class JobQueue:
+    """
+    ワーカープール付きジョブキュー
+
+    - register_handler でジョブ種別ごとの処理（payload を受け取り結果 dict を返す async 関数）を登録
+    - enqueue は (resource_type, resource_id) で冪等。実行中/待ちのジョブや直近に成功したジョブがあればそれを返す
+    - ワーカーは最初の enqueue 時に実行中のイベントループ上で起動する
+    - 状態が変わるたびに add_listener で登録したコールバック（WebSocket 配信など）を呼ぶ
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = 4, idempotency_ttl_seconds: int = 600):
+        """
+        Args:
+            store: ジョブの保存先（省略時はメモリ）
+            workers: 同時に実行するジョブ数
+            idempotency_ttl_seconds: 成功したジョブを同一リソースの再投入に対して返し続ける期間（秒）
+        """
+        self.store = store or InMemoryJobStore()
+        self.workers = max(1, workers)
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._listeners: List[JobListener] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (resource_type, resource_id) → [ロック, 使用中の enqueue 数]。既存ジョブの確認と作成を同一リソースで直列化する
+        self._enqueue_locks: Dict[Tuple[str, str], List[Any]] = {}
+
+    def register_handler(self, job_type: str, handler: JobHandler) -> None:
+        """ジョブ種別の処理を登録"""
+        self._handlers[job_type] = handler
+
+    def add_listener(self, listener: JobListener) -> None:
+        """ジョブ状態変更時のコールバックを登録"""
+        self._listeners.append(listener)
+
+    async def enqueue(
+        self,
+        job_type: str,
+        resource_type: str,
+        resource_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Job, bool]:
+        """
+        ジョブを投入
+
+        Returns:
+            (job, created)。既存ジョブを返した場合は created=False
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        await self._ensure_workers()
+
+        # 確認と作成の間に別の enqueue が割り込むと同一リソースのジョブが重複するため、リソース単位で直列化する
+        key = (resource_type, resource_id)
+        entry = self._enqueue_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                succeeded_after = datetime.now() - timedelta(seconds=self.idempotency_ttl_seconds)
+                existing = await self._io(self.store.find_reusable, resource_type, resource_id, succeeded_after)
+                if existing is not None:
+                    logger.info(
+                        f"Job enqueue deduplicated: {resource_type}/{resource_id} -> {existing.job_id} ({existing.status})"
+                    )
+                    return existing, False
+
+                job = Job(
+                    job_id=str(uuid.uuid4()),
+                    job_type=job_type,
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    payload=payload or {},
+                )
+                await self._io(self.store.save, job)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._enqueue_locks.get(key) is entry:
+                del self._enqueue_locks[key]
+        self._queue.put_nowait(job.job_id)
+        logger.info(f"Job enqueued: {job.job_id} type={job_type} resource={resource_type}/{resource_id}")
+        await self._notify(job)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得"""
+        return self.store.get(job_id)
+
+    async def get_async(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得（非同期版。SQLite の読み込みでイベントループを止めない）"""
+        return await self._io(self.store.get, job_id)
+
+    async def join(self) -> None:
+        """投入済みのジョブがすべて完了するまで待つ（テスト・シャットダウン用）"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """ワーカーを停止"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        self._loop = None
+
+    async def _io(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """保存先の操作を実行（同期I/Oを伴う保存先はイベントループの外のスレッドで実行する）"""
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def _ensure_workers(self) -> None:
+        """実行中のイベントループでワーカーを起動（ループが変わった場合は作り直す）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker_tasks:
+            return
+        self._loop = loop
+        self._enqueue_locks = {}
+        queue = self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            loop.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        # 前回のプロセス（またはループ）で未完了だったジョブを再投入
+        for job in await self._io(self.store.list_incomplete):
+            if job.status == JobStatus.RUNNING:
+                job.status = JobStatus.QUEUED
+                await self._io(self.store.save, job)
+            queue.put_nowait(job.job_id)
+        logger.info(f"Job queue workers started: workers={self.workers}")
+
+    async def _worker(self, worker_index: int) -> None:
+        """キューからジョブを取り出して実行"""
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Job worker {worker_index} failed on {job_id}: {e}", exc_info=True)
+            finally:
+                queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        """ジョブを1件実行し、結果と状態を保存"""
+        job = await self._io(self.store.get, job_id)
+        if job is None or job.status not in JobStatus.ACTIVE:
+            return
+
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.started_at = datetime.now().isoformat()
+        await self._io(self.store.save, job)
+        await self._notify(job)
+
+        try:
+            job.result = await self._handlers[job.job_type](job.payload)
+            job.status = JobStatus.SUCCEEDED
+        except asyncio.CancelledError:
+            # シャットダウン時は実行待ちに戻す（次回起動時に再投入される）
+            job.status = JobStatus.QUEUED
+            await asyncio.shield(self._io(self.store.save, job))
+            raise
+        except HelmException as e:
+            job.status = JobStatus.FAILED
+            job.error = {"error_code": e.error_code, "message": e.message, "details": e.details}
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = {"error_code": "INTERNAL_SERVER_ERROR", "message": str(e), "details": {}}
+
+        job.finished_at = datetime.now().isoformat()
+        await self._io(self.store.save, job)
+        logger.info(f"Job {job.job_id} finished: status={job.status}")
+        await self._notify(job)
+
+    async def _notify(self, job: Job) -> None:
+        """状態変更をリスナーに通知（リスナーの失敗はジョブに影響させない）"""
+        for listener in self._listeners:
+            try:
+                await listener(job)
+            except Exception as e:
+                logger.warning(f"Job listener failed for {job.job_id}: {e}")
+
+
+def create_job_store(
+    backend: str,
+    db_path: Optional[str] = None,
+    max_jobs: int = 1000,
+    retention_seconds: int = 86400,
+) -> JobStore:
+    """
+    設定に応じてジョブ保存先を生成
+
+    Args:
+        backend: "memory" または "sqlite"
+        db_path: SQLite ファイルのパス（backend="sqlite" の場合）
+        max_jobs: 保持するジョブ数の上限
+        retention_seconds: 完了したジョブを保持する期間（秒）
+    """
+    if backend == "sqlite" and db_path:
+        try:
+            return SQLiteJobStore(db_path, max_jobs=max_jobs, retention_seconds=retention_seconds)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"SQLite job store unavailable ({e}); falling back to in-memory job store")
+    return InMemoryJobStore(max_jobs=max_jobs, retention_seconds=retention_seconds)
@@ -0,0 +1,406 @@
+"""
+LLMバックエンド
+LLMService がモデルを呼び出す先を差し替えるための層。各バックエンドは Gen AI SDK の GenerativeModel と同じ形
+（generate_content / generate_content_async、応答の text・usage_metadata）のモデルを返す。
+
+- GenAIBackend: Gen AI SDK（google-generativeai、GOOGLE_API_KEY）
+- VertexAIBackend: Vertex AI SDK（vertexai、GOOGLE_CLOUD_PROJECT_ID のプロジェクト）
+- FakeLLMBackend: APIを呼ばないローカル実装。遅延の分布・エラー率・トークン数を設定でき、
+  config/fake_llm/ の AnalysisResult / TaskGenerationResult を満たすJSONを再生する（負荷試験・ベンチマーク・CI用）
+
+LLM_BACKEND（genai | vertex | fake）で選択する。
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from config import config
+from services.evaluation.schema import AnalysisResult, TaskGenerationResult
+from utils.logger import logger
+from utils.token_estimator import get_token_estimator
+
+# Gen AI SDK（オプション）
+try:
+    import google.generativeai as genai
+    _GENAI_AVAILABLE = True
+except ImportError:
+    genai = None
+    _GENAI_AVAILABLE = False
+
+# Vertex AI SDK（オプション）
+try:
+    import vertexai
+    from vertexai.generative_models import GenerativeModel as VertexGenerativeModel
+    _VERTEX_AI_AVAILABLE = True
+except ImportError:
+    vertexai = None
+    VertexGenerativeModel = None
+    _VERTEX_AI_AVAILABLE = False
+
+# backend/config/fake_llm/ のパス（services/ -> backend/）
+_FAKE_RESPONSES_DIR = Path(__file__).resolve().parent.parent / "config" / "fake_llm"
+
+# Gemini の response_schema（OpenAPI のサブセット）で使えるキーワード
+_GEMINI_SCHEMA_KEYS = ("type", "format", "description", "nullable", "enum", "items", "properties", "required")
+
+
+def to_gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON Schema（get_response_schema の形式）を Gemini の response_schema に変換
+
+    型名を大文字（OBJECT / STRING 等）にし、対応していないキーワード（minimum / maximum 等）を除く。
+    除いた制約はパース時の Pydantic のバリデーションで確認する。
+    """
+    converted: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key not in _GEMINI_SCHEMA_KEYS:
+            continue
+        if key == "type":
+            value = value.upper()
+        elif key == "items":
+            value = to_gemini_schema(value)
+        elif key == "properties":
+            value = {name: to_gemini_schema(prop) for name, prop in value.items()}
+        converted[key] = value
+    return converted
+
+
+class LLMBackend:
+    """LLMバックエンドの共通インターフェース"""
+
+    name = "base"
+    # プロンプトの先頭部分をプロバイダ側にキャッシュできるか（LLMContextCache は Gen AI SDK の CachedContent を使う）
+    supports_context_cache = False
+
+    @property
+    def available(self) -> bool:
+        """呼び出し可能か（SDK・認証情報が揃っているか）"""
+        return False
+
+    def model(self, model_name: str) -> Any:
+        """generate_content / generate_content_async を持つモデルを返す"""
+        raise NotImplementedError
+
+    def supports_async_stream(self) -> bool:
+        """generate_content_async(stream=True) でストリーミングできるか"""
+        return False
+
+    def response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """生成設定の response_schema に渡す形式に変換（Gen AI SDK・Vertex AI とも Gemini の形式）"""
+        return to_gemini_schema(schema)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """バックエンド名・利用可否（監視用）"""
+        return {"name": self.name, "available": self.available}
+
+
+class GenAIBackend(LLMBackend):
+    """Gen AI SDK（google-generativeai）のバックエンド"""
+
+    name = "genai"
+    supports_context_cache = True
+
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Args:
+            api_key: GOOGLE_API_KEY（未設定の場合は利用不可）
+        """
+        self._available = _GENAI_AVAILABLE and bool(api_key)
+        if self._available:
+            try:
+                genai.configure(api_key=api_key)
+                logger.info("Gen AI SDK configured with GOOGLE_API_KEY")
+            except Exception as e:
+                logger.warning(f"Gen AI SDKの初期化に失敗しました: {e}。モックモードを使用します。")
+                self._available = False
+
+    @property
+    def available(self) -> bool:
+        return self._available
+
+    def model(self, model_name: str) -> Any:
+        return genai.GenerativeModel(model_name)
+
+    def supports_async_stream(self) -> bool:
+        return hasattr(genai.GenerativeModel, "generate_content_async")
+
+
+class VertexAIBackend(LLMBackend):
+    """Vertex AI SDK（vertexai.generative_models）のバックエンド"""
+
+    name = "vertex"
+
+    def __init__(self, project_id: Optional[str] = None, location: str = "us-central1"):
+        """
+        Args:
+            project_id: Google Cloud Project ID（未設定の場合は利用不可）
+            location: Vertex AIのリージョン
+        """
+        self._available = _VERTEX_AI_AVAILABLE and bool(project_id)
+        if self._available:
+            try:
+                vertexai.init(project=project_id, location=location)
+                logger.info(f"Vertex AI SDK initialized: project={project_id}, location={location}")
+            except Exception as e:
+                logger.warning(f"Vertex AIの初期化に失敗しました: {e}。モックモードを使用します。")
+                self._available = False
+
+    @property
+    def available(self) -> bool:
+        return self._available
+
+    def model(self, model_name: str) -> Any:
+        return VertexGenerativeModel(model_name)
+
+    def supports_async_stream(self) -> bool:
+        return hasattr(VertexGenerativeModel, "generate_content_async")
+
+
+class ResourceExhausted(Exception):
+    """フェイクの 429（LLMService はスロットリングとして扱う）"""
+
+
+class ServiceUnavailable(Exception):
+    """フェイクの 503（LLMService はエラーとして扱う）"""
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    APIを呼ばないローカル実装（負荷試験・ベンチマーク・CI用）
+
+    応答は同じ seed・同じプロンプトなら同じ順序で再現される（呼び出しごとに
+    seed・モデル名・プロンプトのハッシュ・そのプロンプトの呼び出し回数から乱数を作るため、並行実行の順序に依存しない）。
+    プロンプトの出力形式の指示から応答の種類を判定し、canned JSON を再生する:
+    タスク生成（"execution_plan"）→ TaskGenerationResult、複数ロール一括評価（"evaluations"）→ ロールごとの評価、
+    それ以外 → AnalysisResult。
+    """
+
+    name = "fake"
+
+    LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+    def __init__(
+        self,
+        latency_distribution: str = "lognormal",
+        latency_ms: float = 800.0,
+        latency_spread: float = 0.5,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        output_tokens: int = 0,
+        seed: int = 0,
+        responses_dir: Optional[str] = None,
+        stream_chunks: int = 4,
+    ):
+        """
+        Args:
+            latency_distribution: 遅延の分布（fixed: 常に latency_ms / uniform: latency_ms ± spread 割合 /
+                lognormal: 中央値 latency_ms・シグマ spread の対数正規分布）
+            latency_ms: 遅延の基準値（ミリ秒）
+            latency_spread: uniform の幅（latency_ms に対する割合）・lognormal のシグマ
+            error_rate: 503（ServiceUnavailable）を返す確率
+            throttle_rate: 429（ResourceExhausted）を返す確率
+            output_tokens: 応答の出力トークン数（0の場合は応答テキストから推定）
+            seed: 乱数のシード
+            responses_dir: canned JSON のディレクトリ（analysis.json / task_generation.json。Noneの場合は config/fake_llm）
+            stream_chunks: ストリーミング時に応答を分割するチャンク数
+        """
+        if latency_distribution not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {self.LATENCY_DISTRIBUTIONS}")
+        self.latency_distribution = latency_distribution
+        self.latency_ms = max(0.0, latency_ms)
+        self.latency_spread = max(0.0, latency_spread)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.output_tokens = output_tokens
+        self.seed = seed
+        self.stream_chunks = max(1, stream_chunks)
+        directory = Path(responses_dir) if responses_dir else _FAKE_RESPONSES_DIR
+        self.analysis_responses = self._load_responses(directory / "analysis.json", AnalysisResult)
+        self.task_responses = self._load_responses(directory / "task_generation.json", TaskGenerationResult)
+        self._call_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "errors": 0, "throttled": 0, "input_tokens": 0, "output_tokens": 0}
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def model(self, model_name: str) -> "FakeGenerativeModel":
+        return FakeGenerativeModel(self, model_name)
+
+    def supports_async_stream(self) -> bool:
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """バックエンド名に加えて、呼び出し数・エラー数・返したトークン数"""
+        stats = super().get_stats()
+        with self._lock:
+            stats.update(self._stats)
+        return stats
+
+    @staticmethod
+    def _load_responses(path: Path, schema: Any) -> List[Dict[str, Any]]:
+        """canned JSON（応答の配列）を読み込み、スキーマを満たすことを確認"""
+        with open(path, "r", encoding="utf-8") as f:
+            responses = json.load(f)
+        if not isinstance(responses, list) or not responses:
+            raise ValueError(f"{path} には応答の配列（1件以上）を記述してください")
+        for response in responses:
+            schema(**response)
+        return responses
+
+    def plan(self, model_name: str, prompt: str) -> SimpleNamespace:
+        """1回の呼び出しの遅延・結果（例外または応答テキストとトークン数）を決める"""
+        digest = hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        with self._lock:
+            index = self._call_counts.get(digest, 0)
+            self._call_counts[digest] = index + 1
+            self._stats["calls"] += 1
+        rng = random.Random(f"{self.seed}:{digest}:{index}")
+
+        latency = self._latency(rng)
+        roll = rng.random()
+        if roll < self.throttle_rate:
+            with self._lock:
+                self._stats["throttled"] += 1
+            return SimpleNamespace(latency=latency, error=ResourceExhausted("429 Resource exhausted (fake)"))
+        if roll < self.throttle_rate + self.error_rate:
+            with self._lock:
+                self._stats["errors"] += 1
+            return SimpleNamespace(latency=latency, error=ServiceUnavailable("503 Service Unavailable (fake)"))
+
+        text = json.dumps(self._response(prompt, rng), ensure_ascii=False)
+        estimator = get_token_estimator()
+        input_tokens = estimator.estimate(prompt)
+        output_tokens = self.output_tokens or estimator.estimate(text)
+        with self._lock:
+            self._stats["input_tokens"] += input_tokens
+            self._stats["output_tokens"] += output_tokens
+        return SimpleNamespace(
+            latency=latency,
+            error=None,
+            text=text,
+            usage=SimpleNamespace(prompt_token_count=input_tokens, candidates_token_count=output_tokens),
+        )
+
+    def _latency(self, rng: random.Random) -> float:
+        """遅延（秒）"""
+        base = self.latency_ms / 1000.0
+        if self.latency_distribution == "uniform":
+            return max(0.0, rng.uniform(base * (1 - self.latency_spread), base * (1 + self.latency_spread)))
+        if self.latency_distribution == "lognormal" and base > 0:
+            return rng.lognormvariate(math.log(base), self.latency_spread)
+        return base
+
+    def _response(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        """プロンプトの出力形式の指示に合う canned 応答"""
+        if '"execution_plan"' in prompt:
+            return rng.choice(self.task_responses)
+        if '"evaluations"' in prompt:
+            role_ids = re.findall(r"^### role_id: (\S+)", prompt, flags=re.MULTILINE) or ["executive"]
+            return {
+                "evaluations": [
+                    {"role_id": role_id, **rng.choice(self.analysis_responses)} for role_id in role_ids
+                ]
+            }
+        return rng.choice(self.analysis_responses)
+
+
+class FakeGenerativeModel:
+    """FakeLLMBackend のモデル（Gen AI SDK の GenerativeModel と同じ呼び出し方）"""
+
+    def __init__(self, backend: FakeLLMBackend, model_name: str):
+        self.backend = backend
+        self.model_name = model_name
+
+    def generate_content(self, contents: Any, generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        plan = self.backend.plan(self.model_name, self._prompt(contents))
+        time.sleep(plan.latency)
+        if plan.error is not None:
+            raise plan.error
+        return SimpleNamespace(text=plan.text, usage_metadata=plan.usage)
+
+    async def generate_content_async(
+        self,
+        contents: Any,
+        generation_config: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Any:
+        plan = self.backend.plan(self.model_name, self._prompt(contents))
+        if not stream:
+            await asyncio.sleep(plan.latency)
+            if plan.error is not None:
+                raise plan.error
+            return SimpleNamespace(text=plan.text, usage_metadata=plan.usage)
+        return _FakeStream(plan, self.backend.stream_chunks)
+
+    @staticmethod
+    def _prompt(contents: Any) -> str:
+        if isinstance(contents, (list, tuple)):
+            return "".join(str(part) for part in contents)
+        return str(contents)
+
+
+class _FakeStream:
+    """ストリーミング応答（遅延の半分で最初のチャンク、残りをチャンク間に均等に配分）"""
+
+    def __init__(self, plan: SimpleNamespace, chunks: int):
+        self._plan = plan
+        self._chunks = chunks
+        self.usage_metadata = None
+
+    async def __aiter__(self):
+        plan = self._plan
+        await asyncio.sleep(plan.latency / 2)
+        if plan.error is not None:
+            raise plan.error
+        size = max(1, math.ceil(len(plan.text) / self._chunks))
+        pieces = [plan.text[i:i + size] for i in range(0, len(plan.text), size)]
+        for i, piece in enumerate(pieces):
+            if i:
+                await asyncio.sleep(plan.latency / 2 / max(1, len(pieces) - 1))
+            yield SimpleNamespace(text=piece)
+        self.usage_metadata = plan.usage
+
+
+def create_llm_backend(
+    name: Optional[str] = None,
+    api_key: Optional[str] = None,
+    project_id: Optional[str] = None,
+    location: str = "us-central1",
+) -> LLMBackend:
+    """
+    LLM_BACKEND に応じたバックエンドを作成
+
+    Args:
+        name: genai | vertex | fake（Noneの場合は LLM_BACKEND）
+        api_key: Gen AI SDK の GOOGLE_API_KEY
+        project_id / location: Vertex AI のプロジェクト・リージョン
+    """
+    name = (name or config.LLM_BACKEND).lower()
+    if name == "fake":
+        logger.info("LLMバックエンド: fake（APIを呼ばずに canned 応答を返します）")
+        return FakeLLMBackend(
+            latency_distribution=config.LLM_FAKE_LATENCY_DISTRIBUTION,
+            latency_ms=config.LLM_FAKE_LATENCY_MS,
+            latency_spread=config.LLM_FAKE_LATENCY_SPREAD,
+            error_rate=config.LLM_FAKE_ERROR_RATE,
+            throttle_rate=config.LLM_FAKE_THROTTLE_RATE,
+            output_tokens=config.LLM_FAKE_OUTPUT_TOKENS,
+            seed=config.LLM_FAKE_SEED,
+            responses_dir=config.LLM_FAKE_RESPONSES_DIR or None,
+        )
+    if name == "vertex":
+        return VertexAIBackend(project_id=project_id, location=location)
+    if name != "genai":
+        logger.warning(f"不明な LLM_BACKEND={name} のため genai を使用します")
+    return GenAIBackend(api_key=api_key)
@@ -0,0 +1,116 @@
+"""
+LLMゲーティング
+ルールベース分析の結果から、マルチ視点LLMの結果がエスカレーション判断を覆しうるかを判定し、
+評価するロール数（0 / 1 / 全ロール）を決める
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import config
+from utils.logger import logger
+
+from .ensemble_scoring import EnsembleScoringService
+from .multi_view_analyzer import RoleConfig
+
+
+@dataclass
+class GateDecision:
+    """ゲーティング結果（評価するロールと、スキップしたロール）"""
+    mode: str  # skip / probe / full
+    reason: str
+    role_ids: List[str] = field(default_factory=list)
+    skipped_roles: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """分析結果の multi_view_meta.gating に格納する形式"""
+        return {
+            "mode": self.mode,
+            "reason": self.reason,
+            "role_ids": list(self.role_ids),
+            "skipped_roles": list(self.skipped_roles),
+        }
+
+
+class LLMGate:
+    """
+    ルール確信度によるLLMロールのゲーティング
+
+    アンサンブルは overall = RULE_WEIGHT×ルール + LLM_WEIGHT×LLM、severity はルールと各ロールの最大値。
+    エスカレーション判断はスコアと severity について単調なので、LLM結果の両端
+    （LLMスコア0・severityはルールのまま / LLMスコア100・severity CRITICAL）で判断を評価すれば十分:
+
+    - 下端でもエスカレーションする → 判断は確定済み。LLMは呼ばない（skip）
+    - スコアだけで判断が変わりうる → 重み付き平均が必要なので全ロールを評価（full）
+    - severity の引き上げでしか判断が変わらない → 代表ロール1つだけ評価（probe）
+    - 上端でもエスカレーションしない → LLMは呼ばない（skip）
+    """
+
+    def __init__(
+        self,
+        escalation_engine: Any,
+        roles: List[RoleConfig],
+        enabled: Optional[bool] = None,
+        probe_role: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            escalation_engine: should_escalate を持つエスカレーションエンジン（EnhancedEscalationEngine 等）
+            roles: マルチ視点LLMのロール構成（MultiRoleLLMAnalyzer.roles）
+            enabled: ゲーティングの有効/無効（Noneの場合は config.LLM_GATING_ENABLED）
+            probe_role: probe 時に評価するロール（Noneの場合は config.LLM_GATING_PROBE_ROLE。空文字なら probe せず skip）
+        """
+        self.escalation_engine = escalation_engine
+        self.roles = roles
+        self.enabled = config.LLM_GATING_ENABLED if enabled is None else enabled
+        self.probe_role = config.LLM_GATING_PROBE_ROLE if probe_role is None else probe_role
+
+    def decide(self, rule_result: Dict[str, Any]) -> GateDecision:
+        """
+        ルールベース分析結果から評価するロールを決定
+
+        Args:
+            rule_result: StructureAnalyzer.analyze の結果
+
+        Returns:
+            GateDecision（role_ids を MultiRoleLLMAnalyzer.run_roles に渡す）
+        """
+        if not self.enabled:
+            return self._run("full", "gating_disabled", [r.role_id for r in self.roles])
+
+        rule_score = rule_result.get("overall_score", 0) or 0
+        rule_severity = rule_result.get("severity", "LOW")
+        findings = rule_result.get("findings", [])
+        rule_part = EnsembleScoringService.RULE_WEIGHT * rule_score
+        llm_max = EnsembleScoringService.LLM_WEIGHT * 100
+
+        if self._escalates(int(rule_part), rule_severity, findings):
+            return self._run("skip", "escalation_decided", [])
+        if self._escalates(int(rule_part + llm_max), rule_severity, findings):
+            return self._run("full", "score_undecided", [r.role_id for r in self.roles])
+        if not self._escalates(int(rule_part + llm_max), "CRITICAL", findings):
+            return self._run("skip", "no_escalation_decided", [])
+
+        probe = next((r for r in self.roles if r.role_id == self.probe_role), None)
+        if probe is None:
+            return self._run("skip", "severity_only_no_probe", [])
+        return self._run("probe", "severity_only", [probe.role_id])
+
+    def _escalates(self, overall_score: int, severity: str, findings: List[Dict[str, Any]]) -> bool:
+        """仮のアンサンブル結果でエスカレーション判断を評価"""
+        return bool(self.escalation_engine.should_escalate({
+            "overall_score": overall_score,
+            "severity": severity,
+            "findings": findings,
+        }))
+
+    def _run(self, mode: str, reason: str, role_ids: List[str]) -> GateDecision:
+        """評価しないロールをスキップ扱いにして GateDecision を組み立てる"""
+        selected = set(role_ids)
+        skipped = [
+            {"role_id": r.role_id, "weight": r.weight, "reason": reason}
+            for r in self.roles if r.role_id not in selected
+        ]
+        if skipped:
+            logger.info(f"LLM gating mode={mode} reason={reason}: skipped {[s['role_id'] for s in skipped]}")
+        return GateDecision(mode=mode, reason=reason, role_ids=role_ids, skipped_roles=skipped)
@@ -4,20 +4,32 @@ Vertex AI / Gemini API / Gen AI SDK の統合レイヤー
 """
 
 import os
+import json
 import time
-from typing import Dict, List, Any, Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from utils.logger import logger
 from config import config
-from services.prompts import AnalysisPromptBuilder, TaskGenerationPromptBuilder
-from services.evaluation import EvaluationParser
+from services.prompts import AnalysisPromptBuilder, RepairPromptBuilder, TaskGenerationPromptBuilder
+from services.evaluation import EvaluationParser, IncrementalJSONParser
+from services.evaluation.schema import AnalysisResult, MultiPerspectiveResult, RoleEvaluation, TaskGenerationResult
+from utils.llm_response_cache import LLMResponseCache, get_response_cache
+from utils.llm_context_cache import ContextCacheEntry, LLMContextCache, get_context_cache
+from utils.llm_admission import AdmissionPermit, AdmissionTimeout, LLMAdmissionController, get_admission_controller
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.latency_histogram import ModelLatencyHistograms, get_llm_latency_histograms
+from utils.token_estimator import get_token_estimator
+from utils.llm_usage_ledger import LLMUsageLedger, get_usage_ledger, llm_usage_tags
+from utils.llm_usage_tracker import get_usage_tracker
+from services.llm_backends import LLMBackend, create_llm_backend
 
-# Gen AI SDK（google-generativeai）がインストールされている場合は優先的に利用
-try:
-    import google.generativeai as genai
-    _GENAI_AVAILABLE = True
-except ImportError:
-    _GENAI_AVAILABLE = False
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いているためLLMを呼ばなかった"""
 
 
 class LLMService:
@@ -27,13 +39,27 @@ class LLMService:
         self,
         project_id: Optional[str] = None,
         location: Optional[str] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        context_cache: Optional[LLMContextCache] = None,
+        admission: Optional[LLMAdmissionController] = None,
+        circuit_breaker: Optional[LLMCircuitBreaker] = None,
+        model_chain: Optional[List[str]] = None,
+        latency: Optional[ModelLatencyHistograms] = None,
+        backend: Optional[LLMBackend] = None,
+        ledger: Optional[LLMUsageLedger] = None,
     ):
         """
         Args:
             project_id: Google Cloud Project ID
             location: Vertex AIのリージョン（デフォルト: us-central1、環境変数 VERTEX_AI_LOCATION で変更可能）
             model_name: 使用するモデル名（デフォルト: gemini-1.5-flash-002）
+            context_cache: プロンプトの共通の先頭部分を再利用するコンテキストキャッシュ（Noneの場合は共有インスタンス）
+            admission: RPM / TPM・同時実行数でLLM呼び出しを待たせるアドミッション制御（Noneの場合は共有インスタンス）
+            circuit_breaker: プロバイダ障害時にLLMを呼ばずにフォールバックさせるサーキットブレーカー（Noneの場合は config から作成）
+            model_chain: model_name の次に試すフォールバックモデル（Noneの場合は LLM_MODEL_CHAIN）
+            latency: モデル別のレイテンシヒストグラム（Noneの場合は共有インスタンス。ヘッジ要求の待ち時間に使う）
+            backend: モデルの呼び出し先（Noneの場合は LLM_BACKEND から作成。fake ならAPIを呼ばない）
+            ledger: 呼び出しごとの使用量を記録する台帳（Noneの場合は共有インスタンス）
         """
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT_ID") or config.GOOGLE_CLOUD_PROJECT_ID
         self.location = location or os.getenv("VERTEX_AI_LOCATION", "us-central1")
@@ -46,28 +72,68 @@ class LLMService:
         if default_model.startswith("models/"):
             default_model = default_model.replace("models/", "")
         self.model_name = model_name or default_model
+        # 失敗・パースできない応答の場合に順に試すモデル（先頭は model_name）
+        fallback_models = model_chain if model_chain is not None else config.LLM_MODEL_CHAIN.split(",")
+        self.model_chain: List[str] = [self.model_name]
+        for fallback in fallback_models:
+            fallback = fallback.strip().replace("models/", "")
+            if fallback and fallback not in self.model_chain:
+                self.model_chain.append(fallback)
+        self.hedge_enabled = config.LLM_HEDGE_ENABLED
         self.use_llm = os.getenv("USE_LLM", "false").lower() == "true"
         self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
         self.timeout = int(os.getenv("LLM_TIMEOUT", "60"))
         self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.2"))
         self.top_p = float(os.getenv("LLM_TOP_P", "0.95"))
+        # 非同期パスでSDKに async API が無い場合に使う上限付きスレッドプール（遅延生成）
+        self.executor_workers = config.LLM_EXECUTOR_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 同一プロンプト・同一生成パラメータのレスポンスを再利用するキャッシュ
+        self._response_cache: LLMResponseCache = get_response_cache()
+        # ロール別プロンプトの共通の先頭部分（評価指示 + 会議・チャット・資料）を再利用するキャッシュ
+        self._context_cache: LLMContextCache = context_cache or get_context_cache()
+        # プロセス全体のLLM呼び出しを分あたりの上限・同時実行ウィンドウで待たせる（リトライも1回の呼び出しとして数える）
+        self._admission: LLMAdmissionController = admission or get_admission_controller()
+        # 直近のエラー率・遅延率が高い間はLLMを呼ばず、リトライ・バックオフを待たずにモックを返す
+        self.circuit_breaker: LLMCircuitBreaker = circuit_breaker or LLMCircuitBreaker(
+            window_seconds=config.LLM_CIRCUIT_WINDOW_SECONDS,
+            min_calls=config.LLM_CIRCUIT_MIN_CALLS,
+            failure_rate_threshold=config.LLM_CIRCUIT_FAILURE_RATE,
+            slow_call_seconds=config.LLM_CIRCUIT_SLOW_CALL_SECONDS,
+            slow_rate_threshold=config.LLM_CIRCUIT_SLOW_RATE,
+            open_seconds=config.LLM_CIRCUIT_OPEN_SECONDS,
+            enabled=config.LLM_CIRCUIT_BREAKER_ENABLED,
+        )
+        # モデル別の成功した呼び出しの所要時間（ヘッジ要求を出すまでの待ち時間を決める）
+        self._latency: ModelLatencyHistograms = latency or get_llm_latency_histograms()
+        self._hedge_stats = {
+            "hedges": 0, "hedge_wins": 0, "fallbacks": 0, "budget_downgrades": 0,
+            "prompt_downgrades": 0, "preflight_rejections": 0,
+        }
+        # モデル別のJSON応答のパース結果（キャッシュヒットは数えない）と出力修正依頼の回数
+        self._parse_stats: Dict[str, Dict[str, int]] = {}
+        self._route_lock = threading.Lock()
+        # 呼び出しごとのトークン数・所要時間（分析ID・ロール・エンドポイント付き）
+        self._ledger: LLMUsageLedger = ledger or get_usage_ledger()
         
-        # Gen AI SDK用の設定（GOOGLE_API_KEY があれば優先利用）
+        # モデルの呼び出し先（Gen AI SDK は GOOGLE_API_KEY、Vertex AI は GOOGLE_CLOUD_PROJECT_ID を使う）
         self.genai_api_key = os.getenv("GOOGLE_API_KEY")
-        self._genai_available = _GENAI_AVAILABLE and bool(self.genai_api_key)
-        if self._genai_available:
-            try:
-                genai.configure(api_key=self.genai_api_key)
-                logger.info("Gen AI SDK configured with GOOGLE_API_KEY")
-            except Exception as e:
-                logger.warning(f"Gen AI SDKの初期化に失敗しました: {e}。Vertex AI経由にフォールバックします。")
-                self._genai_available = False
+        self.backend: LLMBackend = backend or create_llm_backend(
+            api_key=self.genai_api_key, project_id=self.project_id, location=self.location
+        )
+        # バックエンドのSDK・認証情報が揃っているか（Gen AI SDK専用だった頃からの名前）
+        self._genai_available = self.backend.available
         
         # Vertex AIの利用可能性をチェック
         self._check_vertex_ai_availability()
     
     def _check_vertex_ai_availability(self):
         """Vertex AIが利用可能かチェック"""
+        if self.backend.name == "fake":
+            # APIを呼ばないため USE_LLM・プロジェクトの設定に関係なくLLMパスを通す（負荷試験・CI用）
+            self._vertex_ai_available = True
+            logger.info(f"LLMバックエンド fake を使用します: model={self.model_name}")
+            return
         if not self.use_llm or not self.project_id:
             self._vertex_ai_available = False
             logger.info("LLM統合が無効化されています（USE_LLM=false または GOOGLE_CLOUD_PROJECT_ID未設定）")
@@ -103,30 +169,170 @@ class LLMService:
             分析結果
         """
         if not self._vertex_ai_available:
-            logger.warning("⚠️ LLM統合が無効のため、モック分析結果を返します（USE_LLM=false または GOOGLE_CLOUD_PROJECT_ID未設定）")
-            result = self._mock_analyze(meeting_data, chat_data, materials_data)
-            result["_is_mock"] = True  # モックデータであることを明示
-            result["_llm_status"] = "disabled"
-            return result
+            return self._disabled_analysis(meeting_data, chat_data, materials_data)
+        if self.circuit_breaker.is_open():
+            return self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+        
+        prompt, cache_prefix = self._build_analysis_prompt(meeting_data, chat_data, materials_data, role_id)
+        
+        # LLM APIを呼び出し（パースできない場合はチェーンの次のモデルで再試行）
+        with llm_usage_tags(role_id=role_id):
+            response_text, usage, model = self._generate_parsed(
+                prompt, EvaluationParser.parse_analysis_response, cache_prefix=cache_prefix,
+                response_schema=AnalysisPromptBuilder.get_response_schema(), result_model=AnalysisResult,
+            )
+        
+        return self._finalize_analysis(response_text, usage, meeting_data, chat_data, materials_data, prompt, model)
+    
+    async def analyze_structure_async(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        role_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        構造的問題を分析（非同期版。イベントループをブロックしない）
+        
+        引数・戻り値は analyze_structure と同じ
+        """
+        if not self._vertex_ai_available:
+            return self._disabled_analysis(meeting_data, chat_data, materials_data)
+        if self.circuit_breaker.is_open():
+            return self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+        
+        prompt, cache_prefix = self._build_analysis_prompt(meeting_data, chat_data, materials_data, role_id)
+        
+        with llm_usage_tags(role_id=role_id):
+            response_text, usage, model = await self._generate_parsed_async(
+                prompt, EvaluationParser.parse_analysis_response, cache_prefix=cache_prefix,
+                response_schema=AnalysisPromptBuilder.get_response_schema(), result_model=AnalysisResult,
+            )
+        
+        # パースできない応答のキャッシュ削除は _generate_parsed_async / _check_stream_response_async で済んでいる
+        return self._finalize_analysis(response_text, usage, meeting_data, chat_data, materials_data, None, model)
+    
+    async def analyze_structure_stream_async(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        role_id: Optional[str] = None,
+        *,
+        on_partial: Callable[[Dict[str, Any]], None],
+    ) -> Dict[str, Any]:
+        """
+        構造的問題を分析（ストリーミング版）
+        
+        生成途中で確定したフィールド（overall_score / severity / urgency / explanation / findings_count）を
+        変化のたびに on_partial に通知する。引数・戻り値は analyze_structure と同じ
+        """
+        if not self._vertex_ai_available:
+            return self._disabled_analysis(meeting_data, chat_data, materials_data)
+        if self.circuit_breaker.is_open():
+            return self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+        
+        prompt, cache_prefix = self._build_analysis_prompt(meeting_data, chat_data, materials_data, role_id)
+        parser = IncrementalJSONParser(max_depth=1)
+        notified: Dict[str, Any] = {}
+        
+        def on_text(chunk: str) -> None:
+            if not parser.feed(chunk):
+                return
+            partial = EvaluationParser.parse_partial_analysis(parser.values)
+            if partial != notified:
+                notified.clear()
+                notified.update(partial)
+                on_partial(dict(partial))
+        
+        response_schema = AnalysisPromptBuilder.get_response_schema()
+        with llm_usage_tags(role_id=role_id):
+            response_text, usage, model = await self._stream_with_fallback_async(
+                prompt, on_text, cache_prefix=cache_prefix, response_schema=response_schema
+            )
+            response_text, usage = await self._check_stream_response_async(
+                prompt, model, response_text, usage, EvaluationParser.parse_analysis_response,
+                response_schema, AnalysisResult,
+            )
+        
+        # パースできない応答のキャッシュ削除は _generate_parsed_async / _check_stream_response_async で済んでいる
+        return self._finalize_analysis(response_text, usage, meeting_data, chat_data, materials_data, None, model)
+    
+    def _disabled_analysis(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """LLM無効時のモック分析結果"""
+        logger.warning("⚠️ LLM統合が無効のため、モック分析結果を返します（USE_LLM=false または GOOGLE_CLOUD_PROJECT_ID未設定）")
+        result = self._mock_analyze(meeting_data, chat_data, materials_data)
+        result["_is_mock"] = True  # モックデータであることを明示
+        result["_llm_status"] = "disabled"
+        return result
+    
+    def _circuit_open_analysis(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """サーキットブレーカーが開いている間のモック分析結果（LLMを呼ばずに即座に返す）"""
+        logger.warning("LLMサーキットブレーカーが開いているため、モック分析結果を返します")
+        result = self._mock_analyze(meeting_data, chat_data, materials_data)
+        result["_llm_status"] = "circuit_open"
+        return result
+    
+    def _budget_exceeded_analysis(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """推定トークン数で日次上限を超えるため呼び出しを拒否した場合のモック分析結果（トークンは消費していない）"""
+        logger.warning("日次トークン上限を超えるため、モック分析結果を返します")
+        result = self._mock_analyze(meeting_data, chat_data, materials_data)
+        result["_llm_status"] = "budget_exceeded"
+        return result
+    
+    @staticmethod
+    def _build_analysis_prompt(
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        role_id: Optional[str],
+    ) -> Tuple[str, Optional[str]]:
+        """
+        プロンプトを構築（ロール別 or 共通）
         
-        # プロンプトを構築（ロール別 or 共通）
+        Returns:
+            (プロンプト全体, コンテキストキャッシュに載せる共通の先頭部分)。ロール別でない場合・先頭部分が無い場合は先頭部分None
+        """
         if role_id:
-            prompt = AnalysisPromptBuilder.build_for_role(
+            prefix, rest = AnalysisPromptBuilder.build_for_role_parts(
                 meeting_data=meeting_data,
                 chat_data=chat_data,
                 materials_data=materials_data,
                 role_id=role_id,
             )
-        else:
-            prompt = AnalysisPromptBuilder.build(meeting_data, chat_data, materials_data)
-        
-        # LLM APIを呼び出し
-        response_text, usage = self._call_llm(
-            prompt=prompt,
-            response_format="json",
-            model_name=self.model_name
-        )
-        
+            return prefix + rest, prefix or None
+        return AnalysisPromptBuilder.build(meeting_data, chat_data, materials_data), None
+    
+    def _finalize_analysis(
+        self,
+        response_text: Optional[str],
+        usage: Dict[str, Any],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        prompt: Optional[str] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """LLMレスポンスをパースし、失敗時はモック分析結果にフォールバック（model_name は応答したモデル）"""
+        if not response_text and usage.get("circuit_open"):
+            return self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+        if not response_text and usage.get("budget_exceeded"):
+            return self._budget_exceeded_analysis(meeting_data, chat_data, materials_data)
         if not response_text:
             logger.warning(
                 "LLM API呼び出し失敗、モック分析結果にフォールバック",
@@ -149,25 +355,229 @@ class LLMService:
                     "response_preview": response_text[:200] if response_text else None
                 }
             )
+            if prompt is not None:
+                self._invalidate_cached_response(prompt, "json", model_name, AnalysisPromptBuilder.get_response_schema())
             return self._mock_analyze(meeting_data, chat_data, materials_data)
         
         # タイムスタンプを追加
         parsed_result["created_at"] = datetime.now().isoformat()
         parsed_result["_is_mock"] = False  # LLM生成データであることを明示
         parsed_result["_llm_status"] = "success"
-        parsed_result["_llm_model"] = self.model_name
+        parsed_result["_llm_model"] = model_name or self.model_name
         if usage:
             parsed_result["_usage"] = usage
 
-        logger.info(f"✅ LLM分析完了（実際のLLM生成）: overall_score={parsed_result.get('overall_score', 0)}, model={self.model_name}")
+        logger.info(f"✅ LLM分析完了（実際のLLM生成）: overall_score={parsed_result.get('overall_score', 0)}, model={parsed_result['_llm_model']}")
         
         return parsed_result
     
+    def analyze_multi_perspective(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        *,
+        role_ids: List[str],
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """
+        複数ロールの評価を1回のLLM呼び出しで取得
+        
+        議事録・チャット・資料をプロンプトに1回だけ埋め込むため、ロール別に呼び出す場合より入力トークンが少ない。
+        
+        Args:
+            meeting_data: 会議データ（パース済みまたは生データ）
+            chat_data: チャットデータ（オプション）
+            materials_data: 会議資料データ（オプション）
+            role_ids: 評価ロールIDのリスト
+            
+        Returns:
+            (role_id → 分析結果, 呼び出し全体のトークン使用量)。レスポンスに含まれなかったロールは含まない
+        """
+        if not self._vertex_ai_available:
+            return self._disabled_multi_perspective(meeting_data, chat_data, materials_data, role_ids), {}
+        if self.circuit_breaker.is_open():
+            result = self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+            return {role_id: dict(result) for role_id in role_ids}, {}
+        
+        prompt = AnalysisPromptBuilder.build_multi_perspective(meeting_data, chat_data, materials_data, role_ids)
+        
+        response_schema = AnalysisPromptBuilder.get_multi_perspective_response_schema()
+        with llm_usage_tags(role_id=",".join(role_ids)):
+            response_text, usage, model = self._generate_parsed(
+                prompt, partial(EvaluationParser.parse_multi_perspective_response, role_ids=role_ids),
+                response_schema=response_schema, result_model=MultiPerspectiveResult,
+            )
+        
+        results = self._finalize_multi_perspective(
+            response_text, role_ids, meeting_data, chat_data, materials_data, prompt, usage, model
+        )
+        # バリデーションに失敗したロールだけを修正依頼する（全体の再呼び出しはしない）
+        usages = [usage]
+        for role_id, item in self._failed_role_items(response_text, role_ids, results, model).items():
+            with llm_usage_tags(role_id=role_id):
+                text, repair_usage = self._call_llm(
+                    self._role_repair_prompt(item, response_schema), "json", model,
+                    response_schema=RepairPromptBuilder.role_response_schema(response_schema),
+                )
+            usages.append(repair_usage)
+            self._accept_role_repair(results, role_id, text, model)
+        return results, self._merge_usage(usages)
+    
+    async def analyze_multi_perspective_async(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        *,
+        role_ids: List[str],
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """
+        複数ロールの評価を1回のLLM呼び出しで取得（非同期版）
+        
+        引数・戻り値は analyze_multi_perspective と同じ
+        """
+        if not self._vertex_ai_available:
+            return self._disabled_multi_perspective(meeting_data, chat_data, materials_data, role_ids), {}
+        if self.circuit_breaker.is_open():
+            result = self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+            return {role_id: dict(result) for role_id in role_ids}, {}
+        
+        prompt = AnalysisPromptBuilder.build_multi_perspective(meeting_data, chat_data, materials_data, role_ids)
+        
+        response_schema = AnalysisPromptBuilder.get_multi_perspective_response_schema()
+        with llm_usage_tags(role_id=",".join(role_ids)):
+            response_text, usage, model = await self._generate_parsed_async(
+                prompt, partial(EvaluationParser.parse_multi_perspective_response, role_ids=role_ids),
+                response_schema=response_schema, result_model=MultiPerspectiveResult,
+            )
+        
+        results = self._finalize_multi_perspective(
+            response_text, role_ids, meeting_data, chat_data, materials_data, None, usage, model
+        )
+        # バリデーションに失敗したロールだけを並行して修正依頼する（全体の再呼び出しはしない）
+        _, usage = await self._repair_roles_async(response_text, role_ids, results, usage, model, response_schema)
+        return results, usage
+    
+    async def analyze_multi_perspective_stream_async(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        *,
+        role_ids: List[str],
+        on_role: Callable[[str, Dict[str, Any]], None],
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """
+        複数ロールの評価を1回のLLM呼び出しで取得（ストリーミング版）
+        
+        evaluations 配列の要素が確定するたびに、バリデーション済みのロール評価を on_role(role_id, analysis) に通知する。
+        引数・戻り値は analyze_multi_perspective と同じ
+        """
+        if not self._vertex_ai_available:
+            return self._disabled_multi_perspective(meeting_data, chat_data, materials_data, role_ids), {}
+        if self.circuit_breaker.is_open():
+            result = self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+            return {role_id: dict(result) for role_id in role_ids}, {}
+        
+        prompt = AnalysisPromptBuilder.build_multi_perspective(meeting_data, chat_data, materials_data, role_ids)
+        parser = IncrementalJSONParser(max_depth=2)
+        notified: set = set()
+        
+        def on_text(chunk: str) -> None:
+            for path, value in parser.feed(chunk):
+                if len(path) != 2 or path[0] != "evaluations":
+                    continue
+                parsed_item = EvaluationParser.parse_role_evaluation(value, role_ids)
+                if parsed_item is not None and parsed_item[0] not in notified:
+                    notified.add(parsed_item[0])
+                    on_role(*parsed_item)
+        
+        response_schema = AnalysisPromptBuilder.get_multi_perspective_response_schema()
+        parse = partial(EvaluationParser.parse_multi_perspective_response, role_ids=role_ids)
+        with llm_usage_tags(role_id=",".join(role_ids)):
+            response_text, usage, model = await self._stream_with_fallback_async(
+                prompt, on_text, response_schema=response_schema
+            )
+            response_text, usage = await self._check_stream_response_async(
+                prompt, model, response_text, usage, parse, response_schema, MultiPerspectiveResult
+            )
+        
+        results = self._finalize_multi_perspective(
+            response_text, role_ids, meeting_data, chat_data, materials_data, None, usage, model
+        )
+        repaired, usage = await self._repair_roles_async(
+            response_text, role_ids, results, usage, model, response_schema
+        )
+        for role_id in repaired:
+            if role_id not in notified:
+                on_role(role_id, results[role_id])
+        return results, usage
+    
+    def _disabled_multi_perspective(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        role_ids: List[str],
+    ) -> Dict[str, Dict[str, Any]]:
+        """LLM無効時は全ロールにモック分析結果を割り当てる"""
+        result = self._disabled_analysis(meeting_data, chat_data, materials_data)
+        return {role_id: dict(result) for role_id in role_ids}
+    
+    def _finalize_multi_perspective(
+        self,
+        response_text: Optional[str],
+        role_ids: List[str],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        prompt: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """一括評価レスポンスをパースし、呼び出し・パース失敗時は全ロールをモック分析結果にフォールバック"""
+        if not response_text and (usage or {}).get("circuit_open"):
+            result = self._circuit_open_analysis(meeting_data, chat_data, materials_data)
+            return {role_id: dict(result) for role_id in role_ids}
+        if not response_text and (usage or {}).get("budget_exceeded"):
+            result = self._budget_exceeded_analysis(meeting_data, chat_data, materials_data)
+            return {role_id: dict(result) for role_id in role_ids}
+        parsed = EvaluationParser.parse_multi_perspective_response(response_text, role_ids) if response_text else None
+        
+        if not parsed:
+            logger.warning(
+                "LLM一括評価の呼び出しまたはパースに失敗、モック分析結果にフォールバック",
+                extra={
+                    "meeting_id": meeting_data.get("meeting_id"),
+                    "response_length": len(response_text) if response_text else 0,
+                }
+            )
+            if response_text and prompt is not None:
+                self._invalidate_cached_response(
+                    prompt, "json", model_name, AnalysisPromptBuilder.get_multi_perspective_response_schema()
+                )
+            mock = self._mock_analyze(meeting_data, chat_data, materials_data)
+            return {role_id: dict(mock) for role_id in role_ids}
+        
+        created_at = datetime.now().isoformat()
+        for analysis in parsed.values():
+            analysis["created_at"] = created_at
+            analysis["_is_mock"] = False
+            analysis["_llm_status"] = "success"
+            analysis["_llm_model"] = model_name or self.model_name
+        
+        logger.info(f"✅ LLM一括評価完了: roles={list(parsed.keys())}, model={model_name or self.model_name}")
+        return parsed
+    
     def generate_tasks(
         self,
         analysis_result: Dict[str, Any],
         approval_data: Dict[str, Any],
-        approved_interventions: Optional[List[str]] = None
+        approved_interventions: Optional[List[str]] = None,
+        *,
+        meeting_data: Optional[Dict[str, Any]] = None,
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         タスクを生成
@@ -176,31 +586,129 @@ class LLMService:
             analysis_result: 分析結果
             approval_data: Executive承認データ
             approved_interventions: 承認された介入案（オプション）
+            meeting_data, chat_data, materials_data: 分析元の入力（オプション）。
+                分析時のコンテキストキャッシュが有効期間内なら、その先頭部分（会議・チャット・資料）を再利用してプロンプトに含める
             
         Returns:
             タスク生成結果
         """
         if not self._vertex_ai_available:
-            logger.warning("⚠️ LLM統合が無効のため、モックタスク生成結果を返します（USE_LLM=false または GOOGLE_CLOUD_PROJECT_ID未設定）")
-            result = self._mock_generate_tasks(analysis_result, approval_data)
-            result["_is_mock"] = True  # モックデータであることを明示
-            result["_llm_status"] = "disabled"
-            return result
+            return self._disabled_tasks(analysis_result, approval_data)
+        if self.circuit_breaker.is_open():
+            return self._circuit_open_tasks(analysis_result, approval_data)
         
         # プロンプトを構築
-        prompt = TaskGenerationPromptBuilder.build(
-            analysis_result,
-            approval_data,
-            approved_interventions
+        prompt, cache_prefix = self._build_task_prompt(
+            analysis_result, approval_data, approved_interventions, meeting_data, chat_data, materials_data
         )
         
-        # LLM APIを呼び出し
-        response_text, usage = self._call_llm(
-            prompt=prompt,
-            response_format="json",
-            model_name=self.model_name
+        # LLM APIを呼び出し（パースできない場合はチェーンの次のモデルで再試行）
+        response_text, usage, model = self._generate_parsed(
+            prompt, EvaluationParser.parse_task_generation_response, cache_prefix=cache_prefix, create_context=False,
+            response_schema=TaskGenerationPromptBuilder.get_response_schema(), result_model=TaskGenerationResult,
         )
         
+        return self._finalize_tasks(response_text, analysis_result, approval_data, prompt, usage, model)
+    
+    async def generate_tasks_async(
+        self,
+        analysis_result: Dict[str, Any],
+        approval_data: Dict[str, Any],
+        approved_interventions: Optional[List[str]] = None,
+        *,
+        meeting_data: Optional[Dict[str, Any]] = None,
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        タスクを生成（非同期版。イベントループをブロックしない）
+        
+        引数・戻り値は generate_tasks と同じ
+        """
+        if not self._vertex_ai_available:
+            return self._disabled_tasks(analysis_result, approval_data)
+        if self.circuit_breaker.is_open():
+            return self._circuit_open_tasks(analysis_result, approval_data)
+        
+        prompt, cache_prefix = self._build_task_prompt(
+            analysis_result, approval_data, approved_interventions, meeting_data, chat_data, materials_data
+        )
+        
+        response_text, usage, model = await self._generate_parsed_async(
+            prompt, EvaluationParser.parse_task_generation_response, cache_prefix=cache_prefix, create_context=False,
+            response_schema=TaskGenerationPromptBuilder.get_response_schema(), result_model=TaskGenerationResult,
+        )
+        
+        return self._finalize_tasks(response_text, analysis_result, approval_data, None, usage, model)
+    
+    def _build_task_prompt(
+        self,
+        analysis_result: Dict[str, Any],
+        approval_data: Dict[str, Any],
+        approved_interventions: Optional[List[str]],
+        meeting_data: Optional[Dict[str, Any]],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> Tuple[str, Optional[str]]:
+        """
+        タスク生成プロンプトを構築
+        
+        分析時のコンテキストキャッシュが残っている場合だけ、その先頭部分を前置する
+        （キャッシュが無いのに全文を送ると入力トークンが増えるだけなので、その場合は従来のプロンプト）
+        
+        Returns:
+            (プロンプト全体, 再利用する先頭部分 or None)
+        """
+        context_prefix = None
+        if meeting_data is not None and self._context_cache.enabled:
+            prefix = AnalysisPromptBuilder.build_context_prefix(meeting_data, chat_data, materials_data)
+            if self._context_cache.contains(self.model_name, prefix):
+                context_prefix = prefix
+        prompt = TaskGenerationPromptBuilder.build(
+            analysis_result,
+            approval_data,
+            approved_interventions,
+            context_prefix=context_prefix,
+        )
+        # プロンプト予算を超えるため前置されなかった場合は、キャッシュの先頭部分としても使わない
+        if context_prefix is not None and not prompt.startswith(context_prefix):
+            context_prefix = None
+        return prompt, context_prefix
+    
+    def _disabled_tasks(self, analysis_result: Dict[str, Any], approval_data: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM無効時のモックタスク生成結果"""
+        logger.warning("⚠️ LLM統合が無効のため、モックタスク生成結果を返します（USE_LLM=false または GOOGLE_CLOUD_PROJECT_ID未設定）")
+        result = self._mock_generate_tasks(analysis_result, approval_data)
+        result["_is_mock"] = True  # モックデータであることを明示
+        result["_llm_status"] = "disabled"
+        return result
+    
+    def _circuit_open_tasks(self, analysis_result: Dict[str, Any], approval_data: Dict[str, Any]) -> Dict[str, Any]:
+        """サーキットブレーカーが開いている間のモックタスク生成結果（LLMを呼ばずに即座に返す）"""
+        logger.warning("LLMサーキットブレーカーが開いているため、モックタスク生成結果を返します")
+        result = self._mock_generate_tasks(analysis_result, approval_data)
+        result["_is_mock"] = True
+        result["_llm_status"] = "circuit_open"
+        return result
+    
+    def _finalize_tasks(
+        self,
+        response_text: Optional[str],
+        analysis_result: Dict[str, Any],
+        approval_data: Dict[str, Any],
+        prompt: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """タスク生成レスポンスをパースし、失敗時はモックにフォールバック（model_name は応答したモデル）"""
+        if not response_text and (usage or {}).get("circuit_open"):
+            return self._circuit_open_tasks(analysis_result, approval_data)
+        if not response_text and (usage or {}).get("budget_exceeded"):
+            logger.warning("日次トークン上限を超えるため、モックタスク生成結果を返します")
+            result = self._mock_generate_tasks(analysis_result, approval_data)
+            result["_is_mock"] = True
+            result["_llm_status"] = "budget_exceeded"
+            return result
         if not response_text:
             logger.warning(
                 "LLM API呼び出し失敗、モックタスク生成結果にフォールバック",
@@ -222,13 +730,17 @@ class LLMService:
                     "response_preview": response_text[:200] if response_text else None
                 }
             )
+            if prompt is not None:
+                self._invalidate_cached_response(
+                    prompt, "json", model_name, TaskGenerationPromptBuilder.get_response_schema()
+                )
             return self._mock_generate_tasks(analysis_result, approval_data)
         
         parsed_result["_is_mock"] = False  # LLM生成データであることを明示
         parsed_result["_llm_status"] = "success"
-        parsed_result["_llm_model"] = self.model_name
+        parsed_result["_llm_model"] = model_name or self.model_name
         
-        logger.info(f"✅ LLMタスク生成完了（実際のLLM生成）: total_tasks={parsed_result.get('execution_plan', {}).get('total_tasks', 0)}, model={self.model_name}")
+        logger.info(f"✅ LLMタスク生成完了（実際のLLM生成）: total_tasks={parsed_result.get('execution_plan', {}).get('total_tasks', 0)}, model={parsed_result['_llm_model']}")
         
         return parsed_result
     
@@ -236,7 +748,10 @@ class LLMService:
         self,
         prompt: str,
         response_format: str = "text",
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        cache_prefix: Optional[str] = None,
+        create_context: bool = True,
+        response_schema: Optional[Dict[str, Any]] = None,
     ) -> tuple:
         """
         LLM APIを呼び出し（Gen AI SDK専用）。戻り値は (response_text, usage_dict)。
@@ -245,109 +760,76 @@ class LLMService:
             prompt: プロンプト
             response_format: レスポンス形式（"text" または "json"）
             model_name: モデル名（オプション）
+            cache_prefix: コンテキストキャッシュに載せるプロンプトの先頭部分（オプション）。キャッシュを使える場合は残りだけを送る
+            create_context: False の場合は既存のコンテキストキャッシュだけを使う（作成しない）
+            response_schema: JSON応答のスキーマ（オプション）。生成設定の response_schema としてモデルに渡す
             
         Returns:
             レスポンステキスト、失敗時はNone
         """
-        model = model_name or self.model_name
-
-        # 日次トークン上限チェック（超えていればLLM呼び出しをスキップ）
-        try:
-            from utils.llm_usage_tracker import get_usage_tracker
-            tracker = get_usage_tracker(getattr(config, "LLM_DAILY_TOKEN_LIMIT", 0))
-            if tracker.is_over_limit():
-                logger.warning("LLM daily token limit exceeded, skipping LLM call (mock fallback)")
-                return None, {}
-        except Exception as e:
-            logger.debug(f"Usage tracker check skipped: {e}")
+        # キャッシュヒット時はトークンを消費しないため、日次上限チェックより先に参照する
+        cache_key = self._cache_key(prompt, response_format, model_name, response_schema)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            self._ledger.record(model_name or self.model_name, cached[1])
+            return cached
         
-        # Gen AI SDK（google-generativeai）のみを使用
-        if not self._genai_available:
-            logger.warning("Gen AI SDKが利用できません（GOOGLE_API_KEY未設定またはgoogle-generativeai未インストール）")
-            return None, {}
+        # 推定トークン数で日次上限を超える呼び出しは、APIに送る前に拒否する
+        if self._exceeds_daily_budget(prompt):
+            return None, {"budget_exceeded": True}
         
-        # モデル名をGen AI SDK用に調整（models/プレフィックスを削除）
-        # Gen AI SDKでは models/ プレフィックスは不要（エラーの原因）
-        genai_model_name = model
-        if genai_model_name.startswith("models/"):
-            # プレフィックスが含まれている場合は削除
-            genai_model_name = genai_model_name.replace("models/", "")
-            logger.info(f"モデル名を調整: {model} → {genai_model_name}")
+        genai_model_name = self._prepare_call(model_name)
+        if genai_model_name is None:
+            return None, {}
         
         for attempt in range(self.max_retries):
+            context_entry = None
+            permit = None
             try:
-                start_time = time.time()
-                
-                # Gen AI SDKでモデルを初期化
-                gen_model = genai.GenerativeModel(genai_model_name)
-                
-                # 生成設定
-                generation_config = {
-                    "temperature": self.temperature,
-                    "top_p": self.top_p,
-                    "max_output_tokens": 8192,
-                }
+                # Gen AI SDKでモデルを初期化（先頭部分のコンテキストキャッシュがあればそれを参照）
+                gen_model, contents, context_entry = self._context_model(
+                    genai_model_name, prompt, cache_prefix, create_context
+                )
                 
-                # JSON形式を強制する場合
-                if response_format == "json":
-                    generation_config["response_mime_type"] = "application/json"
+                # RPM / TPM・同時実行数の上限内になるまで待ち、サーキットブレーカーが開いていれば呼ばない
+                permit = self._admit(prompt)
+                start_time = time.time()
                 
                 # LLM API呼び出し
                 resp = gen_model.generate_content(
-                    prompt,
-                    generation_config=generation_config
+                    contents,
+                    generation_config=self._generation_config(response_format, response_schema)
                 )
                 elapsed_time = time.time() - start_time
+                self._finish_attempt(permit, resp=resp)
                 
-                if not resp:
-                    logger.warning(f"Gen AI SDKからの空レスポンス（試行 {attempt + 1}/{self.max_retries}）")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(2 ** attempt)  # 指数バックオフ
-                        continue
-                    return None, {}
-                
-                # レスポンステキストを取得
-                response_text = getattr(resp, "text", None)
+                response_text = self._response_text(resp, attempt)
                 if not response_text:
-                    logger.warning(f"Gen AI SDKからのレスポンスにtext属性がありません（試行 {attempt + 1}/{self.max_retries}）")
                     if attempt < self.max_retries - 1:
-                        time.sleep(2 ** attempt)
+                        time.sleep(2 ** attempt)  # 指数バックオフ
                         continue
                     return None, {}
 
-                # トークン使用量（usage_metadata があれば取得）
-                usage = {}
-                um = getattr(resp, "usage_metadata", None)
-                if um is not None:
-                    usage["input_tokens"] = getattr(um, "prompt_token_count", 0) or 0
-                    usage["output_tokens"] = getattr(um, "candidates_token_count", 0) or getattr(um, "output_token_count", 0) or 0
-                    try:
-                        from utils.llm_usage_tracker import get_usage_tracker
-                        get_usage_tracker(getattr(config, "LLM_DAILY_TOKEN_LIMIT", 0)).add(
-                            usage.get("input_tokens", 0), usage.get("output_tokens", 0)
-                        )
-                    except Exception:
-                        pass
-
+                usage = self._record_usage(resp)
+                self._calibrate_estimator(prompt, usage)
+                self._response_cache.set(cache_key, response_text, usage)
+                self._latency.record(genai_model_name, elapsed_time)
+                self._ledger.record(genai_model_name, usage, elapsed_time)
                 logger.info(f"Gen AI SDK呼び出し成功: model={genai_model_name}, elapsed={elapsed_time:.2f}s")
                 return response_text, usage
                 
+            except AdmissionTimeout as e:
+                logger.warning(f"{e}。LLM呼び出しをスキップします（モックフォールバック）")
+                return None, {}
+            except CircuitOpenError:
+                return None, {"circuit_open": True}
             except Exception as e:
-                error_type = type(e).__name__
-                logger.error(
-                    f"Gen AI SDK呼び出しエラー（試行 {attempt + 1}/{self.max_retries}）: {e}",
-                    extra={
-                        "error_type": error_type,
-                        "model": genai_model_name,
-                        "attempt": attempt + 1,
-                        "max_retries": self.max_retries,
-                        "project_id": self.project_id
-                    },
-                    exc_info=True
-                )
+                self._finish_attempt(permit, error=e)
+                self._log_call_error(e, genai_model_name, attempt)
+                self._discard_context_on_error(e, context_entry)
                 if attempt < self.max_retries - 1:
                     # 指数バックオフでリトライ
-                    delay = config.RETRY_INITIAL_DELAY * (config.RETRY_BACKOFF_BASE ** attempt)
+                    delay = self._retry_delay(attempt)
                     logger.info(f"Retrying after {delay:.2f} seconds...")
                     time.sleep(delay)
                     continue
@@ -356,6 +838,961 @@ class LLMService:
 
         return None, {}
     
+    async def _call_llm_async(
+        self,
+        prompt: str,
+        response_format: str = "text",
+        model_name: Optional[str] = None,
+        cache_prefix: Optional[str] = None,
+        create_context: bool = True,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> tuple:
+        """
+        LLM APIを非同期に呼び出し。引数・戻り値は _call_llm と同じ (response_text, usage_dict)。
+        
+        SDKの generate_content_async があればそれを使い、無い場合は上限付きスレッドプールで
+        同期APIを実行する。バックオフは asyncio.sleep で待つためイベントループを止めない。
+        """
+        cache_key = self._cache_key(prompt, response_format, model_name, response_schema)
+        cached = await self._cached_response_async(cache_key)
+        if cached is not None:
+            self._ledger.record(model_name or self.model_name, cached[1])
+            return cached
+        
+        # 推定トークン数で日次上限を超える呼び出しは、APIに送る前に拒否する
+        if self._exceeds_daily_budget(prompt):
+            return None, {"budget_exceeded": True}
+        
+        genai_model_name = self._prepare_call(model_name)
+        if genai_model_name is None:
+            return None, {}
+        
+        for attempt in range(self.max_retries):
+            context_entry = None
+            permit = None
+            try:
+                gen_model, contents, context_entry = await self._context_model_async(
+                    genai_model_name, prompt, cache_prefix, create_context
+                )
+                permit = await self._admit_async(prompt)
+                start_time = time.time()
+                generation_config = self._generation_config(response_format, response_schema)
+                
+                if hasattr(gen_model, "generate_content_async"):
+                    call = gen_model.generate_content_async(contents, generation_config=generation_config)
+                else:
+                    loop = asyncio.get_running_loop()
+                    call = loop.run_in_executor(
+                        self._get_executor(),
+                        partial(gen_model.generate_content, contents, generation_config=generation_config),
+                    )
+                resp = await asyncio.wait_for(call, timeout=self.timeout)
+                elapsed_time = time.time() - start_time
+                self._finish_attempt(permit, resp=resp)
+                
+                response_text = self._response_text(resp, attempt)
+                if not response_text:
+                    if attempt < self.max_retries - 1:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    return None, {}
+                
+                usage = self._record_usage(resp)
+                self._calibrate_estimator(prompt, usage)
+                await asyncio.to_thread(self._response_cache.set, cache_key, response_text, usage)
+                self._latency.record(genai_model_name, elapsed_time)
+                self._ledger.record(genai_model_name, usage, elapsed_time)
+                logger.info(f"Gen AI SDK非同期呼び出し成功: model={genai_model_name}, elapsed={elapsed_time:.2f}s")
+                return response_text, usage
+            
+            except asyncio.CancelledError:
+                # ロールの締め切り超過などで呼び出し元から取り消された
+                self._finish_attempt(permit, outcome="cancelled")
+                raise
+            except AdmissionTimeout as e:
+                logger.warning(f"{e}。LLM呼び出しをスキップします（モックフォールバック）")
+                return None, {}
+            except CircuitOpenError:
+                return None, {"circuit_open": True}
+            except Exception as e:
+                self._finish_attempt(permit, error=e)
+                self._log_call_error(e, genai_model_name, attempt)
+                self._discard_context_on_error(e, context_entry)
+                if attempt < self.max_retries - 1:
+                    delay = self._retry_delay(attempt)
+                    logger.info(f"Retrying after {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error(f"Gen AI SDK呼び出しが{self.max_retries}回失敗しました。")
+                return None, {}
+        
+        return None, {}
+    
+    async def _call_llm_stream_async(
+        self,
+        prompt: str,
+        response_format: str = "text",
+        model_name: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        cache_prefix: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> tuple:
+        """
+        LLM APIをストリーミングで呼び出し、受信したテキストを順に on_text に渡す。戻り値は _call_llm と同じ。
+        
+        キャッシュヒット時・SDKに generate_content_async が無い場合は全文を1回で渡す。
+        テキストを1度でも渡した後の失敗はリトライしない（通知済みの途中経過と食い違うため）。
+        """
+        on_text = on_text or (lambda chunk: None)
+        cache_key = self._cache_key(prompt, response_format, model_name, response_schema)
+        cached = await self._cached_response_async(cache_key)
+        if cached is not None:
+            self._ledger.record(model_name or self.model_name, cached[1])
+            on_text(cached[0])
+            return cached
+        
+        if self._exceeds_daily_budget(prompt):
+            return None, {"budget_exceeded": True}
+        
+        genai_model_name = self._prepare_call(model_name)
+        if genai_model_name is None:
+            return None, {}
+        
+        if not self.backend.supports_async_stream():
+            response_text, usage = await self._call_llm_async(
+                prompt, response_format, model_name, cache_prefix, response_schema=response_schema
+            )
+            if response_text:
+                on_text(response_text)
+            return response_text, usage
+        
+        for attempt in range(self.max_retries):
+            received: List[str] = []
+            context_entry = None
+            permit = None
+            
+            async def consume(gen_model: Any, contents: Any) -> Any:
+                resp = await gen_model.generate_content_async(
+                    contents,
+                    generation_config=self._generation_config(response_format, response_schema),
+                    stream=True,
+                )
+                async for chunk in resp:
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # テキストを含まないチャンク（安全性フィルタ等）は読み飛ばす
+                        continue
+                    if text:
+                        received.append(text)
+                        on_text(text)
+                return resp
+            
+            try:
+                gen_model, contents, context_entry = await self._context_model_async(
+                    genai_model_name, prompt, cache_prefix
+                )
+                # アドミッション制御の待ち時間は呼び出しのタイムアウトに含めない（_call_llm_async と同じ）
+                permit = await self._admit_async(prompt)
+                start_time = time.time()
+                resp = await asyncio.wait_for(consume(gen_model, contents), timeout=self.timeout)
+                elapsed_time = time.time() - start_time
+                self._finish_attempt(permit, resp=resp)
+                
+                response_text = "".join(received)
+                if not response_text:
+                    logger.warning(f"Gen AI SDKからの空ストリーム（試行 {attempt + 1}/{self.max_retries}）")
+                    if attempt < self.max_retries - 1:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    return None, {}
+                
+                usage = self._record_usage(resp)
+                self._calibrate_estimator(prompt, usage)
+                await asyncio.to_thread(self._response_cache.set, cache_key, response_text, usage)
+                self._latency.record(genai_model_name, elapsed_time)
+                self._ledger.record(genai_model_name, usage, elapsed_time)
+                logger.info(f"Gen AI SDKストリーミング呼び出し成功: model={genai_model_name}, elapsed={elapsed_time:.2f}s")
+                return response_text, usage
+            
+            except asyncio.CancelledError:
+                self._finish_attempt(permit, outcome="cancelled")
+                raise
+            except AdmissionTimeout as e:
+                logger.warning(f"{e}。LLM呼び出しをスキップします（モックフォールバック）")
+                return None, {}
+            except CircuitOpenError:
+                return None, {"circuit_open": True}
+            except Exception as e:
+                self._finish_attempt(permit, error=e)
+                self._log_call_error(e, genai_model_name, attempt)
+                self._discard_context_on_error(e, context_entry)
+                if not received and attempt < self.max_retries - 1:
+                    delay = self._retry_delay(attempt)
+                    logger.info(f"Retrying after {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error("Gen AI SDKストリーミング呼び出しに失敗しました。")
+                return None, {}
+        
+        return None, {}
+    
+    def _generate_parsed(
+        self,
+        prompt: str,
+        parse: Callable[[str], Any],
+        cache_prefix: Optional[str] = None,
+        create_context: bool = True,
+        response_schema: Optional[Dict[str, Any]] = None,
+        result_model: Any = None,
+    ) -> Tuple[Optional[str], Dict[str, Any], str]:
+        """
+        モデルチェーンの順にJSON応答を生成し、最初にパースできた応答を返す
+        
+        パースできない応答は、次のモデルに進む前に同じモデルへ出力の修正を依頼する（_repair_prompt）。
+        
+        Args:
+            parse: 応答のパーサー（パースできない場合はNoneを返す）
+            response_schema: JSON応答のスキーマ（生成設定に渡し、修正依頼にも含める）
+            result_model: 応答のPydanticモデル（修正依頼に含める問題点の説明に使う）
+            
+        Returns:
+            (応答テキスト, トークン使用量の合計, 応答したモデル)。どのモデルでもパースできなかった場合は
+            最後の応答（無ければNone）とそのモデル。サーキットブレーカーが開いた場合は usage に circuit_open、
+            日次トークン上限を超えるため呼び出しを拒否した場合は budget_exceeded
+        """
+        usages: List[Dict[str, Any]] = []
+        chain = self._active_chain(prompt)
+        last_text, last_model = None, chain[0]
+        for index, model in enumerate(chain):
+            if index > 0:
+                self._count_route("fallbacks")
+                logger.info(f"次のモデルにフォールバックします: model={model}")
+            text, usage = self._call_llm(prompt, "json", model, cache_prefix, create_context, response_schema)
+            usages.append(usage)
+            if self._aborted(usage):
+                return None, self._merge_usage(usages), model
+            if text and self._check_parse(model, text, usage, parse):
+                return text, self._merge_usage(usages), model
+            if not text:
+                continue
+            last_text, last_model = text, model
+            self._invalidate_cached_response(prompt, "json", model, response_schema)
+            repair_prompt = self._repair_prompt(model, text, response_schema, result_model)
+            if repair_prompt is None:
+                continue
+            repaired, repair_usage = self._call_llm(repair_prompt, "json", model, response_schema=response_schema)
+            usages.append(repair_usage)
+            if self._aborted(repair_usage):
+                return None, self._merge_usage(usages), model
+            if self._accept_repair(prompt, model, repair_prompt, repaired, repair_usage, parse, response_schema):
+                return repaired, self._merge_usage(usages), model
+        return last_text, self._merge_usage(usages), last_model
+    
+    async def _generate_parsed_async(
+        self,
+        prompt: str,
+        parse: Callable[[str], Any],
+        cache_prefix: Optional[str] = None,
+        create_context: bool = True,
+        response_schema: Optional[Dict[str, Any]] = None,
+        result_model: Any = None,
+    ) -> Tuple[Optional[str], Dict[str, Any], str]:
+        """
+        _generate_parsed の非同期版（引数・戻り値は同じ）
+        
+        hedge_enabled の場合は、応答がモデルのレイテンシのパーセンタイル（_hedge_delay）を超えた時点で
+        チェーンの次のモデル（単一モデルなら同じモデル）に2本目を送り、先にパースできた応答を使う。残りの呼び出しは取り消す。
+        """
+        chain = self._active_chain(prompt)
+        next_index = 0
+        running: Dict["asyncio.Task[tuple]", Tuple[str, bool]] = {}  # 呼び出し → (モデル, ヘッジ要求か)
+        usages: List[Dict[str, Any]] = []
+        last_text, last_model = None, chain[0]
+        
+        def start(hedge: bool = False) -> str:
+            nonlocal next_index
+            if next_index < len(chain):
+                model = chain[next_index]
+                next_index += 1
+            else:
+                model = chain[0]
+            task = asyncio.ensure_future(
+                self._call_llm_async(prompt, "json", model, cache_prefix, create_context, response_schema)
+            )
+            running[task] = (model, hedge)
+            return model
+        
+        start()
+        hedge_at = time.monotonic() + self._hedge_delay(chain[0]) if self.hedge_enabled else None
+        try:
+            while running:
+                timeout = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_at = None
+                    model = start(hedge=True)
+                    self._count_route("hedges")
+                    logger.info(f"LLMの応答が遅いためヘッジ要求を送ります: model={model}")
+                    continue
+                for task in done:
+                    model, hedge = running.pop(task)
+                    text, usage = task.result()
+                    usages.append(usage)
+                    if self._aborted(usage):
+                        return None, self._merge_usage(usages), model
+                    if text and self._check_parse(model, text, usage, parse):
+                        if hedge:
+                            self._count_route("hedge_wins")
+                        return text, self._merge_usage(usages), model
+                    if not text:
+                        continue
+                    last_text, last_model = text, model
+                    await self._invalidate_cached_response_async(prompt, "json", model, response_schema)
+                    repair_prompt = self._repair_prompt(model, text, response_schema, result_model)
+                    if repair_prompt is None:
+                        continue
+                    repaired, repair_usage = await self._call_llm_async(
+                        repair_prompt, "json", model, response_schema=response_schema
+                    )
+                    usages.append(repair_usage)
+                    if self._aborted(repair_usage):
+                        return None, self._merge_usage(usages), model
+                    if await self._accept_repair_async(
+                        prompt, model, repair_prompt, repaired, repair_usage, parse, response_schema
+                    ):
+                        return repaired, self._merge_usage(usages), model
+                if not running and next_index < len(chain):
+                    # 実行中の呼び出しがすべて失敗した。ヘッジは打ち切り、チェーンの次のモデルで再試行
+                    hedge_at = None
+                    self._count_route("fallbacks")
+                    logger.info(f"次のモデルにフォールバックします: model={start()}")
+            return last_text, self._merge_usage(usages), last_model
+        finally:
+            for task in running:
+                task.cancel()
+    
+    def get_budget_state(self) -> Dict[str, Any]:
+        """
+        日次トークン上限（LLM_DAILY_TOKEN_LIMIT）に対する縮退の段階
+        
+        level: normal / drop_roles（重みの低いロールを除外）/ cheap_model（さらに軽いモデルに切り替え）/
+        exhausted（LLMを呼ばずにモック）。上限0の場合は常に normal
+        
+        LLM呼び出しごと（_active_chain）に呼ばれるため、使用量台帳は読まずにトラッカーのメモリ上の累積だけで判定する
+        （本日の累積トークン数は GET /api/metrics/llm/usage の daily_tokens）
+        """
+        tracker = get_usage_tracker(config.LLM_DAILY_TOKEN_LIMIT)
+        if tracker.daily_limit <= 0:
+            return {"level": "normal", "remaining_ratio": None, "limit": None}
+        remaining = tracker.remaining_ratio()
+        if remaining <= 0:
+            level = "exhausted"
+        elif remaining < config.LLM_BUDGET_CHEAP_MODEL_RATIO:
+            level = "cheap_model"
+        elif remaining < config.LLM_BUDGET_DROP_ROLES_RATIO:
+            level = "drop_roles"
+        else:
+            level = "normal"
+        return {
+            "level": level,
+            "remaining_ratio": round(remaining, 4),
+            "limit": tracker.daily_limit,
+        }
+    
+    def _active_chain(self, prompt: Optional[str] = None) -> List[str]:
+        """
+        今回試すモデルの順
+        
+        予算の残りが少ない間・プロンプトの推定トークン数が LLM_PROMPT_TOKEN_BUDGET を超える場合は
+        LLM_BUDGET_CHEAP_MODEL（未設定ならチェーンの最後のモデル）だけを使う
+        """
+        cheap_level = self.get_budget_state()["level"] == "cheap_model"
+        oversized = (
+            prompt is not None
+            and config.LLM_PROMPT_TOKEN_BUDGET > 0
+            and get_token_estimator().estimate(prompt) > config.LLM_PROMPT_TOKEN_BUDGET
+        )
+        if not cheap_level and not oversized:
+            return self.model_chain
+        cheap = config.LLM_BUDGET_CHEAP_MODEL.strip().replace("models/", "") or self.model_chain[-1]
+        if cheap != self.model_chain[0]:
+            if cheap_level:
+                self._count_route("budget_downgrades")
+                logger.info(f"日次トークン予算の残りが少ないため軽いモデルを使います: model={cheap}")
+            else:
+                self._count_route("prompt_downgrades")
+                logger.info(f"プロンプトがトークン予算を超えるため軽いモデルを使います: model={cheap}")
+        return [cheap]
+    
+    @staticmethod
+    def _aborted(usage: Dict[str, Any]) -> bool:
+        """チェーンの次のモデルでも呼べない理由（サーキットブレーカー・日次上限のプリフライト）で呼び出しを打ち切ったか"""
+        return bool(usage.get("circuit_open") or usage.get("budget_exceeded"))
+    
+    def _hedge_delay(self, model: str) -> float:
+        """ヘッジ要求を送るまでの待ち時間（モデルのレイテンシのパーセンタイル。計測が少ない間は既定値）"""
+        observed = self._latency.percentile(model, config.LLM_HEDGE_PERCENTILE, min_samples=config.LLM_HEDGE_MIN_SAMPLES)
+        return max(config.LLM_HEDGE_MIN_DELAY, config.LLM_HEDGE_DEFAULT_DELAY if observed is None else observed)
+    
+    def _count_route(self, key: str) -> None:
+        with self._route_lock:
+            self._hedge_stats[key] += 1
+    
+    def _count_parse(self, model: str, key: str) -> None:
+        with self._route_lock:
+            stats = self._parse_stats.setdefault(
+                model, {"responses": 0, "parse_failures": 0, "role_failures": 0, "repairs": 0, "repair_successes": 0}
+            )
+            stats[key] += 1
+    
+    def _check_parse(self, model: str, text: str, usage: Dict[str, Any], parse: Callable[[str], Any]) -> bool:
+        """応答をパースし、モデル別のパース失敗率に数える（キャッシュヒットは数えない）"""
+        parsed = bool(parse(text))
+        if not usage.get("cache_hit"):
+            self._count_parse(model, "responses")
+            if not parsed:
+                self._count_parse(model, "parse_failures")
+        return parsed
+    
+    def _repair_prompt(
+        self,
+        model: str,
+        text: str,
+        response_schema: Optional[Dict[str, Any]],
+        result_model: Any,
+    ) -> Optional[str]:
+        """パースできない応答の修正依頼プロンプト（修正依頼が無効・スキーマ未指定の場合はNone）"""
+        if not config.LLM_REPAIR_ENABLED or response_schema is None or result_model is None:
+            return None
+        error = EvaluationParser.describe_error(text, result_model) or "JSONスキーマに合っていません"
+        self._count_parse(model, "repairs")
+        logger.info(f"パースできない応答の修正を依頼します: model={model}, error={error[:200]}")
+        return RepairPromptBuilder.build(text, error, response_schema)
+    
+    def _accept_repair(
+        self,
+        prompt: str,
+        model: str,
+        repair_prompt: str,
+        text: Optional[str],
+        usage: Dict[str, Any],
+        parse: Callable[[str], Any],
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """修正後の応答がパースできれば、元のプロンプトの応答としてキャッシュする（response_schema は元の呼び出しと修正依頼で共通）"""
+        if text and parse(text):
+            self._count_parse(model, "repair_successes")
+            self._response_cache.set(self._cache_key(prompt, "json", model, response_schema), text, usage)
+            return True
+        if text:
+            self._invalidate_cached_response(repair_prompt, "json", model, response_schema)
+        return False
+    
+    async def _accept_repair_async(
+        self,
+        prompt: str,
+        model: str,
+        repair_prompt: str,
+        text: Optional[str],
+        usage: Dict[str, Any],
+        parse: Callable[[str], Any],
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """_accept_repair の非同期版（キャッシュの書き込み・削除はイベントループの外で行う）"""
+        return await asyncio.to_thread(
+            self._accept_repair, prompt, model, repair_prompt, text, usage, parse, response_schema
+        )
+    
+    async def _stream_with_fallback_async(
+        self,
+        prompt: str,
+        on_text: Callable[[str], None],
+        cache_prefix: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Optional[str], Dict[str, Any], str]:
+        """
+        モデルチェーンの順にJSON応答をストリーミングで生成する（戻り値は _generate_parsed と同じ）
+        
+        最初のチャンクを受け取る前に失敗した場合だけ次のモデルにフォールバックする。
+        途中まで on_text に渡した後の失敗は、通知済みの途中経過と食い違うためフォールバックしない。
+        """
+        chain = self._active_chain(prompt)
+        usages: List[Dict[str, Any]] = []
+        received = False
+        
+        def forward(chunk: str) -> None:
+            nonlocal received
+            received = True
+            on_text(chunk)
+        
+        for index, model in enumerate(chain):
+            if index > 0:
+                self._count_route("fallbacks")
+                logger.info(f"ストリーミングを次のモデルにフォールバックします: model={model}")
+            text, usage = await self._call_llm_stream_async(
+                prompt=prompt,
+                response_format="json",
+                model_name=model,
+                on_text=forward,
+                cache_prefix=cache_prefix,
+                response_schema=response_schema,
+            )
+            usages.append(usage)
+            if text or received or self._aborted(usage):
+                return text, self._merge_usage(usages), model
+        return None, self._merge_usage(usages), chain[-1]
+    
+    async def _check_stream_response_async(
+        self,
+        prompt: str,
+        model: str,
+        text: Optional[str],
+        usage: Dict[str, Any],
+        parse: Callable[[str], Any],
+        response_schema: Dict[str, Any],
+        result_model: Any,
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """ストリーミングの応答をパース失敗率に数え、パースできなければ修正を依頼する（戻り値は修正後の応答と合計の使用量）"""
+        if not text or self._check_parse(model, text, usage, parse):
+            return text, usage
+        await self._invalidate_cached_response_async(prompt, "json", model, response_schema)
+        repair_prompt = self._repair_prompt(model, text, response_schema, result_model)
+        if repair_prompt is None:
+            return text, usage
+        repaired, repair_usage = await self._call_llm_async(repair_prompt, "json", model, response_schema=response_schema)
+        merged = self._merge_usage([usage, repair_usage])
+        if await self._accept_repair_async(prompt, model, repair_prompt, repaired, repair_usage, parse, response_schema):
+            return repaired, merged
+        return text, merged
+    
+    def _failed_role_items(
+        self,
+        response_text: Optional[str],
+        role_ids: List[str],
+        results: Dict[str, Dict[str, Any]],
+        model: str,
+    ) -> Dict[str, Any]:
+        """
+        一括評価のうち、応答には含まれているがバリデーションに失敗したロールの要素（role_id → 要素）
+        
+        全体がパースできずモックにフォールバックした場合・修正依頼が無効の場合は空。応答に含まれなかったロールは修正依頼しない。
+        """
+        if not config.LLM_REPAIR_ENABLED or not response_text:
+            return {}
+        if not any(analysis.get("_llm_status") == "success" for analysis in results.values()):
+            return {}
+        items = EvaluationParser.find_role_items(response_text)
+        failed = {role_id: items[role_id] for role_id in role_ids if role_id not in results and role_id in items}
+        for role_id in failed:
+            self._count_parse(model, "role_failures")
+            self._count_parse(model, "repairs")
+            logger.info(f"バリデーションに失敗したロールだけ修正を依頼します: role_id={role_id}, model={model}")
+        return failed
+    
+    @staticmethod
+    def _role_repair_prompt(item: Any, multi_perspective_schema: Dict[str, Any]) -> str:
+        """1ロール分の要素の修正依頼プロンプト"""
+        text = json.dumps(item, ensure_ascii=False)
+        error = EvaluationParser.describe_error(text, RoleEvaluation) or "JSONスキーマに合っていません"
+        return RepairPromptBuilder.build(text, error, RepairPromptBuilder.role_response_schema(multi_perspective_schema))
+    
+    def _accept_role_repair(
+        self,
+        results: Dict[str, Dict[str, Any]],
+        role_id: str,
+        text: Optional[str],
+        model: str,
+    ) -> bool:
+        """修正後のロール評価がパースできれば results に追加する"""
+        parsed_item = EvaluationParser.parse_role_evaluation_response(text, [role_id]) if text else None
+        if parsed_item is None:
+            return False
+        analysis = parsed_item[1]
+        analysis["created_at"] = datetime.now().isoformat()
+        analysis["_is_mock"] = False
+        analysis["_llm_status"] = "success"
+        analysis["_llm_model"] = model
+        analysis["_repaired"] = True
+        results[role_id] = analysis
+        self._count_parse(model, "repair_successes")
+        return True
+    
+    async def _repair_roles_async(
+        self,
+        response_text: Optional[str],
+        role_ids: List[str],
+        results: Dict[str, Dict[str, Any]],
+        usage: Dict[str, Any],
+        model: str,
+        multi_perspective_schema: Dict[str, Any],
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        バリデーションに失敗したロールだけを並行して修正依頼し、成功したロールを results に追加する
+        
+        Returns:
+            (修正できたロールIDのリスト, 修正依頼を含むトークン使用量の合計)
+        """
+        failed = self._failed_role_items(response_text, role_ids, results, model)
+        if not failed:
+            return [], usage
+        role_schema = RepairPromptBuilder.role_response_schema(multi_perspective_schema)
+        
+        async def repair(role_id: str, item: Any) -> tuple:
+            with llm_usage_tags(role_id=role_id):
+                return await self._call_llm_async(
+                    self._role_repair_prompt(item, multi_perspective_schema), "json", model, response_schema=role_schema
+                )
+        
+        responses = await asyncio.gather(*(repair(role_id, item) for role_id, item in failed.items()))
+        repaired = [
+            role_id for role_id, (text, _) in zip(failed, responses)
+            if self._accept_role_repair(results, role_id, text, model)
+        ]
+        return repaired, self._merge_usage([usage] + [repair_usage for _, repair_usage in responses])
+    
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """モデルチェーン・ヘッジ要求の設定と回数、モデル別のレイテンシ・パース失敗率（監視用）"""
+        with self._route_lock:
+            stats = dict(self._hedge_stats)
+            parse_stats = {model: dict(counts) for model, counts in self._parse_stats.items()}
+        for counts in parse_stats.values():
+            counts["failure_rate"] = round(counts["parse_failures"] / counts["responses"], 4) if counts["responses"] else 0.0
+        return {
+            "model_chain": list(self.model_chain),
+            "hedge_enabled": self.hedge_enabled,
+            **stats,
+            "hedge_delay_ms": {model: round(self._hedge_delay(model) * 1000, 1) for model in self.model_chain},
+            "latency": self._latency.get_stats(),
+            "response_schema_enabled": config.LLM_RESPONSE_SCHEMA_ENABLED,
+            "repair_enabled": config.LLM_REPAIR_ENABLED,
+            "parse": parse_stats,
+            "prompt_token_budget": config.LLM_PROMPT_TOKEN_BUDGET or None,
+            "token_estimator": get_token_estimator().get_stats(),
+        }
+    
+    @staticmethod
+    def _merge_usage(usages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """フォールバック・ヘッジで複数回呼び出した場合のトークン使用量の合計（1回だけならそのまま）"""
+        usages = [usage for usage in usages if usage]
+        if len(usages) <= 1:
+            return usages[0] if usages else {}
+        merged: Dict[str, Any] = {}
+        for usage in usages:
+            for key, value in usage.items():
+                if isinstance(value, bool):
+                    merged[key] = merged.get(key, False) or value
+                elif isinstance(value, (int, float)):
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+    
+    def _context_model(
+        self,
+        genai_model_name: str,
+        prompt: str,
+        cache_prefix: Optional[str],
+        create: bool = True,
+    ) -> Tuple[Any, str, Optional[ContextCacheEntry]]:
+        """
+        呼び出しに使うモデルと送信するテキストを決める
+        
+        Returns:
+            (モデル, 送信テキスト, 使用したコンテキストキャッシュ)。先頭部分のキャッシュが使える場合は
+            キャッシュを参照するモデルと残りの部分、使えない場合は通常のモデルとプロンプト全体
+        """
+        if cache_prefix and self.backend.supports_context_cache and prompt.startswith(cache_prefix):
+            entry = self._context_cache.acquire(genai_model_name, cache_prefix, create=create)
+            if entry is not None:
+                return self._context_cache.model_for(entry), prompt[len(cache_prefix):], entry
+        return self.backend.model(genai_model_name), prompt, None
+    
+    async def _context_model_async(
+        self,
+        genai_model_name: str,
+        prompt: str,
+        cache_prefix: Optional[str],
+        create: bool = True,
+    ) -> Tuple[Any, str, Optional[ContextCacheEntry]]:
+        """_context_model の非同期版（キャッシュ作成はAPI呼び出しを伴うためスレッドプールで実行）"""
+        if not cache_prefix or not self._context_cache.enabled or not self.backend.supports_context_cache:
+            return self.backend.model(genai_model_name), prompt, None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            partial(self._context_model, genai_model_name, prompt, cache_prefix, create),
+        )
+    
+    def _discard_context_on_error(self, e: Exception, entry: Optional[ContextCacheEntry]) -> None:
+        """キャッシュが見つからない旨のエラーなら、プロバイダ側で失効したとみなして破棄（次の試行で作り直す）"""
+        if entry is None:
+            return
+        message = str(e).lower()
+        if type(e).__name__ == "NotFound" or "cachedcontent" in message or "cached content" in message:
+            logger.info("LLMコンテキストキャッシュが失効していたため破棄します")
+            self._context_cache.invalidate(entry)
+    
+    def _admission_tokens(self, prompt: str) -> int:
+        """アドミッション制御でTPMから予約するトークン数（プロンプトの推定値 + 想定出力）"""
+        return get_token_estimator().estimate(prompt) + config.LLM_ADMISSION_OUTPUT_TOKENS
+    
+    def _exceeds_daily_budget(self, prompt: str) -> bool:
+        """プリフライト: 推定入力 + 想定出力を加えると日次トークン上限（LLM_DAILY_TOKEN_LIMIT）を超えるか"""
+        tokens = self._admission_tokens(prompt)
+        if not get_usage_tracker(config.LLM_DAILY_TOKEN_LIMIT).would_exceed(tokens):
+            return False
+        self._count_route("preflight_rejections")
+        logger.warning(f"推定{tokens}トークンで日次トークン上限を超えるため、LLM呼び出しを送らずに拒否します（モックフォールバック）")
+        return True
+    
+    def _calibrate_estimator(self, prompt: str, usage: Dict[str, Any]) -> None:
+        """実際の入力トークン数でローカルのトークン推定を補正（fake バックエンドの使用量は推定値そのものなので使わない）"""
+        if self.backend.name != "fake" and usage.get("input_tokens"):
+            get_token_estimator().observe(prompt, usage["input_tokens"])
+    
+    def _admit(self, prompt: str) -> AdmissionPermit:
+        """
+        1回の試行の許可を得る（アドミッション制御で待ち、サーキットブレーカーで可否を判定）
+        
+        Raises:
+            AdmissionTimeout: 待ち時間の上限を超えた
+            CircuitOpenError: サーキットブレーカーが開いている（リトライ中に開いた場合も含む）
+        """
+        return self._check_circuit(self._admission.acquire(self._admission_tokens(prompt)))
+    
+    async def _admit_async(self, prompt: str) -> AdmissionPermit:
+        """_admit の非同期版"""
+        return self._check_circuit(await self._admission.acquire_async(self._admission_tokens(prompt)))
+    
+    def _check_circuit(self, permit: AdmissionPermit) -> AdmissionPermit:
+        breaker_permit = self.circuit_breaker.allow_request()
+        if breaker_permit is None:
+            self._admission.release(permit, outcome="cancelled")
+            logger.warning("LLMサーキットブレーカーが開いているため、LLM呼び出しをスキップします")
+            raise CircuitOpenError()
+        permit.breaker_permit = breaker_permit
+        return permit
+    
+    def _finish_attempt(
+        self,
+        permit: Optional[AdmissionPermit],
+        resp: Any = None,
+        error: Optional[Exception] = None,
+        outcome: Optional[str] = None,
+    ) -> None:
+        """
+        試行の結果をアドミッション制御・サーキットブレーカーに返す（バックオフで待つ間は枠を空けるため、リトライ前に呼ぶ）
+        
+        429・クォータ超過・タイムアウトの場合は同時実行ウィンドウを狭め、成功時は実績トークン数でTPMを精算する。
+        サーキットブレーカーには応答の有無と所要時間（許可からの経過時間）を、許可時の BreakerPermit とともに記録する。
+        """
+        if permit is None:
+            return
+        latency = time.monotonic() - permit.admitted_at
+        actual_tokens = None
+        if error is not None:
+            outcome = self._admission_outcome(error)
+        elif outcome is None:
+            outcome = "success"
+            um = getattr(resp, "usage_metadata", None)
+            if um is not None:
+                actual_tokens = (getattr(um, "prompt_token_count", 0) or 0) + (getattr(um, "candidates_token_count", 0) or 0)
+        self._admission.release(permit, outcome=outcome, actual_tokens=actual_tokens or None)
+        if outcome == "success":
+            self.circuit_breaker.record_success(latency, permit.breaker_permit)
+        elif outcome == "cancelled":
+            self.circuit_breaker.abandon(permit.breaker_permit)
+        else:
+            self.circuit_breaker.record_failure(latency, permit.breaker_permit)
+    
+    @staticmethod
+    def _admission_outcome(e: Exception) -> str:
+        """呼び出しエラーの分類（"throttled": 429・クォータ超過 / "timeout" / "error": その他）"""
+        error_type = type(e).__name__
+        if isinstance(e, TimeoutError) or error_type == "DeadlineExceeded":
+            return "timeout"
+        message = str(e).lower()
+        if error_type in ("ResourceExhausted", "TooManyRequests") or "429" in message or "quota" in message or "rate limit" in message:
+            return "throttled"
+        return "error"
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        response_format: str,
+        model_name: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        レスポンスキャッシュのキー（レンダリング済みプロンプト・モデル・生成パラメータのハッシュ）
+
+        生成設定にスキーマを渡す場合（_generation_config と同じ条件）はスキーマもキーに含め、
+        LLM_RESPONSE_SCHEMA_ENABLED の切り替え前後・スキーマの変更前後の応答を取り違えないようにする。
+        """
+        model = (model_name or self.model_name).replace("models/", "")
+        if response_format != "json" or not config.LLM_RESPONSE_SCHEMA_ENABLED:
+            response_schema = None
+        return LLMResponseCache.make_key(
+            prompt, model, self.temperature, self.top_p, response_format, response_schema
+        )
+    
+    def _cached_response(self, cache_key: str) -> Optional[tuple]:
+        """
+        キャッシュ済みレスポンスを取得
+        
+        Returns:
+            (response_text, usage_dict)。usage には節約できたトークン数を入れ、
+            日次トラッカーには加算しない。ミス時はNone
+        """
+        cached = self._response_cache.get(cache_key)
+        if cached is None:
+            return None
+        response_text, original_usage = cached
+        usage = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_hit": True,
+            "saved_input_tokens": original_usage.get("input_tokens", 0),
+            "saved_output_tokens": original_usage.get("output_tokens", 0),
+        }
+        logger.info(f"LLMレスポンスキャッシュヒット: key={cache_key[:12]}")
+        return response_text, usage
+    
+    async def _cached_response_async(self, cache_key: str) -> Optional[tuple]:
+        """_cached_response の非同期版（SQLite層の読み込みでイベントループを止めないようスレッドで実行）"""
+        return await asyncio.to_thread(self._cached_response, cache_key)
+    
+    def _invalidate_cached_response(
+        self,
+        prompt: str,
+        response_format: str,
+        model_name: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """パースできなかったレスポンスをキャッシュから削除（次回は再度LLMを呼ぶ）"""
+        self._response_cache.delete(self._cache_key(prompt, response_format, model_name, response_schema))
+    
+    async def _invalidate_cached_response_async(
+        self,
+        prompt: str,
+        response_format: str,
+        model_name: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """_invalidate_cached_response の非同期版"""
+        await asyncio.to_thread(self._invalidate_cached_response, prompt, response_format, model_name, response_schema)
+    
+    def _prepare_call(self, model_name: Optional[str]) -> Optional[str]:
+        """
+        呼び出し前チェック（日次トークン上限・SDK利用可否）とモデル名の正規化
+        
+        Returns:
+            Gen AI SDK用のモデル名。呼び出しをスキップする場合はNone
+        """
+        model = model_name or self.model_name
+
+        # 日次トークン上限チェック（超えていればLLM呼び出しをスキップ）
+        try:
+            from utils.llm_usage_tracker import get_usage_tracker
+            tracker = get_usage_tracker(getattr(config, "LLM_DAILY_TOKEN_LIMIT", 0))
+            if tracker.is_over_limit():
+                logger.warning("LLM daily token limit exceeded, skipping LLM call (mock fallback)")
+                return None
+        except Exception as e:
+            logger.debug(f"Usage tracker check skipped: {e}")
+        
+        if not self._genai_available:
+            logger.warning(
+                f"LLMバックエンド {self.backend.name} が利用できません"
+                "（genai: GOOGLE_API_KEY未設定またはgoogle-generativeai未インストール / "
+                "vertex: GOOGLE_CLOUD_PROJECT_ID未設定またはgoogle-cloud-aiplatform未インストール）"
+            )
+            return None
+        
+        # モデル名をGen AI SDK用に調整（models/プレフィックスを削除）
+        # Gen AI SDKでは models/ プレフィックスは不要（エラーの原因）
+        genai_model_name = model
+        if genai_model_name.startswith("models/"):
+            # プレフィックスが含まれている場合は削除
+            genai_model_name = genai_model_name.replace("models/", "")
+            logger.info(f"モデル名を調整: {model} → {genai_model_name}")
+        return genai_model_name
+    
+    def _generation_config(self, response_format: str, response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """生成設定を構築（JSON形式でスキーマがあれば response_schema としてモデルに渡す）"""
+        generation_config = {
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "max_output_tokens": 8192,
+        }
+        
+        # JSON形式を強制する場合
+        if response_format == "json":
+            generation_config["response_mime_type"] = "application/json"
+            if response_schema is not None and config.LLM_RESPONSE_SCHEMA_ENABLED:
+                generation_config["response_schema"] = self.backend.response_schema(response_schema)
+        return generation_config
+    
+    def _response_text(self, resp: Any, attempt: int) -> Optional[str]:
+        """レスポンステキストを取得（空の場合は警告を出してNone）"""
+        if not resp:
+            logger.warning(f"Gen AI SDKからの空レスポンス（試行 {attempt + 1}/{self.max_retries}）")
+            return None
+        response_text = getattr(resp, "text", None)
+        if not response_text:
+            logger.warning(f"Gen AI SDKからのレスポンスにtext属性がありません（試行 {attempt + 1}/{self.max_retries}）")
+            return None
+        return response_text
+    
+    @staticmethod
+    def _record_usage(resp: Any) -> Dict[str, Any]:
+        """トークン使用量（usage_metadata があれば取得）を日次トラッカーに加算して返す"""
+        usage = {}
+        um = getattr(resp, "usage_metadata", None)
+        if um is not None:
+            usage["input_tokens"] = getattr(um, "prompt_token_count", 0) or 0
+            usage["output_tokens"] = getattr(um, "candidates_token_count", 0) or getattr(um, "output_token_count", 0) or 0
+            # input_tokens のうちコンテキストキャッシュから読まれた（割引料金の）トークン数
+            cached_tokens = getattr(um, "cached_content_token_count", 0) or 0
+            if cached_tokens:
+                usage["cached_input_tokens"] = cached_tokens
+            try:
+                from utils.llm_usage_tracker import get_usage_tracker
+                get_usage_tracker(getattr(config, "LLM_DAILY_TOKEN_LIMIT", 0)).add(
+                    usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+                )
+            except Exception:
+                pass
+        return usage
+    
+    def _log_call_error(self, e: Exception, genai_model_name: str, attempt: int) -> None:
+        """LLM呼び出しエラーをログに記録"""
+        error_type = type(e).__name__
+        logger.error(
+            f"Gen AI SDK呼び出しエラー（試行 {attempt + 1}/{self.max_retries}）: {e}",
+            extra={
+                "error_type": error_type,
+                "model": genai_model_name,
+                "attempt": attempt + 1,
+                "max_retries": self.max_retries,
+                "project_id": self.project_id
+            },
+            exc_info=True
+        )
+    
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """指数バックオフの待ち時間（秒）"""
+        return config.RETRY_INITIAL_DELAY * (config.RETRY_BACKOFF_BASE ** attempt)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """同期SDK呼び出し用の上限付きスレッドプール"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.executor_workers,
+                thread_name_prefix="llm-call",
+            )
+        return self._executor
+    
     def _mock_analyze(
         self,
         meeting_data: Dict[str, Any],
@@ -3,11 +3,26 @@
 複数ロール（executive / staff / corp_planning / governance など）で同一データを評価
 """
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
 
+from config import config
 from utils.logger import logger
 from services.llm_service import LLMService
+from services.input_compaction import collect_compaction_stats
+
+
+# 開始待ちのロール評価がある間、開始を確認する間隔（秒。ロールのタイムアウトは開始時点から数えるため）
+_START_POLL_SECONDS = 0.05
+
+
+class _RoleTimeout(Exception):
+    """ロール評価が開始から role_timeout 以内に完了しなかった（非同期版）"""
 
 
 @dataclass
@@ -17,15 +32,47 @@ class RoleConfig:
     weight: float
 
 
+@dataclass
+class MultiRoleOutcome:
+    """マルチロール分析の実行結果（完了ロールと、締め切り超過・失敗で除外したロール）"""
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    dropped_roles: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_ms: int = 0
+    mode: str = "sequential"
+    # 実際に発行したLLM呼び出し数と、その合計トークン使用量（input_tokens / output_tokens / cache_hits）
+    llm_calls: int = 0
+    usage: Dict[str, int] = field(default_factory=dict)
+    # LLMサーキットブレーカーが開いていたためLLMを呼ばなかった
+    circuit_open: bool = False
+    # プロンプトの描画に使った入力の圧縮結果（CompactedInputs.stats。プロンプトを作らなかった場合は空）
+    input_compaction: Dict[str, Any] = field(default_factory=dict)
+
+
 class MultiRoleLLMAnalyzer:
     """
     複数ロールをまとめてLLM評価するアナライザー
-    
+
     - 同じ meeting_data / chat_data / materials_data を各ロール視点で評価
     - 各ロールは AnalysisResult スキーマに準拠したJSONを返す想定
+    - concurrent=True の場合は全ロールを同時に評価し、ロール単位のタイムアウトと
+      分析全体の締め切りを超えたロールは除外して残りの結果だけを返す
+    - call_mode="single_call" の場合は1回のLLM呼び出しで全ロールを評価する
+      （議事録等の入力トークンを1回分に抑える。締め切りは分析全体の deadline）
     """
 
-    def __init__(self, llm_service: LLMService, roles: Optional[List[RoleConfig]] = None) -> None:
+    CALL_MODES = ("per_role", "single_call")
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        roles: Optional[List[RoleConfig]] = None,
+        concurrent: Optional[bool] = None,
+        role_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        call_mode: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
         self.llm_service = llm_service
         # デフォルトのロール構成（重みはアンサンブル時に利用）
         self.roles: List[RoleConfig] = roles or [
@@ -34,6 +81,23 @@ class MultiRoleLLMAnalyzer:
             RoleConfig(role_id="staff", weight=0.2),
             RoleConfig(role_id="governance", weight=0.1),
         ]
+        self.concurrent = config.MULTI_VIEW_CONCURRENT if concurrent is None else concurrent
+        self.role_timeout = config.MULTI_VIEW_ROLE_TIMEOUT if role_timeout is None else role_timeout
+        self.deadline = config.MULTI_VIEW_DEADLINE if deadline is None else deadline
+        self.call_mode = call_mode or config.MULTI_VIEW_MODE
+        if self.call_mode not in self.CALL_MODES:
+            logger.warning(f"Unknown MULTI_VIEW_MODE={self.call_mode!r}; falling back to per_role")
+            self.call_mode = "per_role"
+        self.max_in_flight = max_in_flight or config.MULTI_VIEW_MAX_IN_FLIGHT
+        # リクエスト間で共有する上限付きプール（タイムアウトしたロールのスレッドが溢れないように）
+        self._max_workers = max_workers or config.MULTI_VIEW_MAX_WORKERS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="multi-view",
+        )
+        # 締め切り超過後も実行中のロール評価（完了するまでプールのワーカーを占有する）
+        self._orphans: set = set()
+        self._orphan_lock = threading.Lock()
 
     def analyze_with_roles(
         self,
@@ -43,7 +107,7 @@ class MultiRoleLLMAnalyzer:
     ) -> List[Dict[str, Any]]:
         """
         各ロール視点でLLM分析を実行
-        
+
         Returns:
             [
               {
@@ -54,49 +118,565 @@ class MultiRoleLLMAnalyzer:
               ...
             ]
         """
-        results: List[Dict[str, Any]] = []
+        return self.run_roles(meeting_data, chat_data, materials_data).results
+
+    def run_roles(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        role_ids: Optional[List[str]] = None,
+    ) -> MultiRoleOutcome:
+        """
+        各ロール視点でLLM分析を実行し、除外ロールを含む実行結果を返す
+
+        Args:
+            role_ids: 評価するロールの絞り込み（Noneの場合は全ロール。LLMGate のゲーティング結果を渡す）
+
+        Returns:
+            MultiRoleOutcome（results は analyze_with_roles と同じ形式）
+        """
+        start_time = time.monotonic()
+        mode = self._execution_mode()
+        roles, budget_dropped = self._apply_budget(self._select_roles(role_ids))
+        if not roles:
+            return MultiRoleOutcome(mode=mode)
 
         # LLMが無効な場合は空リストを返して、呼び出し元でルールベースのみで処理させる
         if not getattr(self.llm_service, "_vertex_ai_available", False):
             logger.info("LLM is not available; skipping multi-role analysis")
-            return results
+            return MultiRoleOutcome(mode=mode)
+        if self._circuit_open():
+            return MultiRoleOutcome(mode=mode, circuit_open=True)
 
-        for role in self.roles:
-            try:
-                logger.info(f"Running multi-view LLM analysis for role={role.role_id}")
-                analysis = self.llm_service.analyze_structure(
-                    meeting_data=meeting_data,
-                    chat_data=chat_data,
-                    materials_data=materials_data,
-                    role_id=role.role_id,
+        with collect_compaction_stats() as compaction:
+            if self.call_mode == "single_call":
+                results, dropped, usage = self._run_single_call(roles, meeting_data, chat_data, materials_data)
+                return self._build_outcome(
+                    results, budget_dropped + dropped, start_time, mode, llm_calls=1, usage=usage, compaction=compaction
                 )
 
-                # 期待スキーマを満たさないケースでも、最低限のガードだけして格納
-                overall_score = analysis.get("overall_score", 0)
-                severity = analysis.get("severity", "MEDIUM")
-                urgency = analysis.get("urgency", "MEDIUM")
-
-                results.append(
-                    {
-                        "role_id": role.role_id,
-                        "weight": role.weight,
-                        "overall_score": overall_score,
-                        "severity": severity,
-                        "urgency": urgency,
-                        "explanation": analysis.get("explanation", ""),
-                        "analysis": analysis,
-                    }
+            if self.concurrent:
+                results, dropped = self._run_concurrent(roles, meeting_data, chat_data, materials_data)
+            else:
+                results, dropped = self._run_sequential(roles, meeting_data, chat_data, materials_data)
+        return self._build_outcome(
+            results, budget_dropped + dropped, start_time, mode,
+            llm_calls=len(roles), usage=self._sum_role_usage(results), compaction=compaction,
+        )
+
+    async def analyze_with_roles_async(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """各ロール視点でLLM分析を実行（非同期版。戻り値は analyze_with_roles と同じ）"""
+        outcome = await self.run_roles_async(meeting_data, chat_data, materials_data)
+        return outcome.results
+
+    async def run_roles_async(
+        self,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        role_ids: Optional[List[str]] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> MultiRoleOutcome:
+        """
+        各ロール視点でLLM分析を実行（非同期版）
+
+        LLMService.analyze_structure_async を使うためイベントループをブロックしない。
+        締め切りを超えたロールのLLM呼び出しは取り消される。role_ids は run_roles と同じ。
+
+        on_event を指定した場合はLLMのストリーミング生成を使い、途中経過を逐次通知する:
+        - {"type": "role_partial", "role_id", "weight", "fields"}: 生成途中で確定したスコア・説明文（per_role のみ）
+        - {"type": "role_result", "role_id", "weight", "overall_score", "severity", "urgency", "explanation"}: ロールの評価確定
+        """
+        start_time = time.monotonic()
+        mode = self._execution_mode()
+        roles, budget_dropped = self._apply_budget(self._select_roles(role_ids))
+        if not roles:
+            return MultiRoleOutcome(mode=mode)
+
+        if not getattr(self.llm_service, "_vertex_ai_available", False):
+            logger.info("LLM is not available; skipping multi-role analysis")
+            return MultiRoleOutcome(mode=mode)
+        if self._circuit_open():
+            return MultiRoleOutcome(mode=mode, circuit_open=True)
+
+        with collect_compaction_stats() as compaction:
+            if self.call_mode == "single_call":
+                results, dropped, usage = await self._run_single_call_async(
+                    roles, meeting_data, chat_data, materials_data, on_event
                 )
+                return self._build_outcome(
+                    results, budget_dropped + dropped, start_time, mode, llm_calls=1, usage=usage, compaction=compaction
+                )
+
+            if self.concurrent:
+                results, dropped = await self._run_concurrent_async(
+                    roles, meeting_data, chat_data, materials_data, on_event
+                )
+            else:
+                results, dropped = await self._run_sequential_async(
+                    roles, meeting_data, chat_data, materials_data, on_event
+                )
+        return self._build_outcome(
+            results, budget_dropped + dropped, start_time, mode,
+            llm_calls=len(roles), usage=self._sum_role_usage(results), compaction=compaction,
+        )
+
+    def _select_roles(self, role_ids: Optional[List[str]]) -> List[RoleConfig]:
+        """評価対象のロール（role_ids 指定時は定義順を保って絞り込む）"""
+        if role_ids is None:
+            return self.roles
+        wanted = set(role_ids)
+        return [r for r in self.roles if r.role_id in wanted]
+
+    def _apply_budget(self, roles: List[RoleConfig]) -> tuple:
+        """
+        日次トークン予算の残りが少ない間（LLMService.get_budget_state が drop_roles 以降）は、
+        重みが LLM_BUDGET_MIN_ROLE_WEIGHT 未満のロール（governance 等）を除外する。最も重いロールは必ず残す
+
+        Returns:
+            (評価するロール, 除外したロール（reason: budget）)
+        """
+        get_budget_state = getattr(self.llm_service, "get_budget_state", None)
+        if not roles or get_budget_state is None or get_budget_state().get("level") not in ("drop_roles", "cheap_model"):
+            return roles, []
+        kept = [r for r in roles if r.weight >= config.LLM_BUDGET_MIN_ROLE_WEIGHT] or [max(roles, key=lambda r: r.weight)]
+        dropped = [{"role_id": r.role_id, "weight": r.weight, "reason": "budget"} for r in roles if r not in kept]
+        if dropped:
+            logger.info(f"LLM daily token budget is low; skipping low-weight roles: {[d['role_id'] for d in dropped]}")
+        return kept, dropped
+
+    def _circuit_open(self) -> bool:
+        """LLMサーキットブレーカーが開いているか（開いている間はロールごとのモックではなくルールベースのみで判断させる）"""
+        breaker = getattr(self.llm_service, "circuit_breaker", None)
+        if breaker is not None and breaker.is_open():
+            logger.warning("LLM circuit breaker is open; skipping multi-role analysis")
+            return True
+        return False
+
+    def _execution_mode(self) -> str:
+        """実行モード名（single_call / concurrent / sequential）"""
+        if self.call_mode == "single_call":
+            return "single_call"
+        return "concurrent" if self.concurrent else "sequential"
+
+    def _build_outcome(
+        self,
+        results: List[Dict[str, Any]],
+        dropped: List[Dict[str, Any]],
+        start_time: float,
+        mode: str,
+        llm_calls: int,
+        usage: Dict[str, int],
+        compaction: Optional[List[Dict[str, Any]]] = None,
+    ) -> MultiRoleOutcome:
+        """
+        スコア揺らぎ補正・除外ロールのログ出力をして MultiRoleOutcome を組み立てる
+
+        compaction は collect_compaction_stats で集めた圧縮結果（全ロールが同じ入力のため最初の1件を使う）
+        """
+        self._spread_identical_scores(results)
+
+        elapsed_ms = int((time.monotonic() - start_time) * 1000)
+        if dropped:
+            logger.warning(
+                f"Multi-role analysis dropped {len(dropped)} role(s): "
+                f"{[d['role_id'] for d in dropped]} (elapsed={elapsed_ms}ms)"
+            )
+        return MultiRoleOutcome(
+            results=results,
+            dropped_roles=dropped,
+            elapsed_ms=elapsed_ms,
+            mode=mode,
+            llm_calls=llm_calls,
+            usage=usage,
+            input_compaction=dict(compaction[0]) if compaction else {},
+        )
+
+    def _run_single_call(
+        self,
+        roles: List[RoleConfig],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> tuple:
+        """1回のLLM呼び出しで全ロールを評価"""
+        # 呼び出し元の分析ID・優先度（contextvars）をワーカースレッドに引き継ぐ
+        future = self._executor.submit(
+            contextvars.copy_context().run,
+            self.llm_service.analyze_multi_perspective,
+            meeting_data,
+            chat_data,
+            materials_data,
+            role_ids=[r.role_id for r in roles],
+        )
+        try:
+            analyses, usage = future.result(timeout=self.deadline)
+        except FuturesTimeoutError:
+            self._abandon(future)
+            return [], self._drop_all(roles, "timeout"), {}
+        except Exception as e:
+            logger.error(f"Single-call multi-role analysis failed: {e}", exc_info=True)
+            return [], self._drop_all(roles, "error"), {}
+        return self._split_single_call(roles, analyses, usage)
+
+    async def _run_single_call_async(
+        self,
+        roles: List[RoleConfig],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> tuple:
+        """1回のLLM呼び出しで全ロールを評価（非同期版。締め切り超過時は呼び出しを取り消す）"""
+        role_ids = [r.role_id for r in roles]
+        if on_event is not None and hasattr(self.llm_service, "analyze_multi_perspective_stream_async"):
+            weights = {r.role_id: r.weight for r in roles}
+            call = self.llm_service.analyze_multi_perspective_stream_async(
+                meeting_data,
+                chat_data,
+                materials_data,
+                role_ids=role_ids,
+                on_role=lambda role_id, analysis: on_event(
+                    self._role_result_event(RoleConfig(role_id=role_id, weight=weights[role_id]), analysis)
+                ),
+            )
+        else:
+            call = self.llm_service.analyze_multi_perspective_async(
+                meeting_data,
+                chat_data,
+                materials_data,
+                role_ids=role_ids,
+            )
+        try:
+            analyses, usage = await asyncio.wait_for(call, timeout=self.deadline)
+        except asyncio.TimeoutError:
+            return [], self._drop_all(roles, "timeout"), {}
+        except Exception as e:
+            logger.error(f"Single-call multi-role analysis failed: {e}", exc_info=True)
+            return [], self._drop_all(roles, "error"), {}
+        return self._split_single_call(roles, analyses, usage)
+
+    def _split_single_call(
+        self, roles: List[RoleConfig], analyses: Dict[str, Dict[str, Any]], usage: Dict[str, Any]
+    ) -> tuple:
+        """一括評価の結果をロール別の multi_view 形式に展開（レスポンスに無いロールは除外扱い）"""
+        results = [self._to_role_result(r, analyses[r.role_id]) for r in roles if r.role_id in analyses]
+        dropped = [
+            {"role_id": r.role_id, "weight": r.weight, "reason": "missing"}
+            for r in roles if r.role_id not in analyses
+        ]
+        return results, dropped, self._sum_usage([usage])
+
+    def _drop_all(self, roles: List[RoleConfig], reason: str) -> List[Dict[str, Any]]:
+        """全ロールを除外扱いにする（一括評価の締め切り超過・失敗時）"""
+        dropped = [{"role_id": r.role_id, "weight": r.weight, "reason": reason} for r in roles]
+        if reason == "timeout":
+            for d in dropped:
+                d["timeout_seconds"] = self.deadline
+        return dropped
+
+    @classmethod
+    def _sum_role_usage(cls, results: List[Dict[str, Any]]) -> Dict[str, int]:
+        """ロール別呼び出しのトークン使用量を合計"""
+        return cls._sum_usage([(r.get("analysis") or {}).get("_usage") or {} for r in results])
+
+    @staticmethod
+    def _sum_usage(usages: List[Dict[str, Any]]) -> Dict[str, int]:
+        """usage dict のリストを input_tokens / output_tokens / cache_hits / cached_input_tokens に集計"""
+        return {
+            "input_tokens": sum(u.get("input_tokens", 0) for u in usages),
+            "output_tokens": sum(u.get("output_tokens", 0) for u in usages),
+            "cache_hits": sum(1 for u in usages if u.get("cache_hit")),
+            "cached_input_tokens": sum(u.get("cached_input_tokens", 0) for u in usages),
+        }
+
+    def _run_sequential(
+        self,
+        roles: List[RoleConfig],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> tuple:
+        """ロールを1つずつ評価（従来動作）"""
+        results: List[Dict[str, Any]] = []
+        dropped: List[Dict[str, Any]] = []
+        for role in roles:
+            try:
+                results.append(self._analyze_role(role, meeting_data, chat_data, materials_data))
             except Exception as e:
                 logger.error(
                     f"Multi-role analysis failed for role={role.role_id}: {e}",
                     exc_info=True,
                 )
                 # 1ロール失敗しても他ロールは継続
-                continue
+                dropped.append({"role_id": role.role_id, "weight": role.weight, "reason": "error"})
+        return results, dropped
+
+    def _run_concurrent(
+        self,
+        roles: List[RoleConfig],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> tuple:
+        """
+        全ロールを同時に評価し、時間内に完了したロールだけを採用（同時実行は in_flight_limit 件まで）
+
+        ロールのタイムアウト（role_timeout）はそのロールが実行を始めた時点から数えるため、同時実行数の上限で
+        待たされたロールも role_timeout の間は実行できる。分析全体の締め切り（deadline）は開始時点から数える
+        """
+        deadline_at = time.monotonic() + self.deadline
+        started: Dict[str, float] = {}  # ロールID → 実行を始めた時刻
+
+        def run_role(role: RoleConfig) -> Dict[str, Any]:
+            started[role.role_id] = time.monotonic()
+            return self._analyze_role(role, meeting_data, chat_data, materials_data)
+
+        queued = list(roles)
+        futures: Dict[Any, RoleConfig] = {}
+        running: set = set()
+        timed_out: Dict[Any, float] = {}  # 除外した Future → 超過したタイムアウト（秒）
+        while queued or running:
+            limit = self._in_flight_limit()
+            while queued and len(running) < limit:
+                role = queued.pop(0)
+                future = self._executor.submit(contextvars.copy_context().run, run_role, role)
+                futures[future] = role
+                running.add(future)
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            wake_at = deadline_at
+            for future in running:
+                start = started.get(futures[future].role_id)
+                wake_at = min(wake_at, now + _START_POLL_SECONDS if start is None else start + self.role_timeout)
+            _, running = wait(running, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future in list(running):
+                start = started.get(futures[future].role_id)
+                if start is not None and now >= start + self.role_timeout and not future.done():
+                    running.discard(future)
+                    timed_out[future] = self.role_timeout
+                    self._abandon(future)
+
+        for future in running:
+            timed_out[future] = self.deadline
+            self._abandon(future)
+        done = [f for f in futures if f not in timed_out]
+        return self._collect_results(roles, futures, done, timed_out, queued, self.deadline)
+
+    async def _run_sequential_async(
+        self,
+        roles: List[RoleConfig],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> tuple:
+        """ロールを1つずつ評価（非同期版）"""
+        results: List[Dict[str, Any]] = []
+        dropped: List[Dict[str, Any]] = []
+        for role in roles:
+            try:
+                results.append(await self._analyze_role_async(role, meeting_data, chat_data, materials_data, on_event))
+            except Exception as e:
+                logger.error(
+                    f"Multi-role analysis failed for role={role.role_id}: {e}",
+                    exc_info=True,
+                )
+                dropped.append({"role_id": role.role_id, "weight": role.weight, "reason": "error"})
+        return results, dropped
+
+    async def _run_concurrent_async(
+        self,
+        roles: List[RoleConfig],
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> tuple:
+        """
+        全ロールをタスクとして同時に評価し、時間切れのロールは取り消す（非同期版。同時実行は in_flight_limit 件まで）
 
-        # すべてのロールでスコアが完全に同一だった場合は、デモ時に「全部75点」に見えないように
-        # ごくわずかな揺らぎを追加して、人が見ても自然な範囲で差分を出す
+        ロールのタイムアウトはセマフォを取得して実行を始めた時点から数え、分析全体の締め切りは開始時点から数える
+        """
+        semaphore = asyncio.Semaphore(self._in_flight_limit())
+
+        async def run(role: RoleConfig) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self._analyze_role_async(role, meeting_data, chat_data, materials_data, on_event),
+                        timeout=self.role_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    raise _RoleTimeout() from None
+
+        tasks = {asyncio.ensure_future(run(role)): role for role in roles}
+        done, not_done = await asyncio.wait(tasks, timeout=self.deadline)
+        timed_out: Dict[Any, float] = {}
+        for task in not_done:
+            task.cancel()
+            timed_out[task] = self.deadline
+        for task in done:
+            if isinstance(task.exception(), _RoleTimeout):
+                timed_out[task] = self.role_timeout
+        done = [task for task in done if task not in timed_out]
+        return self._collect_results(roles, tasks, done, timed_out, [], self.deadline)
+
+    def _in_flight_limit(self) -> int:
+        """
+        この分析で同時に実行するロール評価の数
+
+        締め切り超過後も実行中のロール（中断できない同期LLM呼び出し）が占有しているワーカーを差し引き、
+        遅い分析が続いてもプールが埋まり切らないようにする（最低1件）
+        """
+        with self._orphan_lock:
+            free = self._max_workers - len(self._orphans)
+        return max(1, min(self.max_in_flight, free))
+
+    def _abandon(self, future: Any) -> None:
+        """時間切れのロール評価を取り消す（実行中のLLM呼び出しは中断できないため、完了するまでプールの空きから差し引く）"""
+        if not future.cancel():
+            self._track_orphan(future)
+
+    def _track_orphan(self, future: Any) -> None:
+        """締め切り超過後も実行中のロール評価を、完了するまで記録する"""
+        with self._orphan_lock:
+            self._orphans.add(future)
+        future.add_done_callback(self._release_orphan)
+
+    def _release_orphan(self, future: Any) -> None:
+        """完了したロール評価を記録から外す（Future の完了コールバック）"""
+        with self._orphan_lock:
+            self._orphans.discard(future)
+
+    @staticmethod
+    def _collect_results(
+        roles: List[RoleConfig],
+        handles: Dict[Any, RoleConfig],
+        done: Any,
+        timed_out: Dict[Any, float],
+        unsubmitted: List[RoleConfig],
+        deadline: float,
+    ) -> tuple:
+        """
+        完了したロールの結果と除外ロールをまとめる（同期版の Future・非同期版の Task 共通）
+
+        失敗したロールは reason: error、時間切れのロール（timed_out。値は超過したタイムアウト）と
+        締め切りまでに開始しなかったロール（unsubmitted）は reason: timeout で除外する
+        """
+        results_by_role: Dict[str, Dict[str, Any]] = {}
+        dropped: List[Dict[str, Any]] = []
+        for handle in done:
+            role = handles[handle]
+            try:
+                results_by_role[role.role_id] = handle.result()
+            except Exception as e:
+                logger.error(
+                    f"Multi-role analysis failed for role={role.role_id}: {e}",
+                    exc_info=True,
+                )
+                dropped.append({"role_id": role.role_id, "weight": role.weight, "reason": "error"})
+        timeouts = [(handles[handle], seconds) for handle, seconds in timed_out.items()]
+        for role, seconds in timeouts + [(role, deadline) for role in unsubmitted]:
+            dropped.append({
+                "role_id": role.role_id,
+                "weight": role.weight,
+                "reason": "timeout",
+                "timeout_seconds": seconds,
+            })
+
+        # 結果はロール定義順に並べる（スコア揺らぎの割り当てやUI表示の順序を安定させる）
+        results = [results_by_role[r.role_id] for r in roles if r.role_id in results_by_role]
+        order = {r.role_id: i for i, r in enumerate(roles)}
+        dropped.sort(key=lambda d: order.get(d["role_id"], 0))
+        return results, dropped
+
+    async def _analyze_role_async(
+        self,
+        role: RoleConfig,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """1ロール分のLLM分析を実行（非同期版。on_event 指定時はストリーミングで途中経過を通知）"""
+        logger.info(f"Running multi-view LLM analysis for role={role.role_id}")
+        if on_event is not None and hasattr(self.llm_service, "analyze_structure_stream_async"):
+            analysis = await self.llm_service.analyze_structure_stream_async(
+                meeting_data=meeting_data,
+                chat_data=chat_data,
+                materials_data=materials_data,
+                role_id=role.role_id,
+                on_partial=lambda fields: on_event({
+                    "type": "role_partial",
+                    "role_id": role.role_id,
+                    "weight": role.weight,
+                    "fields": fields,
+                }),
+            )
+        else:
+            analysis = await self.llm_service.analyze_structure_async(
+                meeting_data=meeting_data,
+                chat_data=chat_data,
+                materials_data=materials_data,
+                role_id=role.role_id,
+            )
+        if on_event is not None:
+            on_event(self._role_result_event(role, analysis))
+        return self._to_role_result(role, analysis)
+
+    def _analyze_role(
+        self,
+        role: RoleConfig,
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]],
+        materials_data: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """1ロール分のLLM分析を実行し、multi_view 形式の要素に整形"""
+        logger.info(f"Running multi-view LLM analysis for role={role.role_id}")
+        analysis = self.llm_service.analyze_structure(
+            meeting_data=meeting_data,
+            chat_data=chat_data,
+            materials_data=materials_data,
+            role_id=role.role_id,
+        )
+        return self._to_role_result(role, analysis)
+
+    @classmethod
+    def _role_result_event(cls, role: RoleConfig, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """ロール評価確定の通知イベント（分析結果の全文は含めない）"""
+        event = cls._to_role_result(role, analysis)
+        event.pop("analysis")
+        return {"type": "role_result", **event}
+
+    @staticmethod
+    def _to_role_result(role: RoleConfig, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """AnalysisResult dict を multi_view の1要素に変換"""
+        # 期待スキーマを満たさないケースでも、最低限のガードだけして格納
+        return {
+            "role_id": role.role_id,
+            "weight": role.weight,
+            "overall_score": analysis.get("overall_score", 0),
+            "severity": analysis.get("severity", "MEDIUM"),
+            "urgency": analysis.get("urgency", "MEDIUM"),
+            "explanation": analysis.get("explanation", ""),
+            "analysis": analysis,
+        }
+
+    @staticmethod
+    def _spread_identical_scores(results: List[Dict[str, Any]]) -> None:
+        """
+        すべてのロールでスコアが完全に同一だった場合は、デモ時に「全部75点」に見えないように
+        ごくわずかな揺らぎを追加して、人が見ても自然な範囲で差分を出す
+        """
         try:
             if results:
                 scores = [r.get("overall_score", 0) for r in results]
@@ -112,6 +692,3 @@ class MultiRoleLLMAnalyzer:
         except Exception as e:
             # デモ用のスコア調整なので、万一失敗しても元の結果をそのまま返す
             logger.warning(f"multi_view score adjustment failed: {e}")
-
-        return results
-
@@ -0,0 +1,334 @@
+"""
+宣言的パターンルールエンジン
+config/definitions/pattern_rules.json のパターン定義（検出条件・証拠文・スコア表）を起動時に1つの評価計画へコンパイルする。
+特徴量（KPI下方修正数、判断集中率など）は分析ごとに1回だけ算出し、全パターンで共有する。
+同じ条件を使うパターンが増えても条件の評価は1回で済み、パターン追加にPythonの変更は不要。
+"""
+
+import operator
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.keyword_matcher import get_keyword_matcher
+from utils.logger import logger
+
+
+# 条件式で使える比較演算子
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+
+# extract_features が返す特徴量（ルール定義で参照できる名前）
+FEATURE_NAMES = (
+    "kpi_downgrade_count",
+    "kpi_mention_count",
+    "exit_discussed",
+    "total_statements",
+    "decision_concentration_rate",
+    "ignored_opposition_count",
+    "has_chat",
+    "risk_message_count",
+    "opposition_message_count",
+    "escalation_mentioned",
+)
+
+
+def extract_features(meeting_data: Dict[str, Any], chat_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    ルール評価・スコアリングで共有する特徴量を算出
+
+    増分パース（TranscriptParseState）の結果に speaker_counts / kpi_downgrade_count が
+    含まれていればそれを使い、全発言の数え直しを避ける。発言リストの無い集計
+    （TranscriptParseState.rule_summary）は total_statements / kpi_mention_count を件数として使う。
+    """
+    kpi_mentions = meeting_data.get("kpi_mentions", [])
+    kpi_mention_count = len(kpi_mentions) if "kpi_mentions" in meeting_data else meeting_data.get("kpi_mention_count", 0)
+
+    # KPI下方修正の検出
+    kpi_downgrade_count = meeting_data.get("kpi_downgrade_count")
+    if kpi_downgrade_count is None:
+        matcher = get_keyword_matcher()
+        kpi_downgrade_count = sum(
+            1 for mention in kpi_mentions
+            if "kpi_downgrade" in matcher.scan(mention["text"])
+        )
+
+    # 撤退/ピボット議論の不在
+    exit_discussed = meeting_data.get("exit_discussed", False)
+
+    # 判断集中の検出（最も多く発言した人の発言数 / 総発言数）
+    statements = meeting_data.get("statements", [])
+    total_statements = len(statements) if "statements" in meeting_data else meeting_data.get("total_statements", 0)
+    if total_statements == 0:
+        decision_concentration_rate = 0.0
+    else:
+        speaker_counts = meeting_data.get("speaker_counts") or Counter(stmt["speaker"] for stmt in statements)
+        decision_concentration_rate = max(speaker_counts.values()) / total_statements
+
+    # チャット由来の特徴量
+    risk_message_count = 0
+    opposition_message_count = 0
+    escalation_mentioned = False
+    if chat_data:
+        risk_message_count = len(chat_data.get("risk_messages", []))
+        opposition_message_count = len(chat_data.get("opposition_messages", []))
+        escalation_mentioned = bool(chat_data.get("escalation_mentioned", False))
+
+    # 反対意見の無視（チャットで反対意見が出ているが、会議で撤退議論がない）
+    ignored_opposition_count = opposition_message_count if not exit_discussed else 0
+
+    return {
+        "kpi_downgrade_count": kpi_downgrade_count,
+        "kpi_mention_count": kpi_mention_count,
+        "exit_discussed": exit_discussed,
+        "total_statements": total_statements,
+        "decision_concentration_rate": decision_concentration_rate,
+        "ignored_opposition_count": ignored_opposition_count,
+        "has_chat": bool(chat_data),
+        "risk_message_count": risk_message_count,
+        "opposition_message_count": opposition_message_count,
+        "escalation_mentioned": escalation_mentioned,
+    }
+
+
+@dataclass
+class CompiledPattern:
+    """コンパイル済みパターン（条件は評価計画内の述語番号で保持）"""
+    pattern_id: str
+    description: str
+    score: int
+    all_of: Tuple[int, ...]
+    any_of: Tuple[int, ...]
+    evidence: List[str] = field(default_factory=list)
+    quantitative_scores: List[str] = field(default_factory=list)
+
+
+class PatternRuleEngine:
+    """パターン定義をコンパイルし、特徴量に対して一括評価するエンジン"""
+
+    def __init__(self, definition: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            definition: pattern_rules.json の内容（Noneの場合はパターンなし）
+
+        Raises:
+            ValueError: 未知の特徴量・演算子を参照している場合
+        """
+        # 評価計画: 重複を除いた述語 (特徴量, 演算子, 値) の列
+        self._predicates: List[Tuple[str, Callable[[Any, Any], bool], Any]] = []
+        self._predicate_index: Dict[Tuple[str, str, str], int] = {}
+        self.patterns: List[CompiledPattern] = []
+        self._scoring: Dict[str, Dict[str, Any]] = {}
+        self._default_scores: Dict[str, int] = {}
+        # 分析結果の scores に検出時スコアを載せるパターン（定義の record_score）
+        self._recorded_scores: set = set()
+
+        for spec in (definition or {}).get("patterns", []):
+            self._compile_pattern(spec)
+
+    @staticmethod
+    def _validate_condition(condition: Dict[str, Any]) -> None:
+        """条件が既知の特徴量・演算子だけを参照しているか検証"""
+        if condition.get("feature") not in FEATURE_NAMES:
+            raise ValueError(f"Unknown feature in pattern rule: {condition.get('feature')}")
+        if condition.get("op", "==") not in _OPERATORS:
+            raise ValueError(f"Unknown operator in pattern rule: {condition.get('op')}")
+
+    def _compile_condition(self, condition: Dict[str, Any]) -> int:
+        """条件1つを評価計画の述語に登録し、その番号を返す（同じ条件は共有）"""
+        self._validate_condition(condition)
+        feature = condition["feature"]
+        op = condition.get("op", "==")
+        value = condition.get("value")
+        key = (feature, op, repr(value))
+        if key not in self._predicate_index:
+            self._predicate_index[key] = len(self._predicates)
+            self._predicates.append((feature, _OPERATORS[op], value))
+        return self._predicate_index[key]
+
+    def _compile_pattern(self, spec: Dict[str, Any]) -> None:
+        """パターン定義1件をコンパイル"""
+        pattern_id = spec["pattern_id"]
+        when = spec.get("when", {})
+        all_of = tuple(self._compile_condition(c) for c in when.get("all", []))
+        any_of = tuple(self._compile_condition(c) for c in when.get("any", []))
+
+        quantitative_scores = list(spec.get("quantitative_scores", []))
+        for name in quantitative_scores:
+            if name not in FEATURE_NAMES:
+                raise ValueError(f"Unknown feature in quantitative_scores: {name}")
+
+        scoring = spec.get("scoring")
+        if scoring:
+            # スコア表の条件も特徴量名を検証しておく（評価時のKeyErrorを防ぐ）
+            for reason in scoring.get("reasons", []):
+                if isinstance(reason, dict):
+                    self._validate_condition(reason["when"])
+            for table in scoring.get("importance", []) + scoring.get("urgency", []):
+                if table.get("feature") not in FEATURE_NAMES:
+                    raise ValueError(f"Unknown feature in scoring table: {table.get('feature')}")
+            self._scoring[pattern_id] = scoring
+
+        self._default_scores[pattern_id] = int(spec.get("score", 50))
+        if spec.get("record_score", False):
+            self._recorded_scores.add(pattern_id)
+        self.patterns.append(CompiledPattern(
+            pattern_id=pattern_id,
+            description=spec.get("description", ""),
+            score=int(spec.get("score", 50)),
+            all_of=all_of,
+            any_of=any_of,
+            evidence=list(spec.get("evidence", [])),
+            quantitative_scores=quantitative_scores,
+        ))
+
+    def evaluate(self, features: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        全パターンを評価し、該当したパターンの finding を定義順に返す（スコアリング前）
+
+        Args:
+            features: extract_features の結果
+        """
+        truth = [op(features[feature], value) for feature, op, value in self._predicates]
+        findings = []
+        for pattern in self.patterns:
+            if not all(truth[i] for i in pattern.all_of):
+                continue
+            if pattern.any_of and not any(truth[i] for i in pattern.any_of):
+                continue
+            finding = {
+                "pattern_id": pattern.pattern_id,
+                "severity": _level_for(pattern.score, DEFAULT_SEVERITY_LEVELS),
+                "score": pattern.score,
+                "description": pattern.description,
+                "evidence": [text.format(**features) for text in pattern.evidence],
+            }
+            if pattern.quantitative_scores:
+                finding["quantitative_scores"] = {name: features[name] for name in pattern.quantitative_scores}
+            findings.append(finding)
+        return findings
+
+    def get_scoring(self, pattern_id: str) -> Optional[Dict[str, Any]]:
+        """パターンのスコア表（定義が無ければNone）"""
+        return self._scoring.get(pattern_id)
+
+    def default_score(self, pattern_id: str) -> int:
+        """パターン定義の検出時スコア（定義が無ければ50）"""
+        return self._default_scores.get(pattern_id, 50)
+
+    def records_score(self, pattern_id: str) -> bool:
+        """検出時スコアを分析結果の scores に載せるパターンか（定義の record_score、既定は False）"""
+        return pattern_id in self._recorded_scores
+
+    def score(self, pattern_id: str, finding: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        スコア表に基づいて重要性・緊急性を評価（ScoringService.evaluate と同じ形式）
+
+        Returns:
+            評価結果。スコア表が定義されていないパターンはNone
+        """
+        scoring = self._scoring.get(pattern_id)
+        if scoring is None:
+            return None
+        if scoring.get("type") == "fixed":
+            return _score_fixed(scoring, finding, self._default_scores[pattern_id])
+        return self._score_additive(scoring, finding.get("quantitative_scores", {}))
+
+    def _score_additive(self, scoring: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+        """加点表による評価（重要性・緊急性を加点し、加重平均で総合スコアを出す）"""
+        def value_of(name: str) -> Any:
+            return values.get(name, 0)
+
+        importance_score = sum(_band_points(table["bands"], value_of(table["feature"])) for table in scoring.get("importance", []))
+        urgency_score = sum(_band_points(table["bands"], value_of(table["feature"])) for table in scoring.get("urgency", []))
+        weights = scoring.get("weights", {"importance": 0.6, "urgency": 0.4})
+        overall_score = int(importance_score * weights.get("importance", 0) + urgency_score * weights.get("urgency", 0))
+
+        reasons = []
+        for reason in scoring.get("reasons", []):
+            condition = reason["when"]
+            if _OPERATORS[condition.get("op", "==")](value_of(condition["feature"]), condition.get("value")):
+                reasons.append(reason["text"].format(**{k: value_of(k) for k in FEATURE_NAMES}))
+
+        return {
+            "overall_score": overall_score,
+            "importance_score": importance_score,
+            "urgency_score": urgency_score,
+            "severity": _level_for(overall_score, scoring.get("severity_levels", DEFAULT_SEVERITY_LEVELS)),
+            "urgency": _level_for(urgency_score, scoring.get("urgency_levels", DEFAULT_URGENCY_LEVELS)),
+            "reasons": reasons,
+            "explanation": " ".join(reasons) if reasons else scoring.get("default_explanation", "構造的問題が検出されました。"),
+            "quantitative_breakdown": {
+                name: int(value_of(item["feature"]) * item.get("multiplier", 1))
+                for name, item in scoring.get("breakdown", {}).items()
+            },
+        }
+
+
+# 既定の重要度・緊急度レベル（ScoringService の SeverityLevel / UrgencyLevel の閾値）
+DEFAULT_SEVERITY_LEVELS = [
+    {"min": 90, "level": "CRITICAL"},
+    {"min": 70, "level": "HIGH"},
+    {"min": 40, "level": "MEDIUM"},
+    {"min": 0, "level": "LOW"},
+]
+DEFAULT_URGENCY_LEVELS = [
+    {"min": 80, "level": "IMMEDIATE"},
+    {"min": 60, "level": "URGENT"},
+    {"min": 40, "level": "HIGH"},
+    {"min": 20, "level": "MEDIUM"},
+    {"min": 0, "level": "LOW"},
+]
+
+
+def _band_points(bands: List[Dict[str, Any]], value: Any) -> int:
+    """閾値の高い順に並んだ加点表から、値が最初に到達した帯の点数を返す"""
+    for band in bands:
+        if value >= band["min"]:
+            return band["points"]
+    return 0
+
+
+def _level_for(score: float, levels: List[Dict[str, Any]]) -> str:
+    """閾値の高い順に並んだレベル表からレベル名を返す"""
+    for level in levels:
+        if score >= level["min"]:
+            return level["level"]
+    return levels[-1]["level"]
+
+
+def _score_fixed(scoring: Dict[str, Any], finding: Dict[str, Any], default_score: int) -> Dict[str, Any]:
+    """固定スコア評価（検出時のスコアをそのまま使い、レベル表で重要度・緊急度を決める）"""
+    overall_score = finding.get("score", default_score)
+    level = next((lv for lv in scoring.get("levels", []) if overall_score >= lv["min"]), None) or {}
+    return {
+        "overall_score": overall_score,
+        "importance_score": overall_score,
+        "urgency_score": overall_score,
+        "severity": level.get("severity", "LOW"),
+        "urgency": level.get("urgency", "LOW"),
+        "reasons": list(scoring.get("reasons", [])),
+        "explanation": scoring.get("explanation", "構造的問題が検出されました。"),
+        "quantitative_breakdown": {},
+    }
+
+
+# モジュール単一インスタンス（config/definitions/pattern_rules.json から初期化）
+_pattern_rule_engine: Optional[PatternRuleEngine] = None
+
+
+def get_pattern_rule_engine() -> PatternRuleEngine:
+    global _pattern_rule_engine
+    if _pattern_rule_engine is None:
+        from .definition_loader import DefinitionLoader
+        definition = DefinitionLoader().get_pattern_rules()
+        if definition is None:
+            logger.error("Pattern rules (config/definitions/pattern_rules.json) not found. No rule-based patterns will be detected.")
+        _pattern_rule_engine = PatternRuleEngine(definition)
+    return _pattern_rule_engine
@@ -5,8 +5,10 @@ LLMへのプロンプトを分離して管理し、後から改修しやすく
 
 from .analysis_prompt import AnalysisPromptBuilder
 from .task_generation_prompt import TaskGenerationPromptBuilder
+from .repair_prompt import RepairPromptBuilder
 
 __all__ = [
     "AnalysisPromptBuilder",
     "TaskGenerationPromptBuilder",
+    "RepairPromptBuilder",
 ]
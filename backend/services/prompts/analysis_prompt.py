@@ -4,8 +4,19 @@
 config/prompts/analysis/ から読み込み、ファイルがなければフォールバック
 """
 
-from typing import Dict, Any, Optional, Tuple
-from services.prompts.loader import load_prompt, load_analysis_prompt
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from config import config
+from services.prompts.loader import get_prompt_template, load_analysis_prompt, render_prompt
+from services.prompts.registry import PromptTemplate
+from services.input_compaction import get_input_compactor
+from services.transcript_digest import fit_lines, get_transcript_digest_builder
+from utils.token_estimator import get_token_estimator
+
+_SPEAKER_LINE = re.compile(r'^([^:]+):\s*(.+)$')
+
+# ロールに依存しないプレースホルダ（ベーステンプレートでこれらより前の部分は全ロールで共通の先頭部分になる）
+CONTEXT_PLACEHOLDERS = ("meeting_transcript", "chat_messages", "materials_content")
 
 
 # フォールバック用のロール説明（ファイル読み込み失敗時）
@@ -85,6 +96,43 @@ _ANALYSIS_POINTS_DEFAULT_FALLBACK = """【分析観点】
 5. リスク認識から報告までの遅延"""
 
 
+_MULTI_PERSPECTIVE_TEMPLATE_FALLBACK = """あなたは組織の意思決定プロセスを分析する専門AIです。
+入力（会議議事録・チャットログ・会議資料）を、以下の複数の評価ロールそれぞれの立場から独立に評価してください。
+
+【評価ロール】
+{role_sections}
+
+【入力データ】
+- 会議議事録:
+{meeting_transcript}
+
+- チャットログ:
+{chat_messages}
+
+- 会議資料:
+{materials_content}
+
+【出力形式】
+以下のJSON形式で厳密に回答してください（JSON以外のテキストは含めない）：
+{{
+  "evaluations": [
+    {{
+      "role_id": "executive",
+      "findings": [],
+      "overall_score": 25,
+      "severity": "LOW",
+      "urgency": "LOW",
+      "explanation": "そのロールの立場から見た説明文（2-3文）"
+    }}
+  ]
+}}
+
+**重要**:
+- evaluations には {role_ids} の各ロールを1件ずつ、この順で含める
+- findings の各要素は pattern_id, severity, score, description, evidence を含める
+- JSON形式のみを返し、説明文やマークダウンは含めない"""
+
+
 class AnalysisPromptBuilder:
     """分析用プロンプトビルダー"""
     
@@ -159,35 +207,122 @@ class AnalysisPromptBuilder:
         return prompt
     
     @staticmethod
-    def _extract_texts(
+    def build_for_role_parts(
         meeting_data: Dict[str, Any],
         chat_data: Optional[Dict[str, Any]] = None,
         materials_data: Optional[Dict[str, Any]] = None,
-    ) -> Tuple[str, str, str]:
-        """会議・チャット・資料からLLMに渡すテキストを抽出"""
-        # 会議議事録のテキストを取得
-        meeting_transcript = meeting_data.get("transcript", "")
-        if not meeting_transcript and meeting_data.get("statements"):
-            statements = meeting_data.get("statements", [])
-            meeting_transcript = "\n".join(
-                f"{stmt.get('speaker', 'Unknown')}: {stmt.get('text', '')}"
-                for stmt in statements
+        role_id: str = "executive"
+    ) -> Tuple[str, str]:
+        """
+        特定ロール視点の分析用プロンプトを (ロール共通の先頭部分, ロール別の残り) に分けて構築
+        
+        先頭部分は評価指示と会議・チャット・資料のテキストだけで決まり、同じ入力なら全ロールで同一になる
+        （LLMService がコンテキストキャッシュとして再利用する）。2つを連結すると build_for_role と同じ文字列
+        
+        Args:
+            build_for_role と同じ
+        
+        Returns:
+            (先頭部分, 残り)。テンプレートに共有できる先頭部分が無い場合は ("", プロンプト全体)
+        """
+        meeting_transcript, chat_messages, materials_content = AnalysisPromptBuilder._extract_texts(
+            meeting_data, chat_data, materials_data
+        )
+        
+        role_description = load_analysis_prompt(role_id, "role_description")
+        if role_description is None:
+            role_description = _ROLE_DESCRIPTIONS_FALLBACK.get(
+                role_id, _DEFAULT_ROLE_FALLBACK
             )
         
-        # チャットログのテキストを取得
-        chat_messages = ""
-        if chat_data:
-            messages = chat_data.get("messages", [])
-            if messages:
-                chat_messages = "\n".join(
-                    f"{msg.get('author', msg.get('user', 'Unknown'))}: {msg.get('text', '')}"
-                    for msg in messages
-                )
+        return AnalysisPromptBuilder._build_base_prompt_parts(
+            meeting_transcript=meeting_transcript,
+            chat_messages=chat_messages,
+            materials_content=materials_content,
+            role_description=role_description,
+            role_id=role_id
+        )
+    
+    @staticmethod
+    def build_context_prefix(
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """ロール別プロンプトの共通の先頭部分（build_for_role_parts の1つ目）だけを構築"""
+        meeting_transcript, chat_messages, materials_content = AnalysisPromptBuilder._extract_texts(
+            meeting_data, chat_data, materials_data
+        )
+        return AnalysisPromptBuilder._base_template().render_prefix(
+            CONTEXT_PLACEHOLDERS,
+            meeting_transcript=meeting_transcript,
+            chat_messages=chat_messages,
+            materials_content=materials_content,
+        )
+    
+    @staticmethod
+    def build_multi_perspective(
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+        role_ids: Optional[List[str]] = None,
+    ) -> str:
+        """
+        複数ロールの評価を1回のLLM呼び出しで得るためのプロンプトを構築
+        
+        議事録・チャット・資料は1回だけ埋め込み、ロールごとの役割説明と分析観点を並べる。
         
-        # 会議資料のテキストを取得
-        materials_content = ""
-        if materials_data:
-            materials_content = materials_data.get("content", "")
+        Args:
+            meeting_data: 会議データ（パース済み）
+            chat_data: チャットデータ（パース済み、オプション）
+            materials_data: 会議資料データ（オプション）
+            role_ids: 評価ロールIDのリスト（出力の順序もこの順）
+        
+        Returns:
+            プロンプト文字列
+        """
+        role_ids = role_ids or ["executive", "corp_planning", "staff", "governance"]
+        meeting_transcript, chat_messages, materials_content = AnalysisPromptBuilder._extract_texts(
+            meeting_data, chat_data, materials_data
+        )
+        
+        role_sections = []
+        for role_id in role_ids:
+            role_description = load_analysis_prompt(role_id, "role_description")
+            if role_description is None:
+                role_description = _ROLE_DESCRIPTIONS_FALLBACK.get(role_id, _DEFAULT_ROLE_FALLBACK)
+            analysis_points = load_analysis_prompt(role_id, "analysis_points")
+            if analysis_points is None:
+                analysis_points = _ANALYSIS_POINTS_DEFAULT_FALLBACK
+            role_sections.append(f"### role_id: {role_id}\n{role_description}\n\n{analysis_points}")
+        
+        return render_prompt(
+            "analysis/multi_perspective.txt",
+            _MULTI_PERSPECTIVE_TEMPLATE_FALLBACK,
+            role_sections="\n\n".join(role_sections),
+            role_ids=", ".join(role_ids),
+            meeting_transcript=meeting_transcript,
+            chat_messages=chat_messages,
+            materials_content=materials_content,
+        )
+    
+    @staticmethod
+    def _extract_texts(
+        meeting_data: Dict[str, Any],
+        chat_data: Optional[Dict[str, Any]] = None,
+        materials_data: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, str, str]:
+        """会議・チャット・資料からLLMに渡すテキストを抽出（正規化・フィラー除去などの圧縮後）"""
+        meeting_transcript, chat_messages, materials_content = get_input_compactor().compact(
+            meeting_data, chat_data, materials_data
+        ).texts()
+        
+        # プロンプト予算を超える入力は、LONG_INPUT_ENABLED・議事録のしきい値に関係なく分割・切り詰める
+        over_budget = AnalysisPromptBuilder.exceeds_budget(meeting_transcript, chat_messages, materials_content)
+        if config.LONG_INPUT_ENABLED or over_budget:
+            meeting_transcript, chat_messages, materials_content = AnalysisPromptBuilder._apply_long_input_mode(
+                meeting_data, meeting_transcript, chat_messages, materials_content, force=over_budget
+            )
         
         return (
             meeting_transcript or "（議事録なし）",
@@ -195,6 +330,46 @@ class AnalysisPromptBuilder:
             materials_content or "（会議資料なし）",
         )
     
+    @staticmethod
+    def exceeds_budget(*texts: str) -> bool:
+        """
+        入力テキストの推定トークン数が1プロンプトの予算（LLM_PROMPT_TOKEN_BUDGET、0は無制限）を超えるか
+
+        評価指示などテンプレート部分のトークン数は予算から差し引いて判定する。
+        """
+        if config.LLM_PROMPT_TOKEN_BUDGET <= 0:
+            return False
+        estimator = get_token_estimator()
+        template_tokens = estimator.estimate(AnalysisPromptBuilder._base_template().text)
+        return estimator.estimate_many(texts) > config.LLM_PROMPT_TOKEN_BUDGET - template_tokens
+    
+    @staticmethod
+    def _apply_long_input_mode(
+        meeting_data: Dict[str, Any],
+        meeting_transcript: str,
+        chat_messages: str,
+        materials_content: str,
+        force: bool = False,
+    ) -> Tuple[str, str, str]:
+        """
+        長時間会議モード: 予算を超える議事録はチャンク抽出のダイジェストに、
+        チャットログ・会議資料は先頭と末尾を残して予算内に切り詰める
+
+        force の場合は議事録がしきい値以下でもダイジェストにする（プロンプト予算の超過時）
+        """
+        builder = get_transcript_digest_builder()
+        if meeting_transcript and (force or builder.needs_digest(meeting_transcript)):
+            statements = meeting_data.get("statements") or [
+                {"speaker": m.group(1).strip(), "text": m.group(2).strip()} if m else {"speaker": "Unknown", "text": line}
+                for line, m in ((line, _SPEAKER_LINE.match(line)) for line in meeting_transcript.splitlines() if line.strip())
+            ]
+            meeting_transcript = builder.build(statements).text
+        if chat_messages:
+            chat_messages = fit_lines(chat_messages.splitlines(), config.LONG_INPUT_CHAT_TOKENS, builder.estimator)
+        if materials_content:
+            materials_content = fit_lines(materials_content.splitlines(), config.LONG_INPUT_MATERIALS_TOKENS, builder.estimator)
+        return meeting_transcript, chat_messages, materials_content
+    
     @staticmethod
     def _build_base_prompt(
         *,
@@ -205,18 +380,47 @@ class AnalysisPromptBuilder:
         role_id: str = "default",
     ) -> str:
         """共通のプロンプトテンプレートを構築（ファイル読み込み + フォールバック）"""
+        return "".join(AnalysisPromptBuilder._build_base_prompt_parts(
+            meeting_transcript=meeting_transcript,
+            chat_messages=chat_messages,
+            materials_content=materials_content,
+            role_description=role_description,
+            role_id=role_id,
+        ))
+    
+    @staticmethod
+    def _build_base_prompt_parts(
+        *,
+        meeting_transcript: str,
+        chat_messages: str,
+        materials_content: str,
+        role_description: str,
+        role_id: str = "default",
+    ) -> Tuple[str, str]:
+        """共通のプロンプトテンプレートを (ロール共通の先頭部分, ロール別の残り) に分けて構築"""
         
         # 分析観点をファイルから読み込み
         analysis_points = load_analysis_prompt(role_id, "analysis_points")
         if analysis_points is None:
             analysis_points = _ANALYSIS_POINTS_DEFAULT_FALLBACK
         
-        # ベーステンプレートをファイルから読み込み
-        base_template = load_prompt("analysis/base.txt")
-        if not base_template:
+        return AnalysisPromptBuilder._base_template().render_split(
+            CONTEXT_PLACEHOLDERS,
+            role_description=role_description,
+            meeting_transcript=meeting_transcript,
+            chat_messages=chat_messages,
+            materials_content=materials_content,
+            analysis_points=analysis_points,
+        )
+    
+    @staticmethod
+    def _base_template() -> PromptTemplate:
+        """ベーステンプレート（ファイル読み込み + フォールバック）"""
+        # ベーステンプレートをファイルから読み込み（プリコンパイル済み）
+        base_template = get_prompt_template("analysis/base.txt")
+        if base_template is None:
             # フォールバック: 元のハードコード
-            base_template = """{role_description}
-Helmシステムの一部として、組織の構造的問題を検知し、定量評価を行います。
+            base_template = get_prompt_template("analysis/base.txt", """Helmシステムの一部として、組織の構造的問題を検知し、定量評価を行います。
 
 【役割】
 会議議事録、チャットログ、会議資料から組織の意思決定プロセスを分析し、構造的問題パターンを検出して定量評価（0-100点）を提供してください。
@@ -235,6 +439,9 @@ Helmシステムの一部として、組織の構造的問題を検知し、定
 - 会議資料:
 {materials_content}
 
+【あなたのロール】
+{role_description}
+
 {analysis_points}
 
 【出力形式】
@@ -275,15 +482,9 @@ Helmシステムの一部として、組織の構造的問題を検知し、定
 **重要**: 
 - 健全な意思決定が行われている場合: findingsを空配列[]にし、overall_scoreを20-40点、severity/urgencyをLOW/MEDIUMに設定
 - 構造的問題がある場合: findingsにパターンIDを含め、overall_scoreを80-100点、severity/urgencyをHIGHに設定
-- JSON形式のみを返し、説明文やマークダウンは含めない"""
+- JSON形式のみを返し、説明文やマークダウンは含めない""")
         
-        return base_template.format(
-            role_description=role_description,
-            meeting_transcript=meeting_transcript,
-            chat_messages=chat_messages,
-            materials_content=materials_content,
-            analysis_points=analysis_points,
-        )
+        return base_template
     
     @staticmethod
     def get_response_schema() -> Dict[str, Any]:
@@ -329,3 +530,25 @@ Helmシステムの一部として、組織の構造的問題を検知し、定
             },
             "required": ["findings", "overall_score", "severity", "urgency", "explanation"]
         }
+    
+    @staticmethod
+    def get_multi_perspective_response_schema() -> Dict[str, Any]:
+        """
+        複数ロール一括評価のレスポンススキーマを取得（Gemini APIのJSON Schema形式）
+        
+        Returns:
+            evaluations 配列の各要素が role_id 付きの分析結果となるスキーマ定義
+        """
+        evaluation = AnalysisPromptBuilder.get_response_schema()
+        evaluation["properties"] = {"role_id": {"type": "string"}, **evaluation["properties"]}
+        evaluation["required"] = ["role_id"] + evaluation["required"]
+        return {
+            "type": "object",
+            "properties": {
+                "evaluations": {
+                    "type": "array",
+                    "items": evaluation
+                }
+            },
+            "required": ["evaluations"]
+        }
@@ -2,12 +2,19 @@
 プロンプトファイル読み込みユーティリティ
 config/prompts/ 配下のテキストファイルを変数的に読み込む
 組織グラフ・RACIと同様の設計思想（DefinitionLoaderと同様のパス解決）
+ファイルは PromptRegistry が一度だけ読み込んでキャッシュし、更新された場合のみ読み直す
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 import logging
 
+from services.prompts.registry import (
+    PromptTemplate,
+    compile_fallback_template,
+    get_prompt_registry,
+)
+
 logger = logging.getLogger(__name__)
 
 # backend/config/prompts/ のパス（services/prompts/ -> services/ -> backend/）
@@ -30,19 +37,47 @@ def load_prompt(relative_path: str, fallback: Optional[str] = None) -> str:
     Returns:
         プロンプト文字列。ファイルが存在しない場合はfallback、fallbackもNoneなら空文字
     """
-    file_path = _get_prompts_dir() / relative_path
-    try:
-        if file_path.exists():
-            content = file_path.read_text(encoding="utf-8")
-            return content.strip()
-    except Exception as e:
-        logger.warning(f"プロンプトファイル読み込み失敗: {relative_path}, error={e}")
+    template = get_prompt_registry().get(relative_path)
+    if template is not None:
+        return template.text
     
     if fallback is not None:
         return fallback
     return ""
 
 
+def get_prompt_template(relative_path: str, fallback: Optional[str] = None) -> Optional[PromptTemplate]:
+    """
+    プリコンパイル済みのプロンプトテンプレートを取得する
+    
+    Args:
+        relative_path: config/prompts/ からの相対パス（例: "analysis/base.txt"）
+        fallback: ファイルが存在しない・検証に失敗した場合に使うテンプレート文字列
+        
+    Returns:
+        PromptTemplate（render() で値を埋め込む）。ファイルもfallbackも無い場合はNone
+    """
+    template = get_prompt_registry().get(relative_path)
+    if template is not None:
+        return template
+    if fallback is not None:
+        return compile_fallback_template(relative_path, fallback)
+    return None
+
+
+def render_prompt(relative_path: str, fallback: Optional[str] = None, **values: Any) -> Optional[str]:
+    """
+    プロンプトテンプレートに値を埋め込む（get_prompt_template + render）
+    
+    Returns:
+        埋め込み後の文字列。ファイルもfallbackも無い場合はNone
+    """
+    template = get_prompt_template(relative_path, fallback)
+    if template is None:
+        return None
+    return template.render(**values)
+
+
 def load_analysis_prompt(role_id: str, prompt_type: str) -> Optional[str]:
     """
     分析用プロンプトを読み込む
@@ -100,3 +135,17 @@ def load_agent_prompt_template(agent_id: str) -> Optional[str]:
     filename = f"{agent_id}_prompt.txt"
     content = load_prompt(f"agents/{filename}")
     return content if content else None
+
+
+def render_agent_prompt(agent_id: str, **values: Any) -> Optional[str]:
+    """
+    ADKエージェント実行時のuser promptテンプレートに値を埋め込む
+    
+    Args:
+        agent_id: research, analysis, notification
+        values: プレースホルダの値（topic, description 等）
+        
+    Returns:
+        埋め込み後のプロンプト。テンプレートが存在しない場合はNone（呼び出し側でフォールバック）
+    """
+    return render_prompt(f"agents/{agent_id}_prompt.txt", **values)
@@ -0,0 +1,288 @@
+"""
+プロンプトテンプレートのレジストリ
+config/prompts/ 配下のテンプレートを一度だけ読み込んで検証・プリコンパイルし、メモリ上で保持する。
+ファイルの更新（mtime）を一定間隔で確認して自動で再読み込みし、管理API（POST /api/admin/prompts/reload）からの強制再読み込みにも対応する。
+各テンプレートには内容のハッシュからなるバージョンを付け、分析結果に使用したバージョンを記録できるようにする。
+"""
+
+import hashlib
+import string
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# backend/config/prompts/ のパス（services/prompts/ -> services/ -> backend/）
+_PROMPTS_DIR = Path(__file__).resolve().parent.parent.parent / "config" / "prompts"
+
+# str.format で値を埋め込むテンプレートと、使用できるプレースホルダ（config/prompts/README.md 参照）
+# ここに無いファイル（ロール説明・分析観点・instruction）は値として埋め込まれるだけなので、波括弧はそのまま扱う
+TEMPLATE_PLACEHOLDERS: Dict[str, Tuple[str, ...]] = {
+    "analysis/base.txt": ("role_description", "meeting_transcript", "chat_messages", "materials_content", "analysis_points"),
+    "analysis/multi_perspective.txt": ("role_sections", "role_ids", "meeting_transcript", "chat_messages", "materials_content"),
+    "task_generation.txt": ("analysis_result_json", "decision", "modifications", "interventions"),
+    "repair.txt": ("error", "response_schema", "invalid_output"),
+    "agents/research_prompt.txt": ("topic",),
+    "agents/analysis_prompt.txt": ("description",),
+    "agents/notification_prompt.txt": ("recipients", "document_url", "description"),
+}
+
+_FORMATTER = string.Formatter()
+
+
+@dataclass
+class PromptTemplate:
+    """検証・プリコンパイル済みのプロンプトテンプレート"""
+    path: str  # config/prompts/ からの相対パス
+    text: str
+    version: str  # 内容の sha256 先頭12桁（フォールバックは "fallback-" 接頭辞）
+    mtime_ns: int = 0
+    placeholders: Tuple[str, ...] = ()
+    # (リテラル, プレースホルダ名 or None) の列。書式指定・属性参照を含む場合は None（str.format で描画）
+    _pieces: Optional[List[Tuple[str, Optional[str]]]] = field(default=None, repr=False)
+    _split_points: Dict[Tuple[str, ...], Optional[int]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def compile(cls, path: str, text: str, mtime_ns: int = 0, version: Optional[str] = None) -> "PromptTemplate":
+        """
+        テンプレート文字列を解析して PromptTemplate を作る
+
+        Raises:
+            ValueError: 波括弧の対応が取れていない場合
+        """
+        pieces: List[Tuple[str, Optional[str]]] = []
+        placeholders: List[str] = []
+        simple = True
+        for literal, name, spec, conversion in _FORMATTER.parse(text):
+            pieces.append((literal, name))
+            if name is None:
+                continue
+            if name not in placeholders:
+                placeholders.append(name)
+            if spec or conversion or not name.isidentifier():
+                simple = False
+        return cls(
+            path=path,
+            text=text,
+            version=version or _content_version(text),
+            mtime_ns=mtime_ns,
+            placeholders=tuple(placeholders),
+            _pieces=pieces if simple else None,
+        )
+
+    def render(self, **values: Any) -> str:
+        """
+        プレースホルダに値を埋め込む（str.format と同じ結果。プリコンパイル済みの断片を連結するだけなので解析は行わない）
+
+        Raises:
+            KeyError: 値が渡されていないプレースホルダがある場合
+        """
+        if self._pieces is None:
+            return self.text.format(**values)
+        return _render_pieces(self._pieces, values)
+
+    def render_split(self, shared: Tuple[str, ...], **values: Any) -> Tuple[str, str]:
+        """
+        共有部分（shared のプレースホルダだけで決まる先頭部分）とそれ以降に分けて描画する
+
+        先頭から、shared 以外のプレースホルダが現れる直前の shared プレースホルダまでを共有部分とする。
+        共有部分が無いテンプレート（shared 以外のプレースホルダが先に現れる等）では共有部分は空文字。
+        2つを連結すると render() と同じ文字列になる。
+        """
+        cut = self._split_point(shared)
+        if cut is None:
+            return "", self.render(**values)
+        return _render_pieces(self._pieces[:cut], values), _render_pieces(self._pieces[cut:], values)
+
+    def render_prefix(self, shared: Tuple[str, ...], **values: Any) -> str:
+        """render_split の共有部分だけを描画する（shared 以外の値は不要）"""
+        cut = self._split_point(shared)
+        if cut is None:
+            return ""
+        return _render_pieces(self._pieces[:cut], values)
+
+    def _split_point(self, shared: Tuple[str, ...]) -> Optional[int]:
+        """共有部分に含める断片の数（共有部分が無い場合は None）"""
+        if self._pieces is None:
+            return None
+        if shared not in self._split_points:
+            cut = None
+            for index, (_, name) in enumerate(self._pieces):
+                if name is None:
+                    continue
+                if name not in shared:
+                    break
+                cut = index + 1
+            self._split_points[shared] = cut
+        return self._split_points[shared]
+
+
+class PromptRegistry:
+    """
+    config/prompts/ 配下のテンプレートのキャッシュ
+
+    起動時に全 .txt を読み込み、TEMPLATE_PLACEHOLDERS に登録されたテンプレートは
+    波括弧の対応と未知のプレースホルダを検証する。検証に失敗したファイルは登録せず、呼び出し側のフォールバックを使わせる。
+    get() は check_interval 秒ごとにファイルの mtime を確認し、変更・追加・削除があれば反映する。
+    """
+
+    def __init__(self, prompts_dir: Optional[Path] = None, check_interval: Optional[float] = None):
+        """
+        Args:
+            prompts_dir: テンプレートのディレクトリ（Noneの場合は backend/config/prompts）
+            check_interval: mtime を確認する間隔（秒）。Noneの場合は config.PROMPT_RELOAD_CHECK_SECONDS。0以下なら毎回確認
+        """
+        if check_interval is None:
+            from config import config
+            check_interval = config.PROMPT_RELOAD_CHECK_SECONDS
+        self.prompts_dir = Path(prompts_dir) if prompts_dir is not None else _PROMPTS_DIR
+        self.check_interval = check_interval
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._mtimes: Dict[str, int] = {}  # 読み込み済みファイルの mtime（空・検証失敗のファイルも含め、変更されるまで読み直さない）
+        self._invalid: set = set()  # 検証に失敗したファイル
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.reload()
+
+    def get(self, relative_path: str) -> Optional[PromptTemplate]:
+        """テンプレートを取得（存在しない・空・検証失敗の場合は None）"""
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self._refresh()
+        return self._templates.get(relative_path)
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        全テンプレートを読み込み直す
+
+        Returns:
+            loaded（読み込んだ数）, changed（内容が変わったパス）, invalid（検証に失敗したパス）, versions
+        """
+        with self._lock:
+            previous = {path: t.version for path, t in self._templates.items()}
+            self._templates = {}
+            self._mtimes = {}
+            self._invalid = set()
+            for path, file_path, mtime_ns in self._scan():
+                self._load(path, file_path, mtime_ns)
+            self._last_check = time.monotonic()
+            changed = sorted(
+                path for path in set(previous) | set(self._templates)
+                if previous.get(path) != getattr(self._templates.get(path), "version", None)
+            )
+            logger.info(f"プロンプトテンプレートを読み込みました: {len(self._templates)}件")
+            return {
+                "loaded": len(self._templates),
+                "changed": changed,
+                "invalid": sorted(self._invalid),
+                "versions": self.versions(),
+            }
+
+    def versions(self, prefix: str = "") -> Dict[str, str]:
+        """読み込み済みテンプレートのバージョン（パス → バージョン。prefix で絞り込み）"""
+        return {
+            path: template.version
+            for path, template in sorted(self._templates.items())
+            if path.startswith(prefix)
+        }
+
+    def _refresh(self) -> None:
+        """mtime が変わったファイルだけ読み込み直す"""
+        with self._lock:
+            if time.monotonic() - self._last_check < self.check_interval:
+                return
+            seen = set()
+            for path, file_path, mtime_ns in self._scan():
+                seen.add(path)
+                if self._mtimes.get(path) == mtime_ns:
+                    continue
+                self._load(path, file_path, mtime_ns)
+                logger.info(f"プロンプトテンプレートを再読み込みしました: {path}")
+            for path in set(self._mtimes) - seen:
+                self._mtimes.pop(path, None)
+                self._templates.pop(path, None)
+                self._invalid.discard(path)
+            self._last_check = time.monotonic()
+
+    def _scan(self) -> List[Tuple[str, Path, int]]:
+        """ディレクトリ配下の .txt の (相対パス, 絶対パス, mtime_ns)"""
+        if not self.prompts_dir.is_dir():
+            return []
+        entries = []
+        for file_path in self.prompts_dir.rglob("*.txt"):
+            try:
+                mtime_ns = file_path.stat().st_mtime_ns
+            except OSError:
+                continue
+            entries.append((file_path.relative_to(self.prompts_dir).as_posix(), file_path, mtime_ns))
+        return entries
+
+    def _load(self, path: str, file_path: Path, mtime_ns: int) -> None:
+        """1ファイルを読み込んで検証し、登録する（呼び出し側でロックを取得済み）"""
+        self._templates.pop(path, None)
+        self._invalid.discard(path)
+        self._mtimes[path] = mtime_ns
+        try:
+            text = file_path.read_text(encoding="utf-8").strip()
+        except Exception as e:
+            logger.warning(f"プロンプトファイル読み込み失敗: {path}, error={e}")
+            self._invalid.add(path)
+            return
+        if not text:
+            return
+        expected = TEMPLATE_PLACEHOLDERS.get(path)
+        if expected is None:
+            self._templates[path] = PromptTemplate(path=path, text=text, version=_content_version(text), mtime_ns=mtime_ns)
+            return
+        try:
+            template = PromptTemplate.compile(path, text, mtime_ns=mtime_ns)
+        except ValueError as e:
+            logger.warning(f"プロンプトテンプレートの書式が不正なためフォールバックを使用します: {path}, error={e}")
+            self._invalid.add(path)
+            return
+        unknown = [name for name in template.placeholders if name not in expected]
+        if unknown:
+            logger.warning(f"プロンプトテンプレートに未知のプレースホルダがあるためフォールバックを使用します: {path}, placeholders={unknown}")
+            self._invalid.add(path)
+            return
+        missing = [name for name in expected if name not in template.placeholders]
+        if missing:
+            logger.warning(f"プロンプトテンプレートで使われていないプレースホルダがあります: {path}, placeholders={missing}")
+        self._templates[path] = template
+
+
+def _render_pieces(pieces: List[Tuple[str, Optional[str]]], values: Dict[str, Any]) -> str:
+    """プリコンパイル済みの断片に値を埋め込んで連結"""
+    parts = []
+    for literal, name in pieces:
+        parts.append(literal)
+        if name is not None:
+            value = values[name]
+            parts.append(value if isinstance(value, str) else format(value))
+    return "".join(parts)
+
+
+def _content_version(text: str) -> str:
+    """テンプレート内容のバージョン（sha256 先頭12桁）"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+@lru_cache(maxsize=32)
+def compile_fallback_template(path: str, text: str) -> PromptTemplate:
+    """コード内フォールバックのテンプレートをプリコンパイル（同じ文字列は1回だけ解析）"""
+    return PromptTemplate.compile(path, text, version=f"fallback-{_content_version(text)}")
+
+
+# モジュール単一インスタンス
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry()
+    return _prompt_registry
@@ -0,0 +1,61 @@
+"""
+出力修正依頼用プロンプト生成
+スキーマに合わない（パースできない）LLM出力を、元のプロンプト全体を再送せずに修正させるためのプロンプトを構築
+config/prompts/repair.txt から読み込み、ファイルがなければフォールバック
+"""
+
+import json
+from typing import Any, Dict
+
+from services.prompts.loader import get_prompt_template
+
+# 修正依頼に含める不正な出力の最大文字数（長い出力は末尾を省略）
+_MAX_INVALID_OUTPUT_CHARS = 20000
+
+# フォールバック用テンプレート（ファイル読み込み失敗時）
+_REPAIR_FALLBACK = """以下はJSONスキーマに従って出力されるべきデータですが、スキーマに合っていません。
+内容（評価・判断・文章）は変えずに、指摘された箇所だけを修正したJSONを返してください。
+
+【問題点】
+{error}
+
+【JSONスキーマ】
+{response_schema}
+
+【修正対象の出力】
+{invalid_output}
+
+**重要**:
+- JSON形式のみを返し、説明文やマークダウンは含めない
+- 欠けている必須項目は、出力の他の部分と矛盾しない値で補う"""
+
+
+class RepairPromptBuilder:
+    """出力修正依頼用プロンプトビルダー"""
+
+    @staticmethod
+    def build(invalid_output: str, error: str, response_schema: Dict[str, Any]) -> str:
+        """
+        出力修正依頼用プロンプトを構築
+
+        Args:
+            invalid_output: スキーマに合わなかったLLMの出力
+            error: パースできない理由（EvaluationParser.describe_error）
+            response_schema: 期待するJSONスキーマ（get_response_schema 等）
+
+        Returns:
+            プロンプト文字列
+        """
+        if len(invalid_output) > _MAX_INVALID_OUTPUT_CHARS:
+            invalid_output = invalid_output[:_MAX_INVALID_OUTPUT_CHARS] + "\n…（以下省略）"
+        template = get_prompt_template("repair.txt", _REPAIR_FALLBACK)
+        return template.render(
+            error=error,
+            response_schema=json.dumps(response_schema, ensure_ascii=False, separators=(",", ":")),
+            invalid_output=invalid_output,
+        )
+
+    @staticmethod
+    def role_response_schema(multi_perspective_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """複数ロール一括評価のスキーマから、evaluations 配列の1要素（ロール評価）のスキーマを取り出す"""
+        return multi_perspective_schema["properties"]["evaluations"]["items"]
@@ -6,7 +6,9 @@ config/prompts/task_generation.txt から読み込み、ファイルがなけれ
 
 from typing import Dict, Any, Optional
 import json
-from services.prompts.loader import load_task_generation_template
+from config import config
+from services.prompts.loader import get_prompt_template
+from utils.token_estimator import get_token_estimator
 
 
 # フォールバック用テンプレート（ファイル読み込み失敗時）
@@ -57,6 +59,15 @@ Helmシステムの一部として、Executive承認に基づいて実行可能
 }}"""
 
 
+# 分析プロンプトの共通の先頭部分（評価指示 + 会議・チャット・資料）を前置する場合のつなぎ
+_CONTEXT_BRIDGE = """
+
+---
+上記は分析時に使用した評価指示と入力データです。上記の評価指示ではなく、以下の指示に従ってください（入力データはタスク設計の参考にしてください）。
+
+"""
+
+
 class TaskGenerationPromptBuilder:
     """タスク生成用プロンプトビルダー"""
     
@@ -64,7 +75,8 @@ class TaskGenerationPromptBuilder:
     def build(
         analysis_result: Dict[str, Any],
         approval_data: Dict[str, Any],
-        approved_interventions: Optional[list] = None
+        approved_interventions: Optional[list] = None,
+        context_prefix: Optional[str] = None,
     ) -> str:
         """
         タスク生成用プロンプトを構築
@@ -73,6 +85,8 @@ class TaskGenerationPromptBuilder:
             analysis_result: 分析結果
             approval_data: Executive承認データ
             approved_interventions: 承認された介入案（オプション）
+            context_prefix: 前置する分析プロンプトの共通の先頭部分（オプション。AnalysisPromptBuilder.build_context_prefix）。
+                前置するとプロンプト予算を超える場合は前置しない
             
         Returns:
             プロンプト文字列
@@ -108,20 +122,30 @@ class TaskGenerationPromptBuilder:
                     for mod in modifications
                 ])
         
-        # ファイルからテンプレートを読み込み、失敗時はフォールバック
-        template = load_task_generation_template()
-        if not template:
-            template = _TASK_GENERATION_FALLBACK
+        # ファイルからテンプレートを読み込み（プリコンパイル済み）、失敗時はフォールバック
+        template = get_prompt_template("task_generation.txt", _TASK_GENERATION_FALLBACK)
         
-        prompt = template.format(
+        prompt = template.render(
             analysis_result_json=json.dumps(findings_summary, ensure_ascii=False, indent=2),
             decision=decision,
             modifications=modifications or "なし",
             interventions=interventions_text or "なし"
         )
         
+        if context_prefix:
+            # 前置すると1プロンプトの予算（LLM_PROMPT_TOKEN_BUDGET）を超える場合は前置しない（入力データは参考情報のため）
+            with_context = context_prefix + _CONTEXT_BRIDGE + prompt
+            if TaskGenerationPromptBuilder.fits_budget(with_context):
+                prompt = with_context
+        
         return prompt
     
+    @staticmethod
+    def fits_budget(prompt: str) -> bool:
+        """プロンプトの推定トークン数が1プロンプトの予算（LLM_PROMPT_TOKEN_BUDGET、0は無制限）以内か"""
+        budget = config.LLM_PROMPT_TOKEN_BUDGET
+        return budget <= 0 or get_token_estimator().estimate(prompt) <= budget
+    
     @staticmethod
     def get_response_schema() -> Dict[str, Any]:
         """
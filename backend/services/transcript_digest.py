@@ -0,0 +1,327 @@
+"""
+長時間会議のダイジェスト生成（map-reduce）
+議事録の発言をトークン予算ごとのチャンクに分割し、チャンク単位のシグナル抽出（KPI言及・撤退議論・
+反対意見・発言者統計）を並行に実行して、ロール別プロンプトに埋め込む要約テキストにまとめる。
+"""
+
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config import config
+from utils.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from utils.logger import logger
+from utils.token_estimator import TokenEstimator, get_token_estimator
+
+# ダイジェストに載せる引用1件あたりの最大文字数
+_QUOTE_MAX_CHARS = 120
+# 予算内に収めるため、引用件数をこの件数から半分ずつ減らしていく
+_INITIAL_QUOTES_PER_SECTION = 24
+
+
+@dataclass
+class ChunkSignals:
+    """1チャンク分の抽出結果"""
+    index: int
+    start: int  # チャンク先頭の発言番号（0始まり）
+    end: int  # チャンク末尾の次の発言番号
+    tokens: int
+    speaker_counts: Counter = field(default_factory=Counter)
+    kpi_mentions: List[Dict[str, Any]] = field(default_factory=list)
+    kpi_downgrade_count: int = 0
+    exit_mentions: List[Dict[str, Any]] = field(default_factory=list)
+    opposition_mentions: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class TranscriptDigest:
+    """チャンク抽出結果を集約したダイジェスト"""
+    text: str
+    statement_count: int
+    source_tokens: int
+    digest_tokens: int
+    chunk_count: int
+
+
+def chunk_statements(
+    statements: List[Dict[str, Any]],
+    budget_tokens: int,
+    estimator: Optional[TokenEstimator] = None,
+) -> List[List[int]]:
+    """
+    発言をトークン予算以内のチャンクに分割（発言の途中では切らない）
+
+    予算を1発言で超える場合はその発言だけで1チャンクにする。
+
+    Returns:
+        チャンクごとの [開始発言番号, 終了発言番号(排他), 推定トークン数]
+    """
+    estimator = estimator or get_token_estimator()
+    chunks: List[List[int]] = []
+    start, tokens = 0, 0
+    for i, stmt in enumerate(statements):
+        stmt_tokens = estimator.estimate(_statement_line(stmt))
+        if i > start and tokens + stmt_tokens > budget_tokens:
+            chunks.append([start, i, tokens])
+            start, tokens = i, 0
+        tokens += stmt_tokens
+    if start < len(statements):
+        chunks.append([start, len(statements), tokens])
+    return chunks
+
+
+def extract_chunk_signals(
+    statements: List[Dict[str, Any]],
+    index: int,
+    start: int,
+    end: int,
+    tokens: int,
+    matcher: Optional[KeywordMatcher] = None,
+) -> ChunkSignals:
+    """1チャンクの発言からシグナルを抽出（キーワード辞書は議事録・チャットの解析と共通）"""
+    matcher = matcher or get_keyword_matcher()
+    signals = ChunkSignals(index=index, start=start, end=end, tokens=tokens)
+    for position in range(start, end):
+        stmt = statements[position]
+        speaker = stmt.get("speaker", "Unknown")
+        signals.speaker_counts[speaker] += 1
+        hits = matcher.scan(stmt.get("text", ""))
+        quote = {"position": position, "speaker": speaker, "text": stmt.get("text", "")}
+        if "kpi" in hits:
+            signals.kpi_mentions.append(dict(quote, keyword=hits["kpi"][0]))
+            if "kpi_downgrade" in hits:
+                signals.kpi_downgrade_count += 1
+        if "exit" in hits:
+            signals.exit_mentions.append(quote)
+        if "opposition" in hits or "risk" in hits:
+            signals.opposition_mentions.append(quote)
+    return signals
+
+
+class TranscriptDigestBuilder:
+    """
+    長時間会議の議事録をダイジェストに変換するビルダー
+
+    - map: チャンクごとのシグナル抽出。既定のキーワード抽出は純Pythonの処理でGILの下では並行にしても速くならないため
+      逐次に実行する。extractor を差し替えた場合（LLMによる抽出など待ち時間の長い処理）は、ビルダーで共有する
+      上限付きスレッドプールで並行実行する
+    - reduce: 発言者統計・KPI言及・撤退議論・反対意見を集約し、ダイジェスト予算に収まるよう引用件数を調整
+    - 同じ議事録のダイジェストはロール間で再利用する（ロール別プロンプトごとに作り直さない）
+    """
+
+    def __init__(
+        self,
+        threshold_tokens: Optional[int] = None,
+        chunk_tokens: Optional[int] = None,
+        digest_tokens: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        estimator: Optional[TokenEstimator] = None,
+        extractor: Optional[Callable[..., ChunkSignals]] = None,
+        cache_size: int = 32,
+    ):
+        """
+        Args:
+            threshold_tokens: この推定トークン数を超える議事録をダイジェストに置き換える
+            chunk_tokens: 1チャンクのトークン予算
+            digest_tokens: ダイジェスト全体のトークン予算
+            max_workers: 差し替えた extractor によるチャンク抽出の並行数
+            estimator: トークン推定器（Noneの場合は共有インスタンス）
+            extractor: チャンク抽出関数（extract_chunk_signals と同じ引数。LLMによる抽出への差し替え用）
+            cache_size: 再利用するダイジェストの件数
+        """
+        self.threshold_tokens = config.LONG_INPUT_THRESHOLD_TOKENS if threshold_tokens is None else threshold_tokens
+        self.chunk_tokens = config.LONG_INPUT_CHUNK_TOKENS if chunk_tokens is None else chunk_tokens
+        self.digest_tokens = config.LONG_INPUT_DIGEST_TOKENS if digest_tokens is None else digest_tokens
+        self.max_workers = config.LONG_INPUT_MAX_WORKERS if max_workers is None else max_workers
+        self.estimator = estimator or get_token_estimator()
+        self.extractor = extractor or extract_chunk_signals
+        self._cache: "OrderedDict[str, TranscriptDigest]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def needs_digest(self, text: str) -> bool:
+        """テキストがダイジェストへの置き換え対象か"""
+        return self.estimator.estimate(text) > self.threshold_tokens
+
+    def build(self, statements: List[Dict[str, Any]]) -> TranscriptDigest:
+        """発言リストからダイジェストを生成（同じ発言リストはキャッシュを返す）"""
+        cache_key = self._cache_key(statements)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        chunks = chunk_statements(statements, self.chunk_tokens, self.estimator)
+
+        def extract(item: Any) -> ChunkSignals:
+            return self.extractor(statements, item[0], *item[1])
+
+        executor = self._get_executor() if len(chunks) > 1 else None
+        if executor is None:
+            signals = [extract(item) for item in enumerate(chunks)]
+        else:
+            signals = list(executor.map(extract, enumerate(chunks)))
+        digest = self._reduce(statements, signals)
+        logger.info(
+            f"Transcript digest built: statements={digest.statement_count}, chunks={digest.chunk_count}, "
+            f"tokens={digest.source_tokens}->{digest.digest_tokens}"
+        )
+
+        with self._lock:
+            self._cache[cache_key] = digest
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return digest
+
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        """差し替えた extractor 用の共有スレッドプール（既定の抽出・max_workers<=1 の場合は None で逐次実行）"""
+        if self.extractor is extract_chunk_signals or self.max_workers <= 1:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transcript-digest")
+            return self._executor
+
+    def _reduce(self, statements: List[Dict[str, Any]], signals: List[ChunkSignals]) -> TranscriptDigest:
+        """チャンクの抽出結果を集約し、予算内に収まるダイジェストテキストを組み立てる"""
+        speaker_counts: Counter = Counter()
+        kpi_mentions: List[Dict[str, Any]] = []
+        exit_mentions: List[Dict[str, Any]] = []
+        opposition_mentions: List[Dict[str, Any]] = []
+        for chunk in signals:
+            speaker_counts.update(chunk.speaker_counts)
+            kpi_mentions.extend(chunk.kpi_mentions)
+            exit_mentions.extend(chunk.exit_mentions)
+            opposition_mentions.extend(chunk.opposition_mentions)
+        kpi_downgrade_count = sum(chunk.kpi_downgrade_count for chunk in signals)
+        source_tokens = sum(chunk.tokens for chunk in signals)
+
+        limit = _INITIAL_QUOTES_PER_SECTION
+        while True:
+            text = self._render(
+                statements, signals, speaker_counts, kpi_mentions, kpi_downgrade_count,
+                exit_mentions, opposition_mentions, source_tokens, limit,
+            )
+            digest_tokens = self.estimator.estimate(text)
+            if digest_tokens <= self.digest_tokens or limit == 0:
+                break
+            limit //= 2
+        return TranscriptDigest(
+            text=text,
+            statement_count=len(statements),
+            source_tokens=source_tokens,
+            digest_tokens=digest_tokens,
+            chunk_count=len(signals),
+        )
+
+    @staticmethod
+    def _render(
+        statements: List[Dict[str, Any]],
+        signals: List[ChunkSignals],
+        speaker_counts: Counter,
+        kpi_mentions: List[Dict[str, Any]],
+        kpi_downgrade_count: int,
+        exit_mentions: List[Dict[str, Any]],
+        opposition_mentions: List[Dict[str, Any]],
+        source_tokens: int,
+        limit: int,
+    ) -> str:
+        """ダイジェストテキスト（各セクションの引用は limit 件まで、先頭と末尾から均等に選ぶ）"""
+        total = len(statements) or 1
+        lines = [
+            f"【長時間会議のダイジェスト（自動抽出）】全{len(statements)}発言・推定{source_tokens}トークンを"
+            f"{len(signals)}チャンクに分けて抽出。引用の # は発言番号",
+            "■ 発言者統計: " + "、".join(
+                f"{speaker} {count}件({count / total:.0%})" for speaker, count in speaker_counts.most_common()
+            ),
+            f"■ KPI言及: {len(kpi_mentions)}件（うち下方修正・未達 {kpi_downgrade_count}件）",
+        ]
+        lines.extend(_quote_lines(kpi_mentions, limit))
+        lines.append(f"■ 撤退/ピボット議論: {'あり' if exit_mentions else 'なし'}（{len(exit_mentions)}件）")
+        lines.extend(_quote_lines(exit_mentions, limit))
+        lines.append(f"■ 反対意見・懸念: {len(opposition_mentions)}件")
+        lines.extend(_quote_lines(opposition_mentions, limit))
+        if statements and limit:
+            lines.append("■ 会議の結び:")
+            tail = [
+                {"position": position, "speaker": statements[position].get("speaker", "Unknown"),
+                 "text": statements[position].get("text", "")}
+                for position in range(max(0, len(statements) - min(limit, 5)), len(statements))
+            ]
+            lines.extend(_quote_lines(tail, limit))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _cache_key(statements: List[Dict[str, Any]]) -> str:
+        """発言リストのハッシュ"""
+        digest = hashlib.sha256()
+        for stmt in statements:
+            digest.update(_statement_line(stmt).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+
+def fit_lines(lines: List[str], budget_tokens: int, estimator: Optional[TokenEstimator] = None) -> str:
+    """
+    行リストを予算内に収める（超える場合は先頭と末尾を残して中間を省略）
+
+    チャットログ・会議資料など、チャンク抽出の対象外の長い入力に使う。
+    """
+    estimator = estimator or get_token_estimator()
+    costs = [estimator.estimate(line) + 1 for line in lines]
+    if sum(costs) <= budget_tokens:
+        return "\n".join(lines)
+    head: List[str] = []
+    tail: List[str] = []
+    used = 0
+    i, j = 0, len(lines) - 1
+    # 先頭と末尾から交互に、予算の範囲で行を採用する
+    while i <= j:
+        take_head = len(head) <= len(tail)
+        index = i if take_head else j
+        if used + costs[index] > budget_tokens:
+            break
+        used += costs[index]
+        if take_head:
+            head.append(lines[i])
+            i += 1
+        else:
+            tail.append(lines[j])
+            j -= 1
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head + [f"（中略: {omitted}行）"] + tail[::-1])
+
+
+def _statement_line(stmt: Dict[str, Any]) -> str:
+    """プロンプトに埋め込む1発言分の行（AnalysisPromptBuilder と同じ形式）"""
+    return f"{stmt.get('speaker', 'Unknown')}: {stmt.get('text', '')}"
+
+
+def _quote_lines(quotes: List[Dict[str, Any]], limit: int) -> List[str]:
+    """引用行（limit を超える場合は先頭と末尾から半数ずつ）"""
+    if len(quotes) > limit:
+        head = (limit + 1) // 2
+        quotes = quotes[:head] + quotes[len(quotes) - (limit - head):] if limit else []
+    lines = []
+    for quote in quotes:
+        text = quote["text"]
+        if len(text) > _QUOTE_MAX_CHARS:
+            text = text[:_QUOTE_MAX_CHARS] + "…"
+        lines.append(f"- #{quote['position'] + 1} {quote['speaker']}: {text}")
+    return lines
+
+
+# モジュール単一インスタンス（config から初期化）
+_digest_builder: Optional[TranscriptDigestBuilder] = None
+
+
+def get_transcript_digest_builder() -> TranscriptDigestBuilder:
+    global _digest_builder
+    if _digest_builder is None:
+        _digest_builder = TranscriptDigestBuilder()
+    return _digest_builder
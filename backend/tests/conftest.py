@@ -3,10 +3,18 @@ pytest設定ファイル
 共通のフィクスチャと設定
 """
 
+import os
 import pytest
 import sys
 from pathlib import Path
 
+# LLMレスポンスキャッシュはテスト間で共有しないようメモリ層のみにする
+os.environ.setdefault("LLM_CACHE_DB_PATH", "")
+# LLM使用量台帳もテストではファイルに書かない（メモリ上のDB）
+os.environ.setdefault("LLM_USAGE_LEDGER_DB_PATH", "")
+# トークン推定の補正はテスト用のスタブの使用量で係数が変わらないよう無効にする
+os.environ.setdefault("TOKEN_ESTIMATOR_CALIBRATION_ENABLED", "false")
+
 # プロジェクトルートをパスに追加
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
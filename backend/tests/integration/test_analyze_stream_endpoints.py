@@ -0,0 +1,135 @@
+"""
+ストリーミング系の分析API（バッチ・SSE）のテスト
+
+サーバーを起動せず、FastAPI の TestClient でアプリを直接呼び出す（LLM無効時のモック分析で実行）
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.audit_log import AuditAction, AuditLogService
+from services.llm_backends import FakeLLMBackend
+from services.llm_service import LLMService
+from services.multi_view_analyzer import MultiRoleLLMAnalyzer
+from services.output_service import OutputService
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, sample_meeting_data):
+    """会議データを登録し、監査ログ・出力先を一時ディレクトリにしたクライアント"""
+    monkeypatch.setattr(main, "audit_log_service", AuditLogService(log_dir=str(tmp_path / "audit")))
+    monkeypatch.setattr(main, "output_service", OutputService(output_dir=str(tmp_path / "outputs")))
+    for meeting_id in ("stream_m1", "stream_m2"):
+        monkeypatch.setitem(main.meetings_db, meeting_id, {
+            "meeting_id": meeting_id,
+            "parsed_data": dict(sample_meeting_data),
+        })
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """マルチ視点LLM分析を FakeLLMBackend（チャンク分割のストリーミング応答）で、ゲーティングなしの全ロールで動かす"""
+    service = LLMService(
+        backend=FakeLLMBackend(latency_distribution="fixed", latency_ms=0, stream_chunks=4),
+        admission=LLMAdmissionController(),
+        circuit_breaker=LLMCircuitBreaker(),
+    )
+    service._response_cache = LLMResponseCache(enabled=False)
+    monkeypatch.setattr(main, "multi_view_analyzer", MultiRoleLLMAnalyzer(llm_service=service))
+    monkeypatch.setattr(main.llm_gate, "enabled", False)
+
+
+def _sse_events(text):
+    """SSEの本文を (event, data) のリストにする"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def _audited_analysis_ids():
+    return [
+        entry["resource_id"] for entry in main.audit_log_service.recent_logs
+        if entry["action"] == AuditAction.VIEW_ANALYSIS.value
+    ]
+
+
+class TestAnalyzeBatchEndpoint:
+    """POST /api/analyze/batch のテストクラス"""
+
+    def test_streams_errors_then_results_then_summary(self, client):
+        """入力不備の件を先に返し、分析結果を1行ずつ返した後、最終行で件数を集計する"""
+        response = client.post(
+            "/api/analyze/batch",
+            json={"items": [{"meeting_id": "stream_m1"}, {"meeting_id": "missing"}, {"meeting_id": "stream_m2"}]},
+            headers={"X-User-ID": "auditor"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["error", "result", "result", "summary"]
+        assert lines[0]["index"] == 1
+        assert lines[0]["error"]["error_code"] == "NOT_FOUND"
+        assert sorted(line["index"] for line in lines[1:3]) == [0, 2]
+        assert {line["meeting_id"] for line in lines[1:3]} == {"stream_m1", "stream_m2"}
+        assert {key: lines[3][key] for key in ("total", "completed", "failed")} == {"total": 3, "completed": 2, "failed": 1}
+
+    def test_each_successful_item_is_audited(self, client):
+        """成功した各件を /api/analyze と同じく VIEW_ANALYSIS として監査ログに記録する"""
+        response = client.post(
+            "/api/analyze/batch",
+            json={"items": [{"meeting_id": "stream_m1"}, {"meeting_id": "missing"}, {"meeting_id": "stream_m2"}]},
+            headers={"X-User-ID": "auditor"},
+        )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        analysis_ids = {line["analysis"]["analysis_id"] for line in lines if line["type"] == "result"}
+        assert len(analysis_ids) == 2
+        assert set(_audited_analysis_ids()) == analysis_ids
+        assert {entry["user_id"] for entry in main.audit_log_service.recent_logs} == {"auditor"}
+
+    def test_rejects_empty_batch(self, client):
+        """items が空の場合はストリームを開始せず 400 を返す"""
+        response = client.post("/api/analyze/batch", json={"items": []})
+
+        assert response.status_code == 400
+
+
+class TestAnalyzeStreamEndpoint:
+    """POST /api/analyze/stream のテストクラス"""
+
+    def test_events_arrive_in_order(self, client, fake_llm):
+        """rule_result → gating → ロールの途中経過・確定 → analysis の順に送る"""
+        response = client.post("/api/analyze/stream", json={"meeting_id": "stream_m1"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response.text)
+        names = [name for name, _ in events]
+        assert names[:2] == ["rule_result", "gating"]
+        assert names[-1] == "analysis"
+        role_events = names[2:-1]
+        assert role_events and set(role_events) <= {"role_partial", "role_result"}
+        assert role_events.index("role_partial") < role_events.index("role_result")
+
+        gating = events[1][1]
+        role_results = [data["role_id"] for name, data in events if name == "role_result"]
+        assert sorted(role_results) == sorted(gating["role_ids"])
+        analysis = events[-1][1]["analysis"]
+        assert analysis["analysis_id"] == events[0][1]["analysis_id"]
+        assert _audited_analysis_ids() == [analysis["analysis_id"]]
+
+    def test_unknown_meeting_is_rejected_before_streaming(self, client):
+        """会議データが無い場合はストリームを開始せず 404 を返す"""
+        response = client.post("/api/analyze/stream", json={"meeting_id": "missing"})
+
+        assert response.status_code == 404
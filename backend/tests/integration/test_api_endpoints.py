@@ -5,6 +5,7 @@ APIエンドポイントの統合テスト
       uvicorn main:app --reload --host 0.0.0.0 --port 8000
 """
 
+import json
 import pytest
 import requests
 import time
@@ -175,6 +176,48 @@ class TestAnalyze:
             assert "analysis_id" in data
 
 
+class TestAnalyzeBatch:
+    """バッチ分析APIのテスト"""
+    
+    def test_analyze_batch_streams_ndjson(self, server_check):
+        """完了した分析から順にNDJSONで返し、最終行はサマリー"""
+        requests.post(
+            f"{BASE_URL}/api/meetings/ingest",
+            json={
+                "meeting_id": "test_meeting_batch_001",
+                "metadata": {"meeting_name": "バッチテスト会議", "date": "2025-01-20"}
+            }
+        )
+        
+        response = requests.post(
+            f"{BASE_URL}/api/analyze/batch",
+            json={
+                "items": [
+                    {"meeting_id": "test_meeting_batch_001"},
+                    {"meeting_id": "nonexistent_meeting_batch"},
+                ]
+            },
+            stream=True
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        by_type = {}
+        for line in lines:
+            by_type.setdefault(line["type"], []).append(line)
+        assert by_type["result"][0]["index"] == 0
+        assert "analysis_id" in by_type["result"][0]["analysis"]
+        assert by_type["error"][0]["error"]["error_code"] == "NOT_FOUND"
+        assert lines[-1] == {**lines[-1], "type": "summary", "total": 2, "completed": 1, "failed": 1}
+    
+    def test_analyze_batch_empty_items(self, server_check):
+        """items が空の場合は400"""
+        response = requests.post(f"{BASE_URL}/api/analyze/batch", json={"items": []})
+        
+        assert response.status_code == 400
+
+
 class TestEscalate:
     """エスカレーションAPIのテスト"""
     
@@ -0,0 +1,79 @@
+"""
+LLMレスポンスパースのマイクロベンチマーク（従来実装との比較）
+
+注意:
+- これは「計測用」のテストであり、速度のしきい値で fail させることは目的ではありません（結果が一致することのみ確認）。
+- 記録済みの応答として fake バックエンドの canned JSON（backend/config/fake_llm/）を使い、
+  JSONモードの応答・マークダウンのコードブロックで囲まれた応答・大きなタスク生成の応答を比較します。
+"""
+
+import json
+import re
+import timeit
+import warnings
+from pathlib import Path
+
+import pytest
+
+from services.evaluation import AnalysisResult, EvaluationParser, TaskGenerationResult
+
+RESPONSES_DIR = Path(__file__).resolve().parent.parent.parent / "config" / "fake_llm"
+
+
+def _legacy_extract_json(text):
+    """従来の抽出（コードブロック → 貪欲な \\{.*\\} → 全体）"""
+    match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
+    if match:
+        return match.group(1)
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
+        return match.group(0)
+    return None
+
+
+def _legacy_parse(text, model):
+    """従来のパース（抽出 → json.loads → モデル生成 → dict）"""
+    return model(**json.loads(_legacy_extract_json(text))).dict()
+
+
+def _large_task_response():
+    """タスク数の多いタスク生成の応答（canned 応答のタスクを複製）"""
+    base = json.loads((RESPONSES_DIR / "task_generation.json").read_text(encoding="utf-8"))[0]
+    tasks = []
+    for i in range(60):
+        for task in base["tasks"]:
+            tasks.append({**task, "id": f"{task['id']}_{i}", "dependencies": [f"{d}_{i}" for d in task["dependencies"]]})
+    return {"tasks": tasks, "execution_plan": {**base["execution_plan"], "total_tasks": len(tasks)}}
+
+
+def _recorded_responses():
+    analysis = json.loads((RESPONSES_DIR / "analysis.json").read_text(encoding="utf-8"))[0]
+    large_tasks = _large_task_response()
+    return [
+        ("analysis_json_mode", json.dumps(analysis, ensure_ascii=False), AnalysisResult,
+         EvaluationParser.parse_analysis_response),
+        ("analysis_markdown", "分析結果です。\n```json\n" + json.dumps(analysis, ensure_ascii=False, indent=2) + "\n```",
+         AnalysisResult, EvaluationParser.parse_analysis_response),
+        ("tasks_large_json_mode", json.dumps(large_tasks, ensure_ascii=False), TaskGenerationResult,
+         EvaluationParser.parse_task_generation_response),
+        ("tasks_large_with_preamble", "以下がタスクです。\n" + json.dumps(large_tasks, ensure_ascii=False, indent=2),
+         TaskGenerationResult, EvaluationParser.parse_task_generation_response),
+    ]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name,text,model,parse", _recorded_responses(), ids=lambda v: v if isinstance(v, str) else "")
+def test_parser_benchmark(name, text, model, parse):
+    """従来実装と同じ結果を返すことを確認し、1回あたりの所要時間を比較して出力する"""
+    with warnings.catch_warnings():
+        # 従来実装の .dict() の非推奨警告（計測の妨げになるため抑止）
+        warnings.simplefilter("ignore", DeprecationWarning)
+        assert parse(text) == _legacy_parse(text, model)
+
+        number = 20
+        legacy = min(timeit.repeat(lambda: _legacy_parse(text, model), number=number, repeat=3)) / number
+        current = min(timeit.repeat(lambda: parse(text), number=number, repeat=3)) / number
+    print(
+        f"{name} ({len(text)} chars): legacy={legacy * 1000:.3f}ms, current={current * 1000:.3f}ms, "
+        f"speedup={legacy / current:.2f}x"
+    )
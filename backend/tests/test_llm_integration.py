@@ -3,11 +3,15 @@ LLM統合機能のテスト
 """
 
 import pytest
+import asyncio
+import time
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 from services.llm_service import LLMService
 from services.prompts import AnalysisPromptBuilder, TaskGenerationPromptBuilder
 from services.evaluation import EvaluationParser
 from services.output_service import OutputService
+from utils.llm_response_cache import LLMResponseCache
 import json
 import tempfile
 import os
@@ -52,6 +56,18 @@ class TestAnalysisPromptBuilder:
         assert schema["type"] == "object"
         assert "findings" in schema["properties"]
         assert "overall_score" in schema["properties"]
+    
+    def test_build_multi_perspective_embeds_transcript_once(self):
+        """一括評価プロンプトは議事録を1回だけ含み、全ロールの説明を含む"""
+        meeting_data = {"transcript": "CFO: 今期も下方修正です"}
+        roles = ["executive", "corp_planning", "staff", "governance"]
+        
+        prompt = AnalysisPromptBuilder.build_multi_perspective(meeting_data, role_ids=roles)
+        
+        assert prompt.count("CFO: 今期も下方修正です") == 1
+        for role_id in roles:
+            assert f"role_id: {role_id}" in prompt
+        assert "evaluations" in prompt
 
 
 class TestTaskGenerationPromptBuilder:
@@ -142,6 +158,33 @@ class TestEvaluationParser:
         
         assert result is None
     
+    def test_parse_multi_perspective_response(self):
+        """一括評価レスポンスはロール別に分解され、不正なロールだけ除外される"""
+        evaluation = {
+            "findings": [],
+            "overall_score": 30,
+            "severity": "LOW",
+            "urgency": "LOW",
+            "explanation": "説明"
+        }
+        response_text = json.dumps({
+            "evaluations": [
+                {"role_id": "executive", **evaluation},
+                {"role_id": "staff", **evaluation, "severity": "UNKNOWN"},
+                {"role_id": "unexpected", **evaluation},
+            ]
+        })
+        
+        result = EvaluationParser.parse_multi_perspective_response(response_text, ["executive", "staff"])
+        
+        assert list(result.keys()) == ["executive"]
+        assert "role_id" not in result["executive"]
+        assert result["executive"]["overall_score"] == 30
+    
+    def test_parse_multi_perspective_response_without_evaluations(self):
+        """evaluations 配列が無い場合はNone"""
+        assert EvaluationParser.parse_multi_perspective_response('{"overall_score": 30}') is None
+    
     def test_parse_task_generation_response_valid_json(self):
         """有効なタスク生成JSONレスポンスのパース"""
         response_text = json.dumps({
@@ -216,6 +259,158 @@ class TestLLMService:
         assert len(result["tasks"]) > 0
 
 
+class _SlowSyncModel:
+    """同期APIのみを持つ Gen AI SDK モデルのスタブ"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None):
+        time.sleep(0.2)
+        return SimpleNamespace(
+            text=json.dumps({
+                "findings": [],
+                "overall_score": 30,
+                "severity": "LOW",
+                "urgency": "LOW",
+                "explanation": "説明"
+            }),
+            usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=20),
+        )
+
+
+class TestLLMServiceAsync:
+    """LLMサービス非同期パスのテスト"""
+
+    def _service(self):
+        service = LLMService()
+        service._vertex_ai_available = True
+        service._genai_available = True
+        service._response_cache = LLMResponseCache(enabled=False)
+        return service
+
+    def test_analyze_structure_async_does_not_block_event_loop(self):
+        """同期SDKはスレッドプールで実行され、イベントループは止まらない"""
+        service = self._service()
+        fake_genai = SimpleNamespace(GenerativeModel=_SlowSyncModel)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker_task = asyncio.ensure_future(ticker())
+            result = await service.analyze_structure_async({"transcript": "CFO: 発言"}, role_id="executive")
+            ticker_task.cancel()
+            return result, ticks
+
+        with patch("services.llm_backends.genai", fake_genai, create=True):
+            result, ticks = asyncio.run(run())
+
+        assert result["_llm_status"] == "success"
+        assert result["_usage"] == {"input_tokens": 100, "output_tokens": 20}
+        assert ticks >= 5
+
+    def test_call_llm_async_retries_with_non_blocking_backoff(self):
+        """失敗時は asyncio.sleep でバックオフしてリトライする"""
+        service = self._service()
+        calls = []
+
+        class FlakyModel(_SlowSyncModel):
+            def generate_content(self, prompt, generation_config=None):
+                calls.append(prompt)
+                if len(calls) == 1:
+                    raise RuntimeError("temporary error")
+                return SimpleNamespace(text="{}", usage_metadata=None)
+
+        with patch("services.llm_backends.genai", SimpleNamespace(GenerativeModel=FlakyModel), create=True), \
+                patch("services.llm_service.config.RETRY_INITIAL_DELAY", 0.01):
+            text, usage = asyncio.run(service._call_llm_async("prompt", response_format="json"))
+
+        assert text == "{}"
+        assert usage == {}
+        assert len(calls) == 2
+
+    def test_cached_response_skips_llm_call(self):
+        """同一プロンプトの2回目はキャッシュから返し、トークンを消費しない"""
+        service = self._service()
+        service._response_cache = LLMResponseCache()
+        calls = []
+
+        class CountingModel(_SlowSyncModel):
+            def generate_content(self, prompt, generation_config=None):
+                calls.append(prompt)
+                return SimpleNamespace(
+                    text="{}",
+                    usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=20),
+                )
+
+        with patch("services.llm_backends.genai", SimpleNamespace(GenerativeModel=CountingModel), create=True):
+            first = service._call_llm("prompt", response_format="json")
+            second = asyncio.run(service._call_llm_async("prompt", response_format="json"))
+
+        assert len(calls) == 1
+        assert first == ("{}", {"input_tokens": 100, "output_tokens": 20})
+        assert second[0] == "{}"
+        assert second[1]["cache_hit"] is True
+        assert second[1]["input_tokens"] == 0
+        assert second[1]["saved_input_tokens"] == 100
+
+    def test_unparseable_cached_response_is_invalidated(self):
+        """パースできないレスポンスはキャッシュから削除される"""
+        service = self._service()
+        service._response_cache = LLMResponseCache()
+        prompt = "prompt"
+        cache_key = service._cache_key(prompt, "json", response_schema=AnalysisPromptBuilder.get_response_schema())
+        service._response_cache.set(cache_key, "not json")
+
+        result = service._finalize_analysis("not json", {}, {"statements": []}, None, None, prompt)
+
+        assert result.get("_is_mock") is not False
+        assert service._cached_response(cache_key) is None
+
+    def test_analyze_multi_perspective_async_single_call(self):
+        """一括評価は1回の呼び出しで全ロールの結果とトークン使用量を返す"""
+        service = self._service()
+        calls = []
+        evaluation = {"findings": [], "overall_score": 30, "severity": "LOW", "urgency": "LOW", "explanation": "説明"}
+
+        class MultiModel(_SlowSyncModel):
+            def generate_content(self, prompt, generation_config=None):
+                calls.append(prompt)
+                return SimpleNamespace(
+                    text=json.dumps({"evaluations": [
+                        {"role_id": "executive", **evaluation},
+                        {"role_id": "staff", **evaluation},
+                    ]}),
+                    usage_metadata=SimpleNamespace(prompt_token_count=300, candidates_token_count=80),
+                )
+
+        with patch("services.llm_backends.genai", SimpleNamespace(GenerativeModel=MultiModel), create=True):
+            analyses, usage = asyncio.run(service.analyze_multi_perspective_async(
+                {"transcript": "CFO: 発言"}, role_ids=["executive", "staff"]
+            ))
+
+        assert len(calls) == 1
+        assert set(analyses) == {"executive", "staff"}
+        assert analyses["staff"]["_llm_status"] == "success"
+        assert usage == {"input_tokens": 300, "output_tokens": 80}
+
+    def test_generate_tasks_async_disabled_returns_mock(self):
+        """LLM無効時はモックタスクを返す"""
+        service = LLMService()
+        service._vertex_ai_available = False
+
+        result = asyncio.run(service.generate_tasks_async({"findings": []}, {"decision": "approve"}))
+
+        assert result["_llm_status"] == "disabled"
+        assert len(result["tasks"]) > 0
+
+
 class TestOutputService:
     """出力サービスのテスト"""
     
@@ -0,0 +1,78 @@
+"""
+BatchScoringServiceのユニットテスト
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.batch_scoring import BatchScoringService
+from services.scoring import ScoringService
+from utils.exceptions import ValidationError
+
+
+def _random_columns(rows, seed=0):
+    rnd = random.Random(seed)
+    return {
+        "kpi_downgrade_count": [rnd.randint(0, 4) for _ in range(rows)],
+        "decision_concentration_rate": [rnd.choice([0.0, 0.5, 0.7, 0.8, rnd.random()]) for _ in range(rows)],
+        "ignored_opposition_count": [rnd.randint(0, 3) for _ in range(rows)],
+    }
+
+
+class TestBatchScoringService:
+    """BatchScoringServiceのテストクラス"""
+
+    def setup_method(self):
+        self.batch = BatchScoringService()
+        self.scalar = ScoringService()
+
+    def test_matches_scalar_scoring(self):
+        """加点表による評価は ScoringService.evaluate を1件ずつ呼んだ結果と一致する"""
+        columns = _random_columns(500)
+
+        result = self.batch.score(columns)
+
+        for i in range(500):
+            finding = {
+                "pattern_id": "B1_正当化フェーズ",
+                "quantitative_scores": {name: values[i] for name, values in columns.items()},
+            }
+            expected = self.scalar.evaluate(finding)
+            assert int(result["overall_score"][i]) == expected["overall_score"]
+            assert int(result["importance_score"][i]) == expected["importance_score"]
+            assert int(result["urgency_score"][i]) == expected["urgency_score"]
+            assert result["severity"][i] == expected["severity"]
+            assert result["urgency"][i] == expected["urgency"]
+
+    def test_fixed_scoring_uses_score_column(self):
+        """固定スコア評価は score 列からレベルを決める"""
+        scores = [10, 40, 65, 70, 90]
+
+        result = self.batch.score({"score": scores}, pattern_id="ES1_報告遅延")
+
+        for i, score in enumerate(scores):
+            expected = self.scalar.evaluate({"pattern_id": "ES1_報告遅延", "score": score})
+            assert (result["severity"][i], result["urgency"][i]) == (expected["severity"], expected["urgency"])
+
+    def test_sweep_evaluates_threshold_grid(self):
+        """スコア表候補 × 閾値のグリッドを1回で評価し、閾値ごとのエスカレーション件数を返す"""
+        columns = _random_columns(200, seed=1)
+        thresholds = [40, 50, 60, 70]
+        candidates = [None, {"weights": {"importance": 0.5, "urgency": 0.5}}]
+
+        sweep = self.batch.sweep(columns, thresholds, scoring_candidates=candidates)
+
+        assert sweep["thresholds"] == [40.0, 50.0, 60.0, 70.0]
+        for candidate, override in zip(sweep["candidates"], candidates):
+            overall = self.batch.score(columns, scoring=override)["overall_score"]
+            assert candidate["escalated"].shape == (4, 200)
+            assert candidate["escalation_counts"] == [int((overall >= t).sum()) for t in thresholds]
+            assert sum(candidate["severity_counts"].values()) == 200
+
+    def test_mismatched_column_lengths_are_rejected(self):
+        """列の長さが揃っていない場合は ValidationError"""
+        with pytest.raises(ValidationError):
+            self.batch.score({"kpi_downgrade_count": [1, 2], "ignored_opposition_count": [1]})
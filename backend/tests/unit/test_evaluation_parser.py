@@ -0,0 +1,63 @@
+"""
+EvaluationParser のJSON取り出し（高速パス・括弧の対応による抽出）のユニットテスト
+"""
+
+import json
+import time
+
+from services.evaluation import EvaluationParser
+
+ANALYSIS = {"findings": [], "overall_score": 40, "severity": "MEDIUM", "urgency": "LOW", "explanation": "説明 {注記}"}
+
+
+class TestLoadJson:
+    """EvaluationParser._load_json のテストクラス"""
+
+    def test_json_mode_response_is_decoded_directly(self):
+        """全体がJSONの応答は抽出せずにデコードする"""
+        assert EvaluationParser._load_json("  " + json.dumps(ANALYSIS, ensure_ascii=False) + "\n") == ANALYSIS
+
+    def test_code_block_ignores_braces_after_fence(self):
+        """コードブロックの後ろの括弧は含めない"""
+        text = "結果:\n```json\n" + json.dumps(ANALYSIS, ensure_ascii=False) + "\n```\n補足 {注}"
+
+        assert EvaluationParser._load_json(text) == ANALYSIS
+
+    def test_trailing_object_falls_back_to_brace_matching(self):
+        """後ろに別のオブジェクトがある場合は、最初のオブジェクトを括弧の対応で取り出す（文字列内の括弧は数えない）"""
+        text = 'pre {"a": "}{\\"}", "b": {"c": 1}} mid {"d": 2}'
+
+        assert EvaluationParser._load_json(text) == {"a": '}{"}', "b": {"c": 1}}
+        assert EvaluationParser._extract_json(text) == '{"a": "}{\\"}", "b": {"c": 1}}'
+
+    def test_missing_json_returns_none(self):
+        """JSONが無い・閉じていない場合はNone"""
+        assert EvaluationParser._load_json("JSONはありません") is None
+        assert EvaluationParser._extract_json('{"a": {"b": 1') is None
+
+    def test_unbalanced_input_is_linear(self):
+        """閉じない括弧が大量にあっても線形時間で終わる"""
+        text = "{" * 200000
+
+        start = time.perf_counter()
+        assert EvaluationParser.parse_analysis_response(text) is None
+        assert time.perf_counter() - start < 1.0
+
+
+class TestParseResponses:
+    """パース結果のテストクラス"""
+
+    def test_analysis_with_preamble(self):
+        """説明文つきの応答もバリデーション済みのDictを返す"""
+        text = "以下が分析です。\n" + json.dumps(ANALYSIS, ensure_ascii=False, indent=2) + "\n以上です。"
+
+        result = EvaluationParser.parse_analysis_response(text)
+
+        assert result["overall_score"] == 40
+        assert result["explanation"] == "説明 {注記}"
+
+    def test_invalid_schema_returns_none(self):
+        """スキーマを満たさない応答はNone"""
+        assert EvaluationParser.parse_analysis_response(json.dumps({**ANALYSIS, "severity": "CRITICAL"})) is None
+        assert EvaluationParser.validate_analysis_result(ANALYSIS) is True
+        assert EvaluationParser.validate_task_generation_result({"tasks": []}) is False
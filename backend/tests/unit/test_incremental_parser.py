@@ -0,0 +1,85 @@
+"""
+IncrementalJSONParser / ストリーミング分析のユニットテスト
+"""
+
+import asyncio
+import json
+
+from services.evaluation import EvaluationParser, IncrementalJSONParser
+from services.llm_service import LLMService
+
+ANALYSIS = {
+    "findings": [{"pattern_id": "B1_正当化フェーズ", "severity": "HIGH", "score": 80, "description": "説明, {括弧}\"引用\"",
+                  "evidence": [], "quantitative_scores": {}}],
+    "overall_score": 85,
+    "severity": "HIGH",
+    "urgency": "HIGH",
+    "explanation": "KPI悪化が継続している。",
+}
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestIncrementalJSONParser:
+    """IncrementalJSONParserのテストクラス"""
+
+    def test_values_are_emitted_as_soon_as_closed(self):
+        """数値は区切り文字、文字列は閉じ引用符を受信した時点で確定する"""
+        parser = IncrementalJSONParser()
+
+        assert parser.feed('```json\n{"findings": [], "overall_score": 8') == [(("findings",), [])]
+        assert parser.feed("5,") == [(("overall_score",), 85)]
+        assert parser.feed(' "severity": "HI') == []
+        assert parser.feed('GH"}') == [(("severity",), "HIGH"), ((), {"findings": [], "overall_score": 85, "severity": "HIGH"})]
+        assert parser.complete
+
+    def test_any_chunking_matches_full_parse(self):
+        """どの区切り方で受信しても json.loads と同じ値になり、配列要素も個別に確定する"""
+        document = {"evaluations": [dict(ANALYSIS, role_id="executive"), dict(ANALYSIS, role_id="staff", overall_score=-1.5e1)]}
+        for indent in (None, 2):
+            text = json.dumps(document, ensure_ascii=False, indent=indent)
+            for size in (1, 3, 7, len(text)):
+                parser = IncrementalJSONParser()
+                events = [e for chunk in _chunks(text, size) for e in parser.feed(chunk)]
+
+                assert parser.result == document
+                assert [v["role_id"] for p, v in events if len(p) == 2] == ["executive", "staff"]
+
+    def test_partial_analysis_keeps_only_valid_fields(self):
+        """途中経過は AnalysisResult の制約を満たすフィールドだけを返す"""
+        partial = EvaluationParser.parse_partial_analysis(
+            {"overall_score": 150, "severity": "HIGH", "urgency": "SOON", "explanation": "説明", "findings": [{}, {}]}
+        )
+
+        assert partial == {"severity": "HIGH", "explanation": "説明", "findings_count": 2}
+
+
+class TestStreamingAnalysis:
+    """LLMService のストリーミング分析のテストクラス"""
+
+    def test_partial_fields_are_reported_before_completion(self):
+        """スコア・説明文は確定した順に通知され、最終結果は非ストリーミング版と同じ形式になる"""
+        service = LLMService()
+        service._vertex_ai_available = True
+        text = json.dumps(ANALYSIS, ensure_ascii=False)
+
+        async def fake_stream(prompt, response_format="text", model_name=None, on_text=None, cache_prefix=None,
+                              response_schema=None):
+            for chunk in _chunks(text, 5):
+                on_text(chunk)
+            return text, {"input_tokens": 10, "output_tokens": 5}
+
+        service._call_llm_stream_async = fake_stream
+        partials = []
+        result = asyncio.run(service.analyze_structure_stream_async(
+            {"statements": []}, role_id="executive", on_partial=partials.append
+        ))
+
+        assert partials[0] == {"findings_count": 1}
+        assert partials[1] == {"findings_count": 1, "overall_score": 85}
+        assert partials[-1] == {"findings_count": 1, "overall_score": 85, "severity": "HIGH", "urgency": "HIGH",
+                                "explanation": "KPI悪化が継続している。"}
+        assert result["overall_score"] == 85
+        assert result["_usage"] == {"input_tokens": 10, "output_tokens": 5}
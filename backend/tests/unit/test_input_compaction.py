@@ -0,0 +1,111 @@
+"""
+InputCompactor（プロンプト入力の圧縮）のユニットテスト
+"""
+
+from services.input_compaction import InputCompactor, collect_compaction_stats, is_filler, normalize_text
+from services.prompts.analysis_prompt import AnalysisPromptBuilder
+
+MEETING = {
+    "statements": [
+        {"speaker": "CFO", "text": "えーと、"},
+        {"speaker": "CFO", "text": "成長率は　計画を下回っています。"},
+        {"speaker": "CFO", "text": "ＡＲＰＵも１５％下方修正が必要です。"},
+        {"speaker": "CEO", "text": "うーん…"},
+        {"speaker": "CEO", "text": "はい。"},
+        {"speaker": "CEO", "text": "承認します。"},
+    ]
+}
+CHAT = {
+    "messages": [
+        {"user": "田中", "text": "撤退も検討すべきでは"},
+        {"user": "佐藤", "text": "> 撤退も検討すべきでは\n同意です"},
+        {"user": "佐藤", "text": "> 別スレッドの話\n補足します"},
+        {"user": "田中", "text": "撤退も検討すべきでは"},
+    ]
+}
+
+
+class TestInputCompactor:
+    """InputCompactorのテストクラス"""
+
+    def test_normalize_and_filler(self):
+        """NFKC で全角英数字・空白を揃え、相づちだけの短い発言をフィラーとみなす（同意の発言は残す）"""
+        assert normalize_text("ＡＲＰＵ　は\n１５％") == "ARPU は 15%"
+        assert is_filler("えーと、", 8)
+        assert is_filler("うーん…", 8)
+        assert not is_filler("はい。", 8)
+        assert not is_filler("承認", 8)
+        assert not is_filler("えー" * 10, 8)
+
+    def test_transcript_drops_fillers_and_merges_turns(self):
+        """フィラーを除き、同じ発言者の連続した発言を1行にまとめる"""
+        compacted = InputCompactor(enabled=True).compact(MEETING)
+
+        assert compacted.meeting_transcript == (
+            "CFO: 成長率は 計画を下回っています。 ARPUも15%下方修正が必要です。\n"
+            "CEO: はい。 承認します。"
+        )
+        assert compacted.stats["dropped_fillers"] == 2
+        assert compacted.stats["merged_turns"] == 2
+        assert compacted.stats["after_tokens"] < compacted.stats["before_tokens"]
+        assert compacted.stats["saved_ratio"] > 0
+
+    def test_transcript_text_with_fullwidth_colon(self):
+        """議事録テキストの「発言者：発言」（全角コロン）も発言者ごとにまとめる"""
+        compacted = InputCompactor(enabled=True).compact({"transcript": "CFO：計画未達です\nCFO：下方修正します\n\nCEO：了解"})
+
+        assert compacted.meeting_transcript == "CFO: 計画未達です 下方修正します\nCEO: 了解"
+
+    def test_chat_dedupes_quotes_and_duplicates(self):
+        """既出のメッセージの引用と同じメッセージの重複を除き、未出の引用は残す"""
+        compacted = InputCompactor(enabled=True).compact({"statements": []}, CHAT)
+
+        assert compacted.chat_messages == (
+            "田中: 撤退も検討すべきでは\n"
+            "佐藤: 同意です\n"
+            "佐藤: > 別スレッドの話 補足します"
+        )
+        assert compacted.stats["deduped_quotes"] == 1
+        assert compacted.stats["deduped_messages"] == 1
+
+    def test_materials_keep_lines(self):
+        """会議資料は行構造を残し、空行の連続だけを1行にまとめる"""
+        compacted = InputCompactor(enabled=True).compact({}, None, {"content": "売上　１２０\n\n\n\n利益  ３０\n"})
+
+        assert compacted.materials_content == "売上 120\n\n利益 30"
+
+    def test_result_is_reused_and_totals(self):
+        """同じ入力の圧縮結果は再利用し、累計には1回だけ数える"""
+        compactor = InputCompactor(enabled=True)
+
+        first = compactor.compact(MEETING, CHAT)
+        assert compactor.compact(MEETING, CHAT) is first
+        stats = compactor.get_stats()
+        assert stats["compactions"] == 1
+        assert stats["before_tokens"] == first.stats["before_tokens"]
+
+    def test_collects_stats_actually_used(self):
+        """collect_compaction_stats のブロック内で使った圧縮結果の stats を、再利用した場合も含めて受け取る"""
+        compactor = InputCompactor(enabled=True)
+        first = compactor.compact(MEETING, CHAT)
+
+        with collect_compaction_stats() as used:
+            compactor.compact(MEETING, CHAT)
+        compactor.compact(MEETING)
+
+        assert used == [first.stats]
+        assert compactor.get_stats()["compactions"] == 2
+
+    def test_disabled_passes_through(self):
+        """無効の場合は従来どおりの描画のまま"""
+        compacted = InputCompactor(enabled=False).compact(MEETING, CHAT)
+
+        assert compacted.meeting_transcript.splitlines()[0] == "CFO: えーと、"
+        assert compacted.stats == {"enabled": False}
+
+    def test_prompt_uses_compacted_inputs(self):
+        """ロール別プロンプトには圧縮後の議事録を埋め込む"""
+        prompt = AnalysisPromptBuilder.build_for_role(MEETING, CHAT, role_id="executive")
+
+        assert "CEO: はい。 承認します。" in prompt
+        assert "えーと" not in prompt
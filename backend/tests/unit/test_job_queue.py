@@ -0,0 +1,202 @@
+"""
+JobQueueのユニットテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from services.job_queue import InMemoryJobStore, Job, JobQueue, JobStatus, SQLiteJobStore, create_job_store
+from utils.exceptions import NotFoundError
+
+
+async def _echo(payload):
+    await asyncio.sleep(0.01)
+    return {"echo": payload["value"]}
+
+
+async def _not_found(payload):
+    raise NotFoundError(message="not found", resource_type="meeting", resource_id=payload["value"])
+
+
+class TestJobQueue:
+    """JobQueueのテストクラス"""
+
+    def test_job_runs_to_success_and_notifies_listeners(self):
+        """ジョブは queued → running → succeeded と遷移し、各状態がリスナーに通知される"""
+        queue = JobQueue(workers=2)
+        queue.register_handler("echo", _echo)
+        seen = []
+
+        async def listener(job):
+            seen.append(job.status)
+
+        queue.add_listener(listener)
+
+        async def run():
+            job, created = await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+            await queue.join()
+            await queue.stop()
+            return job, created
+
+        job, created = asyncio.run(run())
+
+        assert created is True
+        stored = queue.get(job.job_id)
+        assert stored.status == JobStatus.SUCCEEDED
+        assert stored.result == {"echo": 1}
+        assert stored.attempts == 1
+        assert seen == [JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.SUCCEEDED]
+
+    def test_enqueue_is_idempotent_per_resource(self):
+        """同一リソースの再投入は実行中・直近成功のジョブを返し、失敗後は新しいジョブを作る"""
+        queue = JobQueue(workers=1)
+        queue.register_handler("echo", _echo)
+        queue.register_handler("fail", _not_found)
+
+        async def run():
+            first, _ = await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+            duplicate, duplicate_created = await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+            await queue.join()
+            after_success, after_success_created = await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+
+            failed, _ = await queue.enqueue("fail", "meeting", "m2", {"value": "m2"})
+            await queue.join()
+            retried, retried_created = await queue.enqueue("fail", "meeting", "m2", {"value": "m2"})
+            await queue.join()
+            await queue.stop()
+            return first, duplicate, duplicate_created, after_success, after_success_created, failed, retried, retried_created
+
+        first, duplicate, duplicate_created, after_success, after_success_created, failed, retried, retried_created = asyncio.run(run())
+
+        assert duplicate.job_id == first.job_id and duplicate_created is False
+        assert after_success.job_id == first.job_id and after_success_created is False
+        assert queue.get(failed.job_id).status == JobStatus.FAILED
+        assert queue.get(failed.job_id).error["error_code"] == "NOT_FOUND"
+        assert retried.job_id != failed.job_id and retried_created is True
+
+    def test_idempotency_ttl_expired_creates_new_job(self):
+        """成功から TTL を過ぎた同一リソースの再投入は新しいジョブになる"""
+        queue = JobQueue(workers=1, idempotency_ttl_seconds=0)
+        queue.register_handler("echo", _echo)
+
+        async def run():
+            first, _ = await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+            await queue.join()
+            await asyncio.sleep(0.01)
+            second, created = await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+            await queue.join()
+            await queue.stop()
+            return first, second, created
+
+        first, second, created = asyncio.run(run())
+
+        assert created is True
+        assert second.job_id != first.job_id
+
+    def test_sqlite_store_requeues_incomplete_jobs(self, tmp_path):
+        """SQLite版は未完了ジョブを保持し、次のワーカー起動時に再投入する"""
+        db_path = str(tmp_path / "jobs.sqlite3")
+
+        # ワーカー起動前にプロセスが終了したケースを再現
+        async def enqueue_only():
+            queue = JobQueue(store=SQLiteJobStore(db_path), workers=1)
+            queue.register_handler("echo", _echo)
+            job, _ = await queue.enqueue("echo", "meeting", "m1", {"value": 42})
+            await queue.stop()
+            return job
+
+        job = asyncio.run(enqueue_only())
+        assert SQLiteJobStore(db_path).get(job.job_id).status == JobStatus.QUEUED
+
+        async def restart():
+            queue = JobQueue(store=SQLiteJobStore(db_path), workers=1)
+            queue.register_handler("echo", _echo)
+            # 同一リソースの再投入は既存ジョブを返しつつ、未完了ジョブをワーカーに流す
+            replay, created = await queue.enqueue("echo", "meeting", "m1", {"value": 42})
+            await queue.join()
+            await queue.stop()
+            return replay, created
+
+        replay, created = asyncio.run(restart())
+
+        assert created is False
+        assert replay.job_id == job.job_id
+        stored = SQLiteJobStore(db_path).get(job.job_id)
+        assert stored.status == JobStatus.SUCCEEDED
+        assert stored.result == {"echo": 42}
+
+    def test_in_memory_store_lists_only_incomplete(self):
+        """list_incomplete は実行待ち・実行中のジョブだけを返す"""
+        store = InMemoryJobStore()
+        queue = JobQueue(store=store, workers=1)
+        queue.register_handler("echo", _echo)
+
+        async def run():
+            await queue.enqueue("echo", "meeting", "m1", {"value": 1})
+            await queue.join()
+            await queue.stop()
+
+        asyncio.run(run())
+
+        assert store.list_incomplete() == []
+
+    def test_in_memory_store_prunes_finished_jobs(self):
+        """上限を超えた分の古い完了ジョブと保持期間切れの完了ジョブを削除し、実行中のジョブは残す"""
+        store = InMemoryJobStore(max_jobs=3, retention_seconds=3600)
+        old = (datetime.now() - timedelta(hours=2)).isoformat()
+        now = datetime.now().isoformat()
+        store.save(Job("expired", "echo", "meeting", "m1", status=JobStatus.SUCCEEDED, finished_at=old))
+        store.save(Job("running", "echo", "meeting", "m1", status=JobStatus.RUNNING))
+        store.save(Job("done", "echo", "meeting", "m2", status=JobStatus.SUCCEEDED, finished_at=now))
+        store.save(Job("new", "echo", "meeting", "m3"))
+
+        assert store.get("expired") is None
+        assert [store.get(job_id) is not None for job_id in ("running", "done", "new")] == [True, True, True]
+        assert store.find_reusable("meeting", "m1", datetime.now() - timedelta(hours=3)).job_id == "running"
+
+        store.save(Job("newer", "echo", "meeting", "m4"))
+        assert store.get("done") is None
+        assert store.find_reusable("meeting", "m2", datetime.now() - timedelta(hours=3)) is None
+
+    def test_concurrent_enqueue_creates_single_job(self, tmp_path):
+        """同一リソースへの同時投入は、確認と作成が別スレッドで実行される SQLite 版でもジョブを1件だけ作る"""
+        queue = JobQueue(store=SQLiteJobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+        queue.register_handler("echo", _echo)
+
+        async def run():
+            results = await asyncio.gather(
+                *(queue.enqueue("echo", "meeting", "m1", {"value": 1}) for _ in range(5))
+            )
+            await queue.join()
+            await queue.stop()
+            return results
+
+        results = asyncio.run(run())
+
+        assert len({job.job_id for job, _ in results}) == 1
+        assert [created for _, created in results].count(True) == 1
+        assert queue._enqueue_locks == {}
+
+    def test_sqlite_store_prunes_finished_jobs(self, tmp_path):
+        """SQLite版もメモリ版と同じく、上限を超えた分の古い完了ジョブと保持期間切れの完了ジョブを削除する"""
+        store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), max_jobs=3, retention_seconds=3600)
+        old = (datetime.now() - timedelta(hours=2)).isoformat()
+        now = datetime.now().isoformat()
+        store.save(Job("expired", "echo", "meeting", "m1", status=JobStatus.SUCCEEDED, finished_at=old))
+        store.save(Job("running", "echo", "meeting", "m1", status=JobStatus.RUNNING))
+        store.save(Job("done", "echo", "meeting", "m2", status=JobStatus.SUCCEEDED, finished_at=now))
+        store.save(Job("new", "echo", "meeting", "m3"))
+
+        assert store.get("expired") is None
+        assert [store.get(job_id) is not None for job_id in ("running", "done", "new")] == [True, True, True]
+
+        store.save(Job("newer", "echo", "meeting", "m4"))
+        assert store.get("done") is None
+        assert store.get("running") is not None
+
+    def test_create_job_store_applies_retention_to_sqlite(self, tmp_path):
+        """create_job_store は SQLite 版にも保持件数・保持期間を渡す"""
+        store = create_job_store("sqlite", str(tmp_path / "jobs.sqlite3"), max_jobs=5, retention_seconds=60)
+
+        assert isinstance(store, SQLiteJobStore)
+        assert (store.max_jobs, store.retention_seconds) == (5, 60)
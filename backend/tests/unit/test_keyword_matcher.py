@@ -0,0 +1,59 @@
+"""
+KeywordMatcherのユニットテスト
+"""
+
+import json
+
+from utils.keyword_matcher import DEFAULT_KEYWORD_SETS, KeywordMatcher, load_keyword_sets
+
+
+class TestKeywordMatcher:
+    """KeywordMatcherのテストクラス"""
+
+    def test_scan_returns_all_categories_in_priority_order(self):
+        """1回の走査で全カテゴリのヒットを返し、カテゴリ内は辞書の並び順になる"""
+        matcher = KeywordMatcher(DEFAULT_KEYWORD_SETS)
+
+        hits = matcher.scan("このままだと問題なので報告しました。撤退すべき")
+
+        assert hits["risk"] == ["問題", "報告"]
+        assert hits["escalation"] == ["報告", "報告しました"]
+        assert hits["opposition"] == ["撤退", "問題"]
+        assert hits["exit"] == ["撤退"]
+        assert "kpi" not in hits
+
+    def test_overlapping_keywords_are_all_found(self):
+        """重なり合う・包含関係にあるキーワードも全て検出する"""
+        matcher = KeywordMatcher({"a": ["he", "she", "his", "hers"]})
+
+        assert matcher.scan("ushers") == {"a": ["he", "she", "hers"]}
+        assert matcher.first("ushers", "a") == "he"
+        assert matcher.first("xyz", "a") is None
+
+    def test_matches_naive_substring_search(self):
+        """素朴な部分文字列検索と同じ結果になる"""
+        matcher = KeywordMatcher(DEFAULT_KEYWORD_SETS)
+        texts = [
+            "",
+            "ARPUは▲6.2%で目標未達。下方修正します",
+            "方向転換かピボットか、やめるか",
+            "上げた方がいいと相談して、エスカレーションを上げました",
+        ]
+        for text in texts:
+            expected = {
+                category: [k for k in keywords if k in text]
+                for category, keywords in DEFAULT_KEYWORD_SETS.items()
+            }
+            assert matcher.scan(text) == {c: v for c, v in expected.items() if v}
+
+    def test_load_keyword_sets_overrides_categories(self, tmp_path):
+        """設定ファイルのカテゴリは既定値を上書きし、含まれないカテゴリは既定値のまま"""
+        path = tmp_path / "keywords.json"
+        path.write_text(json.dumps({"exit": ["撤退", "縮小"], "custom": ["特命"]}), encoding="utf-8")
+
+        keyword_sets = load_keyword_sets(str(path))
+
+        assert keyword_sets["exit"] == ["撤退", "縮小"]
+        assert keyword_sets["custom"] == ["特命"]
+        assert keyword_sets["kpi"] == DEFAULT_KEYWORD_SETS["kpi"]
+        assert load_keyword_sets(str(tmp_path / "missing.json")) == DEFAULT_KEYWORD_SETS
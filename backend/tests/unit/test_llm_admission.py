@@ -0,0 +1,162 @@
+"""
+LLMAdmissionController（RPM / TPM バケット・AIMD ウィンドウ・優先度付き待ち行列）のユニットテスト
+"""
+
+import asyncio
+
+import pytest
+
+from services.llm_service import LLMService
+from utils.llm_admission import (
+    AdmissionTimeout,
+    LLMAdmissionController,
+    current_priority,
+    llm_priority,
+    priority_by_urgency,
+)
+
+
+class TestLLMAdmissionController:
+    """LLMAdmissionControllerのテストクラス"""
+
+    def test_high_urgency_is_admitted_first(self):
+        """枠が空いたら、後から来ても緊急度の高い呼び出しを先に通す"""
+        controller = LLMAdmissionController(initial_concurrency=1, max_concurrency=1)
+        order = []
+
+        async def call(urgency):
+            with llm_priority(urgency):
+                permit = await controller.acquire_async(timeout=5)
+            order.append(urgency)
+            controller.release(permit)
+
+        async def main():
+            first = await controller.acquire_async()
+            waiters = [asyncio.ensure_future(call(u)) for u in ("LOW", "MEDIUM", "HIGH")]
+            await asyncio.sleep(0.01)
+            assert controller.get_stats()["queued_by_priority"] == {"IMMEDIATE": 0, "URGENT": 0, "HIGH": 1, "MEDIUM": 1, "LOW": 1}
+            controller.release(first)
+            await asyncio.gather(*waiters)
+
+        asyncio.run(main())
+
+        assert order == ["HIGH", "MEDIUM", "LOW"]
+
+    def test_request_bucket_limits_and_times_out(self):
+        """RPMを使い切ったら待ち、待ち時間の上限を超えたら AdmissionTimeout"""
+        controller = LLMAdmissionController(requests_per_minute=2)
+        controller.release(controller.acquire())
+        controller.release(controller.acquire())
+
+        with pytest.raises(AdmissionTimeout):
+            controller.acquire(timeout=0.05)
+
+        stats = controller.get_stats()
+        assert stats["admitted"] == 2
+        assert stats["queue_timeouts"] == 1
+        assert stats["queued"] == 0
+
+    def test_token_bucket_settles_with_actual_usage(self):
+        """TPMは推定値で予約し、完了時に実績との差分を返却する"""
+        controller = LLMAdmissionController(tokens_per_minute=1000)
+        permit = controller.acquire(estimated_tokens=600)
+        assert controller.get_stats()["tpm_available"] == pytest.approx(400, abs=1)
+
+        controller.release(permit, actual_tokens=100)
+
+        assert controller.get_stats()["tpm_available"] == pytest.approx(900, abs=1)
+
+    def test_aimd_window(self):
+        """429で半分に狭め（同じ混雑では1回だけ）、成功で少しずつ広げる"""
+        controller = LLMAdmissionController(initial_concurrency=8, max_concurrency=16)
+        before = [controller.acquire() for _ in range(2)]
+
+        controller.release(before[0], outcome="throttled")
+        assert controller.concurrency_limit == 4
+        controller.release(before[1], outcome="timeout")
+        assert controller.concurrency_limit == 4
+
+        for _ in range(4):
+            controller.release(controller.acquire(), outcome="success")
+        assert controller.concurrency_limit == 4
+        assert controller.get_stats()["window"] > 4.9
+        assert controller.get_stats()["window_decreases"] == 1
+
+    def test_cancelled_waiter_leaves_queue(self):
+        """取り消された待ちは待ち行列から外れ、枠を消費しない"""
+        controller = LLMAdmissionController(initial_concurrency=1, max_concurrency=1)
+
+        async def main():
+            holder = await controller.acquire_async()
+            waiter = asyncio.ensure_future(controller.acquire_async(timeout=5))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            controller.release(holder)
+
+        asyncio.run(main())
+
+        stats = controller.get_stats()
+        assert stats["queued"] == 0
+        assert stats["in_flight"] == 0
+        assert controller.acquire(timeout=0.1) is not None
+
+
+class TestLLMPriority:
+    """llm_priority / LLMService の分類のテストクラス"""
+
+    def test_priority_propagates_to_tasks(self):
+        """緊急度の指定は asyncio のタスクに引き継がれ、ブロックを出ると戻る"""
+        async def read_priority():
+            await asyncio.sleep(0)
+            return current_priority()
+
+        async def main():
+            with llm_priority("high"):
+                inner = await asyncio.ensure_future(read_priority())
+            return inner, current_priority()
+
+        assert asyncio.run(main()) == (priority_by_urgency()["HIGH"], priority_by_urgency()["MEDIUM"])
+
+    def test_immediate_and_urgent_rank_above_high(self):
+        """UrgencyLevel の IMMEDIATE・URGENT は HIGH より先に通し、未知の緊急度は MEDIUM として扱う"""
+        priorities = []
+        for urgency in ("immediate", "URGENT", "HIGH", "MEDIUM", "LOW", "unknown", None):
+            with llm_priority(urgency):
+                priorities.append(current_priority())
+
+        assert priorities[:5] == sorted(priorities[:5])
+        assert len(set(priorities[:5])) == 5
+        assert priorities[5] == priorities[6] == priority_by_urgency()["MEDIUM"]
+
+    def test_immediate_is_admitted_before_high(self):
+        """待ち行列では後から来た IMMEDIATE・URGENT の呼び出しを HIGH より先に通す"""
+        controller = LLMAdmissionController(initial_concurrency=1, max_concurrency=1)
+        order = []
+
+        async def call(urgency):
+            with llm_priority(urgency):
+                permit = await controller.acquire_async(timeout=5)
+            order.append(urgency)
+            controller.release(permit)
+
+        async def main():
+            first = await controller.acquire_async()
+            waiters = [asyncio.ensure_future(call(u)) for u in ("HIGH", "URGENT", "IMMEDIATE")]
+            await asyncio.sleep(0.01)
+            controller.release(first)
+            await asyncio.gather(*waiters)
+
+        asyncio.run(main())
+        assert order == ["IMMEDIATE", "URGENT", "HIGH"]
+
+    def test_error_classification(self):
+        """429・クォータ超過は throttled、タイムアウトは timeout、それ以外は error"""
+        class ResourceExhausted(Exception):
+            pass
+
+        assert LLMService._admission_outcome(ResourceExhausted("quota")) == "throttled"
+        assert LLMService._admission_outcome(RuntimeError("429 Too Many Requests")) == "throttled"
+        assert LLMService._admission_outcome(asyncio.TimeoutError()) == "timeout"
+        assert LLMService._admission_outcome(ValueError("bad request")) == "error"
@@ -0,0 +1,190 @@
+"""
+LLMバックエンド（FakeLLMBackend）と LLMService の差し替えのユニットテスト
+"""
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from services.evaluation.schema import AnalysisResult, MultiPerspectiveResult, TaskGenerationResult
+from services.llm_backends import (
+    FakeLLMBackend,
+    GenAIBackend,
+    ResourceExhausted,
+    ServiceUnavailable,
+    create_llm_backend,
+)
+from services.llm_service import LLMService
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています"}], "kpi_mentions": []}
+
+
+def _fake(**kwargs):
+    kwargs.setdefault("latency_distribution", "fixed")
+    kwargs.setdefault("latency_ms", 0)
+    return FakeLLMBackend(**kwargs)
+
+
+def _service(backend):
+    service = LLMService(
+        backend=backend,
+        admission=LLMAdmissionController(),
+        circuit_breaker=LLMCircuitBreaker(),
+    )
+    service._response_cache = LLMResponseCache(enabled=False)
+    return service
+
+
+class TestFakeLLMBackend:
+    """FakeLLMBackendのテストクラス"""
+
+    def test_replays_schema_valid_responses(self):
+        """プロンプトの出力形式に合わせて AnalysisResult / TaskGenerationResult / 複数ロール評価を返す"""
+        model = _fake().model("fake-model")
+
+        analysis = json.loads(model.generate_content("分析してください").text)
+        tasks = json.loads(model.generate_content('{"tasks": [], "execution_plan": {}}').text)
+        multi = json.loads(model.generate_content(
+            '"evaluations"\n### role_id: executive\n説明\n### role_id: staff\n説明'
+        ).text)
+
+        AnalysisResult(**analysis)
+        TaskGenerationResult(**tasks)
+        assert [e.role_id for e in MultiPerspectiveResult(**multi).evaluations] == ["executive", "staff"]
+
+    def test_same_seed_reproduces_sequence(self):
+        """同じ seed・同じプロンプトなら、呼び出しの順序どおりに同じ応答と遅延を再現する"""
+        def run(seed):
+            backend = _fake(seed=seed, latency_distribution="lognormal", latency_ms=500)
+            return [backend.plan("m", f"prompt{i % 3}") for i in range(9)]
+
+        first, second = run(1), run(1)
+
+        assert [(p.text, p.latency) for p in first] == [(p.text, p.latency) for p in second]
+        assert len({p.latency for p in first}) > 1
+
+    def test_latency_distributions(self):
+        """fixed は常に基準値、uniform は基準値 ± spread の範囲"""
+        fixed = _fake(latency_ms=200)
+        uniform = _fake(latency_distribution="uniform", latency_ms=200, latency_spread=0.5)
+
+        assert {fixed.plan("m", str(i)).latency for i in range(10)} == {0.2}
+        assert all(0.1 <= uniform.plan("m", str(i)).latency <= 0.3 for i in range(50))
+        with pytest.raises(ValueError):
+            FakeLLMBackend(latency_distribution="normal")
+
+    def test_error_and_throttle_rates(self):
+        """throttle_rate で 429、error_rate で 503 を送出し、LLMService はそれぞれ throttled / error に分類する"""
+        throttled = _fake(throttle_rate=1.0).model("m")
+        failing = _fake(error_rate=1.0).model("m")
+
+        with pytest.raises(ResourceExhausted) as throttle_error:
+            throttled.generate_content("p")
+        with pytest.raises(ServiceUnavailable) as service_error:
+            failing.generate_content("p")
+
+        assert LLMService._admission_outcome(throttle_error.value) == "throttled"
+        assert LLMService._admission_outcome(service_error.value) == "error"
+
+    def test_token_counts(self):
+        """入力はプロンプトの推定値、出力は output_tokens（0の場合は応答から推定）"""
+        response = _fake(output_tokens=321).model("m").generate_content("prompt")
+
+        assert response.usage_metadata.prompt_token_count > 0
+        assert response.usage_metadata.candidates_token_count == 321
+
+    def test_create_backend(self):
+        """LLM_BACKEND の値でバックエンドを選ぶ（不明な値は genai）"""
+        assert isinstance(create_llm_backend("fake"), FakeLLMBackend)
+        assert isinstance(create_llm_backend("unknown"), GenAIBackend)
+
+
+class TestLLMServiceWithFakeBackend:
+    """LLMService を FakeLLMBackend で動かすテストクラス"""
+
+    def test_analysis_and_task_generation(self):
+        """USE_LLM・APIキーなしでもLLMパスを通り、パース済みの結果を返す"""
+        service = _service(_fake(output_tokens=50))
+
+        analysis = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+        tasks = service.generate_tasks(analysis, {"decision": "approve"})
+        analyses, usage = asyncio.run(service.analyze_multi_perspective_async(MEETING, role_ids=["executive", "staff"]))
+
+        assert analysis["_llm_status"] == "success"
+        assert analysis["_usage"]["output_tokens"] == 50
+        assert tasks["_llm_status"] == "success"
+        assert tasks["tasks"]
+        assert set(analyses) == {"executive", "staff"}
+        assert usage["output_tokens"] == 50
+
+    def test_streaming_notifies_partials(self):
+        """ストリーミングでもチャンクごとに途中経過を通知する"""
+        service = _service(_fake(stream_chunks=8))
+        partials = []
+
+        result = asyncio.run(service.analyze_structure_stream_async(
+            MEETING, role_id="executive", on_partial=partials.append
+        ))
+
+        assert result["_llm_status"] == "success"
+        assert partials
+
+    def test_stream_timeout_excludes_admission_wait(self):
+        """アドミッション制御で待った時間はストリーミング呼び出しのタイムアウトに含めず、失敗として記録しない"""
+        service = _service(_fake(stream_chunks=4))
+        service.timeout = 0.1
+        admit = service._admit_async
+
+        async def slow_admit(prompt):
+            await asyncio.sleep(0.3)
+            return await admit(prompt)
+
+        service._admit_async = slow_admit
+        result = asyncio.run(service.analyze_structure_stream_async(
+            MEETING, role_id="executive", on_partial=lambda fields: None
+        ))
+
+        assert result["_llm_status"] == "success"
+        assert service.circuit_breaker.get_stats()["failures"] == 0
+
+    def test_async_paths_access_cache_off_event_loop(self, tmp_path):
+        """非同期・ストリーミングの呼び出しでは、レスポンスキャッシュ（SQLite層）の読み書きをイベントループのスレッドで行わない"""
+        service = _service(_fake())
+        cache = LLMResponseCache(db_path=str(tmp_path / "cache.sqlite3"))
+        threads = []
+        for name in ("get", "set"):
+            def wrapper(*args, _method=getattr(cache, name), **kwargs):
+                threads.append(threading.get_ident())
+                return _method(*args, **kwargs)
+            setattr(cache, name, wrapper)
+        service._response_cache = cache
+
+        async def run():
+            await service.analyze_structure_async(MEETING, role_id="executive")
+            await service.analyze_structure_stream_async(MEETING, role_id="staff", on_partial=lambda fields: None)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        assert len(threads) == 4
+        assert loop_thread not in threads
+
+    def test_retries_after_fake_error(self):
+        """503 の後はリトライし、リトライで成功すれば結果を返す"""
+        backend = _fake(error_rate=0.5, seed=3)
+        service = _service(backend)
+        service.max_retries = 10
+
+        with patch("services.llm_service.config.RETRY_INITIAL_DELAY", 0.01):
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert result["_llm_status"] == "success"
+        stats = backend.get_stats()
+        assert stats["name"] == "fake"
+        assert stats["errors"] >= 1
@@ -0,0 +1,201 @@
+"""
+LLMCircuitBreaker と LLMService / MultiRoleLLMAnalyzer のフォールバックのユニットテスト
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services.llm_service import LLMService
+from services.multi_view_analyzer import MultiRoleLLMAnalyzer
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import CLOSED, HALF_OPEN, OPEN, LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています"}], "kpi_mentions": []}
+
+
+def _breaker(**kwargs):
+    kwargs.setdefault("min_calls", 4)
+    kwargs.setdefault("open_seconds", 60)
+    return LLMCircuitBreaker(**kwargs)
+
+
+class TestLLMCircuitBreaker:
+    """LLMCircuitBreakerのテストクラス"""
+
+    def test_opens_on_failure_rate(self):
+        """最小呼び出し数に達した時点でエラー率が閾値以上なら開き、呼び出しを拒否する"""
+        breaker = _breaker(failure_rate_threshold=0.5)
+        breaker.record_success(0.1)
+        breaker.record_failure(0.1)
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+
+        breaker.record_failure(0.1)
+
+        assert breaker.state == OPEN
+        assert breaker.is_open()
+        assert not breaker.allow_request()
+        stats = breaker.get_stats()
+        assert stats["opened"] == 1
+        assert stats["rejected"] == 1
+        assert stats["retry_in_seconds"] > 0
+
+    def test_opens_on_slow_rate(self):
+        """エラーが無くても遅延した呼び出しの割合が閾値以上なら開く"""
+        breaker = _breaker(slow_call_seconds=1.0, slow_rate_threshold=0.75)
+        for latency in (2.0, 2.0, 0.1, 3.0):
+            breaker.record_success(latency)
+
+        assert breaker.state == OPEN
+        assert "遅延率" in breaker.get_stats()["last_open_reason"]
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """待ち時間の経過後は試験呼び出しを1件だけ通し、成功なら閉じ、失敗なら再び開く"""
+        breaker = _breaker(min_calls=1, open_seconds=0.05)
+        breaker.record_failure(0.1)
+        time.sleep(0.06)
+
+        assert breaker.state == HALF_OPEN
+        assert not breaker.is_open()
+        probe = breaker.allow_request()
+        assert probe is not None and probe.probe
+        assert breaker.allow_request() is None
+        breaker.record_failure(0.1, probe)
+        assert breaker.state == OPEN
+
+        time.sleep(0.06)
+        probe = breaker.allow_request()
+        breaker.record_success(0.1, probe)
+        assert breaker.state == CLOSED
+        assert breaker.allow_request()
+
+    def test_abandoned_probe_frees_slot(self):
+        """取り消した試験呼び出しは判定に使わず、次の試験呼び出しを通す"""
+        breaker = _breaker(min_calls=1, open_seconds=0.01)
+        breaker.record_failure(0.1)
+        time.sleep(0.02)
+
+        breaker.abandon(breaker.allow_request())
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request()
+
+    def test_stale_pre_open_result_does_not_settle_half_open(self):
+        """open 前に許可された遅い呼び出しが half_open 中に返っても、試験呼び出しとして数えない"""
+        breaker = _breaker(min_calls=1, open_seconds=0.01)
+        stale = breaker.allow_request()
+        breaker.record_failure(0.1, breaker.allow_request())
+        time.sleep(0.02)
+        probe = breaker.allow_request()
+
+        breaker.record_success(0.1, stale)
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request() is None
+
+        breaker.record_success(0.1, probe)
+        assert breaker.state == CLOSED
+
+    def test_stale_abandon_keeps_probe_slot(self):
+        """open 前に許可された呼び出しを取り消しても、実行中の試験呼び出しの枠は空けない"""
+        breaker = _breaker(min_calls=1, open_seconds=0.01)
+        stale = breaker.allow_request()
+        breaker.record_failure(0.1, breaker.allow_request())
+        time.sleep(0.02)
+        probe = breaker.allow_request()
+
+        breaker.abandon(stale)
+
+        assert breaker.allow_request() is None
+        breaker.record_failure(0.1, probe)
+        assert breaker.state == OPEN
+
+    def test_probe_from_previous_half_open_is_ignored(self):
+        """前回の half_open の試験呼び出しの結果は、次の half_open の判定に使わない"""
+        breaker = _breaker(min_calls=1, open_seconds=0.01, half_open_probes=2)
+        breaker.record_failure(0.1)
+        time.sleep(0.02)
+        old_probe = breaker.allow_request()
+        breaker.record_failure(0.1, breaker.allow_request())
+        time.sleep(0.02)
+        probe = breaker.allow_request()
+
+        breaker.record_failure(0.1, old_probe)
+        assert breaker.state == HALF_OPEN
+
+        breaker.record_success(0.1, probe)
+        breaker.record_success(0.1, breaker.allow_request())
+        assert breaker.state == CLOSED
+
+
+class _FailingModel:
+    calls = 0
+
+    def __init__(self, name):
+        pass
+
+    def generate_content(self, contents, generation_config=None):
+        _FailingModel.calls += 1
+        raise RuntimeError("503 Service Unavailable")
+
+
+class TestLLMServiceCircuitBreaker:
+    """LLMService のサーキットブレーカー連携のテストクラス"""
+
+    def _service(self, breaker):
+        service = LLMService(admission=LLMAdmissionController(), circuit_breaker=breaker)
+        service._vertex_ai_available = True
+        service._genai_available = True
+        service._response_cache = LLMResponseCache(enabled=False)
+        return service
+
+    def test_open_breaker_returns_mock_without_calling(self):
+        """開いている間は分析・タスク生成ともLLMを呼ばずに circuit_open のモックを返す"""
+        breaker = _breaker(min_calls=1)
+        breaker.record_failure(0.1)
+        service = self._service(breaker)
+        _FailingModel.calls = 0
+
+        with patch("services.llm_backends.genai", SimpleNamespace(GenerativeModel=_FailingModel), create=True):
+            analysis = service.analyze_structure(MEETING, role_id="executive")
+            analysis_async = asyncio.run(service.analyze_structure_async(MEETING, role_id="staff"))
+            tasks = service.generate_tasks({"findings": []}, {"decision": "approve"})
+
+        assert _FailingModel.calls == 0
+        assert analysis["_llm_status"] == "circuit_open"
+        assert analysis_async["_llm_status"] == "circuit_open"
+        assert tasks["_llm_status"] == "circuit_open"
+        assert tasks["_is_mock"] is True
+
+    def test_breaker_opening_stops_retries(self):
+        """リトライ中にブレーカーが開いたら、残りの試行とバックオフを待たずにフォールバックする"""
+        service = self._service(_breaker(min_calls=1))
+        service.max_retries = 3
+        _FailingModel.calls = 0
+
+        with patch("services.llm_backends.genai", SimpleNamespace(GenerativeModel=_FailingModel), create=True), \
+                patch("services.llm_service.config.RETRY_INITIAL_DELAY", 0.01):
+            result = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+
+        assert _FailingModel.calls == 1
+        assert result["_llm_status"] == "circuit_open"
+        assert service.circuit_breaker.get_stats()["failures"] == 1
+
+
+class TestMultiRoleCircuitBreaker:
+    """MultiRoleLLMAnalyzer のサーキットブレーカー連携のテストクラス"""
+
+    def test_skips_roles_while_open(self):
+        """開いている間はロールを評価せず、ルールベースのみで判断させる"""
+        breaker = _breaker(min_calls=1)
+        breaker.record_failure(0.1)
+        llm = SimpleNamespace(_vertex_ai_available=True, model_name="fake", circuit_breaker=breaker)
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm)
+
+        outcome = asyncio.run(analyzer.run_roles_async(MEETING))
+
+        assert outcome.circuit_open is True
+        assert outcome.results == []
+        assert outcome.llm_calls == 0
@@ -0,0 +1,123 @@
+"""
+LLMContextCache と共通の先頭部分を持つロール別プロンプトのユニットテスト
+"""
+
+import threading
+
+from services.llm_service import LLMService
+from services.prompts.analysis_prompt import AnalysisPromptBuilder
+from utils.llm_context_cache import FakeContextCacheBackend, LLMContextCache
+
+ROLES = ["executive", "corp_planning", "staff", "governance"]
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています。下方修正が必要です。"}] * 20}
+CHAT = {"messages": [{"user": "a", "text": "このままだとリスクが高い"}]}
+
+
+def _cache(backend=None, **kwargs):
+    kwargs.setdefault("min_tokens", 10)
+    return LLMContextCache(backend=backend or FakeContextCacheBackend(), **kwargs)
+
+
+class TestRolePromptPrefix:
+    """ロール別プロンプトの共通の先頭部分のテストクラス"""
+
+    def test_prefix_is_shared_across_roles(self):
+        """先頭部分は全ロールで同一で、入力データを含み、連結すると build_for_role と一致する"""
+        parts = {role: AnalysisPromptBuilder.build_for_role_parts(MEETING, CHAT, role_id=role) for role in ROLES}
+        prefixes = {prefix for prefix, _ in parts.values()}
+
+        assert len(prefixes) == 1
+        prefix = prefixes.pop()
+        assert "成長率は計画を下回っています" in prefix
+        assert "このままだとリスクが高い" in prefix
+        assert prefix == AnalysisPromptBuilder.build_context_prefix(MEETING, CHAT)
+        for role, (head, rest) in parts.items():
+            assert head + rest == AnalysisPromptBuilder.build_for_role(MEETING, CHAT, role_id=role)
+            assert "【あなたのロール】" in rest
+
+
+class TestLLMContextCache:
+    """LLMContextCacheのテストクラス"""
+
+    def test_concurrent_roles_create_once(self):
+        """同じ先頭部分を並行に要求しても作成は1回で、残りは再利用になる"""
+        backend = FakeContextCacheBackend()
+        cache = _cache(backend)
+        prefix = AnalysisPromptBuilder.build_context_prefix(MEETING, CHAT)
+        entries = []
+        threads = [threading.Thread(target=lambda: entries.append(cache.acquire("m", prefix))) for _ in ROLES]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(backend.created) == 1
+        assert len({id(e) for e in entries}) == 1
+        stats = cache.get_stats()
+        assert stats["creates"] == 1
+        assert stats["reuses"] == len(ROLES) - 1
+        assert stats["reused_prefix_tokens"] == entries[0].prefix_tokens * (len(ROLES) - 1)
+
+    def test_small_prefix_and_lookup_only(self):
+        """小さすぎる先頭部分はキャッシュせず、create=False では作成しない"""
+        backend = FakeContextCacheBackend()
+        cache = _cache(backend, min_tokens=10_000)
+
+        assert cache.acquire("m", "短い先頭部分") is None
+        assert cache.acquire("m", "x" * 50_000, create=False) is None
+        assert not cache.contains("m", "x" * 50_000)
+        assert backend.created == []
+        assert cache.get_stats()["skipped_small"] == 1
+
+    def test_failed_creation_is_not_retried(self):
+        """作成に失敗した先頭部分は有効期間中は再作成しない"""
+        cache = _cache(FakeContextCacheBackend(fail=True))
+
+        assert cache.acquire("m", "共通の先頭部分" * 10) is None
+        assert cache.acquire("m", "共通の先頭部分" * 10) is None
+        assert cache.get_stats()["create_failures"] == 1
+
+    def test_eviction_and_invalidate_delete_provider_cache(self):
+        """上限超過で追い出したキャッシュ・破棄したキャッシュはプロバイダ側からも削除する"""
+        backend = FakeContextCacheBackend()
+        cache = _cache(backend, max_entries=1)
+        first = cache.acquire("m", "先頭部分A" * 10)
+        second = cache.acquire("m", "先頭部分B" * 10)
+
+        assert backend.deleted == [first.handle["name"]]
+        cache.invalidate(second)
+        assert backend.deleted == [first.handle["name"], second.handle["name"]]
+        assert cache.acquire("m", "先頭部分B" * 10) is not second
+
+
+class TestLLMServiceContextCache:
+    """LLMService のコンテキストキャッシュ利用のテストクラス"""
+
+    def test_context_model_sends_only_role_part(self):
+        """キャッシュを使える場合はロール別の残りだけを送信する"""
+        cache = _cache()
+        service = LLMService(context_cache=cache)
+        prompt, prefix = service._build_analysis_prompt(MEETING, CHAT, None, "staff")
+
+        model, contents, entry = service._context_model(service.model_name, prompt, prefix)
+
+        assert entry is not None
+        assert model["prefix"] == prefix
+        assert prefix + contents == prompt
+
+    def test_task_prompt_reuses_live_analysis_context(self):
+        """タスク生成は分析時のキャッシュが残っている場合だけ先頭部分を前置する"""
+        cache = _cache()
+        service = LLMService(context_cache=cache)
+        analysis = {"findings": [{"pattern_id": "B1_正当化フェーズ", "description": "d", "severity": "HIGH", "score": 85}]}
+        approval = {"decision": "approve"}
+
+        prompt, prefix = service._build_task_prompt(analysis, approval, None, MEETING, CHAT, None)
+        assert prefix is None
+        assert "成長率は計画を下回っています" not in prompt
+
+        cache.acquire(service.model_name, AnalysisPromptBuilder.build_context_prefix(MEETING, CHAT))
+        prompt, prefix = service._build_task_prompt(analysis, approval, None, MEETING, CHAT, None)
+        assert prefix == AnalysisPromptBuilder.build_context_prefix(MEETING, CHAT)
+        assert prompt.startswith(prefix)
+        assert "B1_正当化フェーズ" in prompt[len(prefix):]
@@ -0,0 +1,96 @@
+"""
+LLMGateのユニットテスト
+"""
+
+from services.ensemble_scoring import EnsembleScoringService
+from services.escalation_engine import EscalationEngine
+from services.llm_gating import LLMGate
+from services.multi_view_analyzer import RoleConfig
+
+ROLES = [
+    RoleConfig(role_id="executive", weight=0.4),
+    RoleConfig(role_id="corp_planning", weight=0.3),
+    RoleConfig(role_id="staff", weight=0.2),
+    RoleConfig(role_id="governance", weight=0.1),
+]
+FINDING = {"pattern_id": "B1_正当化フェーズ", "severity": "MEDIUM"}
+
+
+def _rule(score, severity="LOW", findings=None):
+    return {"overall_score": score, "severity": severity, "urgency": "LOW", "explanation": "", "findings": findings or []}
+
+
+def _engine(demo_mode=False):
+    engine = EscalationEngine(escalation_threshold=70)
+    engine.demo_mode = demo_mode
+    return engine
+
+
+def _gate(demo_mode=False, **kwargs):
+    engine = _engine(demo_mode)
+    return LLMGate(escalation_engine=engine, roles=ROLES, enabled=True, probe_role="executive", **kwargs), engine
+
+
+class TestLLMGate:
+    """LLMGateのテストクラス"""
+
+    def test_decided_escalation_skips_all_roles(self):
+        """ルールだけでエスカレーションが確定する場合はLLMを呼ばず、全ロールをスキップとして記録する"""
+        gate, _ = _gate()
+
+        decision = gate.decide(_rule(95, "CRITICAL", [FINDING]))
+
+        assert decision.mode == "skip"
+        assert decision.role_ids == []
+        assert [s["role_id"] for s in decision.skipped_roles] == ["executive", "corp_planning", "staff", "governance"]
+        assert decision.skipped_roles[0] == {"role_id": "executive", "weight": 0.4, "reason": "escalation_decided"}
+
+    def test_borderline_score_runs_all_roles(self):
+        """LLMスコア次第で閾値をまたぐ場合は全ロールを評価する"""
+        gate, _ = _gate()
+
+        decision = gate.decide(_rule(60, "MEDIUM", [FINDING]))
+
+        assert decision.mode == "full"
+        assert len(decision.role_ids) == 4
+        assert decision.skipped_roles == []
+
+    def test_healthy_meeting_runs_probe_role_only(self):
+        """severity の引き上げでしか判断が変わらない健全な会議は代表ロール1つだけ評価する"""
+        gate, _ = _gate()
+
+        decision = gate.decide(_rule(0))
+
+        assert decision.mode == "probe"
+        assert decision.role_ids == ["executive"]
+        assert len(decision.skipped_roles) == 3
+
+    def test_empty_probe_role_skips_and_disabled_gate_runs_all(self):
+        """probe ロール未設定なら skip、ゲーティング無効なら常に全ロール"""
+        engine = _engine()
+
+        assert LLMGate(engine, ROLES, enabled=True, probe_role="").decide(_rule(0)).mode == "skip"
+        assert LLMGate(engine, ROLES, enabled=False).decide(_rule(95, "CRITICAL")).mode == "full"
+
+    def test_skip_never_changes_escalation_decision(self):
+        """skip / probe の判定は、どのLLM結果でもスキップしたロールが判断を覆さない範囲に限られる"""
+        ensemble = EnsembleScoringService()
+        llm_outcomes = [(score, severity) for score in (0, 35, 70, 100) for severity in ("LOW", "MEDIUM", "HIGH", "CRITICAL")]
+        for demo_mode in (False, True):
+            gate, engine = _gate(demo_mode=demo_mode)
+            for score in range(0, 101, 5):
+                for severity in ("LOW", "MEDIUM", "HIGH", "CRITICAL"):
+                    for findings in ([], [FINDING]):
+                        rule = _rule(score, severity, findings)
+                        decision = gate.decide(rule)
+                        baseline = engine.should_escalate(rule)
+                        for llm_score, llm_severity in llm_outcomes:
+                            roles = [
+                                {"role_id": r.role_id, "weight": r.weight, "overall_score": llm_score,
+                                 "severity": llm_severity if decision.mode != "probe" else "MEDIUM"}
+                                for r in ROLES
+                            ]
+                            combined = ensemble.combine(rule, roles)
+                            combined["findings"] = findings
+                            if decision.mode == "skip" or (decision.mode == "probe" and llm_severity == "MEDIUM"):
+                                assert engine.should_escalate(combined) == baseline, (rule, llm_score, llm_severity)
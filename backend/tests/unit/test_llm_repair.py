@@ -0,0 +1,203 @@
+"""
+構造化出力（response_schema）・パース失敗率・出力修正依頼のユニットテスト
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services.evaluation import EvaluationParser
+from services.evaluation.schema import AnalysisResult
+from services.llm_backends import to_gemini_schema
+from services.llm_service import LLMService
+from services.prompts import AnalysisPromptBuilder, RepairPromptBuilder
+from utils.latency_histogram import ModelLatencyHistograms
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています"}]}
+ANALYSIS = {"findings": [], "overall_score": 40, "severity": "MEDIUM", "urgency": "LOW", "explanation": "説明"}
+VALID = json.dumps(ANALYSIS)
+INVALID = json.dumps({**ANALYSIS, "severity": "CRITICAL"})
+
+
+def _fake_genai(responses, calls):
+    """呼び出しの順に responses の応答を返す Gen AI SDK のスタブ（calls に (モデル, プロンプト, 生成設定) を記録）"""
+    class Model:
+        def __init__(self, name):
+            self.name = name
+
+        def _respond(self, contents, generation_config):
+            calls.append((self.name, contents, generation_config))
+            return SimpleNamespace(
+                text=responses[len(calls) - 1],
+                usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=10),
+            )
+
+        async def generate_content_async(self, contents, generation_config=None, stream=False):
+            return self._respond(contents, generation_config)
+
+        def generate_content(self, contents, generation_config=None):
+            return self._respond(contents, generation_config)
+
+    return SimpleNamespace(GenerativeModel=Model)
+
+
+def _service(chain=("primary",)):
+    service = LLMService(
+        model_name=chain[0],
+        model_chain=list(chain[1:]),
+        admission=LLMAdmissionController(),
+        circuit_breaker=LLMCircuitBreaker(),
+        latency=ModelLatencyHistograms(),
+    )
+    service._vertex_ai_available = True
+    service._genai_available = True
+    service._response_cache = LLMResponseCache(enabled=False)
+    service.max_retries = 1
+    return service
+
+
+class TestResponseSchema:
+    """生成設定の response_schema のテストクラス"""
+
+    def test_gemini_schema_drops_unsupported_keywords(self):
+        """型名を大文字にし、minimum / maximum 等の対応していないキーワードを除く"""
+        schema = to_gemini_schema(AnalysisPromptBuilder.get_response_schema())
+
+        assert schema["type"] == "OBJECT"
+        assert schema["properties"]["overall_score"] == {"type": "INTEGER"}
+        assert schema["properties"]["severity"]["enum"] == ["HIGH", "MEDIUM", "LOW"]
+        assert schema["properties"]["findings"]["items"]["required"][0] == "pattern_id"
+
+    def test_schema_is_passed_to_model(self):
+        """JSON応答の呼び出しでは生成設定に response_schema を渡す（無効化した場合は渡さない）"""
+        calls = []
+        service = _service()
+
+        with patch("services.llm_backends.genai", _fake_genai([VALID, VALID], calls), create=True):
+            service.analyze_structure(MEETING, role_id="executive")
+            with patch("services.llm_service.config.LLM_RESPONSE_SCHEMA_ENABLED", False):
+                service.analyze_structure(MEETING, role_id="staff")
+
+        assert calls[0][2]["response_schema"]["properties"]["explanation"] == {"type": "STRING"}
+        assert "response_schema" not in calls[1][2]
+
+    def test_schema_toggle_does_not_replay_cached_response(self):
+        """スキーマなしでキャッシュした応答は、スキーマを有効にした後の同じプロンプトには返さない"""
+        calls = []
+        service = _service()
+        service._response_cache = LLMResponseCache()
+
+        with patch("services.llm_backends.genai", _fake_genai([VALID, VALID, VALID], calls), create=True):
+            with patch("services.llm_service.config.LLM_RESPONSE_SCHEMA_ENABLED", False):
+                service.analyze_structure(MEETING, role_id="executive")
+                service.analyze_structure(MEETING, role_id="executive")
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert len(calls) == 2
+        assert "response_schema" not in calls[0][2]
+        assert "response_schema" in calls[1][2]
+        assert result["_llm_status"] == "success"
+
+
+class TestRepair:
+    """出力修正依頼のテストクラス"""
+
+    def test_repairs_on_same_model_before_fallback(self):
+        """パースできない応答は、次のモデルに進まず同じモデルに不正な出力と問題点だけを送って修正させる"""
+        calls = []
+        service = _service(("primary", "light"))
+
+        with patch("services.llm_backends.genai", _fake_genai([INVALID, VALID], calls), create=True):
+            result = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+
+        assert [model for model, _, _ in calls] == ["primary", "primary"]
+        repair_prompt = calls[1][1]
+        assert INVALID in repair_prompt
+        assert "severity" in repair_prompt
+        assert "会議" not in repair_prompt  # 元のプロンプト（議事録等）は再送しない
+        assert result["_llm_model"] == "primary"
+        assert result["_usage"] == {"input_tokens": 200, "output_tokens": 20}
+        parse = service.get_routing_stats()["parse"]["primary"]
+        assert parse["responses"] == 1
+        assert parse["parse_failures"] == 1
+        assert parse["repair_successes"] == 1
+        assert parse["failure_rate"] == 1.0
+        assert service.get_routing_stats()["fallbacks"] == 0
+
+    def test_falls_back_when_repair_fails(self):
+        """修正後もパースできない場合はチェーンの次のモデルで再試行する"""
+        calls = []
+        service = _service(("primary", "light"))
+
+        with patch("services.llm_backends.genai", _fake_genai(["not json", "still not json", VALID], calls), create=True):
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert [model for model, _, _ in calls] == ["primary", "primary", "light"]
+        assert result["_llm_model"] == "light"
+        stats = service.get_routing_stats()["parse"]
+        assert stats["primary"]["repairs"] == 1
+        assert stats["primary"]["repair_successes"] == 0
+        assert stats["light"]["failure_rate"] == 0.0
+
+    def test_only_failing_role_is_repaired(self):
+        """一括評価でバリデーションに失敗したロールだけを修正依頼し、応答に無いロールは依頼しない"""
+        multi = json.dumps({"evaluations": [
+            {"role_id": "executive", **ANALYSIS},
+            {"role_id": "staff", **ANALYSIS, "overall_score": 150},
+        ]})
+        repaired = json.dumps({"role_id": "staff", **ANALYSIS, "overall_score": 100})
+        for run in ("sync", "async"):
+            calls = []
+            service = _service()
+            with patch("services.llm_backends.genai", _fake_genai([multi, repaired], calls), create=True):
+                if run == "sync":
+                    results, usage = service.analyze_multi_perspective(
+                        MEETING, role_ids=["executive", "staff", "governance"]
+                    )
+                else:
+                    results, usage = asyncio.run(service.analyze_multi_perspective_async(
+                        MEETING, role_ids=["executive", "staff", "governance"]
+                    ))
+
+            assert len(calls) == 2
+            assert '"executive"' not in calls[1][1]
+            assert "role_id" in calls[1][2]["response_schema"]["required"]
+            assert set(results) == {"executive", "staff"}
+            assert results["staff"]["overall_score"] == 100
+            assert results["staff"]["_repaired"] is True
+            assert "_repaired" not in results["executive"]
+            assert usage == {"input_tokens": 200, "output_tokens": 20}
+            assert service.get_routing_stats()["parse"]["primary"]["role_failures"] == 1
+
+    def test_repair_disabled(self):
+        """LLM_REPAIR_ENABLED=false の場合は修正依頼しない"""
+        calls = []
+        service = _service()
+
+        with patch("services.llm_backends.genai", _fake_genai([INVALID], calls), create=True), \
+                patch("services.llm_service.config.LLM_REPAIR_ENABLED", False):
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert len(calls) == 1
+        assert result["_llm_status"] == "mock_fallback"
+
+
+class TestRepairPrompt:
+    """修正依頼プロンプト・問題点の説明のテストクラス"""
+
+    def test_describe_error(self):
+        """スキーマ違反の項目・JSONの構文エラーを説明し、パースできる応答はNone"""
+        assert "severity" in EvaluationParser.describe_error(INVALID, AnalysisResult)
+        assert EvaluationParser.describe_error("JSONなし", AnalysisResult) is not None
+        assert EvaluationParser.describe_error(VALID, AnalysisResult) is None
+
+    def test_long_output_is_truncated(self):
+        """長い不正な出力は省略して送る"""
+        prompt = RepairPromptBuilder.build("x" * 50000, "問題", {"type": "object"})
+
+        assert len(prompt) < 25000
+        assert '{"type":"object"}' in prompt
@@ -0,0 +1,92 @@
+"""
+LLMResponseCacheのユニットテスト
+"""
+
+import time
+
+from utils.llm_response_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    """LLMResponseCacheのテストクラス"""
+
+    def test_key_depends_on_generation_params(self):
+        """プロンプト・モデル・生成パラメータのいずれかが異なればキーも異なる"""
+        base = LLMResponseCache.make_key("prompt", "model-a", 0.2, 0.95, "json")
+
+        assert base == LLMResponseCache.make_key("prompt", "model-a", 0.2, 0.95, "json")
+        assert base != LLMResponseCache.make_key("prompt2", "model-a", 0.2, 0.95, "json")
+        assert base != LLMResponseCache.make_key("prompt", "model-b", 0.2, 0.95, "json")
+        assert base != LLMResponseCache.make_key("prompt", "model-a", 0.3, 0.95, "json")
+        assert base != LLMResponseCache.make_key("prompt", "model-a", 0.2, 0.95, "text")
+
+    def test_key_depends_on_response_schema(self):
+        """モデルに渡すスキーマの有無・内容が異なればキーも異なる（キーの順序には依らない）"""
+        schema = {"type": "object", "properties": {"score": {"type": "integer"}}}
+        base = LLMResponseCache.make_key("prompt", "model-a", 0.2, 0.95, "json")
+        with_schema = LLMResponseCache.make_key("prompt", "model-a", 0.2, 0.95, "json", schema)
+
+        assert base != with_schema
+        assert with_schema == LLMResponseCache.make_key(
+            "prompt", "model-a", 0.2, 0.95, "json", {"properties": {"score": {"type": "integer"}}, "type": "object"}
+        )
+        assert with_schema != LLMResponseCache.make_key(
+            "prompt", "model-a", 0.2, 0.95, "json", {"type": "object", "properties": {"score": {"type": "number"}}}
+        )
+
+    def test_memory_hit_and_lru_eviction(self):
+        """メモリ層は最も古く使われたエントリから追い出す"""
+        cache = LLMResponseCache(max_entries=2)
+        cache.set("a", "A", {"input_tokens": 10})
+        cache.set("b", "B")
+        assert cache.get("a") == ("A", {"input_tokens": 10})
+
+        cache.set("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["memory_hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["bytes_served"] == 2
+
+    def test_expired_entry_is_miss(self):
+        """TTLを過ぎたエントリはミスになる"""
+        cache = LLMResponseCache(ttl_seconds=0)
+        cache.set("a", "A")
+        time.sleep(0.01)
+
+        assert cache.get("a") is None
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """ディスク層のエントリはプロセス再起動（新しいインスタンス）後も参照できる"""
+        db_path = str(tmp_path / "cache.sqlite3")
+        LLMResponseCache(db_path=db_path).set("a", '{"x": 1}', {"input_tokens": 5, "output_tokens": 2})
+
+        cache = LLMResponseCache(db_path=db_path)
+
+        assert cache.get("a") == ('{"x": 1}', {"input_tokens": 5, "output_tokens": 2})
+        assert cache.get_stats()["disk_hits"] == 1
+        # 2回目はメモリ層に昇格している
+        cache.get("a")
+        assert cache.get_stats()["memory_hits"] == 1
+
+    def test_delete_removes_both_tiers(self, tmp_path):
+        """delete でメモリ層・ディスク層の両方から削除される"""
+        db_path = str(tmp_path / "cache.sqlite3")
+        cache = LLMResponseCache(db_path=db_path)
+        cache.set("a", "A")
+
+        cache.delete("a")
+
+        assert cache.get("a") is None
+        assert LLMResponseCache(db_path=db_path).get("a") is None
+
+    def test_disabled_cache_never_hits(self):
+        """無効化されたキャッシュは保存も参照もしない"""
+        cache = LLMResponseCache(enabled=False)
+        cache.set("a", "A")
+
+        assert cache.get("a") is None
+        assert cache.get_stats()["stores"] == 0
@@ -0,0 +1,226 @@
+"""
+モデルのフォールバックチェーン・ヘッジ要求・レイテンシヒストグラムのユニットテスト
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services.llm_service import LLMService
+from utils.latency_histogram import LatencyHistogram, ModelLatencyHistograms
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています"}]}
+VALID = json.dumps({"findings": [], "overall_score": 40, "severity": "MEDIUM", "urgency": "LOW", "explanation": "説明"})
+
+
+def _fake_genai(behaviours, calls):
+    """モデル名 → (遅延秒, 応答テキスト) で応答する Gen AI SDK のスタブ"""
+    class Model:
+        def __init__(self, name):
+            self.name = name
+
+        async def generate_content_async(self, contents, generation_config=None, stream=False):
+            calls.append(self.name)
+            delay, text = behaviours[self.name]
+            await asyncio.sleep(delay)
+            return SimpleNamespace(
+                text=text,
+                usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=10),
+            )
+
+        def generate_content(self, contents, generation_config=None):
+            calls.append(self.name)
+            delay, text = behaviours[self.name]
+            time.sleep(delay)
+            return SimpleNamespace(text=text, usage_metadata=None)
+
+    return SimpleNamespace(GenerativeModel=Model)
+
+
+def _service(chain, latency=None, hedge=False):
+    service = LLMService(
+        model_name=chain[0],
+        model_chain=chain[1:],
+        admission=LLMAdmissionController(),
+        circuit_breaker=LLMCircuitBreaker(),
+        latency=latency or ModelLatencyHistograms(),
+    )
+    service._vertex_ai_available = True
+    service._genai_available = True
+    service._response_cache = LLMResponseCache(enabled=False)
+    service.hedge_enabled = hedge
+    service.max_retries = 1
+    return service
+
+
+class TestLatencyHistogram:
+    """LatencyHistogramのテストクラス"""
+
+    def test_percentiles_follow_distribution(self):
+        """パーセンタイルはバケット幅（25%）の誤差内で実際の分布に一致する"""
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 10)
+
+        assert histogram.percentile(50) == pytest.approx(5.0, rel=0.25)
+        assert histogram.percentile(95) == pytest.approx(9.5, rel=0.25)
+        assert histogram.snapshot()["count"] == 100
+
+    def test_old_samples_decay(self):
+        """max_samples に達するたびに件数を半分にして、直近の計測を優先する"""
+        histogram = LatencyHistogram(max_samples=10)
+        for _ in range(10):
+            histogram.record(1.0)
+        assert histogram.count == 5
+        for _ in range(4):
+            histogram.record(20.0)
+
+        assert histogram.percentile(50) > 1.0
+
+    def test_model_histograms_require_min_samples(self):
+        """計測が min_samples 件未満のモデルはパーセンタイルを返さない"""
+        latency = ModelLatencyHistograms()
+        latency.record("m", 2.0)
+
+        assert latency.percentile("m", 95, min_samples=2) is None
+        assert latency.percentile("m", 95) == pytest.approx(2.0, rel=0.25)
+        assert latency.percentile("other", 95) is None
+
+
+class TestModelChain:
+    """フォールバックチェーンのテストクラス"""
+
+    def test_falls_back_to_next_model_on_unparseable_response(self):
+        """パースできない応答の場合は次のモデルで再試行し、応答したモデルを記録する"""
+        calls = []
+        service = _service(["primary", "light"])
+        fake = _fake_genai({"primary": (0, "not json"), "light": (0, VALID)}, calls)
+
+        # 出力修正の依頼（test_llm_repair.py）を除き、フォールバックだけを確認する
+        with patch("services.llm_backends.genai", fake, create=True), \
+                patch("services.llm_service.config.LLM_REPAIR_ENABLED", False):
+            result = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+            sync_result = service.analyze_structure(MEETING, role_id="staff")
+
+        assert calls == ["primary", "light", "primary", "light"]
+        assert result["_llm_model"] == "light"
+        assert result["_usage"] == {"input_tokens": 200, "output_tokens": 20}
+        assert sync_result["_llm_model"] == "light"
+        assert service.get_routing_stats()["fallbacks"] == 2
+
+    def test_single_model_chain_keeps_usage_as_is(self):
+        """チェーンが1モデルの場合は従来どおり1回だけ呼ぶ"""
+        calls = []
+        service = _service(["primary"])
+        fake = _fake_genai({"primary": (0, VALID)}, calls)
+
+        with patch("services.llm_backends.genai", fake, create=True):
+            result = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+
+        assert calls == ["primary"]
+        assert result["_llm_model"] == "primary"
+        assert result["_usage"] == {"input_tokens": 100, "output_tokens": 10}
+
+
+class TestStreamingFallback:
+    """ストリーミングのフォールバックのテストクラス"""
+
+    @staticmethod
+    def _streaming_genai(fail_models, calls):
+        """fail_models は最初のチャンクの前に失敗し、それ以外は VALID を分割して返すストリーミングのスタブ"""
+        class Stream:
+            usage_metadata = SimpleNamespace(prompt_token_count=100, candidates_token_count=10)
+
+            async def __aiter__(self):
+                for i in range(0, len(VALID), 16):
+                    yield SimpleNamespace(text=VALID[i:i + 16])
+
+        class Model:
+            def __init__(self, name):
+                self.name = name
+
+            async def generate_content_async(self, contents, generation_config=None, stream=False):
+                calls.append(self.name)
+                if self.name in fail_models:
+                    raise RuntimeError("unavailable")
+                return Stream()
+
+        return SimpleNamespace(GenerativeModel=Model)
+
+    def test_stream_falls_back_before_first_chunk(self):
+        """最初のチャンクの前に失敗したストリーミングは、チェーンの次のモデルで生成する"""
+        calls = []
+        service = _service(["primary", "light"])
+        partials = []
+
+        with patch("services.llm_backends.genai", self._streaming_genai({"primary"}, calls), create=True):
+            result = asyncio.run(service.analyze_structure_stream_async(
+                MEETING, role_id="executive", on_partial=partials.append
+            ))
+
+        assert calls == ["primary", "light"]
+        assert result["_llm_status"] == "success"
+        assert result["_llm_model"] == "light"
+        assert partials[-1]["overall_score"] == 40
+        assert service.get_routing_stats()["fallbacks"] == 1
+
+
+class TestHedging:
+    """ヘッジ要求のテストクラス"""
+
+    def test_hedge_delay_follows_observed_percentile(self):
+        """ヘッジまでの待ち時間は計測済みのパーセンタイル（計測が少ない間は既定値、下限あり）"""
+        latency = ModelLatencyHistograms()
+        service = _service(["primary"], latency=latency)
+        with patch("services.llm_service.config.LLM_HEDGE_MIN_SAMPLES", 5), \
+                patch("services.llm_service.config.LLM_HEDGE_DEFAULT_DELAY", 15.0), \
+                patch("services.llm_service.config.LLM_HEDGE_MIN_DELAY", 0.5):
+            assert service._hedge_delay("primary") == 15.0
+            for _ in range(5):
+                latency.record("primary", 3.0)
+            assert service._hedge_delay("primary") == pytest.approx(3.0, rel=0.25)
+            for _ in range(100):
+                latency.record("primary", 0.1)
+            assert service._hedge_delay("primary") == 0.5
+
+    def test_slow_primary_is_hedged_and_first_valid_parse_wins(self):
+        """応答が待ち時間を超えたら次のモデルに2本目を送り、先にパースできた応答を使う"""
+        calls = []
+        latency = ModelLatencyHistograms()
+        for _ in range(20):
+            latency.record("primary", 0.05)
+        service = _service(["primary", "light"], latency=latency, hedge=True)
+        fake = _fake_genai({"primary": (2.0, VALID), "light": (0.05, VALID)}, calls)
+
+        with patch("services.llm_backends.genai", fake, create=True), \
+                patch("services.llm_service.config.LLM_HEDGE_MIN_DELAY", 0.05):
+            start = time.monotonic()
+            result = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+            elapsed = time.monotonic() - start
+
+        assert elapsed < 1.0
+        assert calls == ["primary", "light"]
+        assert result["_llm_model"] == "light"
+        stats = service.get_routing_stats()
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_fast_primary_is_not_hedged(self):
+        """待ち時間内に応答があればヘッジ要求は送らない"""
+        calls = []
+        service = _service(["primary", "light"], hedge=True)
+        fake = _fake_genai({"primary": (0.01, VALID), "light": (0.01, VALID)}, calls)
+
+        with patch("services.llm_backends.genai", fake, create=True):
+            result = asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+
+        assert calls == ["primary"]
+        assert result["_llm_model"] == "primary"
+        assert service.get_routing_stats()["hedges"] == 0
@@ -0,0 +1,194 @@
+"""
+LLM使用量台帳（LLMUsageLedger）と日次トークン予算による縮退のユニットテスト
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from services.llm_backends import FakeLLMBackend
+from services.llm_service import LLMService
+from services.multi_view_analyzer import MultiRoleLLMAnalyzer
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+from utils.llm_usage_ledger import LLMUsageLedger, current_usage_tags, llm_usage_tags
+from utils.llm_usage_tracker import LLMUsageTracker
+
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています"}]}
+
+
+def _service(ledger, chain=("primary",)):
+    service = LLMService(
+        model_name=chain[0],
+        model_chain=list(chain[1:]),
+        admission=LLMAdmissionController(),
+        circuit_breaker=LLMCircuitBreaker(),
+        backend=FakeLLMBackend(latency_distribution="fixed", latency_ms=0, output_tokens=10),
+        ledger=ledger,
+    )
+    service._response_cache = LLMResponseCache(enabled=False)
+    return service
+
+
+class TestLLMUsageLedger:
+    """LLMUsageLedger のテストクラス"""
+
+    def test_hourly_buckets_and_analysis_breakdown(self):
+        """呼び出しを時間別の集計表に加算し、ロール・エンドポイント別や分析単位で集計できる"""
+        ledger = LLMUsageLedger()
+        tags = {"analysis_id": "a1", "role_id": "executive", "endpoint": "/api/analyze"}
+        ledger.record("m1", {"input_tokens": 100, "output_tokens": 10}, 0.5, tags)
+        ledger.record("m1", {"input_tokens": 0, "output_tokens": 0, "cache_hit": True}, 0.0, tags)
+        ledger.record("m2", {"input_tokens": 50, "output_tokens": 5}, 1.5, {**tags, "role_id": "staff"})
+        ledger.record("m1", {"input_tokens": 7, "output_tokens": 1}, 0.1, {"endpoint": "/api/execute"})
+        ledger.flush()
+
+        by_role = {row["role_id"]: row for row in ledger.summary(hours=1, group_by=["role_id"])}
+        by_endpoint = {row["endpoint"]: row for row in ledger.summary(hours=1, group_by=["endpoint"])}
+        analysis = ledger.analysis_usage("a1")
+
+        assert by_role["executive"]["calls"] == 2
+        assert by_role["executive"]["cache_hits"] == 1
+        assert by_role["executive"]["avg_latency_ms"] == 500.0  # キャッシュヒットは平均に含めない
+        assert by_endpoint["/api/analyze"]["input_tokens"] == 150
+        assert by_endpoint["/api/execute"]["output_tokens"] == 1
+        assert [(row["role_id"], row["model"]) for row in analysis] == [("executive", "m1"), ("staff", "m2")]
+        assert ledger.daily_totals() == {"input_tokens": 157, "output_tokens": 16, "calls": 4, "cache_hits": 1}
+        assert ledger.daily_totals(date.today() - timedelta(days=1))["calls"] == 0
+
+    def test_persists_across_restart(self, tmp_path):
+        """ファイルに記録した使用量は再起動後も残り、日次トラッカーの起点になる"""
+        db_path = str(tmp_path / "usage.sqlite3")
+        previous = LLMUsageLedger(db_path=db_path)
+        previous.record("m", {"input_tokens": 600, "output_tokens": 400}, 1.0, {})
+        previous.close()  # 終了時に溜まっている記録を書き込む
+
+        ledger = LLMUsageLedger(db_path=db_path)
+        tracker = LLMUsageTracker(daily_limit=1000, ledger=ledger)
+
+        assert ledger.get_stats()["persistent"] is True
+        assert tracker.get_daily_total() == 1000
+        assert tracker.is_over_limit() is True
+
+    def test_tags_from_context(self):
+        """llm_usage_tags の内側ではタグが重なり、外に出ると戻る"""
+        with llm_usage_tags(analysis_id="a1"):
+            with llm_usage_tags(role_id="staff"):
+                assert current_usage_tags()["analysis_id"] == "a1"
+                assert current_usage_tags()["role_id"] == "staff"
+            assert current_usage_tags()["role_id"] is None
+        assert current_usage_tags()["analysis_id"] is None
+
+    def test_service_records_calls_with_role_tag(self):
+        """LLMService の呼び出しはロールIDと分析IDつきで記録される"""
+        ledger = LLMUsageLedger()
+        service = _service(ledger)
+
+        with llm_usage_tags(analysis_id="a1"):
+            asyncio.run(service.analyze_structure_async(MEETING, role_id="executive"))
+            service.analyze_structure(MEETING, role_id="staff")
+        ledger.flush()
+
+        rows = {row["role_id"]: row for row in ledger.analysis_usage("a1")}
+        assert set(rows) == {"executive", "staff"}
+        assert rows["executive"]["output_tokens"] == 10
+
+    def test_record_defers_writes_to_writer_thread(self):
+        """record は SQLite に触れずに記録を溜め、書き込みスレッドがまとめて書き込む（集計を読む前にも書き込む）"""
+        ledger = LLMUsageLedger(flush_interval=60)
+        for _ in range(3):
+            ledger.record("m", {"input_tokens": 10, "output_tokens": 1}, 0.1, {"role_id": "staff"})
+
+        assert ledger._conn.execute("SELECT COUNT(*) FROM llm_usage_calls").fetchone()[0] == 0
+        assert ledger.daily_totals()["calls"] == 0  # 集計の読み込みでは書き込まない
+        assert ledger.flush() == 3
+        assert ledger.daily_totals()["calls"] == 3
+
+        ledger.flush_interval = 0.01
+        ledger.record("m", {"input_tokens": 10}, 0.1, {})
+        ledger._wake.set()
+        deadline = time.monotonic() + 5
+        while ledger._conn.execute("SELECT COUNT(*) FROM llm_usage_calls").fetchone()[0] < 4:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        ledger.close()
+
+    def test_writer_purges_expired_calls_periodically(self):
+        """書き込みスレッドは purge_interval ごとに保持期間を過ぎた明細を削除する（集計表は残す）"""
+        ledger = LLMUsageLedger(retention_days=1, flush_interval=0.01, purge_interval=0.01)
+        with patch("utils.llm_usage_ledger.time.time", return_value=time.time() - 2 * 86400):
+            ledger.record("m", {"input_tokens": 10}, 0.1, {})
+        ledger.flush()
+        assert ledger.get_stats()["calls_retained"] == 1
+
+        ledger.record("m", {"input_tokens": 5}, 0.1, {})
+        deadline = time.monotonic() + 5
+        while ledger.get_stats()["calls_retained"] != 1 or ledger._pending:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        ledger.close()
+
+        assert ledger._conn.execute("SELECT MIN(input_tokens) FROM llm_usage_calls").fetchone()[0] == 5
+        assert ledger._conn.execute("SELECT SUM(input_tokens) FROM llm_usage_hourly").fetchone()[0] == 15
+
+
+class TestBudgetRouting:
+    """日次トークン予算による縮退のテストクラス"""
+
+    def _tracker(self, used):
+        """上限1000（千トークン単位）のうち used を使用済みのトラッカー（プリフライトで拒否されない規模にする）"""
+        ledger = LLMUsageLedger()
+        ledger.record("m", {"input_tokens": used * 1000}, 0.0, {})
+        ledger.flush()
+        return LLMUsageTracker(daily_limit=1000 * 1000, ledger=ledger)
+
+    def test_budget_levels(self):
+        """残りの割合に応じて normal → drop_roles → cheap_model → exhausted と縮退する"""
+        service = _service(LLMUsageLedger())
+        levels = {}
+        for used in (500, 800, 950, 1000):
+            with patch("services.llm_service.get_usage_tracker", return_value=self._tracker(used)):
+                levels[used] = service.get_budget_state()["level"]
+
+        assert levels == {500: "normal", 800: "drop_roles", 950: "cheap_model", 1000: "exhausted"}
+
+    def test_unlimited_budget_does_not_read_ledger(self):
+        """日次上限0の場合は台帳を読まずに normal を返す（LLM呼び出しごとに呼ばれるため）"""
+        ledger = MagicMock()
+        service = _service(LLMUsageLedger())
+
+        with patch("services.llm_service.get_usage_tracker", return_value=LLMUsageTracker(daily_limit=0, ledger=ledger)):
+            state = service.get_budget_state()
+            service.analyze_structure(MEETING, role_id="executive")
+
+        assert state == {"level": "normal", "remaining_ratio": None, "limit": None}
+        ledger.daily_totals.assert_not_called()
+
+    def test_switches_to_cheap_model(self):
+        """cheap_model の段階ではチェーンの最後（軽い）モデルだけを使う"""
+        service = _service(LLMUsageLedger(), chain=("primary", "light"))
+
+        with patch("services.llm_service.get_usage_tracker", return_value=self._tracker(950)):
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert result["_llm_model"] == "light"
+        assert service.get_routing_stats()["budget_downgrades"] == 1
+
+    def test_drops_low_weight_roles(self):
+        """drop_roles 以降は重みの低いロール（governance）を除外し、除外理由を budget とする"""
+        llm_service = MagicMock()
+        llm_service._vertex_ai_available = True
+        llm_service.circuit_breaker.is_open.return_value = False
+        llm_service.get_budget_state.return_value = {"level": "drop_roles"}
+        llm_service.analyze_structure.return_value = {"overall_score": 50}
+        analyzer = MultiRoleLLMAnalyzer(llm_service, concurrent=False, call_mode="per_role")
+
+        outcome = analyzer.run_roles(MEETING)
+
+        assert [r["role_id"] for r in outcome.results] == ["executive", "corp_planning", "staff"]
+        assert outcome.dropped_roles == [{"role_id": "governance", "weight": 0.1, "reason": "budget"}]
+
+        llm_service.get_budget_state.return_value = {"level": "normal"}
+        assert len(analyzer.run_roles(MEETING).results) == 4
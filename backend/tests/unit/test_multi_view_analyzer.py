@@ -0,0 +1,278 @@
+"""
+MultiRoleLLMAnalyzerのユニットテスト
+"""
+
+import asyncio
+import threading
+import time
+
+from services.multi_view_analyzer import MultiRoleLLMAnalyzer
+from services.ensemble_scoring import EnsembleScoringService
+from services.prompts import AnalysisPromptBuilder
+
+
+class FakeLLMService:
+    """ロールごとに遅延・スコアを変えられるLLMサービスのスタブ"""
+
+    def __init__(self, delays=None, scores=None, fail_roles=None):
+        self._vertex_ai_available = True
+        self.model_name = "fake-model"
+        self.delays = delays or {}
+        self.scores = scores or {}
+        self.fail_roles = set(fail_roles or [])
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    async def analyze_structure_async(self, meeting_data, chat_data=None, materials_data=None, role_id=None):
+        await asyncio.sleep(self.delays.get(role_id, 0.0))
+        if role_id in self.fail_roles:
+            raise RuntimeError("LLM error")
+        return {
+            "findings": [],
+            "overall_score": self.scores.get(role_id, 50),
+            "severity": "MEDIUM",
+            "urgency": "MEDIUM",
+            "explanation": f"{role_id} の評価",
+        }
+
+    def _multi_perspective(self, role_ids):
+        self.multi_calls = getattr(self, "multi_calls", 0) + 1
+        analyses = {
+            role_id: {
+                "findings": [],
+                "overall_score": self.scores.get(role_id, 50),
+                "severity": "MEDIUM",
+                "urgency": "MEDIUM",
+                "explanation": f"{role_id} の評価",
+            }
+            for role_id in role_ids if role_id not in self.fail_roles
+        }
+        return analyses, {"input_tokens": 1000, "output_tokens": 400}
+
+    def analyze_multi_perspective(self, meeting_data, chat_data=None, materials_data=None, *, role_ids):
+        time.sleep(self.delays.get("single_call", 0.0))
+        return self._multi_perspective(role_ids)
+
+    async def analyze_multi_perspective_async(self, meeting_data, chat_data=None, materials_data=None, *, role_ids):
+        await asyncio.sleep(self.delays.get("single_call", 0.0))
+        return self._multi_perspective(role_ids)
+
+    def analyze_structure(self, meeting_data, chat_data=None, materials_data=None, role_id=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(role_id, 0.0))
+            if role_id in self.fail_roles:
+                raise RuntimeError("LLM error")
+            return {
+                "findings": [],
+                "overall_score": self.scores.get(role_id, 50),
+                "severity": "MEDIUM",
+                "urgency": "MEDIUM",
+                "explanation": f"{role_id} の評価",
+            }
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class PromptBuildingLLMService(FakeLLMService):
+    """実際のロール別プロンプトを描画してから評価を返すスタブ"""
+
+    def analyze_structure(self, meeting_data, chat_data=None, materials_data=None, role_id=None):
+        AnalysisPromptBuilder.build_for_role(meeting_data, chat_data, materials_data, role_id=role_id)
+        return super().analyze_structure(meeting_data, chat_data, materials_data, role_id)
+
+    async def analyze_structure_async(self, meeting_data, chat_data=None, materials_data=None, role_id=None):
+        AnalysisPromptBuilder.build_for_role(meeting_data, chat_data, materials_data, role_id=role_id)
+        return await super().analyze_structure_async(meeting_data, chat_data, materials_data, role_id)
+
+
+class TestMultiRoleLLMAnalyzer:
+    """MultiRoleLLMAnalyzerのテストクラス"""
+
+    def test_concurrent_runs_roles_in_parallel(self):
+        """並列モードでは全ロールが同時に実行される"""
+        llm = FakeLLMService(delays={r: 0.2 for r in ["executive", "corp_planning", "staff", "governance"]},
+                             scores={"executive": 80, "corp_planning": 70, "staff": 60, "governance": 50})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=5, deadline=5)
+
+        start = time.monotonic()
+        outcome = analyzer.run_roles({"statements": []})
+        elapsed = time.monotonic() - start
+
+        assert llm.max_active == 4
+        assert elapsed < 0.6
+        assert [r["role_id"] for r in outcome.results] == ["executive", "corp_planning", "staff", "governance"]
+        assert outcome.dropped_roles == []
+        assert outcome.mode == "concurrent"
+
+    def test_slow_role_is_dropped_at_deadline(self):
+        """締め切りを超えたロールは除外され、残りのロールで結果を返す"""
+        llm = FakeLLMService(delays={"governance": 1.0}, scores={"executive": 80, "corp_planning": 70, "staff": 60})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=5, deadline=0.3)
+
+        outcome = analyzer.run_roles({"statements": []})
+
+        assert [r["role_id"] for r in outcome.results] == ["executive", "corp_planning", "staff"]
+        assert [d["role_id"] for d in outcome.dropped_roles] == ["governance"]
+        assert outcome.dropped_roles[0]["reason"] == "timeout"
+
+    def test_in_flight_limit_and_timed_out_roles_hold_workers(self):
+        """1分析の同時実行数は max_in_flight まで。締め切り後も実行中のロールの分だけ次の分析の同時実行数を減らす"""
+        llm = FakeLLMService(delays={"executive": 0.5, "corp_planning": 0.5})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=5, deadline=0.2,
+                                        max_workers=3, max_in_flight=2)
+
+        outcome = analyzer.run_roles({"statements": []})
+
+        assert llm.max_active == 2
+        # 実行中の2ロールは中断できず、未開始の2ロールは開始せずに除外する
+        assert [d["reason"] for d in outcome.dropped_roles] == ["timeout"] * 4
+        assert analyzer._in_flight_limit() == 1
+
+        time.sleep(0.5)
+        assert analyzer._in_flight_limit() == 2
+
+    def test_queued_role_gets_full_role_timeout(self):
+        """同時実行数の上限で待たされたロールも、実行を始めてから role_timeout の間は打ち切らない"""
+        roles = ["executive", "corp_planning", "staff", "governance"]
+        llm = FakeLLMService(delays={r: 0.2 for r in roles})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=0.3, deadline=5, max_in_flight=2)
+
+        outcome = analyzer.run_roles({"statements": []})
+        async_outcome = asyncio.run(analyzer.run_roles_async({"statements": []}))
+
+        assert llm.max_active == 2
+        assert [r["role_id"] for r in outcome.results] == roles
+        assert [r["role_id"] for r in async_outcome.results] == roles
+        assert outcome.dropped_roles == async_outcome.dropped_roles == []
+
+    def test_role_timeout_and_deadline_are_reported_separately(self):
+        """開始から role_timeout を超えたロールと、分析全体の締め切りまでに終わらなかったロールの timeout_seconds を分ける"""
+        llm = FakeLLMService(delays={"executive": 1.0, "corp_planning": 0.05, "staff": 0.05, "governance": 0.05})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=0.2, deadline=5)
+
+        outcome = asyncio.run(analyzer.run_roles_async({"statements": []}))
+        slow = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=5, deadline=0.25)
+        deadline_outcome = asyncio.run(slow.run_roles_async({"statements": []}))
+
+        assert outcome.dropped_roles == [
+            {"role_id": "executive", "weight": 0.4, "reason": "timeout", "timeout_seconds": 0.2}
+        ]
+        assert deadline_outcome.dropped_roles[0]["timeout_seconds"] == 0.25
+        assert [d["role_id"] for d in deadline_outcome.dropped_roles] == ["executive"]
+
+    def test_failed_role_is_recorded(self):
+        """例外を送出したロールは error として記録される"""
+        llm = FakeLLMService(fail_roles=["staff"])
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=False)
+
+        outcome = analyzer.run_roles({"statements": []})
+
+        assert len(outcome.results) == 3
+        assert outcome.dropped_roles == [{"role_id": "staff", "weight": 0.2, "reason": "error"}]
+        assert outcome.mode == "sequential"
+
+    def test_llm_unavailable_returns_empty(self):
+        """LLMが無効な場合は空の結果を返す"""
+        llm = FakeLLMService()
+        llm._vertex_ai_available = False
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm)
+
+        assert analyzer.analyze_with_roles({"statements": []}) == []
+
+    def test_ensemble_uses_remaining_roles(self):
+        """除外ロールがあってもアンサンブルは残りのロールの重みで計算される"""
+        llm = FakeLLMService(delays={"governance": 1.0},
+                             scores={"executive": 100, "corp_planning": 100, "staff": 100})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=0.3, deadline=5)
+        outcome = analyzer.run_roles({"statements": []})
+
+        rule_result = {"overall_score": 0, "severity": "LOW", "urgency": "LOW", "explanation": "", "findings": []}
+        combined = EnsembleScoringService().combine(rule_result, outcome.results, outcome.dropped_roles)
+
+        # 同一スコアの揺らぎ補正（-5, 0, +5）後の重み付き平均: (95*0.4 + 100*0.3 + 100*0.2) / 0.9
+        assert combined["overall_score"] == int(0.4 * ((95 * 0.4 + 100 * 0.3 + 100 * 0.2) / 0.9))
+        assert [d["role_id"] for d in combined["dropped_roles"]] == ["governance"]
+
+    def test_run_roles_async_cancels_slow_role(self):
+        """非同期版では締め切りを超えたロールのタスクが取り消される"""
+        llm = FakeLLMService(delays={"executive": 0.05, "corp_planning": 0.05, "staff": 0.05, "governance": 2.0})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=0.3, deadline=5)
+
+        start = time.monotonic()
+        outcome = asyncio.run(analyzer.run_roles_async({"statements": []}))
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 1.0
+        assert len(outcome.results) == 3
+        assert [d["role_id"] for d in outcome.dropped_roles] == ["governance"]
+
+    def test_single_call_mode_fans_out_to_roles(self):
+        """single_call モードは1回の呼び出し結果をロール別の multi_view 形式に展開する"""
+        llm = FakeLLMService(scores={"executive": 80, "corp_planning": 70, "staff": 60, "governance": 50},
+                             fail_roles=["governance"])
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, call_mode="single_call")
+
+        outcome = analyzer.run_roles({"statements": []})
+
+        assert llm.multi_calls == 1
+        assert outcome.mode == "single_call"
+        assert outcome.llm_calls == 1
+        assert outcome.usage == {"input_tokens": 1000, "output_tokens": 400, "cache_hits": 0, "cached_input_tokens": 0}
+        assert [(r["role_id"], r["weight"], r["overall_score"]) for r in outcome.results] == [
+            ("executive", 0.4, 80), ("corp_planning", 0.3, 70), ("staff", 0.2, 60)
+        ]
+        # レスポンスに含まれなかったロールは除外扱い
+        assert outcome.dropped_roles == [{"role_id": "governance", "weight": 0.1, "reason": "missing"}]
+
+    def test_single_call_async_drops_all_roles_at_deadline(self):
+        """single_call モードで締め切りを超えた場合は全ロールを除外する"""
+        llm = FakeLLMService(delays={"single_call": 1.0})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, call_mode="single_call", deadline=0.2)
+
+        outcome = asyncio.run(analyzer.run_roles_async({"statements": []}))
+
+        assert outcome.results == []
+        assert [d["reason"] for d in outcome.dropped_roles] == ["timeout"] * 4
+
+    def test_outcome_reports_compaction_used_by_prompts(self):
+        """ロール別プロンプトの描画に使った入力の圧縮結果を outcome.input_compaction で返す（プロンプトを作らなければ空）"""
+        meeting = {"statements": [{"speaker": "CFO", "text": "えーと、"}, {"speaker": "CFO", "text": "計画未達です"}]}
+        analyzer = MultiRoleLLMAnalyzer(llm_service=PromptBuildingLLMService())
+
+        outcome = analyzer.run_roles(meeting)
+        async_outcome = asyncio.run(analyzer.run_roles_async(meeting))
+
+        assert outcome.input_compaction["dropped_fillers"] == 1
+        assert async_outcome.input_compaction == outcome.input_compaction
+        assert MultiRoleLLMAnalyzer(llm_service=FakeLLMService()).run_roles(meeting).input_compaction == {}
+
+    def test_role_ids_limits_evaluated_roles(self):
+        """role_ids を指定すると該当ロールだけを評価し、LLM呼び出し数もその分になる"""
+        llm = FakeLLMService(scores={"executive": 80})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=5, deadline=5)
+
+        probe = analyzer.run_roles({"statements": []}, role_ids=["executive"])
+        skipped = asyncio.run(analyzer.run_roles_async({"statements": []}, role_ids=[]))
+
+        assert [r["role_id"] for r in probe.results] == ["executive"]
+        assert probe.llm_calls == 1
+        assert skipped.results == [] and skipped.llm_calls == 0
+
+    def test_on_event_reports_roles_in_completion_order(self):
+        """on_event を指定すると、全ロールの完了を待たずに確定した順でロール結果が通知される"""
+        llm = FakeLLMService(delays={"executive": 0.3, "corp_planning": 0.0, "staff": 0.1, "governance": 0.2},
+                             scores={"corp_planning": 70})
+        analyzer = MultiRoleLLMAnalyzer(llm_service=llm, concurrent=True, role_timeout=5, deadline=5)
+        events = []
+
+        outcome = asyncio.run(analyzer.run_roles_async({"statements": []}, on_event=events.append))
+
+        assert [e["role_id"] for e in events] == ["corp_planning", "staff", "governance", "executive"]
+        assert events[0] == {"type": "role_result", "role_id": "corp_planning", "weight": 0.3, "overall_score": 70,
+                             "severity": "MEDIUM", "urgency": "MEDIUM", "explanation": "corp_planning の評価"}
+        assert len(outcome.results) == 4
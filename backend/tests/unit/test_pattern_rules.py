@@ -0,0 +1,98 @@
+"""
+PatternRuleEngineのユニットテスト
+"""
+
+import pytest
+
+from services.analyzer import StructureAnalyzer
+from services.definition_loader import DefinitionLoader
+from services.pattern_rules import PatternRuleEngine, extract_features
+
+
+def _features(**overrides):
+    features = extract_features({"statements": []})
+    features.update(overrides)
+    return features
+
+
+class TestPatternRuleEngine:
+    """PatternRuleEngineのテストクラス"""
+
+    def test_shipped_definition_compiles(self):
+        """同梱の pattern_rules.json は既存の2パターンを定義順にコンパイルできる"""
+        engine = PatternRuleEngine(DefinitionLoader().get_pattern_rules())
+
+        assert [p.pattern_id for p in engine.patterns] == ["B1_正当化フェーズ", "ES1_報告遅延"]
+
+    def test_shared_conditions_are_evaluated_once(self):
+        """複数パターンで同じ条件を使っても評価計画の述語は1つにまとまる"""
+        condition = {"feature": "kpi_downgrade_count", "op": ">=", "value": 2}
+        engine = PatternRuleEngine({"patterns": [
+            {"pattern_id": "P1", "when": {"all": [condition]}},
+            {"pattern_id": "P2", "when": {"all": [condition, {"feature": "has_chat", "op": "==", "value": True}]}},
+            {"pattern_id": "P3", "when": {"any": [condition, {"feature": "exit_discussed", "op": "==", "value": True}]}},
+        ]})
+
+        assert len(engine._predicates) == 3
+        findings = engine.evaluate(_features(kpi_downgrade_count=2))
+        assert [f["pattern_id"] for f in findings] == ["P1", "P3"]
+
+    def test_evidence_and_quantitative_scores_from_features(self):
+        """証拠文は特徴量で埋められ、quantitative_scores は指定した特徴量だけを含む"""
+        engine = PatternRuleEngine({"patterns": [{
+            "pattern_id": "P1",
+            "description": "テスト",
+            "score": 80,
+            "when": {"all": [{"feature": "decision_concentration_rate", "op": ">=", "value": 0.5}]},
+            "evidence": ["判断集中率: {decision_concentration_rate:.0%}"],
+            "quantitative_scores": ["decision_concentration_rate"],
+        }]})
+
+        finding = engine.evaluate(_features(decision_concentration_rate=0.75))[0]
+
+        assert finding["evidence"] == ["判断集中率: 75%"]
+        assert finding["quantitative_scores"] == {"decision_concentration_rate": 0.75}
+        assert finding["severity"] == "HIGH"
+
+    def test_unknown_feature_is_rejected_at_compile_time(self):
+        """未知の特徴量・演算子を参照する定義は起動時に ValueError になる"""
+        with pytest.raises(ValueError):
+            PatternRuleEngine({"patterns": [{"pattern_id": "P1", "when": {"all": [{"feature": "nope", "op": ">=", "value": 1}]}}]})
+        with pytest.raises(ValueError):
+            PatternRuleEngine({"patterns": [{"pattern_id": "P1", "when": {"all": [{"feature": "has_chat", "op": "~", "value": 1}]}}]})
+
+    def test_new_pattern_is_detected_without_code_changes(self):
+        """定義を追加するだけで新しいパターンが検出・スコアリングされる"""
+        engine = PatternRuleEngine({"patterns": [{
+            "pattern_id": "B3_反対意見無視",
+            "description": "反対意見が適切に反映されていない",
+            "score": 60,
+            "record_score": True,
+            "when": {"all": [{"feature": "ignored_opposition_count", "op": ">=", "value": 2}]},
+            "scoring": {"type": "fixed", "levels": [{"min": 40, "severity": "MEDIUM", "urgency": "HIGH"}]},
+        }]})
+        analyzer = StructureAnalyzer(rule_engine=engine)
+
+        result = analyzer.analyze({"statements": []}, {"opposition_messages": [{}, {}]})
+
+        assert [f["pattern_id"] for f in result["findings"]] == ["B3_反対意見無視"]
+        assert result["findings"][0]["severity"] == "MEDIUM"
+        assert result["findings"][0]["urgency"] == "HIGH"
+        assert result["scores"] == {"B3_反対意見無視": 60}
+
+    def test_scores_only_for_patterns_with_record_score(self):
+        """分析結果の scores には record_score を指定したパターン（同梱定義では B1 のみ）の検出時スコアだけを載せる"""
+        analyzer = StructureAnalyzer()
+        es1_only = analyzer.analyze(
+            {"statements": [{"speaker": "A", "text": "a"}, {"speaker": "B", "text": "b"}, {"speaker": "C", "text": "c"}]},
+            {"risk_messages": [{"text": "リスクがあります"}]},
+        )
+        b1 = analyzer.analyze({
+            "statements": [{"speaker": "CFO", "text": "x"}],
+            "kpi_mentions": [{"text": "成長率を下方修正"}, {"text": "ARPUも下方修正"}],
+        })
+
+        assert [f["pattern_id"] for f in es1_only["findings"]] == ["ES1_報告遅延"]
+        assert es1_only["scores"] == {}
+        assert [f["pattern_id"] for f in b1["findings"]] == ["B1_正当化フェーズ"]
+        assert b1["scores"] == {"B1_正当化フェーズ": 75}
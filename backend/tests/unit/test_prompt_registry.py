@@ -0,0 +1,92 @@
+"""
+PromptRegistry / PromptTemplate のユニットテスト
+"""
+
+import os
+
+from services.prompts.registry import PromptRegistry, PromptTemplate, _PROMPTS_DIR, TEMPLATE_PLACEHOLDERS
+
+
+def _write(path, text, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestPromptTemplate:
+    """PromptTemplateのテストクラス"""
+
+    def test_render_matches_str_format(self):
+        """プリコンパイル済みの描画結果が str.format と一致する"""
+        for relative_path in TEMPLATE_PLACEHOLDERS:
+            text = (_PROMPTS_DIR / relative_path).read_text(encoding="utf-8").strip()
+            template = PromptTemplate.compile(relative_path, text)
+            values = {name: f"<{name}>{{x}}" for name in template.placeholders}
+
+            assert template.render(**values) == text.format(**values)
+
+    def test_format_spec_falls_back_to_str_format(self):
+        """書式指定付きのプレースホルダも str.format と同じ結果になる"""
+        template = PromptTemplate.compile("t.txt", "score={score:>5} {{literal}} {name!r}")
+
+        assert template.placeholders == ("score", "name")
+        assert template.render(score=42, name="a") == "score=   42 {literal} 'a'"
+
+
+class TestPromptRegistry:
+    """PromptRegistryのテストクラス"""
+
+    def test_loads_and_versions_templates(self, tmp_path):
+        """起動時に全テンプレートを読み込み、内容ハッシュをバージョンとして返す"""
+        _write(tmp_path / "agents" / "research_prompt.txt", "調査: {topic}\n")
+        _write(tmp_path / "analysis" / "role_executive.txt", "CEO {波括弧はそのまま}")
+        registry = PromptRegistry(tmp_path, check_interval=3600)
+
+        template = registry.get("agents/research_prompt.txt")
+        assert template.render(topic="市場") == "調査: 市場"
+        assert registry.get("analysis/role_executive.txt").text == "CEO {波括弧はそのまま}"
+        assert set(registry.versions()) == {"agents/research_prompt.txt", "analysis/role_executive.txt"}
+        assert registry.versions(prefix="agents/")["agents/research_prompt.txt"] == template.version
+
+    def test_rejects_invalid_templates(self, tmp_path):
+        """波括弧の対応が取れない・未知のプレースホルダを含むテンプレートは登録しない"""
+        _write(tmp_path / "agents" / "research_prompt.txt", "調査: {topic")
+        _write(tmp_path / "agents" / "analysis_prompt.txt", "{description} {unknown}")
+        registry = PromptRegistry(tmp_path, check_interval=3600)
+
+        assert registry.get("agents/research_prompt.txt") is None
+        assert registry.get("agents/analysis_prompt.txt") is None
+        assert registry.reload()["invalid"] == ["agents/analysis_prompt.txt", "agents/research_prompt.txt"]
+
+    def test_reloads_only_changed_files(self, tmp_path):
+        """mtime が変わったファイルだけを読み直し、削除されたファイルは外す"""
+        research = tmp_path / "agents" / "research_prompt.txt"
+        analysis = tmp_path / "agents" / "analysis_prompt.txt"
+        _write(research, "v1 {topic}", mtime_ns=1_000_000_000)
+        _write(analysis, "{description}", mtime_ns=1_000_000_000)
+        registry = PromptRegistry(tmp_path, check_interval=0)
+        before = registry.get("agents/analysis_prompt.txt")
+        old_version = registry.get("agents/research_prompt.txt").version
+
+        _write(research, "v2 {topic}", mtime_ns=2_000_000_000)
+        updated = registry.get("agents/research_prompt.txt")
+        assert updated.render(topic="x") == "v2 x"
+        assert updated.version != old_version
+        assert registry.get("agents/analysis_prompt.txt") is before
+
+        analysis.unlink()
+        assert registry.get("agents/analysis_prompt.txt") is None
+
+    def test_check_interval_defers_reload(self, tmp_path):
+        """確認間隔内の変更は reload() を呼ぶまで反映しない"""
+        research = tmp_path / "agents" / "research_prompt.txt"
+        _write(research, "v1 {topic}", mtime_ns=1_000_000_000)
+        registry = PromptRegistry(tmp_path, check_interval=3600)
+
+        _write(research, "v2 {topic}", mtime_ns=2_000_000_000)
+        assert registry.get("agents/research_prompt.txt").text == "v1 {topic}"
+
+        summary = registry.reload()
+        assert summary["changed"] == ["agents/research_prompt.txt"]
+        assert registry.get("agents/research_prompt.txt").text == "v2 {topic}"
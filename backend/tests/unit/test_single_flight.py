@@ -0,0 +1,99 @@
+"""
+SingleFlight / content_fingerprint のユニットテスト
+"""
+
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight, content_fingerprint
+
+
+class TestSingleFlight:
+    """SingleFlightのテストクラス"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """同じキーの並行呼び出しは1回だけ実行し、同じ結果を共有する"""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        async def main():
+            return await asyncio.gather(*[flight.do("k", compute) for _ in range(4)])
+
+        results = asyncio.run(main())
+
+        assert len(calls) == 1
+        assert [shared for _, shared in results] == [False, True, True, True]
+        assert all(result is results[0][0] for result, _ in results)
+        assert flight.get_stats() == {"leaders": 1, "followers": 3, "in_flight": 0}
+
+    def test_different_keys_and_completed_calls_run_separately(self):
+        """別のキー、または完了後の同じキーは新たに実行する"""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute(tag):
+            calls.append(tag)
+            await asyncio.sleep(0.01)
+            return tag
+
+        async def main():
+            await asyncio.gather(flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b")))
+            return await flight.do("a", lambda: compute("a2"))
+
+        assert asyncio.run(main()) == ("a2", False)
+        assert calls == ["a", "b", "a2"]
+
+    def test_exception_is_shared(self):
+        """実行中の処理の例外は合流した呼び出しにも送出される"""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+        results = asyncio.run(main())
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.in_flight() == 0
+
+    def test_leader_cancellation_does_not_cancel_followers(self):
+        """最初の呼び出しが取り消されても、合流した呼び出しは結果を受け取る"""
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do("k", compute))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("k", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        assert asyncio.run(main()) == ("done", True)
+
+
+class TestContentFingerprint:
+    """content_fingerprintのテストクラス"""
+
+    def test_key_order_independent(self):
+        """辞書のキー順に依存せず、内容が変われば変わる"""
+        a = content_fingerprint({"statements": [{"speaker": "CFO", "text": "x"}], "meeting_id": "m1"}, None)
+        b = content_fingerprint({"meeting_id": "m1", "statements": [{"text": "x", "speaker": "CFO"}]}, None)
+        c = content_fingerprint({"meeting_id": "m1", "statements": [{"text": "y", "speaker": "CFO"}]}, None)
+
+        assert a == b
+        assert a != c
@@ -0,0 +1,152 @@
+"""
+トークン推定の補正・プロンプト予算・日次上限のプリフライトのユニットテスト
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from services.llm_backends import FakeLLMBackend
+from services.llm_service import LLMService
+from services.prompts import AnalysisPromptBuilder, TaskGenerationPromptBuilder
+from utils.llm_admission import LLMAdmissionController
+from utils.llm_circuit_breaker import LLMCircuitBreaker
+from utils.llm_response_cache import LLMResponseCache
+from utils.llm_usage_ledger import LLMUsageLedger
+from utils.llm_usage_tracker import LLMUsageTracker
+from utils.token_estimator import TokenEstimator
+
+MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています"}]}
+LONG_MEETING = {"statements": [{"speaker": "CFO", "text": "成長率は計画を下回っています。下方修正が必要です。"}] * 200}
+ANALYSIS = {"findings": [{"pattern_id": "B1_正当化フェーズ", "description": "説明", "severity": "HIGH", "score": 80}]}
+
+
+def _service(ledger, chain=("primary",)):
+    service = LLMService(
+        model_name=chain[0],
+        model_chain=list(chain[1:]),
+        admission=LLMAdmissionController(),
+        circuit_breaker=LLMCircuitBreaker(),
+        backend=FakeLLMBackend(latency_distribution="fixed", latency_ms=0, output_tokens=10),
+        ledger=ledger,
+    )
+    service._response_cache = LLMResponseCache(enabled=False)
+    return service
+
+
+def _tracker(used, limit):
+    ledger = LLMUsageLedger()
+    ledger.record("m", {"input_tokens": used}, 0.0, {})
+    ledger.flush()
+    return LLMUsageTracker(daily_limit=limit, ledger=ledger)
+
+
+class TestTokenEstimatorCalibration:
+    """TokenEstimator の実測値による補正のテストクラス"""
+
+    def test_fits_both_character_classes(self):
+        """英数字と日本語が混在する実測から、文字種ごとの係数を求める"""
+        estimator = TokenEstimator(calibration=True, min_samples=5)
+        for ascii_chars, japanese_chars in [(300, 20), (30, 200), (150, 150), (600, 10), (10, 500)]:
+            text = "a" * ascii_chars + "成" * japanese_chars
+            estimator.observe(text, int(ascii_chars / 3 + japanese_chars * 1.5))
+
+        stats = estimator.get_stats()
+        assert stats["calibrated"] is True
+        assert abs(stats["ascii_chars_per_token"] - 3.0) < 0.1
+        assert abs(stats["non_ascii_tokens_per_char"] - 1.5) < 0.05
+        assert abs(estimator.estimate("a" * 300 + "成" * 100) - 250) <= 2
+
+    def test_single_character_class_scales_both(self):
+        """日本語だけの実測では、既定の係数の比を保ったまま全体の倍率を合わせる"""
+        estimator = TokenEstimator(calibration=True, min_samples=3)
+        for chars in (100, 200, 300):
+            estimator.observe("成" * chars, chars * 2)
+
+        stats = estimator.get_stats()
+        assert stats["non_ascii_tokens_per_char"] == 2.0
+        assert stats["ascii_chars_per_token"] == 2.0
+
+    def test_uses_defaults_until_min_samples_and_clamps(self):
+        """実測数が足りない間は既定の係数、外れ値の実測でも係数は既定値の4倍までに収める"""
+        estimator = TokenEstimator(calibration=True, min_samples=2)
+        estimator.observe("成" * 100, 10000)
+        assert estimator.estimate("成長率") == 3
+
+        estimator.observe("成" * 100, 10000)
+        assert estimator.get_stats()["non_ascii_tokens_per_char"] == 4.0
+
+    def test_disabled_calibration_ignores_observations(self):
+        """calibration=False（既定）では実測を記録しない"""
+        estimator = TokenEstimator(min_samples=1)
+        estimator.observe("成長率", 100)
+
+        assert estimator.get_stats()["samples"] == 0
+        assert estimator.estimate("成長率") == 3
+
+
+class TestPromptBudget:
+    """プロンプト予算のテストクラス"""
+
+    def test_over_budget_input_is_chunked(self):
+        """予算を超える入力は LONG_INPUT_ENABLED=false でもダイジェストに置き換える"""
+        with patch("services.prompts.analysis_prompt.config.LONG_INPUT_ENABLED", False):
+            verbatim = AnalysisPromptBuilder.build_for_role(LONG_MEETING, role_id="executive")
+            with patch("services.prompts.analysis_prompt.config.LLM_PROMPT_TOKEN_BUDGET", 3000):
+                budgeted = AnalysisPromptBuilder.build_for_role(LONG_MEETING, role_id="executive")
+
+        assert "長時間会議のダイジェスト" not in verbatim
+        assert "長時間会議のダイジェスト" in budgeted
+        assert len(budgeted) < len(verbatim)
+
+    def test_task_prompt_drops_context_over_budget(self):
+        """前置すると予算を超える場合、タスク生成プロンプトに分析時の入力データを前置しない"""
+        prefix = AnalysisPromptBuilder.build_context_prefix(LONG_MEETING)
+        approval = {"decision": "approve"}
+
+        with_context = TaskGenerationPromptBuilder.build(ANALYSIS, approval, context_prefix=prefix)
+        with patch("services.prompts.task_generation_prompt.config.LLM_PROMPT_TOKEN_BUDGET", 2000):
+            without_context = TaskGenerationPromptBuilder.build(ANALYSIS, approval, context_prefix=prefix)
+
+        assert with_context.startswith(prefix)
+        assert without_context == TaskGenerationPromptBuilder.build(ANALYSIS, approval)
+
+    def test_oversized_prompt_uses_cheap_model(self):
+        """分割後も予算を超えるプロンプトはチェーンの最後（軽い）モデルで呼ぶ"""
+        service = _service(LLMUsageLedger(), chain=("primary", "light"))
+
+        with patch("services.llm_service.config.LLM_PROMPT_TOKEN_BUDGET", 10):
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert result["_llm_model"] == "light"
+        assert service.get_routing_stats()["prompt_downgrades"] == 1
+        assert service.get_routing_stats()["budget_downgrades"] == 0
+
+
+class TestPreflight:
+    """日次トークン上限のプリフライトのテストクラス"""
+
+    def test_rejects_before_calling(self):
+        """推定トークン数で上限を超える呼び出しはAPIに送らず、budget_exceeded のモックを返す"""
+        ledger = LLMUsageLedger()
+        service = _service(ledger)
+
+        with patch("services.llm_service.get_usage_tracker", return_value=_tracker(99_500, 100_000)):
+            result = service.analyze_structure(MEETING, role_id="executive")
+            results, _ = asyncio.run(service.analyze_multi_perspective_async(MEETING, role_ids=["executive", "staff"]))
+            tasks = service.generate_tasks(ANALYSIS, {"decision": "approve"})
+
+        assert result["_llm_status"] == "budget_exceeded"
+        assert {analysis["_llm_status"] for analysis in results.values()} == {"budget_exceeded"}
+        assert tasks["_llm_status"] == "budget_exceeded"
+        assert ledger.daily_totals()["calls"] == 0
+        assert service.get_routing_stats()["preflight_rejections"] == 3
+
+    def test_allows_call_within_remaining_budget(self):
+        """残りに収まる呼び出しはそのまま送る"""
+        service = _service(LLMUsageLedger())
+
+        with patch("services.llm_service.get_usage_tracker", return_value=_tracker(50_000, 100_000)):
+            result = service.analyze_structure(MEETING, role_id="executive")
+
+        assert result["_llm_status"] == "success"
+        assert service.get_routing_stats()["preflight_rejections"] == 0
@@ -0,0 +1,117 @@
+"""
+TokenEstimator / TranscriptDigestBuilder のユニットテスト
+"""
+
+import threading
+
+from config import config
+from services.prompts.analysis_prompt import AnalysisPromptBuilder
+from services.transcript_digest import (
+    TranscriptDigestBuilder,
+    chunk_statements,
+    extract_chunk_signals,
+    fit_lines,
+)
+from utils.token_estimator import TokenEstimator
+
+TEXTS = [
+    "成長率は計画を下回っています。下方修正が必要です。",
+    "新規顧客の獲得は順調です。",
+    "このままだと問題なので撤退も検討すべきでは",
+    "来期の計画は維持します",
+]
+
+
+def _statements(count):
+    speakers = ["CEO", "CFO", "COO"]
+    return [{"speaker": speakers[i % 3], "text": TEXTS[i % len(TEXTS)]} for i in range(count)]
+
+
+class TestTokenEstimator:
+    """TokenEstimatorのテストクラス"""
+
+    def test_japanese_and_ascii_ratios(self):
+        """日本語は1文字1トークン、英数字は4文字1トークンで数える"""
+        estimator = TokenEstimator()
+
+        assert estimator.estimate("") == 0
+        assert estimator.estimate("成長率") == 3
+        assert estimator.estimate("ARPU down") == 2
+        assert estimator.estimate("ARPUは未達") == 4
+
+
+class TestTranscriptDigestBuilder:
+    """TranscriptDigestBuilderのテストクラス"""
+
+    def test_chunks_respect_budget_and_cover_all_statements(self):
+        """チャンクは予算以内で、全発言を順に1回ずつ含む"""
+        statements = _statements(200)
+
+        chunks = chunk_statements(statements, 300)
+
+        assert chunks[0][0] == 0 and chunks[-1][1] == 200
+        assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+        assert all(tokens <= 300 for _, _, tokens in chunks)
+
+    def test_digest_fits_budget_and_keeps_totals(self):
+        """ダイジェストは予算内に収まり、件数は引用を削っても全体の集計値を保つ"""
+        statements = _statements(2000)
+        builder = TranscriptDigestBuilder(threshold_tokens=1000, chunk_tokens=2000, digest_tokens=800, max_workers=4)
+
+        digest = builder.build(statements)
+
+        assert digest.digest_tokens <= 800
+        assert digest.chunk_count > 1
+        assert "全2000発言" in digest.text
+        assert "KPI言及: 500件（うち下方修正・未達 500件）" in digest.text
+        assert "撤退/ピボット議論: あり（500件）" in digest.text
+        assert builder.build(statements) is digest
+
+    def test_keyword_extraction_runs_sequentially(self):
+        """既定のキーワード抽出は呼び出し元のスレッドで逐次に実行し、スレッドプールを作らない"""
+        builder = TranscriptDigestBuilder(chunk_tokens=200, max_workers=4)
+        digest = builder.build(_statements(100))
+
+        assert digest.chunk_count > 1
+        assert builder._executor is None
+
+    def test_custom_extractor_runs_on_shared_pool(self):
+        """差し替えた extractor は max_workers の範囲で並行に実行し、スレッドプールは呼び出し間で共有する"""
+        threads = set()
+
+        def extractor(statements, index, start, end, tokens):
+            threads.add(threading.current_thread().name)
+            threading.Event().wait(0.05)
+            return extract_chunk_signals(statements, index, start, end, tokens)
+
+        builder = TranscriptDigestBuilder(chunk_tokens=200, max_workers=4, extractor=extractor)
+        builder.build(_statements(100))
+        executor = builder._executor
+        builder.build(_statements(101))
+
+        assert len(threads) > 1
+        assert builder._executor is executor
+
+    def test_prompt_uses_digest_only_for_long_transcripts(self):
+        """閾値を超える議事録だけがダイジェストに置き換わる"""
+        short = {"statements": _statements(3)}
+        long = {"statements": _statements(config.LONG_INPUT_THRESHOLD_TOKENS // 5)}
+
+        short_prompt = AnalysisPromptBuilder.build_for_role(short, role_id="executive")
+        long_prompt = AnalysisPromptBuilder.build_for_role(long, role_id="executive")
+
+        assert "長時間会議のダイジェスト" not in short_prompt
+        assert "CEO: 成長率は計画を下回っています。" in short_prompt
+        assert "長時間会議のダイジェスト" in long_prompt
+        assert len(long_prompt) < config.LONG_INPUT_THRESHOLD_TOKENS
+
+    def test_fit_lines_keeps_head_and_tail(self):
+        """予算を超える行リストは先頭と末尾を残して中間を省略する"""
+        lines = [f"message {i:03d}" for i in range(100)]
+
+        fitted = fit_lines(lines, 40)
+
+        assert fitted.startswith("message 000")
+        assert fitted.endswith("message 099")
+        assert "（中略:" in fitted
+        assert fit_lines(lines[:3], 40) == "\n".join(lines[:3])
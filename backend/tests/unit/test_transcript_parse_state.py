@@ -0,0 +1,83 @@
+"""
+TranscriptParseState（議事録の増分パース）のユニットテスト
+"""
+
+from services.analyzer import StructureAnalyzer
+from services.google_meet import GoogleMeetService, TranscriptParseState
+
+
+TRANSCRIPT = """
+CFO: モバイルARPUは前年同期比▲6.2%です。
+CFO: DX事業の利益率は依然▲12%で
+目標を下回っています。
+CEO: 計画は維持する方向で進めましょう。
+通信本部長: 市場要因も大きい。
+DX本部長: 今は仕込みのフェーズ。撤退は考えていない。
+"""
+
+
+class TestTranscriptParseState:
+    """TranscriptParseStateのテストクラス"""
+
+    def setup_method(self):
+        self.service = GoogleMeetService()
+
+    def test_chunked_feed_matches_full_parse(self):
+        """任意の位置で分割して追記しても、各時点の結果は全文パースと一致する"""
+        for step in (1, 7, 23):
+            state = TranscriptParseState()
+            for end in list(range(0, len(TRANSCRIPT), step)) + [len(TRANSCRIPT)]:
+                state.feed(TRANSCRIPT[:end])
+                assert state.snapshot() == self.service.parse_transcript(TRANSCRIPT[:end])
+
+    def test_feed_modes_and_revision(self):
+        """追記・変更なし・書き換えを判別し、書き換え後もリビジョンは戻らない"""
+        state = TranscriptParseState()
+        assert state.feed("CFO: 売上は未達です。\n") == "append"
+        assert state.feed("CFO: 売上は未達です。\n") == "unchanged"
+        assert state.feed("CFO: 売上は未達です。\nCEO: 了解\n") == "append"
+        assert state.revision == 2
+
+        assert state.feed("CEO: 別の会議\n") == "full"
+        assert state.revision == 3
+        assert state.snapshot()["statements"] == [{"speaker": "CEO", "text": "別の会議"}]
+
+    def test_counters_are_updated_incrementally(self):
+        """発言者ごとの発言数・KPI下方修正数・撤退議論の有無を差分で更新する"""
+        state = TranscriptParseState()
+        state.feed("CFO: ARPUは▲6%です。\nCEO: 続けよう。\n")
+        snapshot = state.snapshot()
+        assert snapshot["speaker_counts"] == {"CFO": 1, "CEO": 1}
+        assert snapshot["kpi_downgrade_count"] == 1
+        assert snapshot["exit_discussed"] is False
+
+        state.feed("CFO: ARPUは▲6%です。\nCEO: 続けよう。\nCFO: 利益率も未達。撤退も選択肢です。\n")
+        snapshot = state.snapshot()
+        assert snapshot["speaker_counts"] == {"CFO": 2, "CEO": 1}
+        assert snapshot["kpi_downgrade_count"] == 2
+        assert snapshot["exit_discussed"] is True
+
+    def test_rule_summary_matches_snapshot_features(self):
+        """発言リストを含まない集計からも、スナップショットと同じ特徴量・検出パターンが求まる"""
+        analyzer = StructureAnalyzer()
+        state = TranscriptParseState()
+        detected = set()
+        for end in list(range(0, len(TRANSCRIPT), 5)) + [len(TRANSCRIPT)]:
+            state.feed(TRANSCRIPT[:end])
+            summary = state.rule_summary()
+            snapshot = state.snapshot()
+            assert "statements" not in summary
+            assert analyzer.rule_inputs(summary) == analyzer.rule_inputs(snapshot)
+            pattern_ids = analyzer.detect_pattern_ids(summary)
+            assert pattern_ids == sorted(f["pattern_id"] for f in analyzer.analyze(snapshot)["findings"])
+            detected.update(pattern_ids)
+        # 撤退に言及する最後の発言の前までは正当化フェーズが検出される
+        assert "B1_正当化フェーズ" in detected
+
+    def test_rule_inputs_use_precomputed_counters(self):
+        """ルール入力は増分パースのカウンタを使っても全文から数えた場合と同じ値になる"""
+        analyzer = StructureAnalyzer()
+        parsed = self.service.parse_transcript(TRANSCRIPT)
+        legacy = {k: v for k, v in parsed.items() if k not in ("speaker_counts", "kpi_downgrade_count")}
+
+        assert analyzer.rule_inputs(parsed) == analyzer.rule_inputs(legacy)
@@ -0,0 +1,153 @@
+"""
+キーワード検出エンジン
+議事録・チャットのキーワード辞書（KPI、撤退、リスク等）を1つの Aho-Corasick オートマトンにまとめ、
+1テキストにつき1回の走査で全カテゴリのヒットを返す。
+辞書が数百語に増えても、走査コストはテキスト長にほぼ比例したまま変わらない。
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+
+# カテゴリ別の既定キーワード（並び順は「最初に一致したキーワード」を選ぶ優先順位）
+DEFAULT_KEYWORD_SETS: Dict[str, List[str]] = {
+    # 議事録: KPI関連
+    "kpi": ["KPI", "目標", "達成", "未達", "下方修正", "成長率", "ARPU", "利益率"],
+    # 議事録: KPI言及のうち下方修正・未達を示すもの
+    "kpi_downgrade": ["下方修正", "下回", "未達", "▲"],
+    # 議事録: 撤退/ピボット議論
+    "exit": ["撤退", "中止", "ピボット", "方向転換", "やめる"],
+    # チャット: リスク提起
+    "risk": ["やばい", "危険", "リスク", "問題", "止める", "上げた方がいい", "報告"],
+    # チャット: エスカレーション完了
+    "escalation": ["エスカレーション", "報告", "相談", "上げました", "報告しました"],
+    # チャット: 反対意見
+    "opposition": ["やめた方が", "止める", "撤退", "反対", "問題"],
+}
+
+
+class KeywordMatcher:
+    """複数カテゴリのキーワードを1回の走査で検出する Aho-Corasick マッチャー"""
+
+    def __init__(self, keyword_sets: Dict[str, List[str]]):
+        """
+        Args:
+            keyword_sets: カテゴリ名 → キーワードのリスト（リスト内の順序が優先順位）
+        """
+        self.keyword_sets = {category: list(keywords) for category, keywords in keyword_sets.items()}
+        # キーワード文字列 → [(カテゴリ, 優先順位)]（同じ語が複数カテゴリに属してもよい）
+        self._keyword_owners: Dict[str, List[Tuple[str, int]]] = {}
+        for category, keywords in self.keyword_sets.items():
+            for priority, keyword in enumerate(keywords):
+                owners = self._keyword_owners.setdefault(keyword, []) if keyword else None
+                if owners is not None and all(c != category for c, _ in owners):
+                    owners.append((category, priority))
+        self._build()
+
+    def _build(self) -> None:
+        """トライと失敗リンクを構築"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in self._keyword_owners:
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword)
+
+        # 幅優先で失敗リンクを張り、失敗先の出力を引き継ぐ（走査時に失敗リンクを辿って出力を集めずに済む）
+        # 根の直下は失敗リンクが根（初期値 0）のまま
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_keywords(self, text: str) -> List[str]:
+        """テキストに含まれるキーワード（重複なし、出現順）"""
+        found: Dict[str, None] = {}
+        if not text:
+            return []
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for keyword in output[state]:
+                    found[keyword] = None
+        return list(found)
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """
+        テキストを1回走査し、カテゴリごとのヒットを返す
+
+        Returns:
+            カテゴリ名 → 一致したキーワード（優先順位順）。一致のないカテゴリは含まない
+        """
+        ranked: Dict[str, List[Tuple[int, str]]] = {}
+        for keyword in self.find_keywords(text):
+            for category, priority in self._keyword_owners[keyword]:
+                ranked.setdefault(category, []).append((priority, keyword))
+        return {category: [keyword for _, keyword in sorted(hits)] for category, hits in ranked.items()}
+
+    def first(self, text: str, category: str) -> Optional[str]:
+        """カテゴリ内で優先順位が最も高い一致キーワード（一致しなければNone）"""
+        hits = self.scan(text).get(category)
+        return hits[0] if hits else None
+
+
+def load_keyword_sets(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    既定のキーワード辞書に、JSONファイル（{"カテゴリ": ["キーワード", ...]}）の内容を上書きして返す
+
+    ファイルに含まれないカテゴリは既定値のまま。読み込みに失敗した場合は既定値のみを使う。
+    """
+    keyword_sets = {category: list(keywords) for category, keywords in DEFAULT_KEYWORD_SETS.items()}
+    if not path:
+        return keyword_sets
+    try:
+        with open(Path(path), "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Failed to load keyword sets from {path}: {e}. Using defaults.")
+        return keyword_sets
+    if not isinstance(overrides, dict):
+        logger.warning(f"Keyword sets file {path} must be a JSON object. Using defaults.")
+        return keyword_sets
+    for category, keywords in overrides.items():
+        if isinstance(keywords, list):
+            keyword_sets[category] = [str(k) for k in keywords if k]
+    return keyword_sets
+
+
+# モジュール単一インスタンス（config から初期化）
+_keyword_matcher: Optional[KeywordMatcher] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    global _keyword_matcher
+    if _keyword_matcher is None:
+        from config import config
+        _keyword_matcher = KeywordMatcher(load_keyword_sets(config.KEYWORD_SETS_PATH))
+    return _keyword_matcher
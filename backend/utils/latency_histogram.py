@@ -0,0 +1,114 @@
+"""
+LLM呼び出しレイテンシのヒストグラム（モデル別）
+対数間隔のバケットで成功した呼び出しの所要時間を集計し、パーセンタイル（ヘッジ要求を出す待ち時間の自動調整・監視用）を返す。
+古い計測の影響を薄めるため、件数が max_samples に達するたびに全バケットを半分にする（指数的な減衰）。
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional
+
+
+def _bucket_bounds(start: float = 0.05, factor: float = 1.25, limit: float = 600.0) -> List[float]:
+    """バケットの上限値（秒）。start から factor 倍ずつ limit を超えるまで"""
+    bounds = [start]
+    while bounds[-1] < limit:
+        bounds.append(round(bounds[-1] * factor, 4))
+    return bounds
+
+
+class LatencyHistogram:
+    """対数間隔のバケットで所要時間を数えるヒストグラム（ロックは呼び出し側で取る）"""
+
+    BOUNDS = _bucket_bounds()
+
+    def __init__(self, max_samples: int = 1000):
+        """
+        Args:
+            max_samples: この件数に達したら全バケットを半分にする（直近の傾向を優先）
+        """
+        self.max_samples = max_samples
+        self.counts = [0.0] * (len(self.BOUNDS) + 1)  # 最後は上限超え
+        self.count = 0.0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if self.count >= self.max_samples:
+            self.counts = [c / 2 for c in self.counts]
+            self.count /= 2
+            self.total_seconds /= 2
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q パーセンタイル（0-100、バケット内は線形補間）。計測が無い場合はNone"""
+        if self.count <= 0:
+            return None
+        target = self.count * min(max(q, 0.0), 100.0) / 100.0
+        cumulative = 0.0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= target:
+                lower = self.BOUNDS[index - 1] if index > 0 else 0.0
+                upper = self.BOUNDS[index] if index < len(self.BOUNDS) else max(self.max_seconds, lower)
+                return lower + (upper - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """件数・平均・主要パーセンタイル（ミリ秒）"""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "count": int(self.count),
+            "mean_ms": ms(self.total_seconds / self.count) if self.count else None,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max_seconds) if self.count else None,
+        }
+
+
+class ModelLatencyHistograms:
+    """モデル名ごとの LatencyHistogram（スレッドセーフ）"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        """成功した呼び出しの所要時間を記録"""
+        with self._lock:
+            histogram = self._histograms.get(model)
+            if histogram is None:
+                histogram = self._histograms[model] = LatencyHistogram(self.max_samples)
+            histogram.record(seconds)
+
+    def percentile(self, model: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """モデルの q パーセンタイル（秒）。計測が min_samples 件未満の場合はNone"""
+        with self._lock:
+            histogram = self._histograms.get(model)
+            if histogram is None or histogram.count < min_samples:
+                return None
+            return histogram.percentile(q)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """モデル名 → 件数・パーセンタイル"""
+        with self._lock:
+            return {model: histogram.snapshot() for model, histogram in sorted(self._histograms.items())}
+
+
+# モジュール単一インスタンス
+_llm_latency: Optional[ModelLatencyHistograms] = None
+
+
+def get_llm_latency_histograms() -> ModelLatencyHistograms:
+    global _llm_latency
+    if _llm_latency is None:
+        _llm_latency = ModelLatencyHistograms()
+    return _llm_latency
@@ -0,0 +1,434 @@
+"""
+LLM呼び出しのアドミッション制御（プロセス全体）
+ロールの並行評価・長時間会議のチャンク抽出・バッチ分析などでLLM呼び出しが重なっても、
+Gemini の分あたりリクエスト数（RPM）・トークン数（TPM）の上限を超えないように呼び出しを待たせる。
+
+- RPM / TPM のトークンバケット（0で無制限）。TPM は推定トークン数で予約し、完了時に実績との差分を精算する
+- AIMD の同時実行ウィンドウ: 成功で少しずつ広げ、429（クォータ超過）・タイムアウトで半分に狭める
+- 待ち行列は分析の緊急度（IMMEDIATE > URGENT > HIGH > MEDIUM > LOW）順、同じ緊急度の中は到着順
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.logger import logger
+
+# 呼び出し元の分析の緊急度の優先度（None は MEDIUM。asyncio のタスクには自動で引き継がれる）
+_priority_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("llm_priority", default=None)
+
+# 待ち行列の先頭がバケットの回復待ちでないときの再確認間隔（秒）。通常は release で起こされる
+_MAX_POLL_SECONDS = 1.0
+
+
+class AdmissionTimeout(Exception):
+    """待ち行列での待ち時間が上限を超えた"""
+
+
+@lru_cache(maxsize=1)
+def priority_by_urgency() -> Dict[str, int]:
+    """緊急度 → 優先度（小さいほど先に通す）。UrgencyLevel の定義順（緊急度の高い順）から作る"""
+    # services パッケージの読み込みが本モジュールを参照するため、初回の呼び出し時に読み込む
+    from services.scoring import UrgencyLevel
+    return {level.value: priority for priority, level in enumerate(UrgencyLevel)}
+
+
+def default_priority() -> int:
+    """緊急度の指定が無い・不明な場合の優先度（MEDIUM）"""
+    return priority_by_urgency()["MEDIUM"]
+
+
+@contextmanager
+def llm_priority(urgency: Optional[str]) -> Iterator[None]:
+    """このブロック内（と中で作られた asyncio タスク）のLLM呼び出しの優先度を分析の緊急度で指定する"""
+    token = _priority_var.set(priority_by_urgency().get(str(urgency or "").upper(), default_priority()))
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+def current_priority() -> int:
+    """現在のLLM呼び出しの優先度"""
+    priority = _priority_var.get()
+    return default_priority() if priority is None else priority
+
+
+class TokenBucket:
+    """1分あたりの上限を秒単位で回復するトークンバケット（ロックは呼び出し側で取る）"""
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: 1分あたりの上限（0以下は無制限）
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def cost(self, amount: float) -> float:
+        """実際に予約する量（上限を超える要求も満タンなら通せるよう上限で切る）"""
+        return min(float(amount), self.capacity)
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount を予約できるまでの秒数（今すぐ予約できる場合は0）"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        missing = self.cost(amount) - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.tokens -= self.cost(amount)
+
+    def adjust(self, delta: float) -> None:
+        """予約量と実績の差分を精算（delta > 0 は追加消費、< 0 は返却）"""
+        if not self.unlimited:
+            self.tokens = max(-self.capacity, min(self.capacity, self.tokens - delta))
+
+    def available(self, now: float) -> Optional[float]:
+        if self.unlimited:
+            return None
+        self._refill(now)
+        return self.tokens
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+@dataclass
+class AdmissionPermit:
+    """許可済みのLLM呼び出し（release で返却する）"""
+    priority: int
+    estimated_tokens: int
+    admitted_at: float
+    waited_seconds: float
+    released: bool = False
+    # 呼び出し側が試行に紐づける情報（LLMService はサーキットブレーカーの許可を保持する）
+    breaker_permit: Optional[Any] = None
+
+
+@dataclass(order=True)
+class _Waiter:
+    """待ち行列の要素（priority → 到着順で並ぶ）"""
+    priority: int
+    seq: int
+    estimated_tokens: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    event: Optional[threading.Event] = field(default=None, compare=False)
+    loop: Optional[asyncio.AbstractEventLoop] = field(default=None, compare=False)
+    future: Optional["asyncio.Future[None]"] = field(default=None, compare=False)
+    permit: Optional[AdmissionPermit] = field(default=None, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+    def notify(self) -> None:
+        """許可したことを待っている側に知らせる（別スレッドから呼ばれうる）"""
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if self.future is not None and not self.future.done():
+            self.future.set_result(None)
+
+
+class LLMAdmissionController:
+    """
+    RPM / TPM のトークンバケットと AIMD の同時実行ウィンドウでLLM呼び出しを許可する（スレッドセーフ）
+
+    同期呼び出し（スレッドをブロック）・非同期呼び出し（イベントループをブロックしない）のどちらからも使える。
+    優先度の高い呼び出しが待っている間は、後から来た優先度の低い呼び出しを追い越させない。
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        queue_timeout: float = 30.0,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            requests_per_minute: 1分あたりのリクエスト数の上限（0は無制限）
+            tokens_per_minute: 1分あたりのトークン数（入力 + 出力）の上限（0は無制限）
+            initial_concurrency: 同時実行ウィンドウの初期値
+            min_concurrency: ウィンドウの下限
+            max_concurrency: ウィンドウの上限
+            increase_step: 成功時の増加量（ウィンドウ分の成功でおよそ increase_step 広がる）
+            decrease_factor: 429・タイムアウト時にウィンドウに掛ける係数
+            queue_timeout: 待ち行列で待つ最大秒数（超えたら AdmissionTimeout）
+            enabled: 無効の場合は待たずに許可する（統計のみ記録）
+        """
+        self.enabled = enabled
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.queue_timeout = queue_timeout
+        self._window = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._in_flight = 0
+        self._queue: List[_Waiter] = []
+        self._queued = 0  # 取り消し済みを除いた待ち数
+        self._seq = itertools.count()
+        # 直近にウィンドウを狭めた時刻。これより前に許可した呼び出しの失敗では重ねて狭めない（同じ混雑で何度も半減させない）
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._stats = {
+            "admitted": 0,
+            "successes": 0,
+            "throttled": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "queue_timeouts": 0,
+            "window_decreases": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    @property
+    def concurrency_limit(self) -> int:
+        """現在の同時実行数の上限"""
+        return int(self._window)
+
+    def acquire(self, estimated_tokens: int = 0, priority: Optional[int] = None, timeout: Optional[float] = None) -> AdmissionPermit:
+        """
+        LLM呼び出しの許可を得る（許可されるまでスレッドをブロック）
+
+        Args:
+            estimated_tokens: この呼び出しの推定トークン数（入力 + 想定出力）。TPMバケットから予約する
+            priority: 優先度（Noneの場合は llm_priority で指定された値）
+            timeout: 待つ最大秒数（Noneの場合は queue_timeout）
+
+        Raises:
+            AdmissionTimeout: 時間内に許可されなかった
+        """
+        waiter = _Waiter(
+            priority=current_priority() if priority is None else priority,
+            seq=next(self._seq),
+            estimated_tokens=estimated_tokens,
+            enqueued_at=time.monotonic(),
+            event=threading.Event(),
+        )
+        deadline = waiter.enqueued_at + (self.queue_timeout if timeout is None else timeout)
+        poll = self._enqueue(waiter)
+        while waiter.permit is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._give_up(waiter)
+            waiter.event.wait(min(remaining, poll))
+            with self._lock:
+                poll = self._dispatch()
+        return waiter.permit
+
+    async def acquire_async(
+        self,
+        estimated_tokens: int = 0,
+        priority: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> AdmissionPermit:
+        """acquire の非同期版（イベントループをブロックしない）。取り消された場合は許可を返却する"""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=current_priority() if priority is None else priority,
+            seq=next(self._seq),
+            estimated_tokens=estimated_tokens,
+            enqueued_at=time.monotonic(),
+            loop=loop,
+            future=loop.create_future(),
+        )
+        deadline = waiter.enqueued_at + (self.queue_timeout if timeout is None else timeout)
+        poll = self._enqueue(waiter)
+        try:
+            while waiter.permit is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self._give_up(waiter)
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), timeout=min(remaining, poll))
+                except asyncio.TimeoutError:
+                    pass
+                with self._lock:
+                    poll = self._dispatch()
+        except asyncio.CancelledError:
+            with self._lock:
+                permit = waiter.permit
+                if permit is None:
+                    self._cancel(waiter)
+            if permit is not None:
+                self.release(permit, outcome="cancelled")
+            raise
+        return waiter.permit
+
+    def release(self, permit: AdmissionPermit, outcome: str = "success", actual_tokens: Optional[int] = None) -> None:
+        """
+        許可を返却し、結果に応じてウィンドウを調整する
+
+        Args:
+            permit: acquire で得た許可
+            outcome: "success" / "throttled"（429・クォータ超過）/ "timeout" / "error" / "cancelled"
+            actual_tokens: 実際のトークン数（分かる場合。予約した推定値との差分をTPMバケットで精算する）
+        """
+        with self._lock:
+            if permit.released:
+                return
+            permit.released = True
+            self._in_flight -= 1
+            if actual_tokens is not None and self.enabled:
+                self._tokens.adjust(actual_tokens - self._tokens.cost(permit.estimated_tokens))
+            if outcome == "success":
+                self._stats["successes"] += 1
+                self._window = min(float(self.max_concurrency), self._window + self.increase_step / self._window)
+            elif outcome in ("throttled", "timeout"):
+                self._stats["throttled" if outcome == "throttled" else "timeouts"] += 1
+                if permit.admitted_at >= self._last_decrease:
+                    self._window = max(float(self.min_concurrency), self._window * self.decrease_factor)
+                    self._last_decrease = time.monotonic()
+                    self._stats["window_decreases"] += 1
+                    logger.warning(
+                        f"LLM呼び出しが制限されたため同時実行数を狭めます: outcome={outcome}, limit={self.concurrency_limit}"
+                    )
+            elif outcome == "error":
+                self._stats["errors"] += 1
+            self._dispatch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """同時実行ウィンドウ・待ち行列・バケット残量と累計"""
+        with self._lock:
+            now = time.monotonic()
+            queued_by_priority = {name: 0 for name in priority_by_urgency()}
+            names = {p: name for name, p in priority_by_urgency().items()}
+            for waiter in self._queue:
+                if not waiter.cancelled and waiter.permit is None:
+                    name = names.get(waiter.priority)
+                    if name is not None:
+                        queued_by_priority[name] += 1
+            stats: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "concurrency_limit": self.concurrency_limit,
+                "window": round(self._window, 3),
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "queued_by_priority": queued_by_priority,
+                "rpm_limit": self._requests.capacity or None,
+                "rpm_available": _round(self._requests.available(now)),
+                "tpm_limit": self._tokens.capacity or None,
+                "tpm_available": _round(self._tokens.available(now)),
+            }
+            stats.update(self._stats)
+        admitted = max(stats["admitted"], 1)
+        stats["avg_wait_ms"] = round(stats.pop("total_wait_seconds") / admitted * 1000, 1)
+        stats["max_wait_ms"] = round(stats.pop("max_wait_seconds") * 1000, 1)
+        return stats
+
+    def _enqueue(self, waiter: _Waiter) -> float:
+        """待ち行列に入れて許可できる分を通す。戻り値は次に再確認するまでの秒数"""
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+            self._queued += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+            return self._dispatch()
+
+    def _dispatch(self) -> float:
+        """
+        先頭から順に許可できるだけ許可する（ロック取得済み前提）
+
+        Returns:
+            先頭がバケットの回復待ちならその秒数、それ以外は _MAX_POLL_SECONDS
+        """
+        while self._queue:
+            head = self._queue[0]
+            if head.cancelled or head.permit is not None:
+                heapq.heappop(self._queue)
+                continue
+            now = time.monotonic()
+            if self.enabled:
+                if self._in_flight >= self.concurrency_limit:
+                    return _MAX_POLL_SECONDS
+                wait = max(self._requests.wait_time(1, now), self._tokens.wait_time(head.estimated_tokens, now))
+                if wait > 0:
+                    return min(wait, _MAX_POLL_SECONDS)
+                self._requests.take(1, now)
+                self._tokens.take(head.estimated_tokens, now)
+            heapq.heappop(self._queue)
+            self._queued -= 1
+            self._in_flight += 1
+            waited = now - head.enqueued_at
+            self._stats["admitted"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            head.permit = AdmissionPermit(
+                priority=head.priority,
+                estimated_tokens=head.estimated_tokens,
+                admitted_at=now,
+                waited_seconds=waited,
+            )
+            head.notify()
+        return _MAX_POLL_SECONDS
+
+    def _give_up(self, waiter: _Waiter) -> AdmissionPermit:
+        """待ち時間の上限に達した（直前に許可されていればそれを返す）"""
+        with self._lock:
+            if waiter.permit is not None:
+                return waiter.permit
+            self._cancel(waiter)
+            self._stats["queue_timeouts"] += 1
+            queued = self._queued
+        raise AdmissionTimeout(
+            f"LLM呼び出しの待ち時間が上限を超えました（queued={queued}, limit={self.concurrency_limit}）"
+        )
+
+    def _cancel(self, waiter: _Waiter) -> None:
+        """待ち行列から外す（ロック取得済み前提。ヒープからは _dispatch で取り除く）"""
+        if not waiter.cancelled:
+            waiter.cancelled = True
+            self._queued -= 1
+            # 先頭が抜けたことで後ろの呼び出しを通せる場合がある
+            self._dispatch()
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+# モジュール単一インスタンス（config から初期化）
+_admission_controller: Optional[LLMAdmissionController] = None
+
+
+def get_admission_controller() -> LLMAdmissionController:
+    global _admission_controller
+    if _admission_controller is None:
+        from config import config
+        _admission_controller = LLMAdmissionController(
+            requests_per_minute=config.LLM_RPM_LIMIT,
+            tokens_per_minute=config.LLM_TPM_LIMIT,
+            initial_concurrency=config.LLM_CONCURRENCY_INITIAL,
+            min_concurrency=config.LLM_CONCURRENCY_MIN,
+            max_concurrency=config.LLM_CONCURRENCY_MAX,
+            queue_timeout=config.LLM_ADMISSION_QUEUE_TIMEOUT,
+            enabled=config.LLM_ADMISSION_ENABLED,
+        )
+    return _admission_controller
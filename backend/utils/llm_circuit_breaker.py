@@ -0,0 +1,224 @@
+"""
+LLMプロバイダのサーキットブレーカー
+Gemini の障害・大幅な遅延時に、ロールごとに LLM_MAX_RETRIES 回のリトライとバックオフを待ってから
+モックにフォールバックするのではなく、直ちにルールベース / モックの結果を返すための状態管理。
+
+- closed: 通常どおり呼び出す。直近 window_seconds のエラー率・遅延率が閾値を超えたら open
+- open: 呼び出さない。open_seconds 経過後に half_open
+- half_open: 試験的に half_open_probes 件だけ呼び出し、すべて成功（遅延なし）なら closed、1件でも失敗なら再び open
+
+allow_request が返す BreakerPermit で呼び出しを許可時の状態に紐づけ、状態が変わる前に許可された呼び出しの結果
+（open 前に始まって half_open 中に返ってきた遅い呼び出しなど）は判定に使わない。
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from utils.logger import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerPermit:
+    """allow_request が許可した呼び出し（結果を返すときに渡す）"""
+    generation: int  # 許可時の状態の世代（状態が変わるたびに増える）
+    probe: bool  # half_open の試験呼び出しか
+
+
+class LLMCircuitBreaker:
+    """直近の呼び出しのエラー率・遅延率で開閉するサーキットブレーカー（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            window_seconds: エラー率・遅延率を集計する直近の期間（秒）
+            min_calls: 判定に必要な最小呼び出し数（少数の失敗で開かないように）
+            failure_rate_threshold: これ以上のエラー率で open にする
+            slow_call_seconds: これ以上かかった呼び出しを遅延として数える
+            slow_rate_threshold: これ以上の遅延率で open にする
+            open_seconds: open から half_open に移るまでの秒数
+            half_open_probes: half_open で試験的に通す呼び出し数
+            enabled: 無効の場合は常に呼び出しを許可する（記録のみ）
+        """
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.enabled = enabled
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()  # (時刻, 失敗, 遅延)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0, "failures": 0, "slow_calls": 0, "successes": 0}
+        self._last_open_reason: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        """現在の状態（open の待ち時間が過ぎていれば half_open）"""
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def is_open(self) -> bool:
+        """呼び出しを試みずにフォールバックすべきか（half_open は試験呼び出しの余地があるため False）"""
+        return self.enabled and self.state == OPEN
+
+    def allow_request(self) -> Optional[BreakerPermit]:
+        """
+        呼び出しの可否。拒否した場合は None
+
+        許可した呼び出しは、返した BreakerPermit を record_success / record_failure / abandon のいずれかに渡して
+        必ず結果を返す。half_open では試験呼び出しの枠を1つ消費する。
+        """
+        with self._lock:
+            self._advance(time.monotonic())
+            if not self.enabled or self._state == CLOSED:
+                return BreakerPermit(self._generation, probe=False)
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return BreakerPermit(self._generation, probe=True)
+            self._stats["rejected"] += 1
+            return None
+
+    def record_success(self, latency: float, permit: Optional[BreakerPermit] = None) -> None:
+        """
+        応答があった呼び出しを記録（latency が slow_call_seconds 以上なら遅延として数える）
+
+        permit を省略した場合は closed で許可された呼び出しとして扱う
+        """
+        self._record(failed=False, latency=latency, permit=permit)
+
+    def record_failure(self, latency: float, permit: Optional[BreakerPermit] = None) -> None:
+        """失敗した呼び出し（例外・タイムアウト・429など）を記録"""
+        self._record(failed=True, latency=latency, permit=permit)
+
+    def abandon(self, permit: Optional[BreakerPermit] = None) -> None:
+        """結果を待たずに取り消した呼び出し（判定には使わず、現在の half_open の試験呼び出しならその枠だけ返す）"""
+        with self._lock:
+            self._advance(time.monotonic())
+            if self._is_current_probe(permit) and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def reset(self) -> None:
+        """closed に戻して集計をクリア"""
+        with self._lock:
+            self._close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """状態・直近のエラー率/遅延率・累計（監視用）"""
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            self._prune(now)
+            calls, failure_rate, slow_rate = self._rates()
+            stats: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "state": self._state,
+                "window_calls": calls,
+                "failure_rate": round(failure_rate, 3),
+                "slow_rate": round(slow_rate, 3),
+                "retry_in_seconds": round(max(0.0, self._opened_at + self.open_seconds - now), 1) if self._state == OPEN else 0.0,
+                "last_open_reason": self._last_open_reason,
+            }
+            stats.update(self._stats)
+        return stats
+
+    def _record(self, failed: bool, latency: float, permit: Optional[BreakerPermit]) -> None:
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            self._stats["failures" if failed else "successes"] += 1
+            if slow:
+                self._stats["slow_calls"] += 1
+            if self._state == HALF_OPEN:
+                if not self._is_current_probe(permit):
+                    # open 前に許可された呼び出しや、前回の half_open の試験呼び出しの結果。判定には使わない
+                    return
+                if self._probes_in_flight > 0:
+                    self._probes_in_flight -= 1
+                if failed or slow:
+                    self._open(now, "half_open の試験呼び出しが" + ("失敗" if failed else f"遅延（{latency:.1f}s）"))
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._close()
+                        logger.info("LLMサーキットブレーカーを閉じました（試験呼び出しが成功）")
+                return
+            if self._state == OPEN or (permit is not None and permit.generation != self._generation):
+                # 開く前（または前回の closed の間）に始まっていた呼び出しの結果。判定には使わない
+                return
+            self._calls.append((now, failed, slow))
+            self._prune(now)
+            calls, failure_rate, slow_rate = self._rates()
+            if calls < self.min_calls:
+                return
+            if failure_rate >= self.failure_rate_threshold:
+                self._open(now, f"エラー率 {failure_rate:.0%}（直近{calls}件）")
+            elif slow_rate >= self.slow_rate_threshold:
+                self._open(now, f"遅延率 {slow_rate:.0%}（{self.slow_call_seconds:.0f}s以上、直近{calls}件）")
+
+    def _is_current_probe(self, permit: Optional[BreakerPermit]) -> bool:
+        """現在の half_open で許可した試験呼び出しか（ロック取得済み前提）"""
+        return (
+            self._state == HALF_OPEN and permit is not None and permit.probe
+            and permit.generation == self._generation
+        )
+
+    def _advance(self, now: float) -> None:
+        """open の待ち時間が過ぎていれば half_open に移す（ロック取得済み前提）"""
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._generation += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state = OPEN
+        self._generation += 1
+        self._opened_at = now
+        self._calls.clear()
+        self._stats["opened"] += 1
+        self._last_open_reason = reason
+        logger.warning(f"LLMサーキットブレーカーを開きました: {reason}。{self.open_seconds:.0f}秒間はLLMを呼ばずにフォールバックします")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._generation += 1
+        self._calls.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        calls = len(self._calls)
+        if not calls:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return calls, failures / calls, slow / calls
@@ -0,0 +1,300 @@
+"""
+LLMコンテキストキャッシュ
+ロール別プロンプトの共通の先頭部分（評価指示 + 会議・チャット・資料）をプロバイダ側にキャッシュし、
+2ロール目以降・同じ分析のタスク生成では残りの部分だけを送る。
+キャッシュ済みトークンは割引料金で課金され、先頭部分の処理時間も短くなる。
+
+プロバイダとのやり取りはバックエンドに分離している:
+- GenAIContextCacheBackend: Gen AI SDK（google-generativeai）の CachedContent
+- FakeContextCacheBackend: APIを呼ばないローカル実装（テスト・オフライン検証用）
+"""
+
+import datetime
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+from utils.token_estimator import TokenEstimator, get_token_estimator
+
+# Gen AI SDK（オプション）
+try:
+    import google.generativeai as genai
+    from google.generativeai import caching as genai_caching
+    _GENAI_CACHING_AVAILABLE = True
+except ImportError:
+    genai = None
+    genai_caching = None
+    _GENAI_CACHING_AVAILABLE = False
+
+
+@dataclass
+class ContextCacheEntry:
+    """作成済みのコンテキストキャッシュ"""
+    key: str
+    model: str
+    prefix: str
+    prefix_tokens: int  # 推定トークン数
+    handle: Any  # バックエンドが返したキャッシュ（CachedContent など）
+    expires_at: float
+
+
+class GenAIContextCacheBackend:
+    """Gen AI SDK の CachedContent を使うバックエンド"""
+
+    def create(self, model: str, prefix: str, ttl_seconds: int) -> Any:
+        """先頭部分をキャッシュとして作成し、CachedContent を返す"""
+        return genai_caching.CachedContent.create(
+            model=f"models/{model}",
+            contents=[prefix],
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+
+    def model_for(self, handle: Any, model: str) -> Any:
+        """キャッシュを参照する GenerativeModel"""
+        return genai.GenerativeModel.from_cached_content(cached_content=handle)
+
+    def delete(self, handle: Any) -> None:
+        """キャッシュを削除"""
+        handle.delete()
+
+
+class FakeContextCacheBackend:
+    """
+    APIを呼ばないローカル実装（テスト・オフライン検証用）
+
+    作成・削除を記録し、model_for はキャッシュ名と先頭部分を持つ辞書を返す。
+    """
+
+    def __init__(self, fail: bool = False):
+        """
+        Args:
+            fail: True の場合 create が例外を送出する（作成失敗時の動作確認用）
+        """
+        self.fail = fail
+        self.created: List[Tuple[str, str]] = []  # (キャッシュ名, 先頭部分)
+        self.deleted: List[str] = []
+        self._lock = threading.Lock()
+
+    def create(self, model: str, prefix: str, ttl_seconds: int) -> Any:
+        if self.fail:
+            raise RuntimeError("fake context cache creation failed")
+        with self._lock:
+            name = f"cachedContents/fake-{len(self.created) + 1}"
+            self.created.append((name, prefix))
+        return {"name": name, "model": model, "prefix": prefix}
+
+    def model_for(self, handle: Any, model: str) -> Any:
+        return handle
+
+    def delete(self, handle: Any) -> None:
+        with self._lock:
+            self.deleted.append(handle["name"])
+
+
+class LLMContextCache:
+    """
+    モデル × 先頭部分ごとのコンテキストキャッシュの管理（スレッドセーフ）
+
+    同じ先頭部分を並行に要求された場合は1つのスレッドだけが作成し、他はその結果を待って再利用する。
+    推定トークン数が min_tokens 未満の先頭部分はキャッシュしない（プロバイダの最小サイズ未満・保存料金の方が高くつくため）。
+    作成に失敗した先頭部分は有効期間の間は再作成を試みない（ロールごとに失敗を繰り返さないため）。
+    """
+
+    def __init__(
+        self,
+        backend: Any = None,
+        ttl_seconds: int = 600,
+        min_tokens: int = 2048,
+        max_entries: int = 32,
+        enabled: bool = True,
+        estimator: Optional[TokenEstimator] = None,
+    ):
+        """
+        Args:
+            backend: create / model_for / delete を持つバックエンド（Noneの場合は無効）
+            ttl_seconds: キャッシュの有効期間（秒）
+            min_tokens: キャッシュする先頭部分の最小推定トークン数
+            max_entries: 保持する最大キャッシュ数（超えたら最も古く使われたものを削除）
+            enabled: 無効の場合は acquire が常に None を返す
+            estimator: トークン数の推定器（Noneの場合は共有インスタンス）
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self.enabled = enabled and backend is not None
+        self.estimator = estimator or get_token_estimator()
+        # 有効期限ぎりぎりのキャッシュは呼び出し中に失効しうるため、残り時間がこれ未満なら作り直す
+        self.refresh_margin = min(60.0, ttl_seconds / 10)
+        self._entries: "OrderedDict[str, ContextCacheEntry]" = OrderedDict()
+        self._failed: Dict[str, float] = {}  # 作成に失敗したキー → 再試行を許可する時刻
+        self._creating: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "creates": 0,
+            "reuses": 0,
+            "create_failures": 0,
+            "skipped_small": 0,
+            "evictions": 0,
+            "reused_prefix_tokens": 0,
+        }
+
+    @staticmethod
+    def make_key(model: str, prefix: str) -> str:
+        """モデルと先頭部分からキャッシュキー（SHA-256）を作る"""
+        return hashlib.sha256(f"{model}\x00{prefix}".encode("utf-8")).hexdigest()
+
+    def acquire(self, model: str, prefix: str, create: bool = True) -> Optional[ContextCacheEntry]:
+        """
+        先頭部分のキャッシュを取得（無ければ作成）
+
+        Args:
+            model: モデル名（models/ プレフィックスなし）
+            prefix: プロンプトの先頭部分
+            create: False の場合は既存のキャッシュだけを返す（1回しか使わない呼び出し用）
+
+        Returns:
+            ContextCacheEntry。キャッシュを使わない場合（無効・小さすぎる・作成失敗）はNone
+        """
+        if not self.enabled or not prefix:
+            return None
+        key = self.make_key(model, prefix)
+        entry = self._lookup(key)
+        if entry is not None or not create:
+            return entry
+
+        prefix_tokens = self.estimator.estimate(prefix)
+        if prefix_tokens < self.min_tokens:
+            with self._lock:
+                self._stats["skipped_small"] += 1
+            return None
+
+        with self._lock:
+            if self._failed.get(key, 0) > time.time():
+                return None
+            creating = self._creating.setdefault(key, threading.Lock())
+        with creating:
+            # 待っている間に他のスレッドが作成済みならそれを使う
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            with self._lock:
+                if self._failed.get(key, 0) > time.time():
+                    return None
+            try:
+                handle = self.backend.create(model, prefix, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"LLMコンテキストキャッシュの作成に失敗しました（全文を送信します）: {e}")
+                with self._lock:
+                    self._stats["create_failures"] += 1
+                    self._failed[key] = time.time() + self.ttl_seconds
+                    self._creating.pop(key, None)
+                return None
+            entry = ContextCacheEntry(
+                key=key,
+                model=model,
+                prefix=prefix,
+                prefix_tokens=prefix_tokens,
+                handle=handle,
+                expires_at=time.time() + self.ttl_seconds,
+            )
+            with self._lock:
+                self._entries[key] = entry
+                self._stats["creates"] += 1
+                self._creating.pop(key, None)
+                evicted = self._evict_over_limit()
+            logger.info(f"LLMコンテキストキャッシュを作成しました: model={model}, prefix_tokens≈{prefix_tokens}")
+        self._delete_handles(evicted)
+        return entry
+
+    def contains(self, model: str, prefix: str) -> bool:
+        """有効なキャッシュがあるか（再利用回数には数えない）"""
+        if not self.enabled or not prefix:
+            return False
+        with self._lock:
+            entry = self._entries.get(self.make_key(model, prefix))
+            return entry is not None and entry.expires_at - time.time() >= self.refresh_margin
+
+    def model_for(self, entry: ContextCacheEntry) -> Any:
+        """キャッシュを参照するモデル（バックエンド依存）"""
+        return self.backend.model_for(entry.handle, entry.model)
+
+    def invalidate(self, entry: ContextCacheEntry) -> None:
+        """キャッシュを破棄（プロバイダ側で失効していた場合など）。次回の acquire で作り直す"""
+        with self._lock:
+            removed = self._entries.pop(entry.key, None)
+        if removed is not None:
+            self._delete_handles([removed])
+
+    def clear(self) -> None:
+        """全キャッシュを破棄"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._failed.clear()
+        self._delete_handles(entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """作成・再利用回数などの統計"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["enabled"] = self.enabled
+        return stats
+
+    def _lookup(self, key: str) -> Optional[ContextCacheEntry]:
+        """有効なキャッシュを参照し、再利用として数える"""
+        expired = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at - time.time() < self.refresh_margin:
+                expired = self._entries.pop(key)
+                entry = None
+            else:
+                self._entries.move_to_end(key)
+                self._stats["reuses"] += 1
+                self._stats["reused_prefix_tokens"] += entry.prefix_tokens
+        if expired is not None:
+            self._delete_handles([expired])
+        return entry
+
+    def _evict_over_limit(self) -> List[ContextCacheEntry]:
+        """上限を超えた分を最も古く使われたものから外す（ロック取得済み前提。削除は呼び出し側でロック外に行う）"""
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            evicted.append(entry)
+            self._stats["evictions"] += 1
+        return evicted
+
+    def _delete_handles(self, entries: List[ContextCacheEntry]) -> None:
+        """プロバイダ側のキャッシュを削除（失敗しても有効期限で消えるためログのみ）"""
+        for entry in entries:
+            try:
+                self.backend.delete(entry.handle)
+            except Exception as e:
+                logger.debug(f"LLMコンテキストキャッシュの削除に失敗しました: {e}")
+
+
+# モジュール単一インスタンス（config から初期化）
+_context_cache: Optional[LLMContextCache] = None
+
+
+def get_context_cache() -> LLMContextCache:
+    global _context_cache
+    if _context_cache is None:
+        from config import config
+        _context_cache = LLMContextCache(
+            backend=GenAIContextCacheBackend() if _GENAI_CACHING_AVAILABLE else None,
+            ttl_seconds=config.LLM_CONTEXT_CACHE_TTL_SECONDS,
+            min_tokens=config.LLM_CONTEXT_CACHE_MIN_TOKENS,
+            max_entries=config.LLM_CONTEXT_CACHE_MAX_ENTRIES,
+            enabled=config.LLM_CONTEXT_CACHE_ENABLED,
+        )
+    return _context_cache
@@ -0,0 +1,238 @@
+"""
+LLMレスポンスのコンテンツアドレス型キャッシュ
+(プロンプト, モデル, temperature, top_p, レスポンス形式) のハッシュをキーに、
+メモリLRU層とローカルSQLite層の2段でレスポンスを保持する。
+同じ会議の再分析（デモの再実行、UIからのリトライ等）でトークンとレイテンシを払わないようにする。
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils.logger import logger
+
+
+class LLMResponseCache:
+    """スレッドセーフな2層（メモリLRU + SQLite）LLMレスポンスキャッシュ"""
+
+    def __init__(
+        self,
+        ttl_seconds: int = 86400,
+        max_entries: int = 256,
+        db_path: Optional[str] = None,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            ttl_seconds: エントリの有効期間（秒）
+            max_entries: メモリ層に保持する最大エントリ数（超えたら最も古く使われたものから追い出す）
+            db_path: SQLiteファイルのパス。None または空文字の場合はメモリ層のみ
+            enabled: 無効の場合は get が常にミスし、set は何もしない
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[str, Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_served": 0,
+            "bytes_stored": 0,
+        }
+        if self.enabled and db_path:
+            self._open_disk(db_path)
+
+    def _open_disk(self, db_path: str) -> None:
+        """SQLite層を開く（Cloud Run など書き込み不可環境ではメモリ層のみで動作）"""
+        try:
+            path = Path(db_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                " cache_key TEXT PRIMARY KEY,"
+                " response_text TEXT NOT NULL,"
+                " usage_json TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        except (sqlite3.Error, OSError) as e:
+            logger.info(f"LLM response cache disk tier disabled: {e}. Using memory tier only.")
+            self._conn = None
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model_name: str,
+        temperature: float,
+        top_p: float,
+        response_format: str,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        レンダリング済みプロンプトと生成パラメータからキャッシュキー（SHA-256）を作る
+
+        response_schema はモデルに渡すスキーマ（渡さない場合はNone）。キーの順序に依らないよう並べ替えて含める
+        """
+        payload = json.dumps(
+            [prompt, model_name, temperature, top_p, response_format, response_schema],
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        キャッシュを参照
+
+        Returns:
+            (response_text, usage)。ミスまたは期限切れの場合はNone
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, usage, expires_at = entry
+                if now <= expires_at:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._stats["bytes_served"] += len(text.encode("utf-8"))
+                    return text, dict(usage)
+                del self._memory[key]
+
+            disk_entry = self._disk_get(key, now)
+            if disk_entry is not None:
+                text, usage, expires_at = disk_entry
+                self._memory_put(key, text, usage, expires_at)
+                self._stats["disk_hits"] += 1
+                self._stats["bytes_served"] += len(text.encode("utf-8"))
+                return text, dict(usage)
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, response_text: str, usage: Optional[Dict[str, Any]] = None) -> None:
+        """レスポンスを両方の層に保存"""
+        if not self.enabled or not response_text:
+            return
+        usage = dict(usage or {})
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._memory_put(key, response_text, usage, expires_at)
+            self._stats["stores"] += 1
+            self._stats["bytes_stored"] += len(response_text.encode("utf-8"))
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO llm_response_cache"
+                        " (cache_key, response_text, usage_json, created_at, expires_at)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (key, response_text, json.dumps(usage), now, expires_at),
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to write LLM response cache: {e}")
+
+    def delete(self, key: str) -> None:
+        """エントリを削除（パースできなかったレスポンスを再利用しないため）"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to delete LLM response cache entry: {e}")
+
+    def purge_expired(self) -> int:
+        """期限切れエントリを削除し、削除件数を返す"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key in [k for k, (_, _, exp) in self._memory.items() if exp < now]:
+                del self._memory[key]
+                removed += 1
+            if self._conn is not None:
+                try:
+                    cur = self._conn.execute("DELETE FROM llm_response_cache WHERE expires_at < ?", (now,))
+                    self._conn.commit()
+                    removed += cur.rowcount
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to purge LLM response cache: {e}")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット/ミス/バイト数などの統計"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = sum(len(text.encode("utf-8")) for text, _, _ in self._memory.values())
+            stats["disk_enabled"] = self._conn is not None
+            stats["enabled"] = self.enabled
+        return stats
+
+    def _memory_put(self, key: str, text: str, usage: Dict[str, Any], expires_at: float) -> None:
+        """メモリ層に保存し、上限を超えたら最も古く使われたエントリを追い出す（ロック取得済み前提）"""
+        self._memory[key] = (text, usage, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """SQLite層を参照（ロック取得済み前提）"""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT response_text, usage_json, expires_at FROM llm_response_cache WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read LLM response cache: {e}")
+            return None
+        if row is None:
+            return None
+        text, usage_json, expires_at = row
+        if now > expires_at:
+            return None
+        try:
+            usage = json.loads(usage_json) or {}
+        except json.JSONDecodeError:
+            usage = {}
+        return text, usage, expires_at
+
+
+# モジュール単一インスタンス（config から初期化）
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> LLMResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        from config import config
+        _response_cache = LLMResponseCache(
+            ttl_seconds=config.LLM_CACHE_TTL_SECONDS,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            db_path=config.LLM_CACHE_DB_PATH,
+            enabled=config.LLM_CACHE_ENABLED,
+        )
+    return _response_cache
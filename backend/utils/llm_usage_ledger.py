@@ -0,0 +1,359 @@
+"""
+LLM呼び出しの使用量台帳（ローカルSQLite）
+呼び出しごとのトークン数・所要時間・モデル・キャッシュヒットを、分析ID・ロールID・エンドポイント付きで記録する。
+集計クエリは1時間単位の集計表（記録時に加算）から返すため、呼び出し数が増えても遅くならない。
+記録はメモリ上に溜めて専用スレッドがまとめて書き込む（呼び出し元・イベントループでは SQLite に触れない）。
+集計は書き込み済みの記録だけを読む（書き込み間隔の分だけ遅れる。読み込み側からは書き込まない）。
+保持期間を過ぎた明細の削除も同じスレッドが定期的に行う。
+プロセスを再起動しても本日の使用量が残るため、日次トークン上限（LLMUsageTracker）の起点にも使う。
+"""
+
+import atexit
+import contextvars
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from utils.logger import endpoint_var, logger
+
+# 集計のグループ化に使える列
+GROUP_BY_COLUMNS = ("model", "endpoint", "role_id")
+_TAG_KEYS = ("analysis_id", "role_id", "endpoint")
+
+# 溜まった記録がこの件数に達したら、書き込み間隔を待たずに書き込む
+_FLUSH_BATCH = 200
+
+# 呼び出し元のタグ（asyncio のタスクには自動で引き継がれる。スレッドプールへは contextvars.copy_context で渡す）
+_tags_var: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("llm_usage_tags", default={})
+
+
+@contextmanager
+def llm_usage_tags(**tags: Optional[str]) -> Iterator[None]:
+    """このブロック内のLLM呼び出しを analysis_id / role_id / endpoint で記録する（None の値は外側のタグを引き継ぐ）"""
+    merged = dict(_tags_var.get())
+    merged.update({key: str(value) for key, value in tags.items() if key in _TAG_KEYS and value is not None})
+    token = _tags_var.set(merged)
+    try:
+        yield
+    finally:
+        _tags_var.reset(token)
+
+
+def current_usage_tags() -> Dict[str, Optional[str]]:
+    """現在のタグ（endpoint 未指定時はリクエストのパス）"""
+    tags = _tags_var.get()
+    return {
+        "analysis_id": tags.get("analysis_id"),
+        "role_id": tags.get("role_id"),
+        "endpoint": tags.get("endpoint") or endpoint_var.get(),
+    }
+
+
+def _hour_key(moment: datetime) -> str:
+    """1時間単位の集計キー（ローカル時刻。文字列の大小が時刻の前後と一致する）"""
+    return moment.strftime("%Y-%m-%dT%H")
+
+
+class LLMUsageLedger:
+    """スレッドセーフなLLM使用量台帳（呼び出し明細 + 1時間単位の集計表）"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        enabled: bool = True,
+        retention_days: int = 30,
+        flush_interval: float = 1.0,
+        purge_interval: float = 3600.0,
+    ):
+        """
+        Args:
+            db_path: SQLiteファイルのパス。None または空文字（書き込めない場合も）はメモリ上のDB（再起動で消える）
+            enabled: 無効の場合は record が何もしない
+            retention_days: 呼び出し明細の保持日数（集計表は削除しない）。0以下は無期限
+            flush_interval: 溜まった記録を書き込む間隔（秒）
+            purge_interval: 保持期間を過ぎた明細を削除する間隔（秒）
+        """
+        self.enabled = enabled
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()  # DB接続
+        self._pending_lock = threading.Lock()  # 書き込み待ちの記録と書き込みスレッド
+        self._pending: List[tuple] = []
+        self._writer: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._next_purge = 0.0
+        self._persistent = False
+        self._conn = self._open(db_path) if enabled else None
+        if self._conn is not None and retention_days > 0:
+            self.purge(retention_days)
+
+    def _open(self, db_path: Optional[str]) -> Optional[sqlite3.Connection]:
+        """DBを開いてテーブルを作成（ファイルを開けない環境ではメモリ上のDB）"""
+        conn = None
+        if db_path:
+            try:
+                path = Path(db_path)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._persistent = True
+            except (sqlite3.Error, OSError) as e:
+                logger.info(f"LLM usage ledger file disabled: {e}. Using in-memory ledger.")
+                conn = None
+        try:
+            conn = conn or sqlite3.connect(":memory:", check_same_thread=False)
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS llm_usage_calls ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " ts REAL NOT NULL,"
+                " hour TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " endpoint TEXT NOT NULL DEFAULT '',"
+                " role_id TEXT NOT NULL DEFAULT '',"
+                " analysis_id TEXT,"
+                " input_tokens INTEGER NOT NULL DEFAULT 0,"
+                " output_tokens INTEGER NOT NULL DEFAULT 0,"
+                " cached_input_tokens INTEGER NOT NULL DEFAULT 0,"
+                " latency_ms REAL NOT NULL DEFAULT 0,"
+                " cache_hit INTEGER NOT NULL DEFAULT 0);"
+                "CREATE INDEX IF NOT EXISTS idx_llm_usage_calls_analysis ON llm_usage_calls (analysis_id);"
+                "CREATE INDEX IF NOT EXISTS idx_llm_usage_calls_ts ON llm_usage_calls (ts);"
+                "CREATE TABLE IF NOT EXISTS llm_usage_hourly ("
+                " hour TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " endpoint TEXT NOT NULL,"
+                " role_id TEXT NOT NULL,"
+                " calls INTEGER NOT NULL DEFAULT 0,"
+                " cache_hits INTEGER NOT NULL DEFAULT 0,"
+                " input_tokens INTEGER NOT NULL DEFAULT 0,"
+                " output_tokens INTEGER NOT NULL DEFAULT 0,"
+                " cached_input_tokens INTEGER NOT NULL DEFAULT 0,"
+                " latency_ms_sum REAL NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (hour, model, endpoint, role_id));"
+            )
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"LLM usage ledger disabled: {e}")
+            return None
+
+    def record(
+        self,
+        model: str,
+        usage: Dict[str, Any],
+        latency_seconds: float = 0.0,
+        tags: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        """
+        1回の呼び出しを記録し、1時間単位の集計表に加算する（書き込みは書き込みスレッドがまとめて行う）
+
+        Args:
+            model: 応答したモデル
+            usage: LLMService のトークン使用量（input_tokens / output_tokens / cached_input_tokens / cache_hit）
+            latency_seconds: 所要時間（キャッシュヒットは0）
+            tags: analysis_id / role_id / endpoint（None の場合は current_usage_tags）
+        """
+        if self._conn is None:
+            return
+        tags = current_usage_tags() if tags is None else tags
+        now = time.time()
+        row = (
+            _hour_key(datetime.fromtimestamp(now)),
+            model,
+            tags.get("endpoint") or "",
+            tags.get("role_id") or "",
+            1 if usage.get("cache_hit") else 0,
+            int(usage.get("input_tokens", 0) or 0),
+            int(usage.get("output_tokens", 0) or 0),
+            int(usage.get("cached_input_tokens", 0) or 0),
+            round(latency_seconds * 1000, 1),
+        )
+        with self._pending_lock:
+            self._pending.append((now, row, tags.get("analysis_id")))
+            backlog = len(self._pending)
+            if self._writer is None and not self._closed.is_set():
+                self._writer = threading.Thread(target=self._run_writer, name="llm-usage-ledger", daemon=True)
+                self._writer.start()
+        if backlog >= _FLUSH_BATCH:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """溜まっている記録を1回のトランザクションで書き込み、書き込んだ件数を返す"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending or self._conn is None:
+            return 0
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT INTO llm_usage_calls (ts, hour, model, endpoint, role_id, analysis_id, cache_hit,"
+                    " input_tokens, output_tokens, cached_input_tokens, latency_ms)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(ts, *row[:4], analysis_id, *row[4:]) for ts, row, analysis_id in pending],
+                )
+                self._conn.executemany(
+                    "INSERT INTO llm_usage_hourly (hour, model, endpoint, role_id, calls, cache_hits,"
+                    " input_tokens, output_tokens, cached_input_tokens, latency_ms_sum)"
+                    " VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (hour, model, endpoint, role_id) DO UPDATE SET"
+                    " calls = calls + 1, cache_hits = cache_hits + excluded.cache_hits,"
+                    " input_tokens = input_tokens + excluded.input_tokens,"
+                    " output_tokens = output_tokens + excluded.output_tokens,"
+                    " cached_input_tokens = cached_input_tokens + excluded.cached_input_tokens,"
+                    " latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum",
+                    [row for _, row, _ in pending],
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.warning(f"Failed to write LLM usage ledger ({len(pending)} calls dropped): {e}")
+                return 0
+        return len(pending)
+
+    def close(self) -> None:
+        """書き込みスレッドを止め、溜まっている記録を書き込む（プロセス終了時）"""
+        self._closed.set()
+        self._wake.set()
+        writer = self._writer
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=5)
+        self.flush()
+
+    def _run_writer(self) -> None:
+        """flush_interval ごと（溜まった記録が _FLUSH_BATCH 件に達したらすぐ）に書き込み、purge_interval ごとに明細を削除する"""
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if self.retention_days > 0 and time.monotonic() >= self._next_purge:
+                self.purge()
+
+    def daily_totals(self, day: Optional[date] = None) -> Dict[str, int]:
+        """指定日（省略時は本日）の input_tokens / output_tokens / calls / cache_hits（集計表から）"""
+        day = day or date.today()
+        start = _hour_key(datetime.combine(day, datetime.min.time()))
+        end = _hour_key(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+        row = self._query_one(
+            "SELECT COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0),"
+            " COALESCE(SUM(calls), 0), COALESCE(SUM(cache_hits), 0)"
+            " FROM llm_usage_hourly WHERE hour >= ? AND hour < ?",
+            (start, end),
+        ) or (0, 0, 0, 0)
+        return {"input_tokens": row[0], "output_tokens": row[1], "calls": row[2], "cache_hits": row[3]}
+
+    def summary(self, hours: int = 24, group_by: Sequence[str] = ("role_id",)) -> List[Dict[str, Any]]:
+        """
+        直近 hours 時間（現在の時間帯を含む）の使用量を group_by の列ごとに集計（集計表から）
+
+        Args:
+            hours: 集計する時間数
+            group_by: model / endpoint / role_id の組み合わせ（空の場合は全体の1行）
+
+        Returns:
+            group_by の列 + calls / cache_hits / input_tokens / output_tokens / cached_input_tokens / avg_latency_ms。
+            トークン数の多い順
+        """
+        columns = [column for column in group_by if column in GROUP_BY_COLUMNS]
+        since = _hour_key(datetime.now() - timedelta(hours=max(1, hours) - 1))
+        select = ", ".join(columns + [
+            "SUM(calls)", "SUM(cache_hits)", "SUM(input_tokens)", "SUM(output_tokens)",
+            "SUM(cached_input_tokens)", "SUM(latency_ms_sum)",
+        ])
+        group = f" GROUP BY {', '.join(columns)}" if columns else ""
+        rows = self._query_all(
+            f"SELECT {select} FROM llm_usage_hourly WHERE hour >= ?{group}"
+            " ORDER BY SUM(input_tokens) + SUM(output_tokens) DESC",
+            (since,),
+        )
+        return [self._summary_row(columns, row) for row in rows if row[len(columns)]]
+
+    def analysis_usage(self, analysis_id: str) -> List[Dict[str, Any]]:
+        """分析1件の使用量をロール・モデル別に集計（呼び出し明細から。保持期間内のみ）"""
+        columns = ["role_id", "model", "endpoint"]
+        rows = self._query_all(
+            "SELECT role_id, model, endpoint, COUNT(*), SUM(cache_hit), SUM(input_tokens), SUM(output_tokens),"
+            " SUM(cached_input_tokens), SUM(latency_ms)"
+            " FROM llm_usage_calls WHERE analysis_id = ? GROUP BY role_id, model, endpoint ORDER BY MIN(ts)",
+            (analysis_id,),
+        )
+        return [self._summary_row(columns, row) for row in rows]
+
+    def purge(self, older_than_days: Optional[int] = None) -> int:
+        """保持期間を過ぎた呼び出し明細を削除し、削除件数を返す（集計表は残す）"""
+        days = self.retention_days if older_than_days is None else older_than_days
+        if self._conn is None or days <= 0:
+            return 0
+        self._next_purge = time.monotonic() + self.purge_interval
+        with self._lock:
+            try:
+                cur = self._conn.execute("DELETE FROM llm_usage_calls WHERE ts < ?", (time.time() - days * 86400,))
+                self._conn.commit()
+                return cur.rowcount
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to purge LLM usage ledger: {e}")
+                return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """台帳の状態（監視用）"""
+        row = self._query_one("SELECT COUNT(*) FROM llm_usage_calls", ())
+        return {
+            "enabled": self._conn is not None,
+            "persistent": self._persistent,
+            "retention_days": self.retention_days,
+            "calls_retained": row[0] if row else 0,
+        }
+
+    @staticmethod
+    def _summary_row(columns: List[str], row: Sequence[Any]) -> Dict[str, Any]:
+        calls, cache_hits, input_tokens, output_tokens, cached_input_tokens, latency_ms = row[len(columns):]
+        fresh_calls = calls - (cache_hits or 0)
+        return {
+            **{column: value or None for column, value in zip(columns, row)},
+            "calls": calls,
+            "cache_hits": cache_hits or 0,
+            "input_tokens": input_tokens or 0,
+            "output_tokens": output_tokens or 0,
+            "cached_input_tokens": cached_input_tokens or 0,
+            # キャッシュヒット（所要時間0）を除いた平均
+            "avg_latency_ms": round((latency_ms or 0) / fresh_calls, 1) if fresh_calls else 0.0,
+        }
+
+    def _query_one(self, sql: str, params: Sequence[Any]) -> Optional[Sequence[Any]]:
+        rows = self._query_all(sql, params)
+        return rows[0] if rows else None
+
+    def _query_all(self, sql: str, params: Sequence[Any]) -> List[Sequence[Any]]:
+        if self._conn is None:
+            return []
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to read LLM usage ledger: {e}")
+                return []
+
+
+# モジュール単一インスタンス（config から初期化）
+_usage_ledger: Optional[LLMUsageLedger] = None
+
+
+def get_usage_ledger() -> LLMUsageLedger:
+    global _usage_ledger
+    if _usage_ledger is None:
+        from config import config
+        _usage_ledger = LLMUsageLedger(
+            db_path=config.LLM_USAGE_LEDGER_DB_PATH,
+            enabled=config.LLM_USAGE_LEDGER_ENABLED,
+            retention_days=config.LLM_USAGE_LEDGER_RETENTION_DAYS,
+            flush_interval=config.LLM_USAGE_LEDGER_FLUSH_INTERVAL_SECONDS,
+            purge_interval=config.LLM_USAGE_LEDGER_PURGE_INTERVAL_SECONDS,
+        )
+        atexit.register(_usage_ledger.close)
+    return _usage_ledger
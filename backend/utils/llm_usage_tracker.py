@@ -1,38 +1,53 @@
 """
 LLM日次トークン使用量の追跡と上限チェック
 コスト暴騰防止のため、日次トークン数が上限を超えたらLLM呼び出しをスキップ（モックフォールバック）
+使用量台帳（LLMUsageLedger）を渡した場合は、日付が変わった時点（起動直後を含む）の累積を台帳から読み込むため、再起動してもリセットされない
 """
 
-from datetime import datetime, date
-from typing import Optional
+from datetime import date
+from typing import TYPE_CHECKING, Optional
 import threading
 from utils.logger import logger
 
+if TYPE_CHECKING:
+    from utils.llm_usage_ledger import LLMUsageLedger
+
 
 class LLMUsageTracker:
     """日次トークン使用量を記録し、上限を超えたかチェックする"""
 
-    def __init__(self, daily_limit: int = 0):
+    def __init__(self, daily_limit: int = 0, ledger: Optional["LLMUsageLedger"] = None):
         """
         Args:
             daily_limit: 1日あたりのトークン上限。0は無制限。
+            ledger: 本日の累積の読み込み元（省略時はメモリ上のみで、再起動でリセットされる）
         """
         self.daily_limit = daily_limit
+        self.ledger = ledger
         self._date: Optional[date] = None
         self._input_tokens = 0
         self._output_tokens = 0
         self._lock = threading.Lock()
 
+    def _roll_over(self) -> None:
+        """日付が変わっていれば累積を本日の値（台帳があれば台帳の値、無ければ0）にする（ロック取得済み前提）"""
+        today = date.today()
+        if self._date == today:
+            return
+        self._date = today
+        self._input_tokens = 0
+        self._output_tokens = 0
+        if self.ledger is not None:
+            totals = self.ledger.daily_totals(today)
+            self._input_tokens = totals["input_tokens"]
+            self._output_tokens = totals["output_tokens"]
+
     def add(self, input_tokens: int = 0, output_tokens: int = 0) -> None:
         """使用トークンを加算。日付が変わっていればリセットする。"""
         if self.daily_limit <= 0:
             return
         with self._lock:
-            today = date.today()
-            if self._date != today:
-                self._date = today
-                self._input_tokens = 0
-                self._output_tokens = 0
+            self._roll_over()
             self._input_tokens += input_tokens
             self._output_tokens += output_tokens
             total = self._input_tokens + self._output_tokens
@@ -43,20 +58,36 @@ class LLMUsageTracker:
         if self.daily_limit <= 0:
             return False
         with self._lock:
-            today = date.today()
-            if self._date != today:
-                return False
+            self._roll_over()
             total = self._input_tokens + self._output_tokens
             return total >= self.daily_limit
 
-    def get_daily_total(self) -> int:
-        """本日の累積トークン数（input + output）。"""
+    def would_exceed(self, tokens: int) -> bool:
+        """本日の累積に tokens（呼び出し前の推定値）を加えると上限を超える場合 True。上限0の場合は常に False。"""
+        if self.daily_limit <= 0:
+            return False
         with self._lock:
-            today = date.today()
-            if self._date != today:
+            self._roll_over()
+            total = self._input_tokens + self._output_tokens
+            return total + tokens > self.daily_limit
+
+    def get_daily_total(self) -> int:
+        """本日の累積トークン数（input + output）。上限0の場合は加算しないため、台帳があれば台帳の値。"""
+        if self.daily_limit <= 0:
+            if self.ledger is None:
                 return 0
+            totals = self.ledger.daily_totals()
+            return totals["input_tokens"] + totals["output_tokens"]
+        with self._lock:
+            self._roll_over()
             return self._input_tokens + self._output_tokens
 
+    def remaining_ratio(self) -> Optional[float]:
+        """本日の上限に対する残りの割合（0.0〜1.0）。上限0の場合は None"""
+        if self.daily_limit <= 0:
+            return None
+        return max(0.0, 1.0 - self.get_daily_total() / self.daily_limit)
+
 
 # モジュール単一インスタンス（config から初期化）
 _usage_tracker: Optional[LLMUsageTracker] = None
@@ -65,5 +96,6 @@ _usage_tracker: Optional[LLMUsageTracker] = None
 def get_usage_tracker(daily_limit: int = 0) -> LLMUsageTracker:
     global _usage_tracker
     if _usage_tracker is None:
-        _usage_tracker = LLMUsageTracker(daily_limit=daily_limit)
+        from utils.llm_usage_ledger import get_usage_ledger
+        _usage_tracker = LLMUsageTracker(daily_limit=daily_limit, ledger=get_usage_ledger())
     return _usage_tracker
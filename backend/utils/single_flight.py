@@ -0,0 +1,76 @@
+"""
+同一キーの並行処理の合流（single-flight）
+同じキーの処理が実行中なら新たに実行せず、実行中の処理の完了を待って結果（または例外）を共有する。
+同じアラートを複数人が同時に開いた場合の重複分析（ロールごとのLLM呼び出し）を1回にまとめる用途。
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from utils.logger import logger
+
+
+class SingleFlight:
+    """
+    キー単位で実行中の非同期処理を共有する（単一イベントループ内で使用）
+
+    結果はキャッシュしない。完了後に同じキーで呼ばれた場合は新たに実行する。
+    先に呼んだリクエストが取り消されても（クライアント切断など）、待っている他のリクエストのために処理は継続する。
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[str, "asyncio.Task[Any]"] = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        key の処理を実行、または実行中の処理に合流する
+
+        Args:
+            key: 入力のフィンガープリント
+            fn: 実行する処理（コルーチンを返す関数。合流した場合は呼ばれない）
+
+        Returns:
+            (結果, 合流したか)。合流した場合は実行中の処理と同じ結果オブジェクトを返す（呼び出し側で複製する）
+
+        Raises:
+            実行中の処理が送出した例外（合流したリクエストにも同じ例外を送出する）
+        """
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            # 別のイベントループの処理には合流できない（テストクライアント等）
+            task = None
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self._stats["leaders"] += 1
+        else:
+            self._stats["followers"] += 1
+            logger.info(f"実行中の同一処理に合流します: key={key[:12]}")
+        return await asyncio.shield(task), shared
+
+    def in_flight(self) -> int:
+        """実行中の処理の数"""
+        return len(self._in_flight)
+
+    def get_stats(self) -> Dict[str, int]:
+        """実行（leaders）・合流（followers）の回数"""
+        return {**self._stats, "in_flight": len(self._in_flight)}
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        """完了した処理を外す（同じキーで新しい処理が登録済みならそのまま）"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # 例外は待っている呼び出し側で扱う。全員が取り消された場合の「未取得の例外」警告を抑止する
+            task.exception()
+
+
+def content_fingerprint(*parts: Any) -> str:
+    """JSON化できるデータの内容ハッシュ（キー順に依存しない SHA-256）"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,142 @@
+"""
+トークン数のローカル推定
+LLM APIを呼ばずにテキストのトークン数を見積もる（長時間会議の分割・プロンプト予算の判定用）。
+日本語（かな・漢字・全角記号）は1文字≒1トークン、英数字・半角記号は約4文字≒1トークンとして数える。
+calibration を有効にすると、LLM呼び出しの usage_metadata（実際の入力トークン数）から文字種ごとの係数を補正する。
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import config
+
+# 補正後の係数を既定値のこの倍率の範囲に収める（外れ値の応答で推定が壊れないように）
+_CALIBRATION_CLAMP = 4.0
+# 2つの文字種の文字数の相関がこれ以上の場合は係数を分離できないとみなし、全体の倍率だけを補正する
+_COLLINEAR_THRESHOLD = 0.98
+
+
+class TokenEstimator:
+    """文字種ごとの係数でトークン数を推定する"""
+
+    def __init__(
+        self,
+        ascii_chars_per_token: float = 4.0,
+        non_ascii_tokens_per_char: float = 1.0,
+        calibration: bool = False,
+        min_samples: int = 20,
+        decay: float = 0.98,
+    ):
+        """
+        Args:
+            ascii_chars_per_token: 英数字・半角記号の何文字で1トークンとみなすか
+            non_ascii_tokens_per_char: 日本語など非ASCII文字1文字あたりのトークン数
+            calibration: 実測値（observe）から係数を補正するか
+            min_samples: 補正した係数を使い始めるまでの実測数
+            decay: 実測ごとに過去の実測の重みに掛ける減衰率（モデルの切り替えなどに追従する）
+        """
+        self.ascii_chars_per_token = ascii_chars_per_token
+        self.non_ascii_tokens_per_char = non_ascii_tokens_per_char
+        self.calibration = calibration
+        self.min_samples = min_samples
+        self.decay = decay
+        self._ascii_weight = 1.0 / ascii_chars_per_token
+        self._non_ascii_weight = non_ascii_tokens_per_char
+        # 減衰付きの最小二乗（トークン数 ≒ a × ASCII文字数 + n × 非ASCII文字数）の積和
+        self._sums = {"aa": 0.0, "nn": 0.0, "an": 0.0, "ay": 0.0, "ny": 0.0, "ee": 0.0, "ey": 0.0}
+        self._samples = 0
+        self._lock = threading.Lock()
+
+    def estimate(self, text: str) -> int:
+        """テキストの推定トークン数（空文字は0、それ以外は最低1）"""
+        if not text:
+            return 0
+        ascii_chars, non_ascii_chars = self._counts(text)
+        tokens = ascii_chars * self._ascii_weight + non_ascii_chars * self._non_ascii_weight
+        return max(1, int(tokens + 0.5))
+
+    def estimate_many(self, texts: Iterable[str]) -> int:
+        """複数テキストの推定トークン数の合計"""
+        return sum(self.estimate(text) for text in texts)
+
+    def observe(self, text: str, actual_tokens: int) -> None:
+        """
+        実際のトークン数（usage_metadata の prompt_token_count）を記録し、係数を補正する
+
+        calibration が無効、または空文字・実測0の場合は何もしない。
+        """
+        if not self.calibration or not text or actual_tokens <= 0:
+            return
+        a, n = self._counts(text)
+        e = a / self.ascii_chars_per_token + n * self.non_ascii_tokens_per_char  # 既定の係数での推定値
+        y = float(actual_tokens)
+        with self._lock:
+            sums = self._sums
+            for key in sums:
+                sums[key] *= self.decay
+            sums["aa"] += a * a
+            sums["nn"] += n * n
+            sums["an"] += a * n
+            sums["ay"] += a * y
+            sums["ny"] += n * y
+            sums["ee"] += e * e
+            sums["ey"] += e * y
+            self._samples += 1
+            if self._samples >= self.min_samples:
+                self._refit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """推定に使っている係数と実測数（監視用）"""
+        with self._lock:
+            return {
+                "calibration": self.calibration,
+                "calibrated": self.calibration and self._samples >= self.min_samples,
+                "samples": self._samples,
+                "ascii_chars_per_token": round(1.0 / self._ascii_weight, 3),
+                "non_ascii_tokens_per_char": round(self._non_ascii_weight, 3),
+            }
+
+    def _refit(self) -> None:
+        """積和から係数を解き直す（ロック内で呼ぶ）"""
+        sums = self._sums
+        default_ascii = 1.0 / self.ascii_chars_per_token
+        default_non_ascii = self.non_ascii_tokens_per_char
+        det = sums["aa"] * sums["nn"] - sums["an"] ** 2
+        correlated = sums["aa"] * sums["nn"] == 0 or sums["an"] ** 2 >= _COLLINEAR_THRESHOLD * sums["aa"] * sums["nn"]
+        if not correlated and det > 0:
+            ascii_weight = (sums["ay"] * sums["nn"] - sums["ny"] * sums["an"]) / det
+            non_ascii_weight = (sums["ny"] * sums["aa"] - sums["ay"] * sums["an"]) / det
+        elif sums["ee"] > 0:
+            # 片方の文字種しか無い・比率がほぼ一定の場合は、既定の係数の比を保ったまま全体の倍率だけ合わせる
+            scale = sums["ey"] / sums["ee"]
+            ascii_weight, non_ascii_weight = default_ascii * scale, default_non_ascii * scale
+        else:
+            return
+        self._ascii_weight = _clamp(ascii_weight, default_ascii)
+        self._non_ascii_weight = _clamp(non_ascii_weight, default_non_ascii)
+
+    @staticmethod
+    def _counts(text: str) -> Tuple[int, int]:
+        """(ASCII文字数, 非ASCII文字数)"""
+        # ASCII以外を落としたバイト列の長さ = ASCII文字数（文字ごとのループより大幅に速い）
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        return ascii_chars, len(text) - ascii_chars
+
+
+def _clamp(value: float, default: float) -> float:
+    """係数を既定値の 1/_CALIBRATION_CLAMP 〜 _CALIBRATION_CLAMP 倍に収める"""
+    return min(max(value, default / _CALIBRATION_CLAMP), default * _CALIBRATION_CLAMP)
+
+
+# モジュール単一インスタンス
+_token_estimator: Optional[TokenEstimator] = None
+
+
+def get_token_estimator() -> TokenEstimator:
+    global _token_estimator
+    if _token_estimator is None:
+        _token_estimator = TokenEstimator(
+            calibration=config.TOKEN_ESTIMATOR_CALIBRATION_ENABLED,
+            min_samples=config.TOKEN_ESTIMATOR_MIN_SAMPLES,
+        )
+    return _token_estimator